@@ -0,0 +1,270 @@
+"""
+Group-by Aggregation of Scores
+==============================
+
+One vectorized aggregation layer over the scored responses. The ScoreTables
+of all categories are unpivoted into a long frame with one row per
+(response, metric), with the weighted score as the pseudo-metric 'Score',
+and keyed by category, llm, prompt_id and metric. Any combination of
+those keys can then be grouped to get mean, median, std (population, like
+np.std), min, max and count with whole-array NumPy operations: sums per
+group with np.bincount over the group codes, and the order statistics from
+one stable sort.
+
+The per-model summaries, the metric breakdown and the overall rankings
+of UpdatedLLMAnalyzer are built from it, and it answers new slices such
+as per-prompt difficulty, model x prompt matrices or per-metric variance
+without another loop over the responses.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from result_store import ScoreTable
+
+# Name of the weighted score among the metrics
+SCORE = 'Score'
+
+GROUP_KEYS = ('category', 'llm', 'prompt_id', 'metric')
+STATISTICS = ('mean', 'median', 'std', 'min', 'max', 'count')
+
+# Keys of the summary dicts in results[category]['summary'][model]
+SUMMARY_KEYS = {'mean': 'average_score', 'median': 'median_score', 'std': 'std_score',
+                'min': 'min_score', 'max': 'max_score', 'count': 'total_responses'}
+
+
+def _merge_codes(codes: List[np.ndarray], labels: List[List]) -> Tuple[np.ndarray, List]:
+    """
+    Merge per-table dictionary codes into codes over one label list.
+
+    The None label (missing values) becomes code -1.
+    """
+    merged: Dict = {}
+    remapped = []
+    for table_codes, table_labels in zip(codes, labels):
+        lookup = np.empty(max(len(table_labels), 1), dtype=np.int64)
+        for code, label in enumerate(table_labels):
+            lookup[code] = -1 if label is None else merged.setdefault(label, len(merged))
+        remapped.append(lookup[table_codes])
+    all_codes = np.concatenate(remapped) if remapped else np.empty(0, dtype=np.int64)
+    return all_codes, list(merged)
+
+
+class ScoreAggregator:
+    """
+    Vectorized group-by statistics over the ScoreTables of a run.
+    """
+
+    def __init__(self, tables: Dict[str, ScoreTable]):
+        """
+        Args:
+            tables (Dict): ScoreTable per category
+        """
+        self.tables = tables
+        self._long: Optional[Tuple[Dict[str, Tuple[np.ndarray, List]], np.ndarray]] = None
+        self._cache: Dict = {}
+
+    def _long_columns(self) -> Tuple[Dict[str, Tuple[np.ndarray, List]], np.ndarray]:
+        """
+        The scores unpivoted to one value per (response, metric), with the
+        (codes, labels) of every group key.
+        """
+        if self._long is None:
+            categories, models, prompts, metrics, values = [], [], [], [], []
+            model_labels, prompt_labels = [], []
+            metric_labels: Dict[str, int] = {}
+            for position, (category, table) in enumerate(self.tables.items()):
+                columns = table.columns
+                names = table.metrics + [SCORE]
+                width = len(names)
+                block = np.column_stack([columns['metrics'], columns['weighted']])
+                metric_codes = np.array([metric_labels.setdefault(name, len(metric_labels))
+                                         for name in names], dtype=np.int64)
+                values.append(block.ravel())
+                categories.append(np.full(block.size, position, dtype=np.int64))
+                models.append(np.repeat(columns['model'], width))
+                prompts.append(np.repeat(columns['prompt'], width))
+                metrics.append(np.tile(metric_codes, len(block)))
+                model_labels.append(table.models)
+                prompt_labels.append(table.prompts)
+
+            def join(parts, dtype=np.int64):
+                return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+            keys = {
+                'category': (join(categories), list(self.tables)),
+                'llm': _merge_codes(models, model_labels),
+                'prompt_id': _merge_codes(prompts, prompt_labels),
+                'metric': (join(metrics), list(metric_labels))
+            }
+            self._long = keys, join(values, np.float64)
+        return self._long
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        Long frame with category, llm, prompt_id, metric and value columns.
+        """
+        keys, values = self._long_columns()
+        frame = {name: pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype=object))
+                 for name, (codes, labels) in keys.items()}
+        frame['value'] = values
+        return pd.DataFrame(frame)
+
+    def aggregate(self, by: Sequence[str], metrics: Optional[Sequence[str]] = None,
+                  statistics: Sequence[str] = STATISTICS) -> pd.DataFrame:
+        """
+        Statistics of the scores grouped by any combination of GROUP_KEYS.
+
+        The groups are formed with one stable sort of the combined key
+        codes; rows with a missing key (no LLM or Prompt_ID) are left out.
+
+        Args:
+            by (Sequence[str]): Grouping keys, e.g. ('category', 'llm')
+            metrics (Sequence[str]): Metrics to include (default: all, plus 'Score');
+                group by 'metric' to keep them apart
+            statistics (Sequence[str]): Any of STATISTICS
+
+        Returns:
+            pd.DataFrame indexed by the keys (groups in first-seen order) with
+            one column per statistic
+        """
+        by = list(by)
+        unknown = set(by) - set(GROUP_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown group keys: {sorted(unknown)}")
+        unknown = set(statistics) - set(STATISTICS)
+        if unknown:
+            raise ValueError(f"Unknown statistics: {sorted(unknown)}")
+        key = (tuple(by), None if metrics is None else tuple(metrics), tuple(statistics))
+        if key in self._cache:
+            return self._cache[key]
+
+        keys, values = self._long_columns()
+        keep = np.ones(len(values), dtype=bool)
+        if metrics is not None:
+            metric_codes, metric_labels = keys['metric']
+            wanted = [metric_labels.index(name) for name in metrics if name in metric_labels]
+            keep &= np.isin(metric_codes, wanted)
+        for name in by:
+            keep &= keys[name][0] >= 0
+        rows = np.flatnonzero(keep)
+        values = values[rows]
+
+        # One combined integer key per row, numbered in first-seen order
+        combined = np.zeros(len(rows), dtype=np.int64)
+        for name in by:
+            codes, labels = keys[name]
+            combined = combined * max(len(labels), 1) + codes[rows]
+        unique, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+        rank = np.empty(len(unique), dtype=np.int64)
+        rank[np.argsort(first, kind='stable')] = np.arange(len(unique))
+        group = rank[inverse.ravel()]
+        first = np.sort(first)
+
+        counts = np.bincount(group, minlength=len(unique))
+        starts = np.cumsum(counts) - counts
+        ordered = None
+        if {'median', 'min', 'max'} & set(statistics):
+            # Each group's values, contiguous and ascending after one sort
+            ordered = values[np.lexsort((values, group))]
+
+        columns = {}
+        means = None
+        if 'mean' in statistics or 'std' in statistics:
+            means = np.bincount(group, weights=values, minlength=len(counts)) / counts
+        for statistic in statistics:
+            if statistic == 'mean':
+                columns[statistic] = means
+            elif statistic == 'std':
+                # Two-pass: squared deviations from the group means, as np.std
+                deviations = values - means[group]
+                columns[statistic] = np.sqrt(np.bincount(group, weights=deviations * deviations,
+                                                         minlength=len(counts)) / counts)
+            elif statistic == 'median':
+                columns[statistic] = (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+            elif statistic == 'min':
+                columns[statistic] = ordered[starts]
+            elif statistic == 'max':
+                columns[statistic] = ordered[starts + counts - 1]
+            else:
+                columns[statistic] = counts
+
+        first_rows = rows[first]
+        levels = [pd.Index(keys[name][1], dtype=object).take(keys[name][0][first_rows]) for name in by]
+        if len(by) == 1:
+            index = levels[0].rename(by[0])
+        elif by:
+            index = pd.MultiIndex.from_arrays(levels, names=by)
+        else:
+            index = pd.RangeIndex(len(counts))  # by=[]: one group over everything
+        result = pd.DataFrame(columns, index=index)
+        self._cache[key] = result
+        return result
+
+    def summaries(self, category: str, models: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Weighted-score summary of each model with scores in a category.
+
+        Returns:
+            {model: summary dict} in the order of models
+        """
+        stats = self.aggregate(['category', 'llm'], metrics=[SCORE])
+        summaries = {}
+        for model in models:
+            if (category, model) in stats.index:
+                row = stats.loc[(category, model)]
+                summary = {SUMMARY_KEYS[name]: row[name] for name in STATISTICS}
+                summary['total_responses'] = int(summary['total_responses'])
+                summaries[model] = summary
+        return summaries
+
+    def metric_averages(self, category: str, models: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Average of every metric per model in a category.
+        """
+        means = self.aggregate(['category', 'llm', 'metric'], statistics=['mean'])['mean']
+        metrics = self.tables[category].metrics
+        averages = {}
+        for model in models:
+            if model in self.tables[category]:
+                averages[model] = {metric: means[(category, model, metric)] for metric in metrics}
+        return averages
+
+    def category_means(self, models: Sequence[str]) -> pd.DataFrame:
+        """
+        Average weighted score of each model (rows) in each category (columns),
+        NaN where a model has no scores in a category.
+        """
+        means = self.aggregate(['category', 'llm'], metrics=[SCORE], statistics=['mean'])['mean']
+        matrix = means.unstack('category') if len(means) else pd.DataFrame()
+        return matrix.reindex(index=list(models), columns=list(self.tables)).astype(float)
+
+    def prompt_difficulty(self, category: Optional[str] = None) -> pd.DataFrame:
+        """
+        Weighted-score statistics per prompt across models, hardest first.
+        """
+        stats = self.aggregate(['category', 'prompt_id'], metrics=[SCORE])
+        if category is not None:
+            stats = stats.xs(category, level='category')
+        return stats.sort_values('mean')
+
+    def model_prompt_matrix(self, category: str, statistic: str = 'mean') -> pd.DataFrame:
+        """
+        Prompt (rows) x model (columns) matrix of a weighted-score statistic.
+        """
+        stats = self.aggregate(['category', 'prompt_id', 'llm'], metrics=[SCORE],
+                               statistics=[statistic])[statistic]
+        return stats.xs(category, level='category').unstack('llm')
+
+    def metric_variance(self) -> pd.DataFrame:
+        """
+        Population variance of every metric per category and model.
+        """
+        stats = self.aggregate(['category', 'llm', 'metric'], statistics=['std'])
+        return (stats['std'] ** 2).rename('variance').to_frame()
@@ -3,55 +3,208 @@
 Updated LLM Evaluation Analysis Script
 =====================================
 
-This script analyzes the responses from three LLMs (GPT-4.1-mini, Llama, Mistral) 
-across two evaluation categories (Coding and Paraphrasing) and calculates scores 
-based on predefined metrics. Updated to work with the actual Excel structure.
+This script analyzes the responses of the LLMs found in the data (e.g. GPT-4.1-mini, 
+Llama, Mistral) across the evaluation categories of scoring_rules.json (Coding and 
+Paraphrasing by default) and calculates scores based on predefined metrics. Updated 
+to work with the actual Excel structure.
 
 Author: COMP 5541 Project
 Date: 2025
 """
 
-import pandas as pd
-import numpy as np
-import re
-from typing import Dict, List, Tuple, Optional
+from __future__ import annotations
+
+import os
+import sys
+import argparse
+import contextlib
+import functools
+import hashlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 import warnings
+from score_cache import ScoreCache, response_key
+from checkpoint import CheckpointStore, chunk_key
+from code_execution import ExecutionEngine
+from instrumentation import PipelineTrace, no_laps
+from scoring_core import ResponseScorer, is_missing, load_rules
 warnings.filterwarnings('ignore')
 
-class UpdatedLLMAnalyzer:
+
+def _lazy_import(name: str):
+    """
+    Import a module on first attribute access instead of right away.
+    
+    pandas and numpy take hundreds of milliseconds to import and are only
+    needed by the Excel, batch and report paths, not by the per-response
+    evaluators inherited from scoring_core.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+pd = _lazy_import('pandas')
+np = _lazy_import('numpy')
+
+# Analyzer used by scoring worker processes, set by _init_scoring_worker
+_worker_analyzer = None
+
+
+def _timed(stage: str):
+    """
+    Time a method as a pipeline stage when the analyzer is instrumented.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._stage(stage):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Columns a sheet needs for its rows to be scored
+RESPONSE_COLUMNS = {'LLM', 'Prompt_ID', 'Response'}
+
+
+def metric_columns(count: int) -> List[str]:
+    """
+    Sheet columns of a category's metric scores: Metric_A, Metric_B, ...
+    """
+    return [f"Metric_{chr(ord('A') + position)}" for position in range(count)]
+
+
+def _init_scoring_worker(analyzer: 'UpdatedLLMAnalyzer') -> None:
+    """
+    Install the analyzer that a worker process scores chunks with.
+    """
+    global _worker_analyzer
+    # Workers score in-process; a shard worker must not start a nested pool
+    analyzer.workers = 1
+    if analyzer.executor is not None:
+        analyzer.executor.workers = 1
+    _worker_analyzer = analyzer
+
+
+def _score_chunk(category: str, responses: pd.Series, prompt_ids: pd.Series) -> pd.DataFrame:
+    """
+    Score one chunk of a sheet inside a worker process.
+    """
+    return _worker_analyzer._score_metrics(category, responses, prompt_ids)
+
+
+def _score_shard(path: str, partial_path: str) -> str:
+    """
+    Score one input shard inside a worker process and save its partial.
+    """
+    _worker_analyzer.score_shard(path, partial_path)
+    _worker_analyzer.close()
+    return partial_path
+
+
+class UpdatedLLMAnalyzer(ResponseScorer):
     """
     A comprehensive analyzer for LLM evaluation responses.
     Updated to work with the actual Excel structure.
     """
     
-    def __init__(self, excel_file: str = "records.xlsx"):
+    # Parallel scoring only pays off once every worker gets this many rows
+    MIN_ROWS_PER_WORKER = 1000
+    # Chunks handed to each worker, so uneven chunks balance out
+    CHUNKS_PER_WORKER = 4
+    # Rows scored and checkpointed at a time when checkpoints are on
+    CHECKPOINT_ROWS = 50_000
+    
+    def __init__(self, excel_file: str = "records.xlsx", vectorized: bool = False,
+                 workers: int = 1, cache_path: Optional[str] = None,
+                 cache_size: int = 1_000_000, resamples: int = 10_000,
+                 rules: Optional[Dict[str, Dict]] = None, models: Optional[List[str]] = None,
+                 executor: Optional[ExecutionEngine] = None,
+                 near_duplicates: Optional[float] = None,
+                 checkpoint_path: Optional[str] = None,
+                 source_similarity: bool = False):
         """
         Initialize the analyzer with the Excel file containing responses.
         
         Args:
             excel_file (str): Path to the Excel file containing LLM responses
+            vectorized (bool): Score whole sheets with column operations instead
+                of calling the per-response evaluators row by row; faster when
+                responses repeat, about as fast as the rows when they are unique
+            workers (int): Number of processes to score with (0 = all CPU cores)
+            cache_path (str): SQLite file caching scores between runs (None = no cache)
+            cache_size (int): Maximum number of cached responses
+            resamples (int): Bootstrap resamples and permutations behind the
+                report's confidence intervals and significance tests (0 = skip them)
+            rules (Dict): Rule set per category in the format of
+                scoring_rules.json (default: read that file)
+            models (List[str]): Models to report, in this order (default: every
+                model found in the data, sorted by name)
+            executor (ExecutionEngine): Runs responses against the test cases of
+                their prompt and scores one metric (Correctness) by pass rate
+                (None = heuristics only)
+            near_duplicates (float): Score each cluster of near-duplicate
+                responses to a prompt once and share its scores; responses
+                whose word 3-grams have at least this estimated Jaccard
+                similarity are near-duplicates (None = score every response)
+            checkpoint_path (str): SQLite file recording the scores of every
+                CHECKPOINT_ROWS rows as they finish, so a rerun after a crash
+                resumes instead of scoring them again (None = no checkpoints)
+            source_similarity (bool): Apply the rules comparing paraphrases
+                with the source text of their prompt (default: drop them)
         """
         self.excel_file = excel_file
+        self.vectorized = vectorized
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.cache_path = cache_path
+        self.cache_size = cache_size
+        self.resamples = resamples
+        self.executor = executor
+        self.near_duplicates = near_duplicates
+        self.duplicates = None  # DuplicateReport of the clusters found while scoring
+        if near_duplicates is not None:
+            from near_duplicates import DuplicateReport
+            self.duplicates = DuplicateReport(near_duplicates)
+        self.checkpoint_path = checkpoint_path
+        self._pool = None
+        self._cache = None
+        self._checkpoint = None
         self.data = {}
         self.results = {}
+        self.updated_sheets = set()  # Sheets whose score columns were recomputed
+        self.trace = None  # PipelineTrace while instrumented, see instrument()
         
-        # Coding metrics and weights
-        self.coding_metrics = {
-            'Correctness': 0.40,
-            'Efficiency': 0.20,
-            'Readability': 0.20,
-            'Error Handling': 0.20
-        }
-        
-        # Paraphrasing metrics and weights
-        self.paraphrasing_metrics = {
-            'Relevance & Fidelity': 0.30,
-            'Creativity & Originality': 0.30,
-            'Fluency & Coherence': 0.20,
-            'Prompt Adherence': 0.20
-        }
+        # Metric weights, indicator terms and their matchers per category
+        super().__init__(rules, source_similarity)
         
-        self.models = ['GPT-4.1-mini', 'Llama', 'Mistral']
+        # Models are discovered from the scored data unless given here
+        self.selected_models = list(models) if models else None
+        self.models = list(models or [])
+    
+    @property
+    def sheet_categories(self) -> Dict[str, str]:
+        """
+        Scoring category of each response sheet named by a rule set.
+        """
+        return {sheet: category for category, rule_set in self.rule_sets.items()
+                for sheet in rule_set.sheets}
+    
+    def _resolve_models(self, found: Iterable) -> List:
+        """
+        Models to report: those given to the constructor, else every model
+        found in the scored data, sorted by name.
+        """
+        if self.selected_models is not None:
+            return list(self.selected_models)
+        return sorted({model for model in found if not is_missing(model)}, key=str)
         
     def load_data(self) -> None:
         """
@@ -59,7 +212,10 @@ class UpdatedLLMAnalyzer:
         """
         try:
             # Read all sheets
-            excel_data = pd.read_excel(self.excel_file, sheet_name=None)
+            with self._stage('load_data', nbytes=os.path.getsize(self.excel_file)):
+                excel_data = pd.read_excel(self.excel_file, sheet_name=None)
+            if self.trace is not None:
+                self.trace.count('load_data', rows=sum(len(sheet) for sheet in excel_data.values()))
             
             print(f"Found {len(excel_data)} sheets in {self.excel_file}")
             for sheet_name in excel_data.keys():
@@ -74,523 +230,1285 @@ class UpdatedLLMAnalyzer:
             print(f"Error loading Excel file: {e}")
             return
     
-    def evaluate_coding_response(self, response: str, prompt_id: str) -> Dict[str, float]:
+    def score_batch(self, category: str, responses: pd.Series, prompt_ids: pd.Series) -> pd.DataFrame:
         """
-        Evaluate a coding response based on the defined metrics.
+        Score a column of responses with the column-wise evaluator of a
+        category's rule set; the result matches its row-wise evaluator.
         
         Args:
-            response (str): The LLM's response to evaluate
-            prompt_id (str): The prompt ID (C01-C30)
+            category (str): Scoring category, e.g. 'coding'
+            responses (pd.Series): Response column
+            prompt_ids (pd.Series): Prompt_ID column
             
         Returns:
-            Dict with scores for each metric (0-10 scale)
+            pd.DataFrame with one column per metric of the category (0-10
+            scale), indexed like responses
         """
-        if pd.isna(response) or response == '':
-            return {metric: 0.0 for metric in self.coding_metrics.keys()}
-        
-        response = str(response).lower()
-        scores = {}
-        
-        # Correctness (40% weight)
-        correctness_score = 5.0  # Base score
-        
-        # Check for Python syntax elements
-        if 'def ' in response:
-            correctness_score += 1.5
-        if 'return' in response:
-            correctness_score += 1.0
-        if 'import' in response or 'from' in response:
-            correctness_score += 0.5
-        if 'class ' in response:
-            correctness_score += 1.0
-        if any(keyword in response for keyword in ['if ', 'for ', 'while ', 'try:']):
-            correctness_score += 0.5
-        
-        # Check for function calls and proper syntax
-        if '(' in response and ')' in response:
-            correctness_score += 0.5
-        
-        # Penalty for obvious errors
-        if 'error' in response or 'exception' in response:
-            if 'handle' not in response and 'try' not in response:
-                correctness_score -= 1.0
-        
-        scores['Correctness'] = min(10.0, max(0.0, correctness_score))
-        
-        # Efficiency (20% weight)
-        efficiency_score = 5.0  # Base score
-        
-        # Positive indicators
-        if any(term in response for term in ['o(n)', 'o(log', 'efficient', 'optimize', 'complexity']):
-            efficiency_score += 2.0
-        if any(term in response for term in ['dict', 'set', 'hash', 'dictionary']):
-            efficiency_score += 1.5
-        if any(term in response for term in ['binary search', 'sort', 'heap']):
-            efficiency_score += 1.0
+        return self.rule_sets[category].evaluate_columns(
+            responses, prompt_ids, self._metric_laps(category, len(responses)))
+    
+    def score_coding_batch(self, responses: pd.Series, prompt_ids: pd.Series) -> pd.DataFrame:
+        """
+        Columnar counterpart of evaluate_coding_response.
         
-        # Negative indicators
-        if any(term in response for term in ['nested loop', 'o(n^2)', 'o(n²)', 'brute force']):
-            efficiency_score -= 1.0
+        Runs the column-wise evaluator of the coding rule set, so the result
+        matches calling evaluate_coding_response on each row.
         
-        scores['Efficiency'] = min(10.0, max(0.0, efficiency_score))
+        Args:
+            responses (pd.Series): Response column of the Coding sheet
+            prompt_ids (pd.Series): Prompt_ID column of the Coding sheet
+            
+        Returns:
+            pd.DataFrame with one column per coding metric (0-10 scale),
+            indexed like responses
+        """
+        return self.score_batch('coding', responses, prompt_ids)
+    
+    def score_paraphrasing_batch(self, responses: pd.Series, prompt_ids: pd.Series) -> pd.DataFrame:
+        """
+        Columnar counterpart of evaluate_paraphrasing_response.
         
-        # Readability (20% weight)
-        readability_score = 5.0  # Base score
+        Runs the column-wise evaluator of the paraphrasing rule set, so the
+        result matches calling evaluate_paraphrasing_response on each row.
         
-        # Check for good practices
-        if '"""' in response or "'''" in response:  # Docstrings
-            readability_score += 2.0
-        if '#' in response:  # Comments
-            readability_score += 1.5
-        if len(response) > 100:  # Reasonable length
-            readability_score += 0.5
+        Args:
+            responses (pd.Series): Response column of the paraphrasing sheet
+            prompt_ids (pd.Series): Prompt_ID column of the paraphrasing sheet
+            
+        Returns:
+            pd.DataFrame with one column per paraphrasing metric (0-10 scale),
+            indexed like responses
+        """
+        return self.score_batch('paraphrasing', responses, prompt_ids)
+    
+    def calculate_weighted_scores_batch(self, metric_frame: pd.DataFrame,
+                                        weights: Dict[str, float]) -> pd.Series:
+        """
+        Columnar counterpart of calculate_weighted_scores.
         
-        # Check for clear variable names (heuristic)
-        words = response.split()
-        descriptive_names = [word for word in words if len(word) > 3 and word.isalpha()]
-        if len(descriptive_names) > 3:
-            readability_score += 1.5
+        Args:
+            metric_frame (pd.DataFrame): One column per metric
+            weights (Dict): Weights for each metric
+            
+        Returns:
+            pd.Series: Weighted total score per row
+        """
+        total_score = pd.Series(0.0, index=metric_frame.index)
+        for metric in metric_frame.columns:
+            if metric in weights:
+                total_score += metric_frame[metric] * weights[metric]
+        return total_score
+    
+    def __getstate__(self) -> Dict:
+        """
+        Pickle only the scoring configuration, not the loaded sheets, pool or cache.
+        """
+        state = self.__dict__.copy()
+        state['data'] = {}
+        state['results'] = {}
+        state['_pool'] = None
+        state['_cache'] = None
+        state['_checkpoint'] = None
+        state['trace'] = None
+        return state
+    
+    def instrument(self, profile: bool = False, trace_memory: bool = False) -> PipelineTrace:
+        """
+        Start timing pipeline stages and metric families.
         
-        # Check for proper indentation indicators
-        if '    ' in response or '\t' in response:  # Indentation
-            readability_score += 1.0
+        Metric families are timed inside the batch scorers of this process;
+        chunks scored by worker processes only show up in the stage times.
         
-        scores['Readability'] = min(10.0, max(0.0, readability_score))
+        Args:
+            profile (bool): Also run cProfile over the run
+            trace_memory (bool): Also run tracemalloc over the run
+            
+        Returns:
+            PipelineTrace: The trace, also kept in self.trace
+        """
+        self.trace = PipelineTrace(profile=profile, trace_memory=trace_memory)
+        return self.trace
+    
+    def _stage(self, name: str, rows: int = 0, nbytes: int = 0,
+               texts: Optional[pd.Series] = None):
+        """
+        Context manager timing a pipeline stage (a no-op unless instrumented).
         
-        # Error Handling (20% weight)
-        error_handling_score = 3.0  # Base score
+        Args:
+            name (str): Stage name
+            rows (int): Rows processed
+            nbytes (int): Bytes processed
+            texts (pd.Series): Text column whose UTF-8 size is added to nbytes
+        """
+        if self.trace is None:
+            return contextlib.nullcontext()
+        if texts is not None:
+            nbytes += int(texts.dropna().map(
+                lambda value: len(str(value).encode('utf-8', 'surrogatepass'))).sum())
+        return self.trace.stage(name, rows=rows, nbytes=nbytes)
+    
+    def _metric_laps(self, category: str, rows: int):
+        """
+        Lap timer for the metric families of a batch (a no-op unless instrumented).
+        """
+        if self.trace is None:
+            return no_laps(category, rows)
+        return self.trace.laps(category, rows)
+    
+    def _get_cache(self) -> Optional[ScoreCache]:
+        """
+        Open the score cache on first use and check it against the current rules.
+        """
+        if self.cache_path is None:
+            return None
+        if self._cache is None or self._cache.closed:
+            self._cache = ScoreCache(self.cache_path, self.cache_size)
+        self._cache.validate(self.scoring_fingerprint())
+        return self._cache
+    
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Hit/miss counters of the score cache, or None when caching is off.
+        """
+        return self._cache.stats() if self._cache is not None else None
+    
+    def _get_checkpoint(self) -> Optional[CheckpointStore]:
+        """
+        Open the checkpoint store on first use.
+        """
+        if self.checkpoint_path is not None and self._checkpoint is None:
+            self._checkpoint = CheckpointStore(self.checkpoint_path)
+        return self._checkpoint
+    
+    def checkpoint_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Chunks resumed from and saved to the checkpoint store, or None when
+        checkpoints are off or nothing was scored.
+        """
+        return self._checkpoint.stats() if self._checkpoint is not None else None
+    
+    def discard_checkpoint(self) -> None:
+        """
+        Delete the checkpoint store once the run's outputs are safely written.
+        """
+        store = self._get_checkpoint()
+        if store is not None:
+            store.discard()
+            self._checkpoint = None
+    
+    def scoring_fingerprint(self) -> str:
+        """
+        Hash of everything that determines a response's scores, including
+        the test cases and limits of the execution engine when there is one
+        and the near-duplicate threshold when clusters share scores.
+        """
+        fingerprint = super().scoring_fingerprint()
+        if self.executor is not None:
+            fingerprint = hashlib.sha256(f"{fingerprint}:{self.executor.fingerprint()}"
+                                         .encode('utf-8')).hexdigest()
+        if self.near_duplicates is not None:
+            fingerprint = hashlib.sha256(f"{fingerprint}:near_duplicates={self.near_duplicates!r}"
+                                         .encode('utf-8')).hexdigest()
+        return fingerprint
+    
+    def _score_metrics(self, category: str, responses: pd.Series,
+                       prompt_ids: pd.Series) -> pd.DataFrame:
+        """
+        Score responses in the current process.
         
-        # Check for error handling patterns
-        if 'try:' in response and 'except' in response:
-            error_handling_score += 4.0
-        elif 'try:' in response or 'except' in response:
-            error_handling_score += 2.0
+        Uses the batch scorer when the analyzer is vectorized and the
+        per-response evaluator of the category otherwise; both give the same
+        numbers.
+        """
+        if self.vectorized:
+            return self.score_batch(category, responses, prompt_ids)
+        rule_set = self.rule_sets[category]
+        return pd.DataFrame(
+            [rule_set.evaluate(response, prompt_id) for response, prompt_id in zip(responses, prompt_ids)],
+            index=responses.index, columns=list(rule_set.weights))
+    
+    def plan_chunks(self, n_rows: int) -> List[Tuple[int, int]]:
+        """
+        Split a sheet into row ranges for parallel scoring.
         
-        if 'raise' in response:
-            error_handling_score += 2.0
+        Sheets too small to give every worker MIN_ROWS_PER_WORKER rows use
+        fewer workers, down to a single in-process chunk.
         
-        if any(term in response for term in ['valueerror', 'typeerror', 'filenotfounderror', 'keyerror']):
-            error_handling_score += 1.5
+        Args:
+            n_rows (int): Number of rows in the sheet
+            
+        Returns:
+            List of (start, stop) row ranges covering the sheet in order
+        """
+        workers = min(self.workers, n_rows // self.MIN_ROWS_PER_WORKER)
+        if workers <= 1:
+            return [(0, n_rows)]
         
-        # Check for validation
-        if any(term in response for term in ['if not', 'assert', 'validate']):
-            error_handling_score += 1.0
+        n_chunks = workers * self.CHUNKS_PER_WORKER
+        chunk_size = -(-n_rows // n_chunks)
+        return [(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Start the worker pool on first use.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=_init_scoring_worker,
+                                             initargs=(self,))
+        return self._pool
+    
+    def close(self) -> None:
+        """
+        Shut down the worker pool and the execution sandboxes and close the
+        score cache, if they were started. The cache's counters stay
+        available to cache_stats(); the next scoring call reopens it.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.executor is not None:
+            self.executor.close()
+        if self._cache is not None:
+            self._cache.close()
+    
+    def _score_in_chunks(self, category: str, responses: pd.Series,
+                         prompt_ids: pd.Series) -> pd.DataFrame:
+        """
+        Score responses, in worker processes when there are enough of them.
         
-        scores['Error Handling'] = min(10.0, max(0.0, error_handling_score))
+        Chunks are merged back in row order, so the result is identical to
+        scoring the responses in one piece.
+        """
+        chunks = self.plan_chunks(len(responses))
+        if len(chunks) == 1:
+            return self._score_metrics(category, responses, prompt_ids)
+        
+        pool = self._get_pool()
+        futures = [pool.submit(_score_chunk, category,
+                               responses.iloc[start:stop], prompt_ids.iloc[start:stop])
+                   for start, stop in chunks]
+        return pd.concat([future.result() for future in futures])
+    
+    def _score_fresh(self, category: str, responses: pd.Series,
+                     prompt_ids: pd.Series) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Score responses with the rules, then replace the execution metric by
+        the test pass rate where the execution engine ran them.
         
-        return scores
+        Returns:
+            Tuple of (metric scores per row, whether each row's scores are
+            final; False for rows the engine's time budget left unexecuted,
+            which must not be cached)
+        """
+        metric_frame = self._score_in_chunks(category, responses, prompt_ids)
+        final = np.ones(len(metric_frame), dtype=bool)
+        if self.executor is None or not self.executor.covers(category):
+            return metric_frame, final
+        
+        with self._stage(f'execute:{category}', rows=len(responses)):
+            rates, final = self.executor.pass_rates(category, responses.tolist(), prompt_ids.tolist())
+        rates = np.array([np.nan if rate is None else rate for rate in rates], dtype=float)
+        low, high = self.rule_sets[category].clamp
+        metric = self.executor.metric(category)
+        executed = ~np.isnan(rates)
+        metric_frame[metric] = np.where(executed, low + (high - low) * np.nan_to_num(rates),
+                                        metric_frame[metric].to_numpy(dtype=float))
+        return metric_frame, np.array(final, dtype=bool)
     
-    def evaluate_paraphrasing_response(self, response: str, prompt_id: str) -> Dict[str, float]:
+    def score_responses(self, df: pd.DataFrame, category: str) -> Tuple[pd.DataFrame, pd.Series]:
         """
-        Evaluate a paraphrasing response based on the defined metrics.
+        Score every response of a sheet.
+        
+        With a score cache configured, responses already scored under the
+        current rules are read from the cache and only the rest are scored
+        (in parallel for large sheets) and stored. With near_duplicates set,
+        only the first response of each cluster of near-duplicates is scored
+        and the rest of the cluster gets its scores.
         
         Args:
-            response (str): The LLM's response to evaluate
-            prompt_id (str): The prompt ID (P01-P30)
+            df (pd.DataFrame): Sheet with LLM, Response and Prompt_ID columns
+            category (str): Scoring category, e.g. 'coding'
             
         Returns:
-            Dict with scores for each metric (0-10 scale)
-        """
-        if pd.isna(response) or response == '':
-            return {metric: 0.0 for metric in self.paraphrasing_metrics.keys()}
-        
-        response = str(response)
-        scores = {}
-        word_count = len(response.split())
-        
-        # Relevance & Fidelity (30% weight)
-        relevance_score = 5.0  # Base score
-        
-        # Length appropriateness
-        if 10 <= word_count <= 200:
-            relevance_score += 2.5
-        elif 200 < word_count <= 300:
-            relevance_score += 1.5
-        elif word_count > 300:
-            relevance_score += 0.5
-        elif word_count < 10:
-            relevance_score -= 2.0
-        
-        # Check for direct copying (negative indicator)
-        quote_count = response.count('"') + response.count("'")
-        if quote_count > 6:  # Too many quotes might indicate copying
-            relevance_score -= 1.0
+            Tuple of (metric scores per row, weighted score per row)
+        """
+        from near_duplicates import NearDuplicateIndex
+        
+        weights = self.rule_sets[category].weights
+        with self._stage(f'score:{category}', rows=len(df), texts=df['Response']):
+            if self.near_duplicates is None:
+                metric_frame = self._score_rows(df, category)
+            else:
+                with self._stage(f'score:{category}:near_duplicates', rows=len(df)):
+                    index = NearDuplicateIndex(df['Response'], df['Prompt_ID'], self.near_duplicates)
+                    self.duplicates.add(index, df['LLM'], df['Prompt_ID'])
+                    # Representatives are the first row of their cluster
+                    representatives = np.unique(index.representatives)
+                scored = self._score_rows(df.iloc[representatives], category)
+                metric_frame = pd.DataFrame(
+                    scored.to_numpy()[np.searchsorted(representatives, index.representatives)],
+                    index=df.index, columns=scored.columns)
+            
+            weighted = self.calculate_weighted_scores_batch(metric_frame, weights)
+        return metric_frame, weighted
+    
+    def _score_rows(self, df: pd.DataFrame, category: str) -> pd.DataFrame:
+        """
+        Metric scores of every row of a sheet.
         
-        # Check for relevant content indicators
-        if any(term in response.lower() for term in ['explain', 'describe', 'meaning', 'refers to']):
-            relevance_score += 1.0
+        With checkpoints on, the rows are scored CHECKPOINT_ROWS at a time
+        and every finished chunk is recorded; chunks an interrupted run
+        already finished are read back instead.
+        """
+        store = self._get_checkpoint()
+        if store is None:
+            return self._score_with_cache(df, category)[0]
+        
+        fingerprint = self.scoring_fingerprint()
+        texts = df['Response'].map(str).where(df['Response'].notna(), '')
+        frames = []
+        for start in range(0, len(df), self.CHECKPOINT_ROWS):
+            chunk = df.iloc[start:start + self.CHECKPOINT_ROWS]
+            key = chunk_key(fingerprint, category, chunk['Prompt_ID'],
+                            texts.iloc[start:start + self.CHECKPOINT_ROWS])
+            rows = store.get(key)
+            if rows is None:
+                metric_frame, final = self._score_with_cache(chunk, category)
+                # Chunks the execution budget cut short are scored again on resume
+                if final.all():
+                    store.put(key, metric_frame.to_numpy().tolist())
+            else:
+                metric_frame = pd.DataFrame(rows, index=chunk.index,
+                                            columns=list(self.rule_sets[category].weights), dtype=float)
+            frames.append(metric_frame)
+        if not frames:
+            return self._score_with_cache(df, category)[0]
+        return pd.concat(frames)
+    
+    def _score_with_cache(self, df: pd.DataFrame, category: str) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Metric scores of every row of a sheet, read from the score cache
+        where possible.
         
-        scores['Relevance & Fidelity'] = min(10.0, max(0.0, relevance_score))
+        Returns:
+            Tuple of (metric scores per row, whether each row's scores are
+            final, see _score_fresh)
+        """
+        weights = self.rule_sets[category].weights
+        cache = self._get_cache()
+        if cache is None:
+            return self._score_fresh(category, df['Response'], df['Prompt_ID'])
+        
+        fingerprint = self.scoring_fingerprint()
+        texts = df['Response'].map(str).where(df['Response'].notna(), '')
+        keys = [response_key(fingerprint, category, prompt_id, text)
+                for prompt_id, text in zip(df['Prompt_ID'], texts)]
+        with self._stage(f'score:{category}:cache_lookup', rows=len(keys)):
+            cached = cache.get_many(keys)
+        
+        rows = [cached.get(key) for key in keys]
+        missing = np.array([row is None for row in rows], dtype=bool)
+        final = np.ones(len(rows), dtype=bool)
+        if missing.any():
+            fresh, fresh_final = self._score_fresh(category, df['Response'][missing],
+                                                   df['Prompt_ID'][missing])
+            fresh_rows = fresh.to_numpy().tolist()
+            with self._stage(f'score:{category}:cache_store', rows=int(fresh_final.sum())):
+                cache.put_many((key, values) for key, values, keep in
+                               zip(np.array(keys, dtype=object)[missing], fresh_rows, fresh_final)
+                               if keep)
+            for position, values in zip(np.flatnonzero(missing), fresh_rows):
+                rows[position] = values
+            final[missing] = fresh_final
+        
+        return pd.DataFrame(rows, index=df.index, columns=list(weights), dtype=float), final
+    
+    def _new_results(self) -> Dict:
+        """
+        Empty results, with a ScoreTable per category under 'scores' and
+        its lazy dict view under 'detailed_scores'.
+        """
+        from result_store import ScoreTable
         
-        # Creativity & Originality (30% weight)
-        creativity_score = 5.0  # Base score
+        results = {'overall_summary': {}}
+        for category, rule_set in self.rule_sets.items():
+            table = ScoreTable(list(rule_set.weights))
+            results[category] = {'detailed_scores': table.detailed_view(), 'summary': {},
+                                 'scores': table}
+        return results
+    
+    def _collect_detailed_scores(self, df: pd.DataFrame, metric_frame: pd.DataFrame,
+                                 weighted: pd.Series, table) -> None:
+        """
+        Append the scored rows of a sheet to a category's ScoreTable.
+        """
+        responses = df['Response']
+        lengths = responses.astype(str).str.len().where(responses.notna(), 0).astype(int)
+        table.append(df['LLM'], df['Prompt_ID'], lengths.to_numpy(),
+                     metric_frame[table.metrics].to_numpy(dtype=float),
+                     weighted.to_numpy(dtype=float))
+    
+    def _route_sheets(self) -> Dict[str, List[Tuple[str, np.ndarray]]]:
+        """
+        Find the rows of each scoring category in the loaded sheets.
         
-        # Check for creative elements
-        if any(term in response.lower() for term in ['imagine', 'creative', 'unique', 'innovative']):
-            creativity_score += 2.0
+        Sheets without LLM, Prompt_ID and Response columns (e.g. Metrics)
+        are skipped, as are rows whose category has no rule set.
         
-        # Check for varied vocabulary
-        words = response.lower().split()
-        unique_words = set(words)
-        if len(words) > 0:
-            vocab_diversity = len(unique_words) / len(words)
-            if vocab_diversity > 0.8:  # High vocabulary diversity
-                creativity_score += 2.0
-            elif vocab_diversity > 0.6:
-                creativity_score += 1.0
+        Returns:
+            Dict mapping each category with rows to (sheet, row mask) pairs
+        """
+        routes = {}
+        for sheet, df in self.data.items():
+            if not RESPONSE_COLUMNS.issubset(df.columns):
+                continue
+            categories = self._categorize(df.assign(Sheet=sheet))
+            for category in self.rule_sets:
+                mask = categories == category
+                if mask.any():
+                    routes.setdefault(category, []).append((sheet, mask))
+        return routes
+    
+    @staticmethod
+    def _set_rows(df: pd.DataFrame, column: str, mask: np.ndarray, values: np.ndarray) -> None:
+        """
+        Write scores into the masked rows of a sheet column, keeping the
+        other rows (which belong to another category or none).
+        """
+        if mask.all():
+            df[column] = values
+            return
+        current = (pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, copy=True)
+                   if column in df.columns else np.full(len(df), np.nan))
+        current[mask] = values
+        df[column] = current
+    
+    @_timed('process_and_update_excel')
+    def process_and_update_excel(self) -> Dict:
+        """
+        Process all responses, calculate scores, and update the Excel file.
         
-        # Check for creative formats (poems, stories, etc.)
-        if any(term in response.lower() for term in ['haiku', 'poem', 'story', 'once upon', 'metaphor']):
-            creativity_score += 2.5
+        Returns:
+            Dict containing comprehensive analysis results; 'aggregates' holds
+            the ScoreAggregator for further group-by slices, 'significance'
+            the bootstrap intervals and paired tests
+        """
+        from aggregation import ScoreAggregator
+        from significance import model_significance
         
-        # Check for creative punctuation or formatting
-        if any(char in response for char in ['!', '?', '...', '—', '–']):
-            creativity_score += 0.5
+        results = self._new_results()
         
-        scores['Creativity & Originality'] = min(10.0, max(0.0, creativity_score))
+        # Route the rows of every response sheet to their scoring categories
+        with self._stage('categorize'):
+            routes = self._route_sheets()
         
-        # Fluency & Coherence (20% weight)
-        fluency_score = 6.0  # Base score
+        # Score each category in one pass over the rows of all its sheets
+        for category, parts in routes.items():
+            rule_set = self.rule_sets[category]
+            rows = pd.concat([self.data[sheet][mask] for sheet, mask in parts], ignore_index=True)
+            
+            print(f"Processing {category} responses...")
+            metric_frame, weighted = self.score_responses(rows, category)
+            
+            # Store for analysis
+            with self._stage(f'detailed_scores:{category}', rows=len(rows)):
+                self._collect_detailed_scores(rows, metric_frame, weighted,
+                                              results[category]['scores'])
+            
+            # Update the sheets in bulk
+            metric_values = metric_frame[list(rule_set.weights)].to_numpy(dtype=float)
+            weighted_values = weighted.to_numpy(dtype=float)
+            start = 0
+            for sheet, mask in parts:
+                stop = start + int(mask.sum())
+                with self._stage(f'update_sheet:{sheet}', rows=stop - start):
+                    df = self.data[sheet].copy()
+                    for column, values in zip(metric_columns(metric_values.shape[1]),
+                                              metric_values[start:stop].T):
+                        self._set_rows(df, column, mask, values)
+                    self._set_rows(df, 'Score', mask, weighted_values[start:stop])
+                    # Same as Score for individual responses
+                    self._set_rows(df, 'Mean_Score', mask, weighted_values[start:stop])
+                self.data[sheet] = df
+                self.updated_sheets.add(sheet)
+                start = stop
+        
+        # Scoring is done; release the worker processes
+        self.close()
+        
+        # Calculate summary statistics and the overall summary from one
+        # group-by aggregation over both categories
+        with self._stage('summary_stats'):
+            aggregator = ScoreAggregator({category: results[category]['scores']
+                                          for category in self.rule_sets})
+            self.models = self._resolve_models(model for category in self.rule_sets
+                                               for model in results[category]['scores'].models)
+            for category in self.rule_sets:
+                results[category]['summary'] = aggregator.summaries(category, self.models)
+            results['aggregates'] = aggregator
+            results['overall_summary'] = self._build_overall_summary(results)
+        
+        # Confidence intervals and paired tests behind the rankings
+        if self.resamples > 0:
+            with self._stage('significance'):
+                results['significance'] = model_significance(aggregator, self.models,
+                                                             self.resamples)
+        if self._cache is not None:
+            results['cache'] = self.cache_stats()
+        if self.executor is not None:
+            results['execution'] = self.executor.stats()
+        if self.duplicates is not None:
+            results['duplicates'] = self.duplicates.summary()
         
-        # Check for proper sentence structure
-        sentence_count = len([s for s in response.split('.') if s.strip()])
-        if sentence_count >= 3:
-            fluency_score += 2.0
-        elif sentence_count >= 2:
-            fluency_score += 1.0
+        return results
+    
+    def _build_overall_summary(self, results: Dict) -> Dict:
+        """
+        Rank the models by the mean of their category average scores.
         
-        # Check for coherence indicators
-        if any(term in response.lower() for term in ['however', 'therefore', 'furthermore', 'moreover', 'additionally', 'consequently']):
-            fluency_score += 1.5
+        A model is averaged over the categories it has scores in, so a
+        missing category does not count as a zero; models without any
+        scores are not ranked.
         
-        # Check for proper grammar indicators
-        if response.count(',') > 0:  # Use of commas
-            fluency_score += 0.5
+        Args:
+            results (Dict): Results with an 'aggregates' ScoreAggregator, or
+                per-category 'summary' entries (stream and incremental runs)
+            
+        Returns:
+            Dict with model_rankings, best_model, score_differences and
+            categories_covered (number of categories each model has scores in)
+        """
+        aggregator = results.get('aggregates')
+        if aggregator is not None:
+            means = aggregator.category_means(self.models)
+        else:
+            means = pd.DataFrame(
+                [[results[category]['summary'].get(model, {}).get('average_score', np.nan)
+                  for category in self.rule_sets] for model in self.models],
+                index=list(self.models), columns=list(self.rule_sets), dtype=float)
+        covered = means.notna().sum(axis=1)
+        overall_scores = means[covered > 0].mean(axis=1).to_dict()
+        
+        return {
+            'model_rankings': sorted(overall_scores.items(), key=lambda x: x[1], reverse=True),
+            'best_model': max(overall_scores.items(), key=lambda x: x[1])[0] if overall_scores else None,
+            'score_differences': {
+                model: overall_scores[model] - min(overall_scores.values()) 
+                for model in overall_scores
+            },
+            'categories_covered': {model: int(count) for model, count in covered.items()}
+        }
+    
+    def _categorize(self, batch: pd.DataFrame) -> np.ndarray:
+        """
+        Work out the scoring category of every record in a batch.
         
-        # Penalty for very short responses
-        if word_count < 5:
-            fluency_score -= 3.0
-        elif word_count < 10:
-            fluency_score -= 1.0
+        The source sheet name decides first (a rule set's 'sheets'), then the
+        Category column (a rule set's 'labels', e.g. 'Coding' or
+        'Paraphrasing, Generation, and Creation'), then the Prompt_ID
+        prefix (C/P).
         
-        scores['Fluency & Coherence'] = min(10.0, max(0.0, fluency_score))
+        Returns:
+            np.ndarray: Category name, or None, per record
+        """
+        categories = batch['Sheet'].map(self.sheet_categories).to_numpy(dtype=object)
+        if 'Category' in batch.columns:
+            labels = batch['Category'].astype(str).str.lower()
+            for category, rule_set in self.rule_sets.items():
+                found = labels.str.startswith(rule_set.labels).to_numpy(dtype=bool)
+                categories[found & pd.isna(categories)] = category
+        prefixes = batch['Prompt_ID'].astype(str).str[:1].str.upper().to_numpy(dtype=object)
+        for category, rule_set in self.rule_sets.items():
+            if rule_set.prompt_prefix:
+                categories[(prefixes == rule_set.prompt_prefix) & pd.isna(categories)] = category
+        return np.where(pd.isna(categories), None, categories)
+    
+    def stream_scored_batches(self, path: str,
+                              batch_size: int = 5000) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Score records from a file batch by batch without loading it whole.
         
-        # Prompt Adherence (20% weight)
-        adherence_score = 5.0  # Base score
+        Args:
+            path (str): Input file (.xlsx, .csv, .jsonl or .corpus)
+            batch_size (int): Records read and scored at a time
+            
+        Yields:
+            Tuple of (category, frame with LLM, Prompt_ID, the metric
+            scores and the weighted Score of each record in the batch)
+        """
+        from streaming import iter_record_batches
+        
+        for batch in iter_record_batches(path, batch_size):
+            categories = self._categorize(batch)
+            for category in self.rule_sets:
+                part = batch[categories == category]
+                if part.empty:
+                    continue
+                metric_frame, weighted = self.score_responses(part, category)
+                scored = part[['LLM', 'Prompt_ID']].join(metric_frame)
+                scored['Score'] = weighted
+                yield category, scored
+    
+    @_timed('process_stream')
+    def process_stream(self, path: str, batch_size: int = 5000) -> Dict:
+        """
+        Score a response file of any size with flat memory use.
         
-        # Extract prompt number for specific checks
-        prompt_num = int(prompt_id[1:]) if prompt_id[1:].isdigit() else 0
+        Per-model summaries are kept in running accumulators instead of
+        per-response lists, so 'detailed_scores' stays empty, the median
+        comes from a mergeable quantile sketch and the metric averages are
+        reported from 'metric_averages' in each summary.
         
-        # Check for format adherence (emails, lists, etc.)
-        if prompt_num in [8, 17]:  # Email or list format prompts
-            if '@' in response or any(term in response.lower() for term in ['dear', 'sincerely', 'regards', 'email']):
-                adherence_score += 2.0
-            if any(term in response for term in ['1.', '2.', '3.', '•', '-', '*']):
-                adherence_score += 1.5
+        Args:
+            path (str): Input file (.xlsx, .csv, .jsonl or .corpus)
+            batch_size (int): Records read and scored at a time
+            
+        Returns:
+            Dict in the shape returned by process_and_update_excel()
+        """
+        from streaming import ModelAggregate
+        
+        accumulators = {category: {} for category in self.rule_sets}
+        
+        print(f"Streaming responses from {path}...")
+        for category, scored in self.stream_scored_batches(path, batch_size):
+            metrics = list(self.rule_sets[category].weights)
+            for llm, group in scored.groupby('LLM', sort=False):
+                if llm not in accumulators[category]:
+                    accumulators[category][llm] = ModelAggregate(metrics)
+                accumulators[category][llm].add(group['Score'].to_numpy(), group[metrics])
+        self.close()
+        
+        results = self._new_results()
+        self.models = self._resolve_models(model for models in accumulators.values() for model in models)
+        for category, models in accumulators.items():
+            for model in self.models:
+                if model in models:
+                    results[category]['summary'][model] = models[model].summary()
+        
+        results['overall_summary'] = self._build_overall_summary(results)
+        if self._cache is not None:
+            results['cache'] = self.cache_stats()
+        if self.executor is not None:
+            results['execution'] = self.executor.stats()
+        if self.duplicates is not None:
+            results['duplicates'] = self.duplicates.summary()
+        return results
+    
+    def score_shard(self, path: str, partial_path: Optional[str] = None,
+                    batch_size: int = 5000):
+        """
+        Score one input shard and save its mergeable partial results.
         
-        # Check for length constraints
-        if prompt_num in [3, 25]:  # Haiku or specific length prompts
-            if word_count <= 50:  # Reasonable constraint following
-                adherence_score += 2.5
+        Args:
+            path (str): Input file (.xlsx, .csv, .jsonl or .corpus)
+            partial_path (str): Where to save the partial (default:
+                <path>.partial.json)
+            batch_size (int): Records read and scored at a time
+            
+        Returns:
+            ShardPartial: The partial results of the shard
+        """
+        from shards import ShardPartial, default_partial_path
+        
+        partial = ShardPartial(self.scoring_fingerprint(),
+                               {category: list(rule_set.weights)
+                                for category, rule_set in self.rule_sets.items()})
+        partial.sources.append(path)
+        for category, scored in self.stream_scored_batches(path, batch_size):
+            partial.add(category, scored)
+        partial.save(partial_path or default_partial_path(path))
+        return partial
+    
+    @_timed('process_shards')
+    def process_shards(self, inputs: List[str]) -> Dict:
+        """
+        Score input shards independently, in parallel, and merge their partials.
         
-        # Check for tone/style adherence
-        if any(term in response.lower() for term in ['formal', 'casual', 'professional', 'friendly']):
-            adherence_score += 1.0
+        Each shard is streamed by its own worker process (up to self.workers
+        at a time) and leaves a <shard>.partial.json, which merge_partials()
+        can combine again later without re-scoring.
         
-        # Check for specific format requirements
-        if prompt_num == 23:  # Recipe to poem prompt
-            if any(term in response.lower() for term in ['rhyme', 'verse', 'poem']):
-                adherence_score += 2.0
-        
-        scores['Prompt Adherence'] = min(10.0, max(0.0, adherence_score))
-        
-        return scores
+        Args:
+            inputs (List[str]): Shard files or glob patterns
+            
+        Returns:
+            Dict in the shape returned by process_stream(), with the exact
+            median and the merged shards under 'shards'
+        """
+        from shards import default_partial_path, expand_inputs
+        
+        paths = expand_inputs(inputs)
+        partial_paths = [default_partial_path(path) for path in paths]
+        workers = min(self.workers, len(paths))
+        print(f"Scoring {len(paths)} shards with {workers} worker(s)...")
+        if workers <= 1:
+            for path, partial_path in zip(paths, partial_paths):
+                self.score_shard(path, partial_path)
+            self.close()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_scoring_worker,
+                                     initargs=(self,)) as pool:
+                list(pool.map(_score_shard, paths, partial_paths))
+        return self.merge_partials(partial_paths)
     
-    def calculate_weighted_scores(self, metric_scores: Dict[str, float], 
-                                 weights: Dict[str, float]) -> float:
+    def merge_partials(self, partial_paths: List[str]) -> Dict:
         """
-        Calculate weighted total score from individual metric scores.
+        Combine saved shard partials into the results of a single run.
         
         Args:
-            metric_scores (Dict): Individual metric scores
-            weights (Dict): Weights for each metric
+            partial_paths (List[str]): Partial files or glob patterns
             
         Returns:
-            float: Weighted total score
+            Dict in the shape returned by process_stream(), with the merged
+            shards under 'shards'
         """
-        total_score = 0.0
-        for metric, score in metric_scores.items():
-            if metric in weights:
-                total_score += score * weights[metric]
-        return total_score
+        from shards import ShardPartial, expand_inputs
+        
+        merged = None
+        for path in expand_inputs(partial_paths):
+            partial = ShardPartial.load(path)
+            if merged is None:
+                merged = partial
+            else:
+                merged.merge(partial)
+        if merged is None:
+            raise ValueError("No partial results to merge")
+        if merged.fingerprint != self.scoring_fingerprint():
+            print("Warning: partials were scored with different scoring rules than the current ones")
+        
+        results = self._new_results()
+        self.models = self._resolve_models(model for category in self.rule_sets
+                                           for model in merged.aggregates.get(category, {}))
+        for category in self.rule_sets:
+            models = merged.aggregates.get(category, {})
+            for model in self.models:
+                if model in models:
+                    results[category]['summary'][model] = merged.summary(category, model)
+        
+        results['overall_summary'] = self._build_overall_summary(results)
+        results['shards'] = {'sources': merged.sources, 'rows': merged.rows}
+        if self._cache is not None:
+            results['cache'] = self.cache_stats()
+        return results
     
-    def process_and_update_excel(self) -> Dict:
+    @_timed('process_incremental')
+    def process_incremental(self, manifest_path: Optional[str] = None) -> Dict:
         """
-        Process all responses, calculate scores, and update the Excel file.
+        Score only the rows that are new or changed since the last run.
+        
+        Rows are matched against the fingerprints in the row manifest by
+        content. Stored scores are reused for unchanged rows, the scores of
+        rows that disappeared or changed are subtracted from the stored
+        per-model aggregates, and the freshly scored rows are added to
+        them. Without a usable manifest (first run, or the scoring rules
+        changed) every row is scored.
         
+        Args:
+            manifest_path (str): Manifest file (default: next to the Excel file)
+            
         Returns:
-            Dict containing comprehensive analysis results
+            Dict in the shape returned by process_and_update_excel(), where
+            'detailed_scores' only holds the rows scored in this run and each
+            summary carries 'metric_averages'; 'incremental' counts the
+            scored, reused and removed rows
         """
-        results = {
-            'coding': {'detailed_scores': {}, 'summary': {}},
-            'paraphrasing': {'detailed_scores': {}, 'summary': {}},
-            'overall_summary': {}
-        }
-        
-        # Process coding responses
-        if 'Coding' in self.data:
-            coding_df = self.data['Coding'].copy()
+        from incremental import RowManifest, default_manifest_path, match_rows, row_fingerprints
+        
+        manifest_path = manifest_path or default_manifest_path(self.excel_file)
+        fingerprint = self.scoring_fingerprint()
+        manifest = RowManifest.load(manifest_path, fingerprint)
+        if manifest is None:
+            print("No usable row manifest, scoring every row...")
+            manifest = RowManifest(fingerprint)
+        
+        results = self._new_results()
+        results['incremental'] = {'scored_rows': 0, 'reused_rows': 0, 'removed_rows': 0}
+        counts = results['incremental']
+        
+        # Rows of a sheet are stored under the sheet's name, or under
+        # "<sheet> [<category>]" when the sheet mixes categories
+        parts = {}
+        for category, routes in self._route_sheets().items():
+            for sheet, mask in routes:
+                key = sheet if mask.all() else f"{sheet} [{category}]"
+                parts[key] = (sheet, category, mask)
+        
+        # Take the rows of parts that are gone out of the aggregates
+        for key in [key for key in manifest.sheets if key not in parts]:
+            category = manifest.sheet_categories.get(key, self.sheet_categories.get(key))
+            stored = manifest.sheets.pop(key)
+            if category in manifest.aggregates and category in self.rule_sets:
+                self._fold_aggregates(manifest.aggregates[category], stored['models'],
+                                      stored['weighted'], stored['metrics'],
+                                      list(self.rule_sets[category].weights), remove=True)
+                counts['removed_rows'] += len(stored['weighted'])
+        
+        for key, (sheet, category, mask) in parts.items():
+            df = self.data[sheet].copy()
+            part_df = df[mask]
+            metrics = list(self.rule_sets[category].weights)
+            stored = manifest.sheet_rows(key, metrics)
+            aggregates = manifest.category_aggregates(category)
             
-            print("Processing coding responses...")
-            for idx, row in coding_df.iterrows():
-                llm = row['LLM']
-                response = row['Response']
-                prompt_id = row['Prompt_ID']
-                
-                # Calculate metric scores
-                metric_scores = self.evaluate_coding_response(response, prompt_id)
-                weighted_score = self.calculate_weighted_scores(metric_scores, self.coding_metrics)
-                
-                # Update the dataframe
-                coding_df.at[idx, 'Metric_A'] = metric_scores['Correctness']
-                coding_df.at[idx, 'Metric_B'] = metric_scores['Efficiency'] 
-                coding_df.at[idx, 'Metric_C'] = metric_scores['Readability']
-                coding_df.at[idx, 'Metric_D'] = metric_scores['Error Handling']
-                coding_df.at[idx, 'Score'] = weighted_score
-                coding_df.at[idx, 'Mean_Score'] = weighted_score  # Same as Score for individual responses
-                
-                # Store for analysis
-                if llm not in results['coding']['detailed_scores']:
-                    results['coding']['detailed_scores'][llm] = []
-                
-                results['coding']['detailed_scores'][llm].append({
-                    'prompt_id': prompt_id,
-                    'response_length': len(str(response)) if pd.notna(response) else 0,
-                    'metric_scores': metric_scores,
-                    'weighted_score': weighted_score
-                })
+            hashes = row_fingerprints(part_df)
+            source, stale = match_rows(stored['hashes'], hashes)
+            fresh = source < 0
             
-            # Update the original data
-            self.data['Coding'] = coding_df
+            # Take rows that are gone or changed out of the aggregates
+            self._fold_aggregates(aggregates, stored['models'][stale], stored['weighted'][stale],
+                                  stored['metrics'][stale], metrics, remove=True)
             
-            # Calculate summary statistics
-            for model in self.models:
-                model_data = [item for item in results['coding']['detailed_scores'].get(model, [])]
-                if model_data:
-                    scores = [item['weighted_score'] for item in model_data]
-                    results['coding']['summary'][model] = {
-                        'average_score': np.mean(scores),
-                        'median_score': np.median(scores),
-                        'std_score': np.std(scores),
-                        'min_score': np.min(scores),
-                        'max_score': np.max(scores),
-                        'total_responses': len(scores)
-                    }
-        
-        # Process paraphrasing responses
-        if 'Paraphrasing_Gen_Creation' in self.data:
-            para_df = self.data['Paraphrasing_Gen_Creation'].copy()
+            metric_values = np.empty((len(part_df), len(metrics)), dtype=float)
+            weighted_values = np.empty(len(part_df), dtype=float)
+            reused = ~fresh
+            metric_values[reused] = stored['metrics'][source[reused]]
+            weighted_values[reused] = stored['weighted'][source[reused]]
             
-            print("Processing paraphrasing responses...")
-            for idx, row in para_df.iterrows():
-                llm = row['LLM']
-                response = row['Response']
-                prompt_id = row['Prompt_ID']
-                
-                # Calculate metric scores
-                metric_scores = self.evaluate_paraphrasing_response(response, prompt_id)
-                weighted_score = self.calculate_weighted_scores(metric_scores, self.paraphrasing_metrics)
-                
-                # Update the dataframe
-                para_df.at[idx, 'Metric_A'] = metric_scores['Relevance & Fidelity']
-                para_df.at[idx, 'Metric_B'] = metric_scores['Creativity & Originality']
-                para_df.at[idx, 'Metric_C'] = metric_scores['Fluency & Coherence']
-                para_df.at[idx, 'Metric_D'] = metric_scores['Prompt Adherence']
-                para_df.at[idx, 'Score'] = weighted_score
-                para_df.at[idx, 'Mean_Score'] = weighted_score  # Same as Score for individual responses
-                
-                # Store for analysis
-                if llm not in results['paraphrasing']['detailed_scores']:
-                    results['paraphrasing']['detailed_scores'][llm] = []
-                
-                results['paraphrasing']['detailed_scores'][llm].append({
-                    'prompt_id': prompt_id,
-                    'response_length': len(str(response)) if pd.notna(response) else 0,
-                    'metric_scores': metric_scores,
-                    'weighted_score': weighted_score
-                })
+            models = part_df['LLM'].astype(object).where(part_df['LLM'].notna(), None).to_numpy()
+            if fresh.any():
+                print(f"Processing {int(fresh.sum())} new or changed {category} responses...")
+                part = part_df[fresh]
+                metric_frame, weighted = self.score_responses(part, category)
+                metric_values[fresh] = metric_frame[metrics].to_numpy(dtype=float)
+                weighted_values[fresh] = weighted.to_numpy(dtype=float)
+                self._collect_detailed_scores(part, metric_frame, weighted,
+                                              results[category]['scores'])
+                self._fold_aggregates(aggregates, models[fresh], weighted_values[fresh],
+                                      metric_values[fresh], metrics)
             
-            # Update the original data
-            self.data['Paraphrasing_Gen_Creation'] = para_df
+            # Write every row's scores, so the sheet matches the manifest
+            previous = (pd.to_numeric(part_df['Score'], errors='coerce').to_numpy(dtype=float)
+                        if 'Score' in df.columns else None)
+            for column, values in zip(metric_columns(len(metrics)), metric_values.T):
+                self._set_rows(df, column, mask, values)
+            self._set_rows(df, 'Score', mask, weighted_values)
+            # Same as Score for individual responses
+            self._set_rows(df, 'Mean_Score', mask, weighted_values)
+            self.data[sheet] = df
+            if (fresh.any() or stale.any() or previous is None
+                    or not np.allclose(previous, weighted_values, rtol=1e-12, atol=0)):
+                self.updated_sheets.add(sheet)
             
-            # Calculate summary statistics
+            manifest.set_sheet_rows(key, hashes, models, metric_values, weighted_values, category)
+            counts['scored_rows'] += int(fresh.sum())
+            counts['reused_rows'] += int(reused.sum())
+            counts['removed_rows'] += int(stale.sum())
+        
+        # Categories without rows anymore have nothing left to aggregate
+        scored_categories = {category for _, category, _ in parts.values()}
+        for category in [category for category in manifest.aggregates
+                         if category not in scored_categories]:
+            del manifest.aggregates[category]
+        
+        self.models = self._resolve_models(model for aggregates in manifest.aggregates.values()
+                                           for model in aggregates)
+        for category, aggregates in manifest.aggregates.items():
+            if category not in results:
+                continue
             for model in self.models:
-                model_data = [item for item in results['paraphrasing']['detailed_scores'].get(model, [])]
-                if model_data:
-                    scores = [item['weighted_score'] for item in model_data]
-                    results['paraphrasing']['summary'][model] = {
-                        'average_score': np.mean(scores),
-                        'median_score': np.median(scores),
-                        'std_score': np.std(scores),
-                        'min_score': np.min(scores),
-                        'max_score': np.max(scores),
-                        'total_responses': len(scores)
-                    }
-        
-        # Calculate overall summary
-        overall_scores = {}
-        for model in self.models:
-            coding_avg = results['coding']['summary'].get(model, {}).get('average_score', 0)
-            para_avg = results['paraphrasing']['summary'].get(model, {}).get('average_score', 0)
-            overall_scores[model] = (coding_avg + para_avg) / 2
-        
-        results['overall_summary'] = {
-            'model_rankings': sorted(overall_scores.items(), key=lambda x: x[1], reverse=True),
-            'best_model': max(overall_scores.items(), key=lambda x: x[1])[0] if overall_scores else None,
-            'score_differences': {
-                model: overall_scores[model] - min(overall_scores.values()) 
-                for model in overall_scores
-            }
-        }
-        
+                if model in aggregates:
+                    results[category]['summary'][model] = aggregates[model].summary()
+        
+        self.close()
+        manifest.save(manifest_path)
+        
+        results['overall_summary'] = self._build_overall_summary(results)
+        if self._cache is not None:
+            results['cache'] = self.cache_stats()
+        if self.executor is not None:
+            results['execution'] = self.executor.stats()
+        if self.duplicates is not None:
+            results['duplicates'] = self.duplicates.summary()
         return results
     
-    def save_updated_excel(self, filename: str = "records.xlsx") -> None:
+    @staticmethod
+    def _fold_aggregates(aggregates: Dict[str, ModelAggregate], models: np.ndarray,
+                         weighted: np.ndarray, metric_values: np.ndarray,
+                         metrics: List[str], remove: bool = False) -> None:
+        """
+        Add scored rows to (or remove them from) per-model aggregates.
+        
+        Args:
+            aggregates (Dict): ModelAggregate per model, updated in place
+            models (np.ndarray): LLM of each row (None rows are skipped)
+            weighted (np.ndarray): Weighted score of each row
+            metric_values (np.ndarray): Metric scores, rows x metrics
+            metrics (List[str]): Metric names of the columns
+            remove (bool): Remove the rows instead of adding them
+        """
+        from streaming import ModelAggregate
+        
+        if len(models) == 0:
+            return
+        metric_frame = pd.DataFrame(metric_values, columns=metrics)
+        labels = pd.Series(models, dtype=object)
+        for model, positions in labels.groupby(labels, sort=False).indices.items():
+            if remove:
+                aggregates[model].remove(weighted[positions], metric_frame.iloc[positions])
+                if aggregates[model].scores.count == 0:
+                    del aggregates[model]
+            else:
+                if model not in aggregates:
+                    aggregates[model] = ModelAggregate(metrics)
+                aggregates[model].add(weighted[positions], metric_frame.iloc[positions])
+    
+    def save_updated_excel(self, filename: str = "records.xlsx",
+                           output_format: str = "xlsx") -> None:
         """
         Save the updated Excel file with calculated scores.
         
         Args:
             filename (str): Output filename
+            output_format (str): One of output_writers.WRITERS: 'xlsx' (full
+                rewrite), 'xlsx-stream', 'xlsx-incremental' (only the score
+                columns of scored sheets), 'parquet' or 'arrow'
         """
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            for sheet_name, df in self.data.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        from output_writers import get_writer
+        
+        writer = get_writer(output_format)
+        rows = sum(len(self.data[sheet]) for sheet in self.updated_sheets if sheet in self.data)
+        with self._stage('save_updated_excel', rows=rows) as record:
+            paths = writer.write(self.data, filename, self.updated_sheets)
+            if record is not None:
+                record['bytes'] += sum(os.path.getsize(path) for path in paths)
+        for path in paths:
+            print(f"Updated {output_format} output saved as {path}")
+    
+    def _metric_averages(self, results: Dict, category: str) -> Dict[str, Dict[str, float]]:
+        """
+        Average metric scores per model for the report's metric breakdown.
+        
+        Full runs take them from the group-by aggregation and summaries
+        built from running aggregates (stream, shard and incremental runs)
+        carry 'metric_averages'; otherwise the category's ScoreTable is
+        aggregated once.
         
-        print(f"Updated Excel file saved as {filename}")
+        Returns:
+            Dict mapping each model with scores to {metric: average}
+        """
+        from aggregation import ScoreAggregator
+        
+        if results.get('aggregates') is not None:
+            return results['aggregates'].metric_averages(category, self.models)
+        
+        summaries = results[category]['summary']
+        if all('metric_averages' in summaries[model] for model in self.models if model in summaries):
+            return {model: summaries[model]['metric_averages']
+                    for model in self.models if model in summaries}
+        table = results[category].get('scores')
+        if table is None or not len(table):
+            return {}
+        return ScoreAggregator({category: table}).metric_averages(category, self.models)
     
-    def generate_report(self, results: Dict) -> str:
+    def build_report(self, results: Dict, max_rows: int = 25, page: int = 1) -> Dict:
         """
-        Generate a comprehensive text report from the analysis results.
+        Assemble the report document that report_writers renders.
+        
+        Only aggregate tables go into the document, so its size is bounded
+        by the number of models, categories and metrics, and by max_rows
+        per-prompt rows per category.
         
         Args:
             results (Dict): Analysis results from process_and_update_excel()
+                or another process_* method
+            max_rows (int): Rows per page of the per-prompt tables (0 = leave
+                them out)
+            page (int): Page of the per-prompt tables to include, from 1
             
         Returns:
-            str: Formatted report text
+            Dict with 'title' and 'sections' (see report_writers)
+        """
+        sections = [{'kind': 'rankings', 'title': "OVERALL MODEL RANKINGS",
+                     'rankings': [(model, float(score)) for model, score
+                                  in results['overall_summary'].get('model_rankings') or []],
+                     'categories': results['overall_summary'].get('categories_covered', {}),
+                     'total_categories': len(self.rule_sets)},
+                    {'kind': 'heading', 'title': "PERFORMANCE ANALYSIS"}]
+        
+        for category in self.rule_sets:
+            summaries = results[category]['summary'] if category in results else {}
+            sections.append({'kind': 'category_results', 'category': category,
+                             'summaries': {model: {key: value for key, value in stats.items()
+                                                   if key != 'metric_averages'}
+                                           for model, stats in summaries.items()}})
+        
+        sections.append({'kind': 'heading', 'title': "DETAILED METRIC BREAKDOWN"})
+        for category, rule_set in self.rule_sets.items():
+            averages = self._metric_averages(results, category) if category in results else {}
+            if averages:
+                sections.append({'kind': 'metric_breakdown', 'category': category,
+                                 'weights': dict(rule_set.weights), 'averages': averages})
+        
+        # Per-prompt statistics need the group-by aggregation of a full run
+        aggregator = results.get('aggregates')
+        if aggregator is not None and max_rows > 0:
+            tables = []
+            for category in self.rule_sets:
+                if category not in aggregator.tables or not len(aggregator.tables[category]):
+                    continue
+                difficulty = aggregator.prompt_difficulty(category)
+                pages = max(1, -(-len(difficulty) // max_rows))
+                current = min(max(page, 1), pages)
+                start = (current - 1) * max_rows
+                rows = [[prompt] + [float(value) if column != 'count' else int(value)
+                                    for column, value in zip(difficulty.columns, values)]
+                        for prompt, values in zip(difficulty.index[start:start + max_rows],
+                                                  difficulty.iloc[start:start + max_rows].to_numpy())]
+                tables.append({'kind': 'prompt_table', 'category': category,
+                               'columns': ['Prompt'] + [column.capitalize() for column in difficulty.columns],
+                               'rows': rows, 'total_rows': len(difficulty), 'first_row': start + 1,
+                               'page': current, 'pages': pages})
+            if tables:
+                sections.append({'kind': 'heading', 'title': "PROMPT DIFFICULTY"})
+                sections.extend(tables)
+        
+        # Bootstrap intervals and paired permutation tests
+        if results.get('significance'):
+            sections.append({'kind': 'significance', **results['significance']})
+        
+        # Score cache counters
+        if results.get('cache'):
+            sections.append({'kind': 'cache', **results['cache']})
+        
+        # Execution engine counters
+        if results.get('execution'):
+            sections.append({'kind': 'execution', **results['execution']})
+        
+        # Near-duplicate clusters per model and prompt
+        if results.get('duplicates'):
+            sections.append({'kind': 'duplicates', **results['duplicates']})
+        
+        return {'title': "LLM EVALUATION ANALYSIS REPORT", 'sections': sections}
+    
+    @_timed('generate_report')
+    def generate_report(self, results: Dict, report_format: str = 'txt',
+                        max_rows: int = 25, page: int = 1) -> str:
         """
-        report = []
-        report.append("=" * 80)
-        report.append("LLM EVALUATION ANALYSIS REPORT")
-        report.append("=" * 80)
-        report.append("")
-        
-        # Overall rankings
-        report.append("OVERALL MODEL RANKINGS")
-        report.append("-" * 40)
-        
-        if results['overall_summary']['model_rankings']:
-            for rank, (model, score) in enumerate(results['overall_summary']['model_rankings'], 1):
-                report.append(f"{rank}. {model}: {score:.2f}/10")
-        
-        report.append("\n" + "=" * 80)
-        report.append("PERFORMANCE ANALYSIS")
-        report.append("=" * 80)
-        
-        # Coding results
-        report.append("\nCODING CATEGORY RESULTS")
-        report.append("-" * 40)
-        
-        if 'coding' in results and results['coding']['summary']:
-            for model, stats in results['coding']['summary'].items():
-                report.append(f"\n{model}:")
-                report.append(f"  Average Score: {stats['average_score']:.2f}/10")
-                report.append(f"  Median Score:  {stats['median_score']:.2f}/10")
-                report.append(f"  Std Deviation: {stats['std_score']:.2f}")
-                report.append(f"  Score Range:   {stats['min_score']:.2f} - {stats['max_score']:.2f}")
-                report.append(f"  Total Responses: {stats['total_responses']}/30")
-        
-        # Paraphrasing results
-        report.append("\nPARAPHRASING CATEGORY RESULTS")
-        report.append("-" * 40)
-        
-        if 'paraphrasing' in results and results['paraphrasing']['summary']:
-            for model, stats in results['paraphrasing']['summary'].items():
-                report.append(f"\n{model}:")
-                report.append(f"  Average Score: {stats['average_score']:.2f}/10")
-                report.append(f"  Median Score:  {stats['median_score']:.2f}/10")
-                report.append(f"  Std Deviation: {stats['std_score']:.2f}")
-                report.append(f"  Score Range:   {stats['min_score']:.2f} - {stats['max_score']:.2f}")
-                report.append(f"  Total Responses: {stats['total_responses']}/30")
-        
-        report.append("\n" + "=" * 80)
-        report.append("DETAILED METRIC BREAKDOWN")
-        report.append("=" * 80)
-        
-        # Coding metrics breakdown
-        if 'coding' in results and results['coding']['detailed_scores']:
-            report.append("\nCODING METRICS AVERAGE SCORES:")
-            report.append("-" * 40)
+        Generate a comprehensive report from the analysis results.
+        
+        Args:
+            results (Dict): Analysis results from process_and_update_excel()
+            report_format (str): One of report_writers.REPORT_WRITERS: 'txt'
+                (default), 'md', 'json' or 'html'
+            max_rows (int): Rows per page of the per-prompt tables
+            page (int): Page of the per-prompt tables to include
             
-            for model in self.models:
-                if model in results['coding']['detailed_scores']:
-                    report.append(f"\n{model}:")
-                    metric_avgs = {}
-                    for metric in self.coding_metrics:
-                        scores = [item['metric_scores'][metric] for item in results['coding']['detailed_scores'][model]]
-                        metric_avgs[metric] = np.mean(scores)
-                        report.append(f"  {metric}: {metric_avgs[metric]:.2f}/10 (weight: {self.coding_metrics[metric]*100:.0f}%)")
-        
-        # Paraphrasing metrics breakdown
-        if 'paraphrasing' in results and results['paraphrasing']['detailed_scores']:
-            report.append("\nPARAPHRASING METRICS AVERAGE SCORES:")
-            report.append("-" * 40)
+        Returns:
+            str: Formatted report text
+        """
+        from report_writers import render_report
+        
+        return render_report(self.build_report(results, max_rows, page), report_format)
+    
+    @_timed('write_reports')
+    def write_reports(self, results: Dict, basename: str = "comprehensive_analysis_report",
+                      report_formats: Iterable[str] = ('txt',), max_rows: int = 25,
+                      page: int = 1) -> List[str]:
+        """
+        Stream the report to one file per format.
+        
+        Args:
+            results (Dict): Analysis results from process_and_update_excel()
+            basename (str): Output path without extension
+            report_formats (Iterable[str]): Formats of report_writers.REPORT_WRITERS
+            max_rows (int): Rows per page of the per-prompt tables
+            page (int): Page of the per-prompt tables to include
             
-            for model in self.models:
-                if model in results['paraphrasing']['detailed_scores']:
-                    report.append(f"\n{model}:")
-                    metric_avgs = {}
-                    for metric in self.paraphrasing_metrics:
-                        scores = [item['metric_scores'][metric] for item in results['paraphrasing']['detailed_scores'][model]]
-                        metric_avgs[metric] = np.mean(scores)
-                        report.append(f"  {metric}: {metric_avgs[metric]:.2f}/10 (weight: {self.paraphrasing_metrics[metric]*100:.0f}%)")
-        
-        return "\n".join(report)
+        Returns:
+            List of the written paths
+        """
+        from report_writers import get_report_writer, write_report
+        
+        document = self.build_report(results, max_rows, page)
+        paths = []
+        for report_format in report_formats:
+            path = f"{basename}.{get_report_writer(report_format).extension}"
+            write_report(document, path, report_format)
+            paths.append(path)
+        return paths
 
 def main():
     """
     Main function to run the updated LLM analysis.
     """
+    from code_execution import DEFAULT_MEMORY_MB, DEFAULT_TIMEOUT, load_tests
+    from near_duplicates import THRESHOLD
+    from output_writers import WRITERS
+    from report_writers import REPORT_WRITERS
+    
+    parser = argparse.ArgumentParser(description="Score LLM responses in records.xlsx")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of scoring processes (0 = all CPU cores, default: 1)")
+    parser.add_argument('--stream', metavar='PATH',
+                        help="score PATH (.xlsx, .csv, .jsonl or a .corpus built by corpus.py) "
+                             "incrementally and only write the report, without loading it into "
+                             "memory or updating records.xlsx")
+    parser.add_argument('--shards', metavar='PATH', nargs='+',
+                        help="score input shards (files or glob patterns, formats as for --stream) "
+                             "in parallel, save a .partial.json per shard and report the merged "
+                             "results")
+    parser.add_argument('--merge', metavar='PARTIAL', nargs='+',
+                        help="only merge saved .partial.json files (or glob patterns) into one "
+                             "report, without scoring")
+    parser.add_argument('--cache', metavar='PATH', nargs='?', const='score_cache.sqlite',
+                        help="reuse scores of unchanged responses from an SQLite cache "
+                             "(default path: score_cache.sqlite)")
+    parser.add_argument('--cache-size', type=int, default=1_000_000,
+                        help="maximum number of cached responses (default: 1000000)")
+    parser.add_argument('--incremental', metavar='MANIFEST', nargs='?', const='',
+                        help="only score rows that are new or changed since the last incremental "
+                             "run, tracked in a row manifest (default: records.xlsx.manifest.json)")
+    parser.add_argument('--trace', metavar='PATH', nargs='?', const='analysis_trace.json',
+                        help="write per-stage and per-metric timings as JSON "
+                             "(default path: analysis_trace.json)")
+    parser.add_argument('--profile', action='store_true',
+                        help="run cProfile too; implies --trace and saves the raw stats as .prof")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="run tracemalloc too; implies --trace")
+    parser.add_argument('--resamples', type=int, default=10_000,
+                        help="bootstrap resamples and permutations for the report's confidence "
+                             "intervals and significance tests (0 = skip them, default: 10000)")
+    parser.add_argument('--rules', default=None, metavar='PATH',
+                        help="JSON file with the scoring rules; each rule set is a category "
+                             "(default: scoring_rules.json)")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="score whole sheets with column operations (faster when responses "
+                             "repeat)")
+    parser.add_argument('--source-similarity', action='store_true',
+                        help="apply the rules scoring paraphrases by their lexical similarity to "
+                             "the prompt's source text (see analysis_methodology.md)")
+    parser.add_argument('--models', nargs='+', metavar='MODEL',
+                        help="models to report, in this order (default: every model in the data)")
+    parser.add_argument('--execute', action='store_true',
+                        help="run coding responses against the test cases of their prompt in "
+                             "sandboxed subprocesses and score Correctness by the share passed")
+    parser.add_argument('--execute-tests', default=None, metavar='PATH',
+                        help="JSON file with the test cases (default: coding_tests.json)")
+    parser.add_argument('--execute-workers', type=int, default=0,
+                        help="sandboxes running responses in parallel (default: 0 = all CPU cores)")
+    parser.add_argument('--execute-timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"wall-clock and CPU seconds per response (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument('--execute-memory', type=int, default=DEFAULT_MEMORY_MB, metavar='MB',
+                        help=f"memory limit per response in MiB (default: {DEFAULT_MEMORY_MB})")
+    parser.add_argument('--execute-budget', type=float, default=None, metavar='SECONDS',
+                        help="stop starting new responses after this many seconds of the run; "
+                             "the rest keep their heuristic Correctness (default: no limit)")
+    parser.add_argument('--near-duplicates', type=float, nargs='?', const=THRESHOLD, metavar='THRESHOLD',
+                        help="score each cluster of near-duplicate responses to a prompt once and "
+                             "share its scores, and report the clusters per model and prompt; "
+                             "responses are near-duplicates from this estimated Jaccard similarity "
+                             f"of their word 3-grams (default: {THRESHOLD})")
+    parser.add_argument('--checkpoint', metavar='PATH', nargs='?', const='',
+                        help="record scores of finished chunks of rows in an SQLite file while "
+                             "scoring, so rerunning an interrupted run resumes where it stopped; "
+                             "deleted once the outputs are written (default path: "
+                             "<input>.checkpoint.sqlite)")
+    parser.add_argument('--output-format', choices=list(WRITERS), default='xlsx',
+                        help="how scores are saved: full xlsx rewrite (default), streamed xlsx, "
+                             "in-place update of the score columns, or Parquet/Arrow files")
+    parser.add_argument('--report-format', nargs='+', choices=list(REPORT_WRITERS), default=['txt'],
+                        help="report formats to write as comprehensive_analysis_report.<format>: "
+                             "text, Markdown, JSON and/or self-contained HTML (default: txt)")
+    parser.add_argument('--report-rows', type=int, default=25,
+                        help="rows per page of the report's per-prompt tables (0 = leave them out, "
+                             "default: 25)")
+    parser.add_argument('--report-page', type=int, default=1,
+                        help="page of the per-prompt tables to include (default: 1)")
+    args = parser.parse_args()
+    
     print("Starting Updated LLM Evaluation Analysis...")
     print("=" * 50)
     
     # Initialize analyzer
-    analyzer = UpdatedLLMAnalyzer("records.xlsx")
+    checkpoint_path = args.checkpoint
+    if checkpoint_path == '':
+        checkpoint_path = f"{args.stream or 'records.xlsx'}.checkpoint.sqlite"
+    executor = None
+    if args.execute:
+        executor = ExecutionEngine(load_tests(args.execute_tests) if args.execute_tests else None,
+                                   workers=args.execute_workers, timeout=args.execute_timeout,
+                                   memory_mb=args.execute_memory, time_budget=args.execute_budget)
+    analyzer = UpdatedLLMAnalyzer(args.stream or "records.xlsx", vectorized=args.vectorized,
+                                  workers=args.workers,
+                                  cache_path=args.cache, cache_size=args.cache_size,
+                                  resamples=args.resamples,
+                                  rules=load_rules(args.rules) if args.rules else None,
+                                  models=args.models, executor=executor,
+                                  near_duplicates=args.near_duplicates,
+                                  checkpoint_path=checkpoint_path,
+                                  source_similarity=args.source_similarity)
     
-    # Load data
-    print("Loading data from records.xlsx...")
-    analyzer.load_data()
+    trace_path = args.trace or ('analysis_trace.json' if args.profile or args.trace_memory else None)
+    if trace_path:
+        analyzer.instrument(profile=args.profile, trace_memory=args.trace_memory)
     
-    if not analyzer.data:
-        print("No data loaded. Please check your records.xlsx file.")
-        return
+    if args.stream:
+        # Score the file batch by batch; the input is left untouched
+        print("\nProcessing responses and calculating scores...")
+        results = analyzer.process_stream(args.stream)
+    elif args.shards or args.merge:
+        # Score each shard on its own, then merge the partial results
+        print("\nProcessing responses and calculating scores...")
+        if args.shards:
+            results = analyzer.process_shards(args.shards)
+        else:
+            results = analyzer.merge_partials(args.merge)
+        print(f"Merged {len(results['shards']['sources'])} shards "
+              f"({results['shards']['rows']} responses)")
+    else:
+        # Load data
+        print("Loading data from records.xlsx...")
+        analyzer.load_data()
+        
+        if not analyzer.data:
+            print("No data loaded. Please check your records.xlsx file.")
+            return
+        
+        # Process and calculate scores
+        print("\nProcessing responses and calculating scores...")
+        if args.incremental is not None:
+            results = analyzer.process_incremental(args.incremental or None)
+            counts = results['incremental']
+            print(f"Scored {counts['scored_rows']} rows, reused {counts['reused_rows']}, "
+                  f"removed {counts['removed_rows']}")
+        else:
+            results = analyzer.process_and_update_excel()
+        
+        # Save updated Excel file
+        print("\nSaving updated Excel file with calculated scores...")
+        analyzer.save_updated_excel(output_format=args.output_format)
     
-    # Process and calculate scores
-    print("\nProcessing responses and calculating scores...")
-    results = analyzer.process_and_update_excel()
+    if results.get('execution'):
+        counts = results['execution']
+        print(f"Executed {counts['executed']} coding responses in {counts['seconds']:.1f}s "
+              f"({counts['cache_hits']} reused cached results)")
+        if counts['skipped']:
+            print(f"Warning: the execution time budget ran out; {counts['skipped']} responses "
+                  f"kept their heuristic Correctness score")
     
-    # Save updated Excel file
-    print("\nSaving updated Excel file with calculated scores...")
-    analyzer.save_updated_excel()
+    counts = analyzer.checkpoint_stats()
+    if counts and counts['resumed']:
+        print(f"Resumed {counts['resumed']} finished chunks from {checkpoint_path}")
+    if results.get('duplicates'):
+        counts = results['duplicates']
+        print(f"Found {counts['clusters']} near-duplicate clusters; {counts['duplicates']} responses "
+              f"share their cluster's scores ({counts['cross_model']} clusters span models)")
     
-    # Generate and save report
+    # Generate and save the report in every requested format
     print("\nGenerating comprehensive report...")
-    report = analyzer.generate_report(results)
+    report_paths = analyzer.write_reports(results, report_formats=args.report_format,
+                                          max_rows=args.report_rows, page=args.report_page)
+    for path in report_paths:
+        print(f"Analysis report saved to {path}")
     
-    # Save text report
-    with open("comprehensive_analysis_report.txt", "w", encoding="utf-8") as f:
-        f.write(report)
+    if trace_path:
+        analyzer.trace.write(trace_path)
+        print(f"Pipeline trace saved to {trace_path}")
     
-    print("Analysis report saved to comprehensive_analysis_report.txt")
+    # Every output is written, so the finished chunks are no longer needed
+    analyzer.discard_checkpoint()
     
     # Print summary to console
     print("\n" + "=" * 50)
@@ -599,12 +1517,22 @@ def main():
     
     if results['overall_summary']['model_rankings']:
         print("\nModel Rankings:")
+        covered = results['overall_summary'].get('categories_covered', {})
         for rank, (model, score) in enumerate(results['overall_summary']['model_rankings'], 1):
-            print(f"{rank}. {model}: {score:.2f}/10")
+            partial = (f" ({covered[model]} of {len(analyzer.rule_sets)} categories)"
+                       if covered.get(model, len(analyzer.rule_sets)) < len(analyzer.rule_sets) else "")
+            print(f"{rank}. {model}: {score:.2f}/10{partial}")
     
     print("\nFiles generated:")
-    print("  - records.xlsx (updated with calculated scores)")
-    print("  - comprehensive_analysis_report.txt (detailed analysis report)")
+    scored_in_place = not (args.stream or args.shards or args.merge)
+    if scored_in_place and args.output_format.startswith('xlsx'):
+        print("  - records.xlsx (updated with calculated scores)")
+    elif scored_in_place:
+        print(f"  - records.<sheet>.{args.output_format} (calculated scores per sheet)")
+    for path in report_paths:
+        print(f"  - {path} (detailed analysis report)")
+    if trace_path:
+        print(f"  - {trace_path} (pipeline timings)")
     
     print("\nNext steps for your project:")
     print("  1. Review the calculated scores in records.xlsx")
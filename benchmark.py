@@ -0,0 +1,547 @@
+"""
+Scoring Benchmark Suite
+=======================
+
+Times the hot paths of UpdatedLLMAnalyzer on a seeded synthetic workload:
+
+    - load_data                       parsing the generated workbook
+    - evaluate_coding_response        one call per coding response
+    - evaluate_paraphrasing_response  one call per paraphrasing response
+    - process_and_update_excel        scoring every sheet plus summaries
+    - save_updated_excel              writing the scored workbook
+    - generate_report                 building the text report
+
+With --startup it also times fresh interpreters importing the scoring
+core (scoring_core, no pandas), the analyzer module (pandas deferred) and
+the analyzer with pandas loaded, and checks which heavy modules each one
+pulled in. With --matcher it times KeywordMatcher's two scan modes
+(per-term substring search and the single-pass regex) on the shipped term
+sets, padded with growing numbers of extra terms, to show where the regex
+starts to pay off (KeywordMatcher.REGEX_MIN_TERMS).
+
+Every stage reports throughput (rows/s), latency percentiles (per call for
+the evaluators, per repeat for the whole-sheet stages) and the process's
+peak RSS once it finished. Results are written as JSON; a stored result
+can be used as a baseline, and the run fails when a stage's throughput
+drops more than a threshold below it.
+
+Usage:
+    python benchmark.py --rows 5000 --json bench.json
+    python benchmark.py --rows 5000 --save-baseline bench_baseline.json
+    python benchmark.py --rows 5000 --baseline bench_baseline.json --threshold 0.2
+    python benchmark.py --startup --stages ''
+    python benchmark.py --matcher --stages ''
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis_script import UpdatedLLMAnalyzer
+from output_writers import WRITERS
+from rule_engine import KeywordMatcher, load_rules
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Statements timed in a fresh interpreter by measure_startup()
+STARTUP_PROBES = {
+    'python': 'pass',
+    'scoring_core': "import scoring_core; "
+                    "scoring_core.ResponseScorer().score_response('def f(): return 1', 'C01')",
+    'analysis_script': "import analysis_script; "
+                       "analysis_script.UpdatedLLMAnalyzer().evaluate_coding_response('x', 'C01')",
+    'analysis_script+pandas': "import analysis_script; analysis_script.pd.DataFrame"
+}
+
+HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl']
+
+# LLM names of the synthetic workbook, as in records.xlsx
+MODELS = ['GPT-4.1-mini', 'Llama', 'Mistral']
+
+STAGES = ['load_data', 'evaluate_coding_response', 'evaluate_paraphrasing_response',
+          'process_and_update_excel', 'save_updated_excel', 'generate_report']
+
+# Building blocks of the synthetic responses. They cover the indicator terms
+# of both categories, so every scoring branch is exercised.
+CODE_FRAGMENTS = [
+    'def {name}({arg}):\n    """{Word} the {word} values."""\n',
+    'class {Name}Handler:\n    def __init__(self, {arg}):\n        self.{arg} = {arg}\n',
+    'import {word}\nfrom collections import defaultdict\n',
+    '    for item in {arg}:\n        if item is None:\n            continue\n',
+    '    while {arg}:\n        {arg} = {arg}[1:]\n',
+    '    try:\n        value = int({arg})\n    except ValueError:\n        raise TypeError("bad {word}")\n',
+    '    if not {arg}:\n        raise KeyError("{word}")\n',
+    '    assert isinstance({arg}, dict)\n',
+    '    # Use a set for O(1) lookups, O(n) overall\n    seen = set()\n',
+    '    # Nested loop, O(n^2) brute force\n',
+    '    result = sorted({arg}, key=len)  # sort by length\n',
+    '    return {arg}\n',
+    '\nThis handles the error case and is efficient; use binary search or a heap to optimize.\n',
+    '\tindented_with_tab = {arg}  # tab\n',
+]
+
+PROSE_FRAGMENTS = [
+    'The {word} refers to a simple idea that is easy to explain.',
+    'However, the {word} can be described in a more creative way.',
+    'Therefore, we keep the meaning while using a friendly tone.',
+    'Imagine a {word} that grows like a story nobody has told before!',
+    'Moreover, the result feels unique and innovative...',
+    'Dear team, please find the {word} summary below. Best regards, Alex (alex@example.com)',
+    '1. Gather the {word}. 2. Describe it. 3. Share the email.',
+    '• A formal note — written in a professional voice.',
+    'Once upon a time, a {word} wrote a poem in rhyme and verse.',
+    'A haiku: quiet {word} / a metaphor for autumn / leaves drift to the ground',
+    'Additionally, the casual version is shorter; consequently, it reads faster?',
+    'Furthermore, the {word} - plain and short - stays close to the source.',
+]
+
+# Extra terms added to the shipped term sets by measure_matcher(), in
+# groups of MATCHER_GROUP_SIZE so no category exceeds 63 groups
+MATCHER_EXTRA_TERMS = [0, 40, 80, 120, 160, 200, 240, 280]
+MATCHER_GROUP_SIZE = 8
+
+WORDS = ['data', 'record', 'cache', 'stream', 'parser', 'index', 'queue', 'matrix',
+         'report', 'model', 'prompt', 'token', 'buffer', 'graph', 'vector', 'window']
+
+
+def _fill(fragment: str, rng: np.random.Generator) -> str:
+    word = WORDS[rng.integers(len(WORDS))]
+    arg = WORDS[rng.integers(len(WORDS))] + 's'
+    return fragment.format(name=word, Name=word.capitalize(), word=word,
+                           Word=word.capitalize(), arg=arg)
+
+
+def _synthetic_response(fragments: List[str], length: int, separator: str,
+                        rng: np.random.Generator) -> str:
+    """
+    Join randomly chosen fragments until the response reaches length characters.
+    """
+    parts = []
+    size = 0
+    while size < length:
+        part = _fill(fragments[rng.integers(len(fragments))], rng)
+        parts.append(part)
+        size += len(part) + len(separator)
+    return separator.join(parts)[:max(length, 1)]
+
+
+def _lengths(n: int, mean: float, sigma: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Log-normal response lengths with the given mean (characters).
+    """
+    if sigma <= 0:
+        return np.full(n, int(mean))
+    mu = np.log(mean) - sigma ** 2 / 2
+    return np.maximum(1, rng.lognormal(mu, sigma, n)).astype(int)
+
+
+def generate_records(rows: int, seed: int = 0, code_length: float = 2200,
+                     prose_length: float = 400, length_sigma: float = 0.5,
+                     missing_rate: float = 0.01,
+                     models: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Build a synthetic workbook in the records.xlsx schema.
+
+    Args:
+        rows (int): Responses per response sheet
+        seed (int): Random seed; the same arguments always give the same workbook
+        code_length (float): Mean length of coding responses in characters
+        prose_length (float): Mean length of paraphrasing responses in characters
+        length_sigma (float): Log-normal sigma of the lengths (0 = fixed length)
+        missing_rate (float): Share of rows without a response
+        models (List[str]): LLM names cycled through the rows (default: MODELS)
+
+    Returns:
+        Dict of sheet name to DataFrame, like pd.read_excel(sheet_name=None)
+    """
+    rng = np.random.default_rng(seed)
+    analyzer = UpdatedLLMAnalyzer()
+    models = models or MODELS
+    metrics = pd.DataFrame([
+        {'Category': category, 'Metric': metric, 'Weightage': f"{weight * 100:.0f}%",
+         'Description': '', 'Justification': ''}
+        for category, weights in (('Coding', analyzer.coding_metrics),
+                                  ('Paraphrasing, Generation, and Creation',
+                                   analyzer.paraphrasing_metrics))
+        for metric, weight in weights.items()])
+
+    data = {'Metrics': metrics}
+    for sheet, label, prefix, fragments, separator, mean, weights in (
+            ('Coding', 'Coding', 'C', CODE_FRAGMENTS, '', code_length,
+             analyzer.coding_metrics),
+            ('Paraphrasing_Gen_Creation', 'Paraphrasing, Generation, and Creation', 'P',
+             PROSE_FRAGMENTS, ' ', prose_length, analyzer.paraphrasing_metrics)):
+        lengths = _lengths(rows, mean, length_sigma, rng)
+        responses = [_synthetic_response(fragments, length, separator, rng) for length in lengths]
+        missing = rng.random(rows) < missing_rate
+        prompt_ids = [f"{prefix}{(i // len(models)) % 30 + 1:02d}" for i in range(rows)]
+
+        frame = pd.DataFrame({
+            'Category': label,
+            'LLM': [models[i % len(models)] for i in range(rows)],
+            'Prompt': [f"Prompt {prompt_id}" for prompt_id in prompt_ids],
+            'Response': pd.Series(responses, dtype=object).where(~missing, None),
+            'Prompt_ID': prompt_ids,
+            'Notes': np.nan
+        })
+        for column, weight in zip(['Metric_A', 'Metric_B', 'Metric_C', 'Metric_D'], weights.values()):
+            frame[column] = np.nan
+            frame[f"{column}_Weight"] = f"{weight * 100:.0f}%"
+        frame['Score'] = np.nan
+        frame['Mean_Score'] = np.nan
+        data[sheet] = frame
+    return data
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process so far, in MB (None if unknown).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _stage_result(latencies: List[float], rows: int) -> Dict:
+    """
+    Summarize the latencies (seconds) of runs that each processed rows rows.
+    """
+    latencies = np.asarray(latencies, dtype=float)
+    total = float(latencies.sum())
+    return {
+        'runs': len(latencies),
+        'rows': rows,
+        'throughput_rows_per_s': rows * len(latencies) / total if total > 0 else float('inf'),
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50) * 1000),
+            'p90': float(np.percentile(latencies, 90) * 1000),
+            'p99': float(np.percentile(latencies, 99) * 1000),
+            'max': float(latencies.max() * 1000)
+        },
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def _time_calls(function: Callable, calls) -> List[float]:
+    """
+    Latency in seconds of each call (progress output is discarded).
+    """
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for args in calls:
+            start = time.perf_counter()
+            function(*args)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_benchmark(rows: int = 2000, seed: int = 0, repeat: int = 3,
+                  code_length: float = 2200, prose_length: float = 400,
+                  length_sigma: float = 0.5, workers: int = 1,
+                  output_format: str = 'xlsx',
+                  stages: Optional[List[str]] = None) -> Dict:
+    """
+    Run the benchmark stages on a synthetic workbook.
+
+    Args:
+        rows (int): Responses per response sheet
+        seed (int): Workload seed
+        repeat (int): Repeats of the whole-sheet stages
+        code_length (float): Mean coding response length
+        prose_length (float): Mean paraphrasing response length
+        length_sigma (float): Log-normal sigma of the lengths
+        workers (int): Scoring processes for process_and_update_excel
+        output_format (str): Writer timed by save_updated_excel
+        stages (List[str]): Stages to run (default: all of STAGES, [] = none)
+
+    Returns:
+        Dict with the run configuration, environment and per-stage results
+    """
+    stages = STAGES if stages is None else stages
+    config = {'rows': rows, 'seed': seed, 'repeat': repeat, 'code_length': code_length,
+              'prose_length': prose_length, 'length_sigma': length_sigma,
+              'workers': workers, 'output_format': output_format}
+    result = {
+        'config': config,
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                        'numpy': np.__version__, 'platform': platform.platform()},
+        'stages': {}
+    }
+
+    if not stages:
+        result['peak_rss_mb'] = peak_rss_mb()
+        return result
+
+    data = generate_records(rows, seed, code_length, prose_length, length_sigma)
+    total_rows = sum(len(data[sheet]) for sheet in ('Coding', 'Paraphrasing_Gen_Creation'))
+
+    with tempfile.TemporaryDirectory() as directory, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        workbook = os.path.join(directory, 'records.xlsx')
+        with pd.ExcelWriter(workbook, engine='openpyxl') as writer:
+            for sheet, frame in data.items():
+                frame.to_excel(writer, sheet_name=sheet, index=False)
+
+        analyzer = UpdatedLLMAnalyzer(workbook, workers=workers)
+        analyzer.data = data
+        report_results = None
+
+        def record(stage: str, latencies: List[float], stage_rows: int) -> None:
+            result['stages'][stage] = _stage_result(latencies, stage_rows)
+            print(f"  {stage:<32} {result['stages'][stage]['throughput_rows_per_s']:>12.0f} rows/s")
+
+        if 'load_data' in stages:
+            loader = UpdatedLLMAnalyzer(workbook)
+            record('load_data', _time_calls(loader.load_data, [()] * repeat), total_rows)
+
+        for stage, sheet, evaluate in (
+                ('evaluate_coding_response', 'Coding', analyzer.evaluate_coding_response),
+                ('evaluate_paraphrasing_response', 'Paraphrasing_Gen_Creation',
+                 analyzer.evaluate_paraphrasing_response)):
+            if stage in stages:
+                frame = data[sheet]
+                calls = list(zip(frame['Response'], frame['Prompt_ID']))
+                record(stage, _time_calls(evaluate, calls), 1)
+
+        # Saving and reporting need scored data, so score at least once
+        if any(stage in stages for stage in STAGES[3:]):
+            runs = repeat if 'process_and_update_excel' in stages else 1
+            latencies = []
+            for _ in range(runs):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    report_results = analyzer.process_and_update_excel()
+                    latencies.append(time.perf_counter() - start)
+            if 'process_and_update_excel' in stages:
+                record('process_and_update_excel', latencies, total_rows)
+
+        if 'save_updated_excel' in stages:
+            output = os.path.join(directory, 'scored.xlsx')
+            record('save_updated_excel',
+                   _time_calls(lambda: analyzer.save_updated_excel(output, output_format),
+                               [()] * repeat), total_rows)
+
+        if 'generate_report' in stages:
+            record('generate_report',
+                   _time_calls(lambda: analyzer.generate_report(report_results), [()] * repeat),
+                   total_rows)
+
+        analyzer.close()
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def measure_startup(repeat: int = 10) -> Dict:
+    """
+    Time interpreter start plus each STARTUP_PROBES statement.
+
+    Args:
+        repeat (int): Fresh interpreters started per probe
+
+    Returns:
+        Dict of probe name to median/min milliseconds and the heavy modules
+        that ended up really imported (not just deferred)
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    check = ("; import sys; print(','.join(m for m in %r if m in sys.modules "
+             "and type(sys.modules[m]).__name__ != '_LazyModule'))" % (HEAVY_MODULES,))
+    startup = {}
+    for name, statement in STARTUP_PROBES.items():
+        timings = []
+        loaded = ''
+        for _ in range(repeat):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', statement + check], cwd=directory,
+                                       capture_output=True, text=True, check=True)
+            timings.append(time.perf_counter() - start)
+            loaded = completed.stdout.strip()
+        startup[name] = {
+            'median_ms': float(np.median(timings) * 1000),
+            'min_ms': float(np.min(timings) * 1000),
+            'heavy_modules': loaded.split(',') if loaded else []
+        }
+        print(f"  startup {name:<25} {startup[name]['median_ms']:>8.1f} ms  "
+              f"(loads: {', '.join(startup[name]['heavy_modules']) or 'none'})")
+    return startup
+
+
+def measure_matcher(rows: int = 2000, seed: int = 0, code_length: float = 2200,
+                    prose_length: float = 400, length_sigma: float = 0.5) -> Dict:
+    """
+    Time both KeywordMatcher scan modes on the synthetic responses.
+
+    The padding terms are random words that never occur in the responses,
+    the worst case for the substring search, which has to read the whole
+    text for each of them.
+
+    Args:
+        rows (int): Responses per response sheet
+        seed (int): Workload seed
+        code_length (float): Mean coding response length
+        prose_length (float): Mean paraphrasing response length
+        length_sigma (float): Log-normal sigma of the lengths
+
+    Returns:
+        Dict of category to a list of {terms, substring_s, regex_s}, one per
+        MATCHER_EXTRA_TERMS entry
+    """
+    data = generate_records(rows, seed, code_length, prose_length, length_sigma)
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    padding = [''.join(rng.choice(letters, rng.integers(6, 10)))
+               for _ in range(max(MATCHER_EXTRA_TERMS))]
+    modes = {'substring_s': type('SubstringMatcher', (KeywordMatcher,), {'REGEX_MIN_TERMS': 1 << 30}),
+             'regex_s': type('RegexMatcher', (KeywordMatcher,), {'REGEX_MIN_TERMS': 0})}
+
+    matcher = {}
+    for category, sheet in (('coding', 'Coding'), ('paraphrasing', 'Paraphrasing_Gen_Creation')):
+        texts = [str(text).lower() for text in data[sheet]['Response'].dropna()]
+        matcher[category] = []
+        for extra in MATCHER_EXTRA_TERMS:
+            groups = dict(load_rules()[category]['terms'])
+            for start in range(0, extra, MATCHER_GROUP_SIZE):
+                groups[f'padding_{start}'] = padding[start:start + MATCHER_GROUP_SIZE]
+            timing = {'terms': sum(len(terms) for terms in groups.values())}
+            for mode, matcher_class in modes.items():
+                scan = matcher_class(groups).scan
+                start = time.perf_counter()
+                for text in texts:
+                    scan(text)
+                timing[mode] = time.perf_counter() - start
+            matcher[category].append(timing)
+            print(f"  matcher {category:<12} {timing['terms']:>4} terms  "
+                  f"substring {timing['substring_s']:.3f}s  regex {timing['regex_s']:.3f}s")
+    return matcher
+
+
+def compare_to_baseline(result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Find stages whose throughput fell more than threshold below the baseline.
+
+    Args:
+        result (Dict): Result of run_benchmark()
+        baseline (Dict): Earlier result of run_benchmark()
+        threshold (float): Allowed relative drop, e.g. 0.2 for 20%
+
+    Returns:
+        List[str]: One message per regressed stage (empty if none)
+    """
+    regressions = []
+    for stage, stats in result['stages'].items():
+        reference = baseline.get('stages', {}).get(stage)
+        if reference is None:
+            continue
+        before = reference['throughput_rows_per_s']
+        after = stats['throughput_rows_per_s']
+        if after < before * (1 - threshold):
+            regressions.append(f"{stage}: {after:.0f} rows/s vs baseline {before:.0f} rows/s "
+                               f"({(after / before - 1) * 100:+.1f}%)")
+
+    # Startup is a latency, so a regression is a rise
+    for probe, stats in result.get('startup', {}).items():
+        reference = baseline.get('startup', {}).get(probe)
+        if reference is None:
+            continue
+        before, after = reference['median_ms'], stats['median_ms']
+        if after > before * (1 + threshold):
+            regressions.append(f"startup {probe}: {after:.1f} ms vs baseline {before:.1f} ms "
+                               f"({(after / before - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def main():
+    """
+    Run the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the LLM response scoring pipeline")
+    parser.add_argument('--rows', type=int, default=2000,
+                        help="responses per sheet (default: 2000)")
+    parser.add_argument('--seed', type=int, default=0, help="workload seed (default: 0)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="repeats of the whole-sheet stages (default: 3)")
+    parser.add_argument('--code-length', type=float, default=2200,
+                        help="mean coding response length in characters (default: 2200)")
+    parser.add_argument('--prose-length', type=float, default=400,
+                        help="mean paraphrasing response length in characters (default: 400)")
+    parser.add_argument('--length-sigma', type=float, default=0.5,
+                        help="log-normal sigma of the response lengths (default: 0.5)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="scoring processes for process_and_update_excel (default: 1)")
+    parser.add_argument('--output-format', choices=list(WRITERS), default='xlsx',
+                        help="writer timed by save_updated_excel (default: xlsx)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help="comma-separated stages to run (default: all)")
+    parser.add_argument('--startup', action='store_true',
+                        help="also time interpreter startup with the scoring core and the analyzer")
+    parser.add_argument('--matcher', action='store_true',
+                        help="also time the keyword matcher's substring and regex scans")
+    parser.add_argument('--json', metavar='PATH', help="write the results to PATH")
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help="store the results as a baseline for later runs")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="fail if a stage is slower than this baseline by more than --threshold")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed relative throughput drop (default: 0.2)")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    if stages:
+        print(f"Benchmarking {args.rows} rows per sheet (seed {args.seed})...")
+    result = run_benchmark(args.rows, args.seed, args.repeat, args.code_length,
+                           args.prose_length, args.length_sigma, args.workers,
+                           args.output_format, stages)
+    if args.startup:
+        result['startup'] = measure_startup()
+    if args.matcher:
+        result['matcher'] = measure_matcher(args.rows, args.seed, args.code_length,
+                                            args.prose_length, args.length_sigma)
+    if result['peak_rss_mb'] is not None:
+        print(f"Peak RSS: {result['peak_rss_mb']:.1f} MB")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+            print(f"Results saved to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config') != result['config']:
+            print("Warning: baseline was recorded with a different configuration")
+        regressions = compare_to_baseline(result, baseline, args.threshold)
+        if regressions:
+            print("Throughput regressions:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"No stage regressed more than {args.threshold * 100:.0f}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,673 @@
+"""
+Execution-Based Correctness
+===========================
+
+Optional scoring of coding responses by running them. The Python code of a
+response (its fenced code blocks, or the whole response if it is plain
+code) is executed against the test cases of its Prompt_ID in
+coding_tests.json, and the share of tests it passes replaces the
+heuristic score of one metric (Correctness for the coding category).
+
+Test cases, per category:
+
+    - metric    metric whose score becomes the pass rate, scaled to the
+                rule set's clamp range
+    - prompts   Prompt_ID -> {"setup": [lines], "tests": [test, ...]}
+
+Setup code runs before the solution, in its namespace and working
+directory (fixture files, reference implementations, database rows). A
+test is a Python expression that must be true, or statement lines (a list
+of strings) that must run without raising. Tests can use these helpers:
+
+    THIS_YEAR                       the current year
+    raises(exception, f, *args)     f(*args) raises exception
+    rejects(f, *args)               f(*args) raises or returns a falsy value
+    any_returns(expected, *args)    some function of the solution returns expected
+    sorted_by(f, values)            f's result on a copy of values, or the
+                                    copy itself if f sorts in place
+    output_of(source)               stdout of running source in the solution
+    run_main(*argv, stdin='')       output of running the solution as a script
+    unittest_count()                tests in the solution's TestCase classes
+    unittest_passes()               those tests all pass (and there are some)
+    solution_names()                lowercased names of the solution's
+                                    functions, classes and methods
+
+Sandboxing: each snippet runs in a child forked from a pre-warmed sandbox
+interpreter (started with python -I, common standard library modules
+already imported), in its own session and empty temporary directory, with
+stdin, stdout and stderr on /dev/null and limits on CPU time, address
+space, file size and core dumps. The child reports test outcomes as they
+finish, so a snippet that hangs or crashes is killed at its wall-clock
+timeout (with everything it started) and scored by the tests it passed.
+This guards the scoring run against runaway code; it is not a security
+boundary against hostile code (there is no network or filesystem
+isolation), so only execute responses you would run yourself.
+
+ExecutionEngine runs a pool of sandboxes, one thread feeding each, and
+caches results by a hash of the code and its test cases, so duplicate
+snippets run once. A per-run time budget stops it from starting new
+snippets; those responses keep their heuristic score. A response without
+any Python code, or whose code imports a module missing from the sandbox,
+keeps its heuristic score too, since there is nothing to judge the code by.
+
+Usage:
+    python code_execution.py --prompt-id C06 solution.py
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import argparse
+import ast
+import builtins
+import hashlib
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+TESTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coding_tests.json')
+
+# Bump whenever sandbox behaviour changes, so executed scores are recomputed
+ENGINE_VERSION = 2
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MEMORY_MB = 1024
+# Executed snippets whose results are kept
+DEFAULT_CACHE_SIZE = 100_000
+# Largest file a snippet may write
+FILE_SIZE_LIMIT = 16 * 1024 * 1024
+
+# Imported by every sandbox before its first snippet, so forked children share them
+PRELOAD_MODULES = ('abc', 'argparse', 'asyncio', 'collections', 'concurrent.futures', 'contextlib',
+                   'csv', 'dataclasses', 'datetime', 'functools', 'heapq', 'inspect', 'io',
+                   'itertools', 'json', 'math', 're', 'sqlite3', 'string', 'threading', 'time',
+                   'traceback', 'typing', 'unittest', 'urllib.parse')
+
+# Module name of the solution's namespace
+SOLUTION_MODULE = '__solution__'
+
+# Statuses of an executed snippet
+STATUSES = ('passed', 'failed', 'no_code', 'timeout', 'crashed', 'unsupported', 'skipped')
+
+_FENCE = re.compile(r"```[ \t]*([\w+-]*)[^\n]*\n(.*?)```", re.DOTALL)
+_PYTHON_FENCES = {'', 'python', 'python3', 'py'}
+
+
+def load_tests(path: str = TESTS_PATH) -> Dict[str, Dict]:
+    """
+    Read the test cases of every category from a JSON file.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parses(code: str) -> bool:
+    try:
+        ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+def extract_code(response: str) -> Optional[str]:
+    """
+    The Python code of a response.
+
+    Fenced blocks tagged python (or untagged) are joined in order, leaving
+    out blocks that do not parse, such as sample output. A response without
+    fenced blocks is used as a whole if it parses and defines something.
+
+    Args:
+        response (str): The LLM's response
+
+    Returns:
+        str: The code, or None if the response has none. If no block parses,
+        the blocks are returned as they are, so running them fails.
+    """
+    blocks = [body for language, body in _FENCE.findall(response)
+              if language.lower() in _PYTHON_FENCES]
+    if blocks:
+        code = [block for block in blocks if _parses(block)]
+        return "\n\n".join(code or blocks)
+    if re.search(r'^\s*(def|class|async def) ', response, re.MULTILINE) and _parses(response):
+        return response
+    return None
+
+
+def _source(lines) -> str:
+    return lines if isinstance(lines, str) else "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Inside a sandbox: run one snippet in a forked child
+# ---------------------------------------------------------------------------
+
+def _helpers(namespace: Dict, code: str) -> Dict:
+    """
+    Helper functions of the test cases, bound to the solution's namespace.
+    """
+    import contextlib
+    import datetime
+    import inspect
+    import io
+    import traceback
+    import unittest
+
+    def own(value) -> bool:
+        return getattr(value, '__module__', None) == SOLUTION_MODULE
+
+    def raises(exception, function, *args, **kwargs) -> bool:
+        try:
+            function(*args, **kwargs)
+        except exception:
+            return True
+        except Exception:
+            return False
+        return False
+
+    def rejects(function, *args, **kwargs) -> bool:
+        try:
+            return not function(*args, **kwargs)
+        except Exception:
+            return True
+
+    def any_returns(expected, *args, **kwargs) -> bool:
+        for value in list(namespace.values()):
+            if inspect.isfunction(value) and own(value):
+                try:
+                    if value(*args, **kwargs) == expected:
+                        return True
+                except Exception:
+                    pass
+        return False
+
+    def sorted_by(function, values):
+        values = list(values)
+        result = function(values)
+        return values if result is None else result
+
+    def output_of(source) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                exec(compile(_source(source), '<test>', 'exec'), namespace)
+            except BaseException:
+                traceback.print_exc()
+        return output.getvalue()
+
+    def run_main(*argv, stdin: str = '') -> str:
+        output = io.StringIO()
+        saved = sys.argv, sys.stdin
+        sys.argv, sys.stdin = ['solution.py'] + [str(arg) for arg in argv], io.StringIO(stdin)
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                try:
+                    exec(compile(code, 'solution.py', 'exec'),
+                         {'__name__': '__main__', '__builtins__': builtins})
+                except SystemExit:
+                    pass
+                except BaseException:
+                    traceback.print_exc()
+        finally:
+            sys.argv, sys.stdin = saved
+        return output.getvalue()
+
+    def test_suite():
+        loader = unittest.TestLoader()
+        return unittest.TestSuite(loader.loadTestsFromTestCase(value) for value in list(namespace.values())
+                                  if isinstance(value, type) and issubclass(value, unittest.TestCase)
+                                  and own(value))
+
+    def unittest_count() -> int:
+        return test_suite().countTestCases()
+
+    def unittest_passes() -> bool:
+        result = unittest.TextTestRunner(stream=io.StringIO(), verbosity=0).run(test_suite())
+        return result.testsRun > 0 and result.wasSuccessful()
+
+    def solution_names() -> List[str]:
+        names = []
+        for name, value in list(namespace.items()):
+            if (inspect.isfunction(value) or isinstance(value, type)) and own(value):
+                names.append(name.lower())
+                if isinstance(value, type):
+                    names.extend(member.lower() for member in vars(value) if not member.startswith('__'))
+        return names
+
+    return {'THIS_YEAR': datetime.date.today().year, 'raises': raises, 'rejects': rejects,
+            'any_returns': any_returns, 'sorted_by': sorted_by, 'output_of': output_of,
+            'run_main': run_main, 'unittest_count': unittest_count,
+            'unittest_passes': unittest_passes, 'solution_names': solution_names}
+
+
+def _passes(test, namespace: Dict) -> bool:
+    source = _source(test)
+    try:
+        try:
+            compiled = compile(source, '<test>', 'eval')
+        except SyntaxError:
+            exec(compile(source, '<test>', 'exec'), namespace)
+            return True
+        return bool(eval(compiled, namespace))
+    except BaseException:
+        return False
+
+
+def _run_child(job: Dict, workdir: str, report) -> None:
+    """
+    Body of the forked child: limit itself, load the solution and run the tests.
+    """
+    import resource
+
+    os.setsid()
+    seconds = max(1, int(job['timeout'] + 0.999))
+    memory = job['memory_mb'] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (FILE_SIZE_LIMIT, FILE_SIZE_LIMIT))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+
+    code = job['code']
+    namespace = {'__name__': SOLUTION_MODULE, '__builtins__': builtins}
+    helpers = _helpers(namespace, code)
+    namespace.update(helpers)
+    if job.get('setup'):
+        exec(compile(job['setup'], '<setup>', 'exec'), namespace)
+    try:
+        exec(compile(code, 'solution.py', 'exec'), namespace)
+    except ModuleNotFoundError as error:
+        report.write(f"missing {error.name}\n")
+        return
+    except BaseException as error:  # Definitions made before the error stay usable
+        report.write(f"error {type(error).__name__}\n")
+    # The solution may have shadowed a helper
+    namespace.update(helpers)
+    for index, test in enumerate(job['tests']):
+        report.write(f"test {index} {int(_passes(test, namespace))}\n")
+    report.write("done\n")
+
+
+def run_job(job: Dict) -> Dict:
+    """
+    Run one snippet in a forked, resource-limited child.
+
+    Args:
+        job (Dict): 'code', 'setup', 'tests', 'timeout' (seconds of wall
+            time) and 'memory_mb'
+
+    Returns:
+        Dict with 'status' (see STATUSES), 'passed' and 'total' tests and
+        'error', the exception that stopped the solution from loading
+    """
+    import select
+    import shutil
+    import signal
+
+    workdir = tempfile.mkdtemp(prefix='sandbox-')
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            with os.fdopen(write_fd, 'w', buffering=1) as report:
+                _run_child(job, workdir, report)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    output = b''
+    deadline = time.monotonic() + job['timeout']
+    timed_out = False
+    while not output.endswith(b"done\n"):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        ready, _, _ = select.select([read_fd], [], [], remaining)
+        if ready:
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            output += chunk
+    # Kill the child's session, including anything it started
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+    os.waitpid(pid, 0)
+    os.close(read_fd)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {'status': 'crashed', 'passed': 0, 'total': len(job['tests']), 'error': None}
+    for line in output.decode('utf-8', 'replace').splitlines():
+        kind, _, value = line.partition(' ')
+        if kind == 'test':
+            result['passed'] += value.endswith(' 1')
+        elif kind == 'error':
+            result['error'] = value
+        elif kind == 'missing':
+            result.update(status='unsupported', error=f"ModuleNotFoundError: {value}")
+            return result
+        elif kind == 'done':
+            result['status'] = 'passed' if result['passed'] == result['total'] else 'failed'
+    if timed_out:
+        result['status'] = 'timeout'
+    return result
+
+
+def serve() -> None:
+    """
+    Sandbox main loop: one JSON job per stdin line, one JSON result per stdout line.
+    """
+    import importlib
+
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+    for line in sys.stdin:
+        if line.strip():
+            sys.stdout.write(json.dumps(run_job(json.loads(line))) + "\n")
+            sys.stdout.flush()
+
+
+# ---------------------------------------------------------------------------
+# In the scoring process: a pool of sandboxes
+# ---------------------------------------------------------------------------
+
+class Sandbox:
+    """
+    A pre-warmed sandbox interpreter, running serve() in a subprocess.
+    """
+
+    ENVIRONMENT = {'PATH': os.defpath, 'LANG': 'C.UTF-8', 'OMP_NUM_THREADS': '1',
+                   'OPENBLAS_NUM_THREADS': '1', 'MKL_NUM_THREADS': '1', 'MPLBACKEND': 'Agg'}
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-I', os.path.abspath(__file__), '--serve'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=tempfile.gettempdir(), env=dict(self.ENVIRONMENT, TMPDIR=tempfile.gettempdir()),
+            text=True, encoding='utf-8', errors='surrogateescape', start_new_session=True)
+
+    def run(self, job: Dict) -> Dict:
+        """
+        Run a job; a sandbox that died is reported as a crashed snippet.
+        """
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (BrokenPipeError, OSError):
+            line = ''
+        if not line:
+            return {'status': 'crashed', 'passed': 0, 'total': len(job['tests']),
+                    'error': 'sandbox exited'}
+        return json.loads(line)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self) -> None:
+        if self.alive:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class ExecutionEngine:
+    """
+    Scores coding responses by the share of their test cases they pass.
+    """
+
+    def __init__(self, tests: Optional[Dict[str, Dict]] = None, workers: int = 0,
+                 timeout: float = DEFAULT_TIMEOUT, memory_mb: int = DEFAULT_MEMORY_MB,
+                 time_budget: Optional[float] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            tests (Dict): Test cases per category in the format of
+                coding_tests.json (default: read that file)
+            workers (int): Sandboxes running snippets in parallel (0 = all CPU cores)
+            timeout (float): Wall-clock seconds per snippet (also its CPU limit)
+            memory_mb (int): Address space limit per snippet in MiB
+            time_budget (float): Seconds after the first snippet of the run
+                from which no more snippets are started (None = no limit)
+            cache_size (int): Executed snippets whose results are kept
+        """
+        if os.name != 'posix':
+            raise RuntimeError("Sandboxed execution needs a POSIX system (fork and resource limits)")
+        self.tests = tests if tests is not None else load_tests()
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self._sandboxes = None
+        self._idle = None
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._started = None
+        self.counts = dict.fromkeys(('responses', 'executed', 'cache_hits') + STATUSES, 0)
+        self.seconds = 0.0
+
+    def __getstate__(self) -> Dict:
+        # Sandboxes, threads and results stay with the process that started them
+        state = self.__dict__.copy()
+        state.update(_sandboxes=None, _idle=None, _lock=None, _cache=OrderedDict(), _started=None,
+                     counts=dict.fromkeys(self.counts, 0), seconds=0.0)
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def covers(self, category: str) -> bool:
+        return category in self.tests
+
+    def metric(self, category: str) -> str:
+        """
+        Metric of a category scored by pass rate.
+        """
+        return self.tests[category]['metric']
+
+    def fingerprint(self) -> str:
+        """
+        Hash of everything that determines executed scores: ENGINE_VERSION,
+        the test cases and the limits (the time budget only decides which
+        responses are executed, and unexecuted ones are never cached).
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        config = {'engine_version': ENGINE_VERSION, 'tests': self.tests,
+                  'timeout': self.timeout, 'memory_mb': self.memory_mb}
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _start(self) -> None:
+        if self._sandboxes is None:
+            self._sandboxes = [Sandbox() for _ in range(self.workers)]
+            self._idle = queue.SimpleQueue()
+            for sandbox in self._sandboxes:
+                self._idle.put(sandbox)
+
+    def close(self) -> None:
+        """
+        Stop the sandboxes, if they were started.
+        """
+        if self._sandboxes is not None:
+            for sandbox in self._sandboxes:
+                sandbox.close()
+            self._sandboxes = self._idle = None
+
+    def _out_of_time(self) -> bool:
+        return self.time_budget is not None and time.monotonic() - self._started > self.time_budget
+
+    def _execute(self, job: Dict) -> Dict:
+        """
+        Run a job on an idle sandbox, replacing the sandbox if it died.
+        """
+        if self._out_of_time():
+            return {'status': 'skipped', 'passed': 0, 'total': len(job['tests']), 'error': None}
+        sandbox = self._idle.get()
+        try:
+            result = sandbox.run(job)
+        finally:
+            if not sandbox.alive:
+                with self._lock:
+                    position = self._sandboxes.index(sandbox)
+                    sandbox = self._sandboxes[position] = Sandbox()
+            self._idle.put(sandbox)
+        return result
+
+    def results(self, category: str, responses: List, prompt_ids: List) -> List[Optional[Dict]]:
+        """
+        Run every response against the test cases of its prompt.
+
+        Args:
+            category (str): Category of the responses, e.g. 'coding'
+            responses (List): Responses (None or NaN for missing ones)
+            prompt_ids (List): Prompt ID of each response
+
+        Returns:
+            List with one result dict per response (see run_job), or None for
+            missing responses and prompts without test cases
+        """
+        began = time.perf_counter()
+        if self._started is None:
+            self._started = time.monotonic()
+        prompts = self.tests.get(category, {}).get('prompts', {})
+        results: List[Optional[Dict]] = [None] * len(responses)
+        pending: Dict[str, Tuple[Dict, List[int]]] = {}
+        for position, (response, prompt_id) in enumerate(zip(responses, prompt_ids)):
+            spec = prompts.get(str(prompt_id))
+            if spec is None or not isinstance(response, str) or not response:
+                continue
+            code = extract_code(response)
+            if code is None:
+                results[position] = {'status': 'no_code', 'passed': 0, 'total': len(spec['tests']),
+                                     'error': None}
+                continue
+            payload = json.dumps([spec, code], sort_keys=True)
+            key = hashlib.blake2b(payload.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                results[position] = cached
+                self.counts['cache_hits'] += 1
+            elif key in pending:
+                pending[key][1].append(position)
+                self.counts['cache_hits'] += 1
+            else:
+                job = {'code': code, 'setup': _source(spec.get('setup', '')), 'tests': spec['tests'],
+                       'timeout': self.timeout, 'memory_mb': self.memory_mb}
+                pending[key] = (job, [position])
+
+        if pending:
+            self._start()
+            with ThreadPoolExecutor(max_workers=len(self._sandboxes)) as threads:
+                finished = threads.map(self._execute, [job for job, _ in pending.values()])
+                for (key, (_, positions)), result in zip(pending.items(), finished):
+                    if result['status'] != 'skipped':
+                        self.counts['executed'] += 1
+                        self._cache[key] = result
+                        if len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+                    for position in positions:
+                        results[position] = result
+
+        # Every response with test cases counts once, under its own status
+        for result in results:
+            if result is not None:
+                self.counts['responses'] += 1
+                self.counts[result['status']] += 1
+        self.seconds += time.perf_counter() - began
+        return results
+
+    def pass_rates(self, category: str, responses: List,
+                   prompt_ids: List) -> Tuple[List[Optional[float]], List[bool]]:
+        """
+        Share of its prompt's tests each response passes.
+
+        Returns:
+            Tuple of (pass rate per response, or None where the heuristic
+            score stands: no test cases, a missing response, no code in the
+            response, a module missing from the sandbox or a skipped snippet;
+            whether each rate is final, i.e. False for snippets skipped by
+            the time budget)
+        """
+        rates, final = [], []
+        for result in self.results(category, responses, prompt_ids):
+            status = result['status'] if result else None
+            usable = status not in (None, 'no_code', 'unsupported', 'skipped')
+            rates.append(result['passed'] / result['total'] if usable and result['total'] else
+                         0.0 if usable else None)
+            final.append(status != 'skipped')
+        return rates, final
+
+    def stats(self) -> Dict:
+        """
+        Counters for the report: responses with test cases, each counted
+        once under its status (so the statuses add up to 'responses'),
+        snippets executed, results reused from the cache and seconds spent.
+        """
+        return {**self.counts, 'seconds': round(self.seconds, 3)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run response files against the test cases of a prompt.
+    """
+    parser = argparse.ArgumentParser(description="Run LLM coding responses against their test cases")
+    parser.add_argument('files', nargs='*', help="response files (Markdown or plain Python)")
+    parser.add_argument('--prompt-id', help="prompt ID of the files, e.g. C06")
+    parser.add_argument('--category', default='coding', help="category of the test cases (default: coding)")
+    parser.add_argument('--tests', default=TESTS_PATH,
+                        help="JSON file with the test cases (default: coding_tests.json)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"seconds per snippet (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve()
+        return 0
+    if not args.files or not args.prompt_id:
+        parser.error("response files and --prompt-id are required")
+
+    engine = ExecutionEngine(load_tests(args.tests), workers=min(len(args.files), os.cpu_count() or 1),
+                             timeout=args.timeout)
+    responses = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            responses.append(f.read())
+    try:
+        results = engine.results(args.category, responses, [args.prompt_id] * len(responses))
+    finally:
+        engine.close()
+    for path, result in zip(args.files, results):
+        print(json.dumps({'file': path, 'prompt_id': args.prompt_id, **(result or {'status': 'no_tests'})}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
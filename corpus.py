@@ -0,0 +1,323 @@
+"""
+Memory-mapped Response Corpus
+=============================
+
+Compact on-disk copy of the scoring inputs of records.xlsx. The workbook
+is parsed once by import_corpus; later runs open the corpus with mmap
+instead of re-reading the compressed XML.
+
+Every response sheet is stored as:
+    - blob      the UTF-8 text of all responses, back to back
+    - offsets   uint64 byte offsets into the blob, one more than rows
+    - present   uint8 flag, 0 where the Response cell is empty
+    - llm, prompt_id, category
+                int16 codes (int32 past 32767 labels) into label lists
+                kept in the header, -1 where the cell is empty
+
+File layout: MAGIC, the header length as uint64, the JSON header, then
+the arrays at 8-byte aligned positions given in the header. The arrays are
+NumPy views over the mapping, so nothing is copied until a response is
+decoded. Processes that open the same corpus share its page-cache pages,
+and a Corpus pickles as its path, so worker processes simply re-map it.
+
+Usage:
+    python corpus.py records.xlsx [records.corpus]
+    python analysis_script.py --stream records.corpus
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+import mmap
+import os
+import sys
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import atomic_path
+
+MAGIC = b'LLMCORP\x00'
+CORPUS_VERSION = 1
+
+# Columns stored as dictionary codes
+CODED_COLUMNS = {'llm': 'LLM', 'prompt_id': 'Prompt_ID', 'category': 'Category'}
+
+ALIGNMENT = 8
+
+
+def default_corpus_path(source: str) -> str:
+    """
+    Corpus file kept next to the workbook.
+    """
+    return os.path.splitext(source)[0] + '.corpus'
+
+
+def _source_stamp(source: str) -> Dict:
+    stat = os.stat(source)
+    return {'path': os.path.basename(source), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _json_label(value):
+    """
+    Label as stored in the JSON header (numbers stay numbers).
+    """
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def write_corpus(path: str, sheets: Dict[str, pd.DataFrame], source: Optional[str] = None) -> None:
+    """
+    Write response sheets as a corpus file, atomically (temporary file, then rename).
+
+    Args:
+        path (str): Corpus file to write
+        sheets (Dict): Sheet name -> frame; sheets without a Response column are skipped
+        source (str): Workbook the sheets were read from, recorded so stale
+            corpora can be detected
+    """
+    labels: Dict[str, List] = {key: [] for key in CODED_COLUMNS}
+    lookups: Dict[str, Dict] = {key: {} for key in CODED_COLUMNS}
+    arrays = []  # (sheet, name, array) in file order
+    sheet_rows = {}
+
+    for sheet, df in sheets.items():
+        if 'Response' not in df.columns:
+            continue
+        responses = df['Response']
+        present = responses.notna().to_numpy()
+        encoded = [str(value).encode('utf-8') if keep else b''
+                   for value, keep in zip(responses.tolist(), present.tolist())]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        arrays.append((sheet, 'offsets', offsets))
+        arrays.append((sheet, 'present', present.astype(np.uint8)))
+        for key, column in CODED_COLUMNS.items():
+            values = df[column] if column in df.columns else pd.Series([None] * len(df))
+            codes, uniques = pd.factorize(values.astype(object))
+            mapping = np.empty(len(uniques), dtype=np.int64)
+            for position, label in enumerate(uniques.tolist()):
+                label = _json_label(label)
+                if label not in lookups[key]:
+                    lookups[key][label] = len(labels[key])
+                    labels[key].append(label)
+                mapping[position] = lookups[key][label]
+            arrays.append((sheet, key, np.where(codes < 0, -1, mapping[codes] if len(mapping) else -1)))
+        arrays.append((sheet, 'blob', np.frombuffer(b''.join(encoded), dtype=np.uint8)))
+        sheet_rows[sheet] = len(df)
+
+    code_type = np.int16 if max(len(values) for values in labels.values()) <= np.iinfo(np.int16).max else np.int32
+    arrays = [(sheet, name, array.astype(code_type) if name in CODED_COLUMNS else array)
+              for sheet, name, array in arrays]
+
+    # Place the arrays after the header; positions depend on the header
+    # length, so lay it out until it stops growing
+    header = {'version': CORPUS_VERSION, 'labels': labels,
+              'source': _source_stamp(source) if source else None,
+              'sheets': {sheet: {'rows': rows, 'arrays': {}} for sheet, rows in sheet_rows.items()}}
+    data_start = 0
+    while True:
+        position = data_start
+        for sheet, name, array in arrays:
+            header['sheets'][sheet]['arrays'][name] = [position, array.dtype.str, int(array.size)]
+            position += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        encoded_header = json.dumps(header).encode('utf-8')
+        needed = -(-(len(MAGIC) + 8 + len(encoded_header)) // ALIGNMENT) * ALIGNMENT
+        if needed == data_start:
+            break
+        data_start = needed
+
+    with atomic_path(path) as temp_path, open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(encoded_header)).tobytes())
+        f.write(encoded_header)
+        for _, _, array in arrays:
+            f.write(b'\x00' * (-f.tell() % ALIGNMENT))
+            f.write(array.tobytes())
+
+
+def import_corpus(source: str, path: Optional[str] = None, force: bool = False) -> str:
+    """
+    Import the response sheets of a workbook into a corpus, unless the
+    corpus already matches the workbook.
+
+    Args:
+        source (str): Workbook, e.g. records.xlsx
+        path (str): Corpus file (default: next to the workbook, .corpus extension)
+        force (bool): Rebuild even if the corpus is current
+
+    Returns:
+        str: Path of the corpus
+    """
+    path = path or default_corpus_path(source)
+    if not force and os.path.exists(path):
+        with Corpus(path) as corpus:
+            if corpus.is_current(source):
+                return path
+    sheets = pd.read_excel(source, sheet_name=None)
+    write_corpus(path, sheets, source)
+    return path
+
+
+class CorpusSheet:
+    """
+    Zero-copy column views of one sheet of a Corpus.
+    """
+
+    def __init__(self, name: str, rows: int, buffer: memoryview, arrays: Dict,
+                 labels: Dict[str, List]):
+        self.name = name
+        self.rows = rows
+        views = {key: np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=offset)
+                 for key, (offset, dtype, count) in arrays.items()}
+        self.blob = buffer[arrays['blob'][0]:arrays['blob'][0] + arrays['blob'][2]]
+        self.offsets = views['offsets']
+        self.present = views['present'].view(bool)
+        self.codes = {key: views[key] for key in CODED_COLUMNS}
+        # Code -1 (empty cell) picks the trailing None
+        self._labels = {key: np.array(values + [None], dtype=object) for key, values in labels.items()}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def response(self, row: int) -> Optional[str]:
+        """
+        Decode one response straight from the mapped blob.
+        """
+        if not self.present[row]:
+            return None
+        return str(self.blob[int(self.offsets[row]):int(self.offsets[row + 1])], 'utf-8')
+
+    def responses(self, start: int = 0, stop: Optional[int] = None) -> pd.Series:
+        """
+        Decoded responses of rows start..stop (None where the cell is empty).
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        blob = self.blob
+        bounds = self.offsets[start:stop + 1].tolist()
+        present = self.present[start:stop].tolist()
+        texts = [str(blob[begin:end], 'utf-8') if keep else None
+                 for begin, end, keep in zip(bounds[:-1], bounds[1:], present)]
+        return pd.Series(texts, index=range(start, stop), dtype=object)
+
+    def labels(self, key: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Decoded values of a coded column ('llm', 'prompt_id' or 'category').
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        return self._labels[key][self.codes[key][start:stop]]
+
+    def frame(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        Rows start..stop as a record batch (Category, LLM, Prompt_ID,
+        Response and Sheet), like streaming.iter_record_batches yields.
+        """
+        responses = self.responses(start, stop)
+        frame = pd.DataFrame({column: self.labels(key, start, stop)
+                              for key, column in CODED_COLUMNS.items()}, index=responses.index)
+        frame['Response'] = responses
+        frame['Sheet'] = self.name
+        return frame[['Category', 'LLM', 'Prompt_ID', 'Response', 'Sheet']].reset_index(drop=True)
+
+
+class Corpus:
+    """
+    Read-only, memory-mapped corpus file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map a corpus file.
+
+        Args:
+            path (str): File written by write_corpus / import_corpus
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            buffer.release()
+            self._mmap.close()
+            raise ValueError(f"Not a response corpus: {path}")
+        length = int(np.frombuffer(buffer, dtype=np.uint64, count=1, offset=len(MAGIC))[0])
+        start = len(MAGIC) + 8
+        self.header = json.loads(bytes(buffer[start:start + length]))
+        if self.header.get('version') != CORPUS_VERSION:
+            buffer.release()
+            self._mmap.close()
+            raise ValueError(f"Unsupported corpus version {self.header.get('version')}: {path}")
+        self.sheets = {name: CorpusSheet(name, sheet['rows'], buffer, sheet['arrays'],
+                                         self.header['labels'])
+                       for name, sheet in self.header['sheets'].items()}
+
+    def __getstate__(self) -> Dict:
+        # Workers re-map the file instead of receiving its contents
+        return {'path': self.path}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(state['path'])
+
+    def __len__(self) -> int:
+        return sum(len(sheet) for sheet in self.sheets.values())
+
+    def __enter__(self) -> 'Corpus':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Drop the views and unmap the file.
+        """
+        self.sheets = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Arrays handed out still point into the mapping; it closes with them
+
+    def is_current(self, source: str) -> bool:
+        """
+        Whether the corpus was imported from source as it is now.
+        """
+        stamp = self.header.get('source')
+        return bool(stamp) and os.path.exists(source) and stamp == _source_stamp(source)
+
+    def iter_batches(self, batch_size: int = 5000) -> Iterator[pd.DataFrame]:
+        """
+        Record batches of every sheet, for streaming.iter_record_batches.
+        """
+        for sheet in self.sheets.values():
+            for start in range(0, len(sheet), batch_size):
+                yield sheet.frame(start, start + batch_size)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Import a workbook: corpus.py SOURCE.xlsx [CORPUS]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import the responses of a workbook into a "
+                                                 "memory-mapped corpus")
+    parser.add_argument('source', help="workbook to import, e.g. records.xlsx")
+    parser.add_argument('corpus', nargs='?', help="corpus file (default: SOURCE with .corpus extension)")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the corpus is current")
+    args = parser.parse_args(argv)
+
+    path = import_corpus(args.source, args.corpus, force=args.force)
+    with Corpus(path) as corpus:
+        for name, sheet in corpus.sheets.items():
+            print(f"  - {name}: {len(sheet)} responses, {sheet.blob.nbytes} bytes of text")
+    print(f"Corpus saved as {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Incremental Re-scoring Manifest
+===============================
+
+Row-fingerprint manifest that lets UpdatedLLMAnalyzer.process_incremental
+score only the rows of records.xlsx that are new or changed since the last
+run. The manifest stores, per scored sheet, a 64-bit fingerprint of every
+row's LLM, Prompt_ID and Response together with the scores given to it,
+plus per-model partial statistics (streaming.ModelAggregate) for each
+category. A run diffs the current rows against the stored fingerprints,
+subtracts the scores of rows that disappeared or changed from the
+aggregates and adds the scores of the rows it had to score.
+
+Rows are matched by content rather than position, so appended, inserted
+or re-ordered rows never cause unchanged responses to be re-scored.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import atomic_path
+from streaming import ModelAggregate
+
+MANIFEST_VERSION = 1
+
+# Columns whose content decides a row's scores
+FINGERPRINT_COLUMNS = ['LLM', 'Prompt_ID', 'Response']
+
+
+def default_manifest_path(excel_file: str) -> str:
+    """
+    Manifest file kept next to the workbook.
+    """
+    return f"{excel_file}.manifest.json"
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """
+    Fingerprint the scoring inputs of every row.
+
+    Args:
+        df (pd.DataFrame): Sheet with LLM, Prompt_ID and Response columns
+
+    Returns:
+        np.ndarray: One uint64 hash per row
+    """
+    # Missing cells get a marker no real cell text can be confused with
+    inputs = pd.DataFrame({column: df[column].map(str).where(df[column].notna(), '\x00')
+                           for column in FINGERPRINT_COLUMNS})
+    return pd.util.hash_pandas_object(inputs, index=False).to_numpy(dtype=np.uint64)
+
+
+def match_rows(old_hashes: np.ndarray, new_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pair current rows with stored rows of identical content.
+
+    Duplicate rows are paired occurrence by occurrence, so a sheet holding
+    the same response twice keeps needing two stored rows.
+
+    Args:
+        old_hashes (np.ndarray): Fingerprints stored in the manifest
+        new_hashes (np.ndarray): Fingerprints of the current rows
+
+    Returns:
+        Tuple of (stored row position per current row, -1 where the row is
+        new or changed; mask of stored rows no current row matched)
+    """
+    old = pd.DataFrame({'hash': old_hashes, 'old_position': np.arange(len(old_hashes))})
+    new = pd.DataFrame({'hash': new_hashes})
+    old['occurrence'] = old.groupby('hash').cumcount()
+    new['occurrence'] = new.groupby('hash').cumcount()
+
+    matched = new.merge(old, on=['hash', 'occurrence'], how='left', sort=False)
+    source = matched['old_position'].fillna(-1).to_numpy(dtype=np.int64)
+
+    stale = np.ones(len(old_hashes), dtype=bool)
+    stale[source[source >= 0]] = False
+    return source, stale
+
+
+class RowManifest:
+    """
+    Stored fingerprints, scores and per-model aggregates of the last run.
+    """
+
+    def __init__(self, fingerprint: str):
+        """
+        Args:
+            fingerprint (str): Scoring-rules fingerprint the scores were made under
+        """
+        self.fingerprint = fingerprint
+        self.sheets: Dict[str, Dict[str, np.ndarray]] = {}
+        self.sheet_categories: Dict[str, str] = {}  # Scoring category of each stored sheet
+        self.aggregates: Dict[str, Dict[str, ModelAggregate]] = {}
+
+    def sheet_rows(self, sheet: str, metrics: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Stored rows of a sheet (empty arrays if the sheet was never scored).
+
+        Returns:
+            Dict with 'hashes', 'models', 'metrics' (rows x metrics) and 'weighted'
+        """
+        if sheet in self.sheets:
+            return self.sheets[sheet]
+        return {
+            'hashes': np.empty(0, dtype=np.uint64),
+            'models': np.empty(0, dtype=object),
+            'metrics': np.empty((0, len(metrics)), dtype=float),
+            'weighted': np.empty(0, dtype=float)
+        }
+
+    def set_sheet_rows(self, sheet: str, hashes: np.ndarray, models: np.ndarray,
+                       metrics: np.ndarray, weighted: np.ndarray,
+                       category: Optional[str] = None) -> None:
+        self.sheets[sheet] = {'hashes': hashes, 'models': models,
+                              'metrics': metrics, 'weighted': weighted}
+        if category is not None:
+            self.sheet_categories[sheet] = category
+
+    def category_aggregates(self, category: str) -> Dict[str, ModelAggregate]:
+        return self.aggregates.setdefault(category, {})
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional['RowManifest']:
+        """
+        Read a manifest written by save().
+
+        Returns:
+            RowManifest, or None if the file is missing, unreadable, from
+            another manifest version or made under different scoring rules
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('version') != MANIFEST_VERSION or state.get('fingerprint') != fingerprint:
+            return None
+
+        manifest = cls(fingerprint)
+        for sheet, rows in state['sheets'].items():
+            manifest.set_sheet_rows(
+                sheet,
+                np.array([int(value, 16) for value in rows['hashes']], dtype=np.uint64),
+                np.array(rows['models'], dtype=object),
+                np.array(rows['metrics'], dtype=float).reshape(len(rows['hashes']), -1),
+                np.array(rows['weighted'], dtype=float),
+                state.get('categories', {}).get(sheet))
+        for category, models in state['aggregates'].items():
+            manifest.aggregates[category] = {model: ModelAggregate.from_dict(aggregate)
+                                             for model, aggregate in models.items()}
+        return manifest
+
+    def save(self, path: str) -> None:
+        """
+        Write the manifest atomically (temporary file, then rename).
+        """
+        state = {
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'sheets': {
+                sheet: {
+                    'hashes': [format(value, '016x') for value in rows['hashes'].tolist()],
+                    'models': rows['models'].tolist(),
+                    'metrics': rows['metrics'].tolist(),
+                    'weighted': rows['weighted'].tolist()
+                }
+                for sheet, rows in self.sheets.items()
+            },
+            'categories': {sheet: category for sheet, category in self.sheet_categories.items()
+                           if sheet in self.sheets},
+            'aggregates': {
+                category: {model: aggregate.to_dict() for model, aggregate in models.items()}
+                for category, models in self.aggregates.items()
+            }
+        }
+
+        with atomic_path(path) as temp_path, open(temp_path, 'w', encoding="utf-8") as f:
+            json.dump(state, f)
@@ -0,0 +1,189 @@
+"""
+Pipeline Instrumentation
+========================
+
+Timing and counting hooks for UpdatedLLMAnalyzer. A PipelineTrace records
+the wall time, rows and bytes of every pipeline stage (loading, scoring,
+updating sheets, summary statistics, saving, reporting) and the time spent
+on each metric family inside the batch scorers. It can also run cProfile
+and tracemalloc over the whole run. The trace is written as JSON, next to
+comprehensive_analysis_report.txt when run from main().
+
+Stage names are hierarchical ('score:coding', 'score:coding:cache_lookup')
+and times are inclusive, so a nested stage is also counted in its parent.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator
+
+from checkpoint import atomic_path
+
+# Number of functions / allocation sites summarized in the JSON trace
+TOP_ENTRIES = 25
+
+
+class PipelineTrace:
+    """
+    Collects per-stage and per-metric-family timings of an analysis run.
+    """
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False):
+        """
+        Start tracing.
+
+        Args:
+            profile (bool): Run cProfile until stop() is called
+            trace_memory (bool): Run tracemalloc until stop() is called
+        """
+        self.stages: Dict[str, Dict] = {}
+        self.metric_families: Dict[str, Dict[str, Dict]] = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self.memory_snapshot = None
+        self.memory_peak = None
+        self.started = time.perf_counter()
+        self.stopped = None
+
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def _stage_record(self, name: str) -> Dict:
+        if name not in self.stages:
+            self.stages[name] = {'calls': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0}
+        return self.stages[name]
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int = 0, nbytes: int = 0) -> Iterator[Dict]:
+        """
+        Time a block as one call of a stage.
+
+        Args:
+            name (str): Stage name
+            rows (int): Rows processed by the block
+            nbytes (int): Bytes processed by the block
+
+        Yields:
+            Dict: The stage's record, for counts only known inside the block
+        """
+        record = self._stage_record(name)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] += time.perf_counter() - start
+            record['calls'] += 1
+            record['rows'] += rows
+            record['bytes'] += nbytes
+
+    def count(self, name: str, rows: int = 0, nbytes: int = 0) -> None:
+        """
+        Add rows and bytes to a stage without timing anything.
+        """
+        record = self._stage_record(name)
+        record['rows'] += rows
+        record['bytes'] += nbytes
+
+    def laps(self, category: str, rows: int) -> Callable[[str], None]:
+        """
+        Lap timer for the metric families of one scoring batch.
+
+        Each call lap(name) charges the time since the previous lap (or
+        since laps() was called) to metric family name of category.
+
+        Args:
+            category (str): 'coding' or 'paraphrasing'
+            rows (int): Rows in the batch
+
+        Returns:
+            Callable taking the name of the family that just finished
+        """
+        families = self.metric_families.setdefault(category, {})
+        last = [time.perf_counter()]
+
+        def lap(name: str) -> None:
+            now = time.perf_counter()
+            record = families.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0})
+            record['seconds'] += now - last[0]
+            record['calls'] += 1
+            record['rows'] += rows
+            last[0] = now
+
+        return lap
+
+    def stop(self) -> None:
+        """
+        Stop the profiler and take the tracemalloc snapshot.
+        """
+        if self.stopped is not None:
+            return
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory:
+            self.memory_snapshot = tracemalloc.take_snapshot()
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.stopped = time.perf_counter()
+
+    def to_dict(self) -> Dict:
+        """
+        Machine-readable trace; stops tracing first.
+        """
+        self.stop()
+        trace = {
+            'total_seconds': self.stopped - self.started,
+            'stages': self.stages,
+            'metric_families': self.metric_families
+        }
+
+        if self.profiler is not None:
+            stats = pstats.Stats(self.profiler, stream=io.StringIO())
+            entries = []
+            for (filename, line, function), (calls, _, own, cumulative, _) in stats.stats.items():
+                entries.append({'function': f"{os.path.basename(filename)}:{line}({function})",
+                                'calls': calls, 'own_seconds': own, 'cumulative_seconds': cumulative})
+            entries.sort(key=lambda entry: entry['cumulative_seconds'], reverse=True)
+            trace['profile'] = entries[:TOP_ENTRIES]
+
+        if self.memory_snapshot is not None:
+            top = self.memory_snapshot.statistics('lineno')[:TOP_ENTRIES]
+            trace['memory'] = {
+                'peak_bytes': self.memory_peak,
+                'top_allocations': [{'location': str(stat.traceback[0]), 'bytes': stat.size,
+                                     'blocks': stat.count} for stat in top]
+            }
+        return trace
+
+    def write(self, path: str) -> None:
+        """
+        Write the trace as JSON; with profiling on, the raw cProfile stats
+        go next to it with a .prof extension (for pstats or snakeviz).
+        """
+        trace = self.to_dict()
+        with atomic_path(path) as temp_path, open(temp_path, 'w', encoding="utf-8") as f:
+            json.dump(trace, f, indent=2)
+        if self.profiler is not None:
+            with atomic_path(os.path.splitext(path)[0] + '.prof') as temp_path:
+                self.profiler.dump_stats(temp_path)
+
+
+def _no_lap(name: str) -> None:
+    pass
+
+
+def no_laps(category: str, rows: int) -> Callable[[str], None]:
+    """
+    Lap timer that records nothing, used when instrumentation is off.
+    """
+    return _no_lap
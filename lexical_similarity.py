@@ -0,0 +1,350 @@
+"""
+Lexical Similarity to Source Texts
+==================================
+
+How closely a response follows the source text of its prompt (the passage
+to paraphrase, summarize or rewrite, as given in paraphrasing_prompts.md),
+as text features the scoring rules can test:
+
+    - source_similarity  cosine similarity of the hashed content-word
+                         unigram and bigram counts of response and source
+    - source_overlap     share of the source's distinct content words that
+                         the response uses
+    - copy_ratio         share of the response's distinct word 4-grams
+                         (shingles) found verbatim in the source
+
+Content words are lowercased letter/digit tokens outside STOPWORDS.
+Terms and shingles are hashed into DIMENSION buckets with CRC-32, so
+vectors are sparse integer counts and every statistic is a ratio of
+exact integers; both evaluators below give identical values. Prompts
+without a source (or without text) have NaN features, which no rule
+condition matches.
+
+SourceIndex precomputes the vectors of every source once, for single
+responses as dicts and for batches as sorted sparse key arrays. A batch of
+responses is tokenized, hashed and counted with whole-column operations
+into sparse (row, bucket) keys, and all responses are compared with their
+prompt's source in one pass: each response key is looked up among the
+source keys of its prompt with a binary search (a sparse row-wise dot
+product), and the products are summed per row. There is no pairwise loop
+over responses and sources. Only the batch path imports NumPy and pandas.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import hashlib
+import math
+import os
+import re
+import zlib
+from typing import Dict, Optional, Set, Tuple
+
+# Hash buckets of terms and shingles
+DIMENSION = 1 << 24
+
+# Words per shingle for copy detection
+SHINGLE_SIZE = 4
+
+# Quoted passages shorter than this are names or titles, not source text
+MIN_PASSAGE_WORDS = 5
+
+# Features computed per response and prompt
+SOURCE_FEATURES = ('source_similarity', 'source_overlap', 'copy_ratio')
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be because been but by can could
+did do does for from had has have he her his how i if in into is it its just
+me my no not of on or our out so some than that the their them then there
+these they this those to up us was we were what when which who will with
+would you your
+""".split())
+
+_TOKEN = re.compile(r"[^\W_]+")
+_PROMPT = re.compile(r"^### Prompt (\d+):[^\n]*\n\*\*Prompt:\*\*(.*?)(?=^### |^---|\Z)",
+                     re.MULTILINE | re.DOTALL)
+_QUOTED = re.compile(r'"([^"\n]+)"')
+_ITEM = re.compile(r"^\s*(?:[*•-]|\d+\.)\s+(.+)$", re.MULTILINE)
+
+# Seeds keeping bigram and shingle hashes apart from word hashes
+_BIGRAM_SEED, _SHINGLE_SEED = 0x62, 0x73
+
+# Modulus and multiplier of the polynomial hash of word sequences
+_MODULUS, _MULTIPLIER = (1 << 31) - 1, 1000003
+
+
+def source_text(prompt: str) -> str:
+    """
+    The source a response to a prompt should stay faithful to: its quoted
+    passages and list items, or the whole prompt if it has none.
+    """
+    parts = [quote for quote in _QUOTED.findall(prompt) if len(quote.split()) >= MIN_PASSAGE_WORDS]
+    parts += _ITEM.findall(prompt)
+    return "\n".join(parts) if parts else prompt.strip()
+
+
+def load_sources(path: str, prefix: str) -> Dict[str, str]:
+    """
+    Read the source text of every prompt of a Markdown prompt list.
+
+    Args:
+        path (str): Markdown file with '### Prompt N:' sections holding a
+            '**Prompt:**' paragraph, like paraphrasing_prompts.md
+        prefix (str): Prompt ID prefix, e.g. 'P' for P01-P30
+
+    Returns:
+        Dict mapping Prompt ID to source text
+    """
+    with open(path, encoding="utf-8") as f:
+        markdown = f.read()
+    return {f"{prefix}{int(number):02d}": source_text(body)
+            for number, body in _PROMPT.findall(markdown)}
+
+
+def _hash(word: str) -> int:
+    return zlib.crc32(word.encode('utf-8', 'surrogatepass'))
+
+
+def _combine(seed: int, hashes) -> int:
+    """
+    Polynomial hash of a word sequence from its word hashes.
+    """
+    for value in hashes:
+        seed = (seed * _MULTIPLIER + value) % _MODULUS
+    return seed
+
+
+def token_hashes(lowered):
+    """
+    The tokens of a column of lowercased texts as CRC-32 hashes, in order.
+
+    Args:
+        lowered (pd.Series): Lowercased texts
+
+    Returns:
+        Tuple of np.ndarrays: the row number of each token, its hash and
+        whether it is a content word
+    """
+    import numpy as np
+    import pandas as pd
+
+    tokens = pd.Series(lowered.to_numpy(dtype=object), index=range(len(lowered))).str.findall(_TOKEN)
+    exploded = tokens.explode().dropna()
+    rows = exploded.index.to_numpy(dtype=np.int64)
+    codes, uniques = pd.factorize(exploded.to_numpy(dtype=object))
+    hashes = np.fromiter((_hash(word) for word in uniques), dtype=np.int64, count=len(uniques))[codes]
+    return rows, hashes, ~np.isin(uniques, list(STOPWORDS))[codes]
+
+
+def _combine_columns(seed: int, columns):
+    """
+    _combine of word sequences given as one hash column per position.
+    """
+    import numpy as np
+
+    combined = np.full(len(columns[0]), seed, dtype=np.int64)
+    for column in columns:
+        combined = (combined * _MULTIPLIER + column) % _MODULUS
+    return combined
+
+
+def shingle_hashes(rows, hashes, size: int = SHINGLE_SIZE):
+    """
+    Hashes (below 2**31 - 1) of every run of size consecutive tokens within
+    a row, from the output of token_hashes.
+
+    Returns:
+        Tuple of np.ndarrays: the row number of each shingle and its hash
+    """
+    import numpy as np
+
+    span = size - 1
+    starts = np.flatnonzero(rows[span:] == rows[:len(rows) - span]) if len(rows) > span else rows[:0]
+    return rows[starts], _combine_columns(_SHINGLE_SEED, [hashes[starts + offset] for offset in range(size)])
+
+
+def _vectors(lowered: str) -> Tuple[Dict[int, int], Set[int], Set[int]]:
+    """
+    Term counts, distinct content words and distinct shingles of one text,
+    as hash buckets.
+    """
+    hashes = [(_hash(token), token not in STOPWORDS) for token in _TOKEN.findall(lowered)]
+    content = [value for value, is_content in hashes if is_content]
+    terms: Dict[int, int] = {}
+    for value in content:
+        terms[value % DIMENSION] = terms.get(value % DIMENSION, 0) + 1
+    for pair in zip(content, content[1:]):
+        bucket = _combine(_BIGRAM_SEED, pair) % DIMENSION
+        terms[bucket] = terms.get(bucket, 0) + 1
+    words = {value % DIMENSION for value in content}
+    hashes = [value for value, _ in hashes]
+    shingles = {_combine(_SHINGLE_SEED, hashes[start:start + SHINGLE_SIZE]) % DIMENSION
+                for start in range(len(hashes) - SHINGLE_SIZE + 1)}
+    return terms, words, shingles
+
+
+class SourceIndex:
+    """
+    Precomputed source vectors of a category's prompts, compared with
+    responses one at a time or a batch at a time.
+    """
+
+    def __init__(self, sources: Dict[str, str]):
+        """
+        Args:
+            sources (Dict): Prompt ID -> source text
+        """
+        self.sources = dict(sources)
+        self.prompt_ids = list(self.sources)
+        self._vectors = {prompt_id: _vectors(text.lower()) for prompt_id, text in self.sources.items()}
+        self._norms = {prompt_id: sum(count * count for count in terms.values())
+                       for prompt_id, (terms, _, _) in self._vectors.items()}
+        self._arrays = None
+
+    def digest(self) -> str:
+        """
+        Hash of the source texts, for scoring fingerprints.
+        """
+        payload = '\x1f'.join(f"{prompt_id}\x1e{text}" for prompt_id, text in sorted(self.sources.items()))
+        return hashlib.sha256(payload.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def features(self, lowered: str, prompt_id) -> Dict[str, float]:
+        """
+        SOURCE_FEATURES of one lowercased response to a prompt.
+        """
+        source = self._vectors.get(str(prompt_id))
+        if source is None:
+            return dict.fromkeys(SOURCE_FEATURES, math.nan)
+        source_terms, source_words, source_shingles = source
+        terms, words, shingles = _vectors(lowered)
+        dot = sum(count * source_terms.get(bucket, 0) for bucket, count in terms.items())
+        norm = sum(count * count for count in terms.values())
+        return {
+            'source_similarity': dot / math.sqrt(norm * self._norms[str(prompt_id)]) if dot else 0.0,
+            'source_overlap': len(words & source_words) / len(source_words) if source_words else 0.0,
+            'copy_ratio': len(shingles & source_shingles) / len(shingles) if shingles else 0.0
+        }
+
+    @staticmethod
+    def _sparse(lowered):
+        """
+        Sparse vectors of a column of lowercased texts, as sorted int64 keys
+        row * DIMENSION + bucket: (term keys, their counts, content word
+        keys, shingle keys), the last two without duplicates.
+        """
+        import numpy as np
+
+        rows, hashes, is_content = token_hashes(lowered)
+        content_rows, content = rows[is_content], hashes[is_content]
+
+        def distinct(keys):
+            """
+            Sorted distinct keys and how often each occurs.
+            """
+            keys = np.sort(keys)
+            if not len(keys):
+                return keys, np.zeros(0, dtype=np.int64)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            return keys[starts], np.diff(np.r_[starts, len(keys)])
+
+        # Bigrams and shingles only join words of the same row
+        pairs = np.flatnonzero(content_rows[1:] == content_rows[:-1])
+        bigrams = _combine_columns(_BIGRAM_SEED, [content[pairs], content[pairs + 1]])
+        shingle_rows, shingles = shingle_hashes(rows, hashes)
+
+        term_keys, counts = distinct(np.concatenate([content_rows * DIMENSION + content % DIMENSION,
+                                                     content_rows[pairs] * DIMENSION + bigrams % DIMENSION]))
+        return (term_keys, counts.astype(np.int64),
+                distinct(content_rows * DIMENSION + content % DIMENSION)[0],
+                distinct(shingle_rows * DIMENSION + shingles % DIMENSION)[0])
+
+    def _source_arrays(self):
+        """
+        The sparse source vectors, built on the first batch.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if self._arrays is None:
+            lowered = pd.Series([self.sources[prompt_id].lower() for prompt_id in self.prompt_ids])
+            term_keys, counts, words, shingles = self._sparse(lowered)
+            rows = len(self.prompt_ids)
+            norms = np.bincount(term_keys // DIMENSION, weights=counts * counts, minlength=rows)
+            distinct_words = np.bincount(words // DIMENSION, minlength=rows)
+            self._arrays = (term_keys, counts, words, shingles, norms, distinct_words)
+        return self._arrays
+
+    def column_features(self, lowered, prompt_ids) -> Dict[str, object]:
+        """
+        SOURCE_FEATURES of a batch of responses, in one pass.
+
+        Args:
+            lowered (pd.Series): Lowercased responses
+            prompt_ids: Prompt ID per response
+
+        Returns:
+            Dict mapping each feature to an np.ndarray of values per row
+        """
+        import numpy as np
+
+        source_terms, source_counts, source_words, source_shingles, source_norms, \
+            source_distinct = self._source_arrays()
+        n = len(lowered)
+        positions = {prompt_id: position for position, prompt_id in enumerate(self.prompt_ids)}
+        prompt_rows = np.fromiter((positions.get(str(prompt_id), -1) for prompt_id in prompt_ids),
+                                  dtype=np.int64, count=n)
+        known = prompt_rows >= 0
+        term_keys, counts, words, shingles = self._sparse(lowered)
+
+        def lookup(keys, source_keys):
+            """
+            Position in source_keys of each response key moved to its
+            prompt's row, and whether it is there.
+            """
+            rows = keys // DIMENSION
+            moved = np.maximum(prompt_rows[rows], 0) * DIMENSION + keys % DIMENSION
+            found = np.searchsorted(source_keys, moved)
+            hit = found < len(source_keys)
+            hit[hit] = source_keys[found[hit]] == moved[hit]
+            return rows, found, hit & known[rows]
+
+        rows, found, hit = lookup(term_keys, source_terms)
+        products = np.where(hit, counts * source_counts[np.minimum(found, len(source_counts) - 1)], 0) \
+            if len(source_counts) else np.zeros(len(rows))
+        dots = np.bincount(rows, weights=products, minlength=n)
+        norms = np.bincount(rows, weights=counts * counts, minlength=n)
+        row_source_norms = source_norms[np.maximum(prompt_rows, 0)]
+        similarity = np.zeros(n)
+        np.divide(dots, np.sqrt(norms * row_source_norms), out=similarity, where=dots > 0)
+
+        rows, _, hit = lookup(words, source_words)
+        shared_words = np.bincount(rows[hit], minlength=n)
+        distinct = source_distinct[np.maximum(prompt_rows, 0)]
+        overlap = np.zeros(n)
+        np.divide(shared_words, distinct, out=overlap, where=distinct > 0)
+
+        rows, _, hit = lookup(shingles, source_shingles)
+        copied = np.bincount(rows[hit], minlength=n)
+        total = np.bincount(rows, minlength=n)
+        copy_ratio = np.zeros(n)
+        np.divide(copied, total, out=copy_ratio, where=total > 0)
+
+        features = {'source_similarity': similarity, 'source_overlap': overlap, 'copy_ratio': copy_ratio}
+        for values in features.values():
+            values[~known] = np.nan
+        return features
+
+
+# Indexes by (path, modification time, prefix), shared by the rule sets of a process
+_INDEXES: Dict[Tuple[str, float, str], SourceIndex] = {}
+
+
+def load_source_index(path: str, prefix: Optional[str]) -> SourceIndex:
+    """
+    SourceIndex of a Markdown prompt list, loaded once per process.
+    """
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path), prefix or '')
+    if key not in _INDEXES:
+        _INDEXES[key] = SourceIndex(load_sources(path, prefix or ''))
+    return _INDEXES[key]
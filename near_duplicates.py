@@ -0,0 +1,240 @@
+"""
+Near-Duplicate Responses
+========================
+
+Finds clusters of identical or nearly identical responses, such as the
+same model re-run on a prompt or two models returning one cached upstream
+output, so that each cluster is scored once and its scores are shared.
+
+Two responses are near-duplicates when the Jaccard similarity of their
+sets of word 3-grams (shingles) reaches a threshold. Responses too short
+for a shingle are compared by their set of words. Similarity is estimated
+with MinHash: every response gets a signature of PERMUTATIONS minimum
+shingle hashes, one per random hash permutation, and the share of equal
+signature entries estimates the Jaccard similarity. Locality-sensitive
+hashing splits the signatures into BANDS bands; responses agreeing on a
+whole band fall into the same bucket and become candidates, which finds
+pairs above the default threshold with probability > 0.999 without
+comparing every pair. Signatures and buckets are computed with whole-array
+NumPy operations, so the index is built in roughly linear time.
+
+Candidates are checked against the threshold with their signatures and
+linked into clusters (single linkage); the first response of a cluster
+represents it. Only responses within one group (the Prompt_ID, as scores
+depend on the prompt) are clustered together, and only within one scoring
+pass: a stream run clusters each batch, an incremental run the new and
+changed rows.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from lexical_similarity import shingle_hashes, token_hashes
+
+# Default estimated Jaccard similarity of two near-duplicates
+THRESHOLD = 0.9
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# MinHash signature length and LSH bands (8 signature entries per band)
+PERMUTATIONS = 128
+BANDS = 16
+
+# Seed of the hash permutations, fixed so clusters are reproducible
+SEED = 5541
+
+# Shingles hashed per step, bounding the (shingles x PERMUTATIONS) work array
+BLOCK_SHINGLES = 1 << 18
+
+# Hashes are below 2**32; rows without any have this signature
+_EMPTY = 1 << 32
+
+
+def _starts(sorted_values: np.ndarray) -> np.ndarray:
+    """
+    Positions where a new value begins in a sorted array.
+    """
+    if not len(sorted_values):
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+
+
+def minhash_signatures(rows: np.ndarray, hashes: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    MinHash signatures of sets of hashes.
+
+    The permutations are multiply-shift hashes (a * x + b) >> 32 with
+    random odd 64-bit a, computed with wrapping uint64 arithmetic.
+
+    Args:
+        rows (np.ndarray): Row number of each hash
+        hashes (np.ndarray): Hashes below 2**32
+        n_rows (int): Number of rows
+
+    Returns:
+        np.ndarray of shape (n_rows, PERMUTATIONS); rows without hashes are
+        all _EMPTY
+    """
+    keys = np.sort(rows.astype(np.int64) * _EMPTY + hashes)
+    keys = keys[_starts(keys)]
+    rows, hashes = keys // _EMPTY, (keys % _EMPTY).astype(np.uint64)
+    generator = np.random.default_rng(SEED)
+    multipliers = generator.integers(0, 1 << 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets = generator.integers(0, 1 << 63, PERMUTATIONS, dtype=np.uint64)
+
+    signatures = np.full((n_rows, PERMUTATIONS), _EMPTY, dtype=np.int64)
+    starts = _starts(rows)
+    step = max(1, int(len(starts) * BLOCK_SHINGLES // max(len(keys), 1)))
+    for first in range(0, len(starts), step):
+        low = starts[first]
+        high = starts[first + step] if first + step < len(starts) else len(keys)
+        values = np.multiply.outer(multipliers, hashes[low:high])
+        values += offsets[:, None]
+        values >>= np.uint64(32)
+        signatures[rows[starts[first:first + step]]] = np.minimum.reduceat(
+            values, starts[first:first + step] - low, axis=1).T
+    return signatures
+
+
+class NearDuplicateIndex:
+    """
+    Near-duplicate clusters of a batch of responses.
+
+    Attributes:
+        representatives (np.ndarray): Position of the response that
+            represents each response's cluster (its own position if it has
+            no near-duplicate)
+    """
+
+    def __init__(self, responses: pd.Series, groups: Optional[Iterable] = None,
+                 threshold: float = THRESHOLD):
+        """
+        Build the index.
+
+        Args:
+            responses (pd.Series): Responses; missing ones are never duplicates
+            groups: Group per response (e.g. Prompt_ID); only responses of one
+                group are clustered together (default: a single group)
+            threshold (float): Estimated Jaccard similarity from which two
+                responses are near-duplicates
+        """
+        self.threshold = threshold
+        n = len(responses)
+        values = pd.Series(responses.to_numpy(dtype=object), index=range(n))
+        lowered = values.where(values.notna(), '').map(str).str.lower()
+
+        rows, hashes, _ = token_hashes(lowered)
+        shingle_rows, shingles = shingle_hashes(rows, hashes, SHINGLE_SIZE)
+        # Responses too short for a shingle are compared by their words
+        short = ~np.isin(rows, shingle_rows)
+        rows = np.concatenate([shingle_rows, rows[short]])
+        hashes = np.concatenate([shingles, hashes[short]])
+        signatures = minhash_signatures(rows, hashes, n)
+        present = np.sort(rows)
+
+        codes = np.zeros(n, dtype=np.int64)
+        if groups is not None:
+            codes = pd.factorize(pd.Series(list(groups), dtype=object).map(str))[0].astype(np.int64)
+        self.representatives = self._cluster(signatures, present[_starts(present)], codes)
+
+    def _cluster(self, signatures: np.ndarray, present: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Link candidate pairs from the LSH buckets that pass the threshold
+        and label every row with the first row of its cluster.
+        """
+        labels = np.arange(len(signatures))
+        if len(present) < 2:
+            return labels
+        width = PERMUTATIONS // BANDS
+        firsts, seconds = [], []
+        for band in range(BANDS):
+            block = np.column_stack([codes[present], signatures[present, band * width:(band + 1) * width]])
+            _, buckets = np.unique(block, axis=0, return_inverse=True)
+            order = np.argsort(buckets.ravel(), kind='stable')
+            bucket = buckets.ravel()[order]
+            leads = _starts(bucket)
+            lead_of = np.repeat(leads, np.diff(np.r_[leads, len(order)]))
+            members = np.flatnonzero(lead_of != np.arange(len(order)))
+            # Each bucket member is compared with the bucket's first row only
+            first, second = present[order[lead_of[members]]], present[order[members]]
+            agreement = (signatures[first] == signatures[second]).mean(axis=1)
+            keep = agreement >= self.threshold
+            firsts.append(first[keep])
+            seconds.append(second[keep])
+
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        if not len(first):
+            return labels
+        # Propagate the smallest row number through the linked pairs
+        while True:
+            smallest = np.minimum(labels[first], labels[second])
+            updated = labels.copy()
+            np.minimum.at(updated, first, smallest)
+            np.minimum.at(updated, second, smallest)
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                return labels
+            labels = updated
+
+    def clusters(self) -> List[np.ndarray]:
+        """
+        Positions of the responses of every cluster with near-duplicates,
+        representative first.
+        """
+        order = np.argsort(self.representatives, kind='stable')
+        labels = self.representatives[order]
+        return [members for members in np.split(order, _starts(labels)[1:]) if len(members) > 1]
+
+
+class DuplicateReport:
+    """
+    Near-duplicate clusters found while scoring, counted per model and per
+    Prompt_ID for the report.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+        self.responses = 0
+        self.clusters = 0
+        self.duplicates = 0
+        self.cross_model = 0
+        self.models: Dict[str, Dict[str, int]] = {}
+        self.prompts: Dict[str, Dict] = {}
+
+    def add(self, index: NearDuplicateIndex, models: Iterable, prompt_ids: Iterable) -> None:
+        """
+        Count the clusters of an index over responses of these models and prompts.
+        """
+        models, prompt_ids = list(models), list(prompt_ids)
+        self.responses += len(models)
+        for members in index.clusters():
+            names = sorted({str(models[position]) for position in members})
+            prompt = self.prompts.setdefault(str(prompt_ids[members[0]]),
+                                             {'clusters': 0, 'responses': 0, 'models': []})
+            prompt['clusters'] += 1
+            prompt['responses'] += len(members)
+            prompt['models'] = sorted(set(prompt['models']) | set(names))
+            self.clusters += 1
+            self.duplicates += len(members) - 1
+            self.cross_model += len(names) > 1
+            for position in members:
+                counts = self.models.setdefault(str(models[position]),
+                                                {'responses': 0, 'cross_model': 0})
+                counts['responses'] += 1
+                counts['cross_model'] += len(names) > 1
+
+    def summary(self) -> Dict:
+        """
+        The counts as a dict for the report: totals, 'models' (responses in
+        clusters, and in clusters shared with another model) and 'prompts'.
+        """
+        return {'threshold': self.threshold, 'responses': self.responses, 'clusters': self.clusters,
+                'duplicates': self.duplicates, 'cross_model': self.cross_model,
+                'models': {model: dict(counts) for model, counts in sorted(self.models.items())},
+                'prompts': {prompt: dict(counts) for prompt, counts in sorted(self.prompts.items())}}
@@ -0,0 +1,409 @@
+"""
+Output Writers for Scored Records
+=================================
+
+Pluggable output layer used by UpdatedLLMAnalyzer.save_updated_excel.
+
+Formats:
+    - xlsx              full rewrite through pandas and openpyxl (default)
+    - xlsx-stream       openpyxl write-only workbook, rows streamed in chunks
+    - xlsx-incremental  patch only the score columns of the scored sheets in
+                        an existing workbook; every other part of the file is
+                        copied unchanged
+    - parquet           one Parquet file per sheet (needs pyarrow)
+    - arrow             one uncompressed Arrow IPC file per sheet, which
+                        downstream readers can memory-map (needs pyarrow)
+
+Every file is written under a temporary name and renamed into place when
+complete (checkpoint.atomic_path), so an interrupted save never leaves a
+half-written workbook behind. New formats can be added with
+register_writer().
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+import re
+import codecs
+import shutil
+import zipfile
+import posixpath
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import atomic_path
+
+# Columns written back by the scoring pipeline (Metric_A, Metric_B, ... per metric)
+SCORE_COLUMNS = re.compile(r'Metric_[A-Z]|Score|Mean_Score')
+
+_SHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_CELL_PATTERN = re.compile(r'<c\b[^>]*?/>|<c\b[^>]*>.*?</c>', re.DOTALL)
+_CELL_REF = re.compile(r'\br="([A-Z]+)(\d+)"')
+_CELL_STYLE = re.compile(r'\bs="(\d+)"')
+_ROW_NUMBER = re.compile(r'<row\b[^>]*?\br="(\d+)"')
+
+
+class OutputWriter:
+    """
+    Base class of the output formats.
+    """
+
+    def write(self, data: Dict[str, pd.DataFrame], filename: str,
+              updated_sheets: Optional[Set[str]] = None) -> List[str]:
+        """
+        Write the sheets.
+
+        Args:
+            data (Dict): Sheet name -> DataFrame, in workbook order
+            filename (str): Target file (other outputs are named after it)
+            updated_sheets (Set): Sheets whose scores changed (None = all)
+
+        Returns:
+            List of the files written
+        """
+        raise NotImplementedError
+
+
+class XlsxWriter(OutputWriter):
+    """
+    Rewrite the whole workbook with pandas and openpyxl.
+    """
+
+    def write(self, data, filename, updated_sheets=None):
+        with atomic_path(filename) as temp_name:
+            with pd.ExcelWriter(temp_name, engine='openpyxl') as writer:
+                for sheet_name, df in data.items():
+                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return [filename]
+
+
+class StreamingXlsxWriter(OutputWriter):
+    """
+    Write the workbook through an openpyxl write-only workbook.
+
+    Rows are converted and appended chunk by chunk, so the writer's memory
+    use does not grow with the number of rows.
+    """
+
+    CHUNK_ROWS = 10000
+
+    def write(self, data, filename, updated_sheets=None):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        for sheet_name, df in data.items():
+            worksheet = workbook.create_sheet(title=sheet_name)
+            worksheet.append([str(column) for column in df.columns])
+            for start in range(0, len(df), self.CHUNK_ROWS):
+                chunk = df.iloc[start:start + self.CHUNK_ROWS].astype(object)
+                chunk = chunk.where(chunk.notna(), None)
+                for row in chunk.itertuples(index=False, name=None):
+                    worksheet.append(row)
+        with atomic_path(filename) as temp_name:
+            workbook.save(temp_name)
+        return [filename]
+
+
+class IncrementalXlsxWriter(OutputWriter):
+    """
+    Update only the score cells of the scored sheets in an existing workbook.
+
+    The workbook is rewritten part by part: the XML of every updated sheet
+    is streamed row by row with its score cells replaced, and all other
+    parts (unchanged sheets, styles, shared strings) are copied as they are.
+    Falls back to a full rewrite when the file does not exist yet or its
+    layout no longer matches the data.
+    """
+
+    READ_CHUNK = 1 << 20
+
+    def write(self, data, filename, updated_sheets=None):
+        updated_sheets = set(data) if updated_sheets is None else set(updated_sheets) & set(data)
+        if not os.path.exists(filename):
+            return XlsxWriter().write(data, filename, updated_sheets)
+
+        with zipfile.ZipFile(filename) as source:
+            parts = self._sheet_parts(source)
+            if list(parts) != list(data):
+                return XlsxWriter().write(data, filename, updated_sheets)
+
+            patches = {}
+            for sheet_name in updated_sheets:
+                columns = self._score_columns(source, parts[sheet_name], data[sheet_name])
+                if columns is None:
+                    return XlsxWriter().write(data, filename, updated_sheets)
+                patches[parts[sheet_name]] = (data[sheet_name], columns)
+
+            with atomic_path(filename) as temp_name, \
+                    zipfile.ZipFile(temp_name, 'w', zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    if info.filename in patches:
+                        df, columns = patches[info.filename]
+                        self._patch_sheet(source, target, info, df, columns)
+                    else:
+                        with source.open(info) as src, target.open(_copy_info(info), 'w') as dst:
+                            shutil.copyfileobj(src, dst)
+        return [filename]
+
+    @staticmethod
+    def _sheet_parts(source: zipfile.ZipFile) -> Dict[str, str]:
+        """
+        Map sheet names to their XML part, in workbook order.
+        """
+        workbook = source.read('xl/workbook.xml').decode('utf-8')
+        relations = source.read('xl/_rels/workbook.xml.rels').decode('utf-8')
+        targets = {}
+        for relation in re.finditer(r'<Relationship\b[^>]*>', relations):
+            tag = relation.group(0)
+            rel_id = re.search(r'\bId="([^"]+)"', tag).group(1)
+            target = re.search(r'\bTarget="([^"]+)"', tag).group(1)
+            target = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+            targets[rel_id] = target
+
+        parts = {}
+        for sheet in re.finditer(r'<sheet\b[^>]*>', workbook):
+            tag = sheet.group(0)
+            name = _unescape(re.search(r'\bname="([^"]*)"', tag).group(1))
+            rel_id = re.search(r'\br:id="([^"]+)"', tag).group(1)
+            parts[name] = targets[rel_id]
+        return parts
+
+    def _score_columns(self, source: zipfile.ZipFile, part: str,
+                       df: pd.DataFrame) -> Optional[Dict[str, str]]:
+        """
+        Locate the score columns of a sheet from its header row.
+
+        Returns:
+            Dict mapping column letters to DataFrame columns, or None when the
+            sheet's header or row count does not match the DataFrame
+        """
+        with source.open(part) as f:
+            head = f.read(self.READ_CHUNK).decode('utf-8', 'ignore')
+        dimension = re.search(r'<dimension ref="[A-Z]+\d+:[A-Z]+(\d+)"', head)
+        header = re.search(r'<row\b[^>]*>(.*?)</row>', head, re.DOTALL)
+        if dimension is None or header is None or int(dimension.group(1)) != len(df) + 1:
+            return None
+
+        shared_strings = None
+        header_names = []
+        for cell in _CELL_PATTERN.finditer(header.group(1)):
+            cell = cell.group(0)
+            if 't="s"' in cell:
+                if shared_strings is None:
+                    shared_strings = _read_shared_strings(source)
+                index = int(re.search(r'<v>(\d+)</v>', cell).group(1))
+                header_names.append(shared_strings[index])
+            else:
+                text = re.search(r'<t[^>]*>(.*?)</t>', cell, re.DOTALL)
+                header_names.append(_unescape(text.group(1)) if text else '')
+        if header_names != [str(column) for column in df.columns]:
+            return None
+
+        return {_column_letter(position): column
+                for position, column in enumerate(df.columns)
+                if SCORE_COLUMNS.fullmatch(str(column))}
+
+    def _patch_sheet(self, source: zipfile.ZipFile, target: zipfile.ZipFile,
+                     info: zipfile.ZipInfo, df: pd.DataFrame, columns: Dict[str, str]) -> None:
+        """
+        Stream one sheet's XML, replacing the score cells of every data row.
+        """
+        values = {letter: df[column].to_numpy(dtype=float) for letter, column in columns.items()}
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        with source.open(info) as src, target.open(_copy_info(info), 'w') as dst:
+            buffer = ''
+            while True:
+                chunk = src.read(self.READ_CHUNK)
+                buffer += decoder.decode(chunk, final=not chunk)
+                if not chunk:
+                    dst.write(buffer.encode('utf-8'))
+                    break
+                end = buffer.rfind('</row>')
+                if end < 0:
+                    continue
+                end += len('</row>')
+                dst.write(self._patch_rows(buffer[:end], values).encode('utf-8'))
+                buffer = buffer[end:]
+
+    @staticmethod
+    def _patch_rows(xml: str, values: Dict[str, np.ndarray]) -> str:
+        """
+        Replace the score cells of the complete rows in an XML fragment.
+        """
+        def patch_row(match):
+            row = match.group(0)
+            number = int(_ROW_NUMBER.match(row).group(1))
+            position = number - 2  # Row 1 is the header
+            if position < 0:
+                return row
+
+            open_end = row.index('>') + 1
+            if row.endswith('/>') and open_end == len(row):
+                # Empty row written as <row .../>
+                row = row[:-2] + '>'
+            cells = []
+            for cell in _CELL_PATTERN.finditer(row, open_end):
+                cell = cell.group(0)
+                letter = _CELL_REF.search(cell).group(1)
+                if letter in values:
+                    style = _CELL_STYLE.search(cell.split('>', 1)[0])
+                    values_style = f' s="{style.group(1)}"' if style else ''
+                    cells.append((_column_index(letter), None, values_style))
+                else:
+                    cells.append((_column_index(letter), cell, ''))
+
+            present = {index for index, _, _ in cells}
+            for letter in values:
+                if _column_index(letter) not in present:
+                    cells.append((_column_index(letter), None, ''))
+            cells.sort(key=lambda item: item[0])
+
+            rendered = []
+            for index, cell, style in cells:
+                if cell is not None:
+                    rendered.append(cell)
+                    continue
+                letter = _column_letter(index - 1)
+                value = values[letter][position]
+                if np.isnan(value):
+                    if style:
+                        rendered.append(f'<c r="{letter}{number}"{style}/>')
+                else:
+                    rendered.append(f'<c r="{letter}{number}"{style} t="n"><v>{_format_number(value)}</v></c>')
+            return row[:open_end] + ''.join(rendered) + '</row>'
+
+        return re.sub(r'<row\b[^>]*?(?:/>|>.*?</row>)', patch_row, xml, flags=re.DOTALL)
+
+
+class ParquetWriter(OutputWriter):
+    """
+    Write every sheet to <stem>.<sheet>.parquet.
+    """
+
+    extension = '.parquet'
+
+    def write(self, data, filename, updated_sheets=None):
+        _require_pyarrow(self.extension)
+        paths = []
+        for sheet_name, df in data.items():
+            path = _sidecar_name(filename, sheet_name, self.extension)
+            with atomic_path(path) as temp_path:
+                self._write_frame(df, temp_path)
+            paths.append(path)
+        return paths
+
+    def _write_frame(self, df: pd.DataFrame, path: str) -> None:
+        df.to_parquet(path, index=False)
+
+
+class ArrowWriter(ParquetWriter):
+    """
+    Write every sheet to an uncompressed, memory-mappable <stem>.<sheet>.arrow file.
+    """
+
+    extension = '.arrow'
+
+    def _write_frame(self, df: pd.DataFrame, path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, path, compression='uncompressed')
+
+
+WRITERS = {
+    'xlsx': XlsxWriter,
+    'xlsx-stream': StreamingXlsxWriter,
+    'xlsx-incremental': IncrementalXlsxWriter,
+    'parquet': ParquetWriter,
+    'arrow': ArrowWriter
+}
+
+
+def register_writer(name: str, writer_class: type) -> None:
+    """
+    Make an OutputWriter subclass available under a format name.
+    """
+    WRITERS[name] = writer_class
+
+
+def get_writer(name: str) -> OutputWriter:
+    """
+    Instantiate the writer for a format name.
+    """
+    if name not in WRITERS:
+        raise ValueError(f"Unknown output format '{name}' (choose from {', '.join(WRITERS)})")
+    return WRITERS[name]()
+
+
+def _require_pyarrow(extension: str) -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"Writing {extension} output requires pyarrow (pip install pyarrow)")
+
+
+def _sidecar_name(filename: str, sheet_name: str, extension: str) -> str:
+    stem = os.path.splitext(filename)[0]
+    safe_sheet = re.sub(r'[^A-Za-z0-9_.-]+', '_', sheet_name)
+    return f"{stem}.{safe_sheet}{extension}"
+
+
+def _column_letter(position: int) -> str:
+    """
+    Excel column letter of a 0-based column position (0 -> A, 26 -> AA).
+    """
+    letters = ''
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _column_index(letters: str) -> int:
+    """
+    1-based column number of an Excel column letter.
+    """
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index
+
+
+def _format_number(value: float) -> str:
+    """
+    Render a cell value exactly as openpyxl does, so patched and fully
+    rewritten workbooks hold the same text.
+    """
+    return '%.16g' % value
+
+
+def _copy_info(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """
+    Fresh archive entry with the name, timestamp and compression of an existing one.
+    """
+    copy = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    copy.compress_type = info.compress_type
+    copy.external_attr = info.external_attr
+    return copy
+
+
+def _read_shared_strings(source: zipfile.ZipFile) -> List[str]:
+    import xml.etree.ElementTree as ET
+
+    strings = []
+    with source.open('xl/sharedStrings.xml') as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == f'{{{_SHEET_NS}}}si':
+                strings.append(''.join(text.text or '' for text in element.iter(f'{{{_SHEET_NS}}}t')))
+                element.clear()
+    return strings
+
+
+def _unescape(text: str) -> str:
+    from xml.sax.saxutils import unescape
+    return unescape(text, {'&quot;': '"', '&apos;': "'"})
@@ -0,0 +1,455 @@
+"""
+Report Writers
+==============
+
+Pluggable output layer used by UpdatedLLMAnalyzer.generate_report and
+write_reports. A report is rendered from a report document, which
+UpdatedLLMAnalyzer.build_report assembles from aggregate tables only (the
+per-model summaries, metric averages, per-prompt statistics, significance
+tests and cache counters), never from per-response rows. Its size does not
+depend on how many responses were scored: the per-prompt tables hold one
+page of at most max_rows rows, and the document records how many rows and
+pages there are in total.
+
+A document is {'title': str, 'sections': [section, ...]}. Every section
+is a dict with a 'kind', and each writer has one template method per kind:
+
+    - heading             {'title'}
+    - rankings            {'title', 'rankings': [(model, score), ...],
+                           'categories': {model: categories with scores},
+                           'total_categories'}
+    - category_results    {'category', 'summaries': {model: summary}}
+    - metric_breakdown    {'category', 'weights', 'averages': {model: {metric: average}}}
+    - prompt_table        {'category', 'columns', 'rows', 'total_rows',
+                           'first_row', 'page', 'pages'}
+    - significance        the dict of significance.model_significance
+    - cache               the dict of UpdatedLLMAnalyzer.cache_stats
+    - execution           the dict of code_execution.ExecutionEngine.stats
+    - duplicates          the dict of near_duplicates.DuplicateReport.summary
+
+Formats:
+    - txt   fixed-width text, the classic comprehensive_analysis_report.txt
+    - md    Markdown with pipe tables
+    - json  the document itself
+    - html  a single self-contained page (inline CSS, no external resources)
+
+Writers stream the report section by section to a text file object. New
+formats can be added with register_report_writer().
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import html
+import io
+import json
+import math
+from typing import Dict, Iterator, List, TextIO
+
+from checkpoint import atomic_path
+from code_execution import STATUSES
+
+RULE = "=" * 80
+SUBRULE = "-" * 40
+
+# Words kept in capitals when Markdown and HTML headings are title-cased
+ACRONYMS = {'LLM', 'LLMS'}
+
+
+class ReportWriter:
+    """
+    Base class of the report formats.
+    """
+
+    extension = 'txt'
+
+    def write(self, document: Dict, stream: TextIO) -> None:
+        """
+        Render a report document to a text stream.
+        """
+        raise NotImplementedError
+
+    def render_sections(self, document: Dict) -> Iterator[str]:
+        """
+        Output of each section in turn, from the section's template method.
+        """
+        for section in document['sections']:
+            yield getattr(self, f"_{section['kind']}")(section)
+
+
+class TextReportWriter(ReportWriter):
+    """
+    Fixed-width text report.
+    """
+
+    extension = 'txt'
+
+    def write(self, document: Dict, stream: TextIO) -> None:
+        stream.write("\n".join([RULE, document['title'], RULE, ""]))
+        for text in self.render_sections(document):
+            stream.write("\n" + text)
+
+    def _heading(self, section: Dict) -> str:
+        return "\n".join(["\n" + RULE, section['title'], RULE])
+
+    def _rankings(self, section: Dict) -> str:
+        lines = [section['title'], SUBRULE]
+        for rank, (model, score) in enumerate(section['rankings'], 1):
+            lines.append(f"{rank}. {model}: {score:.2f}/10{_partial_coverage(section, model)}")
+        return "\n".join(lines)
+
+    def _category_results(self, section: Dict) -> str:
+        lines = [f"\n{section['category'].upper()} CATEGORY RESULTS", SUBRULE]
+        for model, stats in section['summaries'].items():
+            lines.append(f"\n{model}:")
+            lines.append(f"  Average Score: {stats['average_score']:.2f}/10")
+            lines.append(f"  Median Score:  {stats['median_score']:.2f}/10")
+            lines.append(f"  Std Deviation: {stats['std_score']:.2f}")
+            lines.append(f"  Score Range:   {stats['min_score']:.2f} - {stats['max_score']:.2f}")
+            lines.append(f"  Total Responses: {stats['total_responses']}")
+        return "\n".join(lines)
+
+    def _metric_breakdown(self, section: Dict) -> str:
+        lines = [f"\n{section['category'].upper()} METRICS AVERAGE SCORES:", SUBRULE]
+        for model, averages in section['averages'].items():
+            lines.append(f"\n{model}:")
+            for metric, weight in section['weights'].items():
+                lines.append(f"  {metric}: {averages[metric]:.2f}/10 (weight: {weight*100:.0f}%)")
+        return "\n".join(lines)
+
+    def _prompt_table(self, section: Dict) -> str:
+        lines = [f"\n{section['category'].upper()} PROMPTS, HARDEST FIRST "
+                 f"({_page_note(section)}):", SUBRULE]
+        width = max([len(str(row[0])) for row in section['rows']] + [len(section['columns'][0])])
+        lines.append(f"  {section['columns'][0]:<{width}}"
+                     + "".join(f"{column:>9}" for column in section['columns'][1:]))
+        for row in section['rows']:
+            lines.append(f"  {str(row[0]):<{width}}" + "".join(_cell(value).rjust(9) for value in row[1:]))
+        return "\n".join(lines)
+
+    def _significance(self, section: Dict) -> str:
+        confidence = section['confidence']
+        lines = ["\n" + RULE, "STATISTICAL SIGNIFICANCE", RULE]
+        lines.append(f"\n{confidence*100:.0f}% BOOTSTRAP CONFIDENCE INTERVALS "
+                     f"({section['resamples']} resamples):")
+        lines.append(SUBRULE)
+        for model, intervals in section['intervals'].items():
+            lines.append(f"\n{model}:")
+            for scope, interval in intervals.items():
+                label = f"{scope.capitalize()}:"
+                lines.append(f"  {label:<14}{interval['mean']:.2f} "
+                             f"[{interval['low']:.2f}, {interval['high']:.2f}]")
+
+        lines.append(f"\nPAIRED PERMUTATION TESTS ({section['resamples']} permutations, "
+                     f"per-prompt average scores):")
+        lines.append(SUBRULE)
+        for test in section['paired_tests']:
+            first, second = test['models']
+            lines.append(f"  {first} vs {second} ({test['category']}): "
+                         f"{_test_outcome(test, confidence)}")
+        lines.append(f"\n  * significant at the {(1 - confidence)*100:.0f}% level")
+        return "\n".join(lines)
+
+    def _cache(self, section: Dict) -> str:
+        lines = ["\n" + RULE, "SCORE CACHE", RULE]
+        lines.append(f"  Hits:      {section['hits']} ({_hit_rate(section):.1f}%)")
+        lines.append(f"  Misses:    {section['misses']}")
+        lines.append(f"  Evictions: {section['evictions']}")
+        lines.append(f"  Entries:   {section['entries']}")
+        return "\n".join(lines)
+
+    def _execution(self, section: Dict) -> str:
+        lines = ["\n" + RULE, "CODE EXECUTION", RULE]
+        lines.append(f"  Responses:   {section['responses']} ({section['cache_hits']} reused cached results)")
+        lines.append(f"  Executed:    {section['executed']} in {section['seconds']:.1f}s")
+        for status in STATUSES:
+            lines.append(f"  {status.replace('_', ' ').capitalize() + ':':<13}{section[status]}")
+        return "\n".join(lines)
+
+    def _duplicates(self, section: Dict) -> str:
+        lines = ["\n" + RULE, "NEAR-DUPLICATE RESPONSES", RULE]
+        lines.append(f"  Threshold:  {section['threshold']:.2f} estimated Jaccard similarity of word 3-grams")
+        lines.append(f"  Responses:  {section['responses']}")
+        lines.append(f"  Clusters:   {section['clusters']} ({section['cross_model']} across models)")
+        lines.append(f"  Duplicates: {section['duplicates']} (scores shared from their cluster's first response)")
+        if section['models']:
+            lines += ["\nRESPONSES IN CLUSTERS BY MODEL:", SUBRULE]
+            for model, counts in section['models'].items():
+                lines.append(f"  {model}: {counts['responses']} ({counts['cross_model']} across models)")
+        if section['prompts']:
+            lines += ["\nCLUSTERS BY PROMPT:", SUBRULE]
+            for prompt, counts in section['prompts'].items():
+                plural = 's' if counts['clusters'] != 1 else ''
+                lines.append(f"  {prompt}: {counts['clusters']} cluster{plural}, {counts['responses']} "
+                             f"responses ({', '.join(counts['models'])})")
+        return "\n".join(lines)
+
+
+class MarkdownReportWriter(ReportWriter):
+    """
+    Markdown report with pipe tables.
+    """
+
+    extension = 'md'
+
+    def write(self, document: Dict, stream: TextIO) -> None:
+        stream.write(f"# {_title_case(document['title'])}\n")
+        for text in self.render_sections(document):
+            stream.write("\n" + text + "\n")
+
+    @staticmethod
+    def _table(columns: List[str], rows: List[List]) -> str:
+        lines = ["| " + " | ".join(_md_escape(column) for column in columns) + " |",
+                 "|" + "|".join(" --- " for _ in columns) + "|"]
+        for row in rows:
+            lines.append("| " + " | ".join(_md_escape(_cell(value)) for value in row) + " |")
+        return "\n".join(lines)
+
+    def _heading(self, section: Dict) -> str:
+        return f"## {_title_case(section['title'])}"
+
+    def _rankings(self, section: Dict) -> str:
+        rows = [[rank, model, score, _coverage(section, model)]
+                for rank, (model, score) in enumerate(section['rankings'], 1)]
+        return (f"## {_title_case(section['title'])}\n\n"
+                + self._table(['Rank', 'Model', 'Score', 'Categories'], rows))
+
+    def _category_results(self, section: Dict) -> str:
+        rows = [[model, stats['average_score'], stats['median_score'], stats['std_score'],
+                 stats['min_score'], stats['max_score'], stats['total_responses']]
+                for model, stats in section['summaries'].items()]
+        return (f"### {section['category'].capitalize()}\n\n"
+                + self._table(['Model', 'Average', 'Median', 'Std', 'Min', 'Max', 'Responses'], rows))
+
+    def _metric_breakdown(self, section: Dict) -> str:
+        weights = section['weights']
+        columns = ['Model'] + [f"{metric} ({weight*100:.0f}%)" for metric, weight in weights.items()]
+        rows = [[model] + [averages[metric] for metric in weights]
+                for model, averages in section['averages'].items()]
+        return f"### {section['category'].capitalize()}\n\n" + self._table(columns, rows)
+
+    def _prompt_table(self, section: Dict) -> str:
+        return (f"### {section['category'].capitalize()} prompts, hardest first\n\n"
+                + self._table(section['columns'], section['rows'])
+                + f"\n\n_{_page_note(section)}_")
+
+    def _significance(self, section: Dict) -> str:
+        confidence = section['confidence']
+        lines = ["## Statistical Significance", "",
+                 f"{confidence*100:.0f}% bootstrap confidence intervals "
+                 f"({section['resamples']} resamples):", ""]
+        scopes = list(dict.fromkeys(scope for intervals in section['intervals'].values()
+                                    for scope in intervals))
+        rows = [[model] + [_interval(intervals[scope]) if scope in intervals else ''
+                           for scope in scopes]
+                for model, intervals in section['intervals'].items()]
+        lines.append(self._table(['Model'] + [scope.capitalize() for scope in scopes], rows))
+        lines += ["", f"Paired permutation tests ({section['resamples']} permutations, "
+                      f"per-prompt average scores; * significant at the "
+                      f"{(1 - confidence)*100:.0f}% level):", ""]
+        rows = [[f"{test['models'][0]} vs {test['models'][1]}", test['category'],
+                 _test_outcome(test, confidence)] for test in section['paired_tests']]
+        lines.append(self._table(['Models', 'Category', 'Result'], rows))
+        return "\n".join(lines)
+
+    def _cache(self, section: Dict) -> str:
+        rows = [['Hits', f"{section['hits']} ({_hit_rate(section):.1f}%)"],
+                ['Misses', section['misses']], ['Evictions', section['evictions']],
+                ['Entries', section['entries']]]
+        return "## Score Cache\n\n" + self._table(['Counter', 'Value'], rows)
+
+    def _execution(self, section: Dict) -> str:
+        rows = [['Responses', f"{section['responses']} ({section['cache_hits']} reused cached results)"],
+                ['Executed', f"{section['executed']} in {section['seconds']:.1f}s"]]
+        rows += [[status.replace('_', ' ').capitalize(), section[status]] for status in STATUSES]
+        return "## Code Execution\n\n" + self._table(['Counter', 'Value'], rows)
+
+    def _duplicates(self, section: Dict) -> str:
+        rows = [['Threshold', f"{section['threshold']:.2f} estimated Jaccard similarity of word 3-grams"],
+                ['Responses', section['responses']],
+                ['Clusters', f"{section['clusters']} ({section['cross_model']} across models)"],
+                ['Duplicates', f"{section['duplicates']} (scores shared from their cluster's first response)"]]
+        lines = ["## Near-Duplicate Responses", "", self._table(['Counter', 'Value'], rows)]
+        if section['models']:
+            rows = [[model, counts['responses'], counts['cross_model']]
+                    for model, counts in section['models'].items()]
+            lines += ["", "### Responses in clusters by model", "",
+                      self._table(['Model', 'Responses', 'Across models'], rows)]
+        if section['prompts']:
+            rows = [[prompt, counts['clusters'], counts['responses'], ', '.join(counts['models'])]
+                    for prompt, counts in section['prompts'].items()]
+            lines += ["", "### Clusters by prompt", "",
+                      self._table(['Prompt', 'Clusters', 'Responses', 'Models'], rows)]
+        return "\n".join(lines)
+
+
+class JsonReportWriter(ReportWriter):
+    """
+    The report document as JSON, streamed one section at a time.
+    """
+
+    extension = 'json'
+
+    def write(self, document: Dict, stream: TextIO) -> None:
+        stream.write('{"title": %s, "sections": [' % json.dumps(document['title']))
+        for position, section in enumerate(document['sections']):
+            stream.write(",\n" if position else "\n")
+            stream.write(json.dumps(_json_safe(section)))
+        stream.write("\n]}\n")
+
+
+class HtmlReportWriter(MarkdownReportWriter):
+    """
+    Self-contained HTML page with the same tables as the Markdown report.
+    """
+
+    extension = 'html'
+
+    STYLE = ("body{font-family:system-ui,sans-serif;margin:2em auto;max-width:60em;color:#222}"
+             "table{border-collapse:collapse;margin:.5em 0 1.5em}"
+             "th,td{border:1px solid #ccc;padding:.25em .6em;text-align:right}"
+             "th:first-child,td:first-child{text-align:left}th{background:#f3f3f3}"
+             "p.note{color:#666;font-size:.9em}")
+
+    def write(self, document: Dict, stream: TextIO) -> None:
+        title = html.escape(_title_case(document['title']))
+        stream.write(f"<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+                     f"<title>{title}</title>\n<style>{self.STYLE}</style>\n</head>\n<body>\n"
+                     f"<h1>{title}</h1>\n")
+        for text in self.render_sections(document):
+            stream.write(text + "\n")
+        stream.write("</body>\n</html>\n")
+
+    @staticmethod
+    def _table(columns: List[str], rows: List[List]) -> str:
+        head = "".join(f"<th>{html.escape(str(column))}</th>" for column in columns)
+        body = "".join("\n<tr>" + "".join(f"<td>{html.escape(_cell(value))}</td>" for value in row)
+                       + "</tr>" for row in rows)
+        return f"<table>\n<thead><tr>{head}</tr></thead>\n<tbody>{body}\n</tbody>\n</table>"
+
+    def render_sections(self, document: Dict) -> Iterator[str]:
+        # Markdown headings, notes and paragraphs of the shared templates
+        # become their HTML counterparts; tables are already HTML
+        for text in super().render_sections(document):
+            parts = []
+            for block in text.split("\n\n"):
+                if block.startswith("<table>"):
+                    parts.append(block)
+                elif block.startswith("### "):
+                    parts.append(f"<h3>{html.escape(block[4:])}</h3>")
+                elif block.startswith("## "):
+                    parts.append(f"<h2>{html.escape(block[3:])}</h2>")
+                elif block.startswith("_") and block.endswith("_"):
+                    parts.append(f"<p class=\"note\">{html.escape(block[1:-1])}</p>")
+                else:
+                    parts.append(f"<p>{html.escape(block)}</p>")
+            yield "\n".join(parts)
+
+
+REPORT_WRITERS = {
+    'txt': TextReportWriter,
+    'md': MarkdownReportWriter,
+    'json': JsonReportWriter,
+    'html': HtmlReportWriter
+}
+
+
+def register_report_writer(name: str, writer_class: type) -> None:
+    """
+    Add a report format, selectable by name in get_report_writer().
+    """
+    REPORT_WRITERS[name] = writer_class
+
+
+def get_report_writer(name: str) -> ReportWriter:
+    """
+    Instantiate the writer of a report format.
+    """
+    if name not in REPORT_WRITERS:
+        raise ValueError(f"Unknown report format '{name}' (choose from {', '.join(REPORT_WRITERS)})")
+    return REPORT_WRITERS[name]()
+
+
+def render_report(document: Dict, report_format: str = 'txt') -> str:
+    """
+    Render a report document to a string.
+    """
+    stream = io.StringIO()
+    get_report_writer(report_format).write(document, stream)
+    return stream.getvalue()
+
+
+def write_report(document: Dict, path: str, report_format: str = 'txt') -> None:
+    """
+    Stream a report document to a file, replacing it only once complete.
+    """
+    with atomic_path(path) as temp_path, open(temp_path, "w", encoding="utf-8") as f:
+        get_report_writer(report_format).write(document, f)
+
+
+def _cell(value) -> str:
+    """
+    Table cell text: floats with two decimals, everything else as is.
+    """
+    if isinstance(value, float):
+        return '' if math.isnan(value) else f"{value:.2f}"
+    return str(value)
+
+
+def _title_case(text: str) -> str:
+    return " ".join(word if word in ACRONYMS else word.capitalize() for word in text.split())
+
+
+def _md_escape(text) -> str:
+    return str(text).replace("|", "\\|")
+
+
+def _page_note(section: Dict) -> str:
+    first = section['first_row']
+    last = first + len(section['rows']) - 1
+    note = f"{first}-{last} of {section['total_rows']}" if section['rows'] else f"0 of {section['total_rows']}"
+    if section['pages'] > 1:
+        note += f", page {section['page']} of {section['pages']}"
+    return note
+
+
+def _coverage(section: Dict, model: str) -> str:
+    covered = section.get('categories', {}).get(model)
+    return f"{covered} of {section['total_categories']}" if covered is not None else ''
+
+
+def _partial_coverage(section: Dict, model: str) -> str:
+    covered = section.get('categories', {}).get(model)
+    if covered is None or covered == section['total_categories']:
+        return ''
+    return f" (averaged over {covered} of {section['total_categories']} categories)"
+
+
+def _interval(interval: Dict) -> str:
+    return f"{interval['mean']:.2f} [{interval['low']:.2f}, {interval['high']:.2f}]"
+
+
+def _test_outcome(test: Dict, confidence: float) -> str:
+    if test['p_value'] is None:
+        return "no shared prompts"
+    marker = " *" if test['p_value'] < 1 - confidence else ""
+    return (f"{test['mean_difference']:+.2f}, p = {test['p_value']:.4f} "
+            f"({test['n_pairs']} prompts){marker}")
+
+
+def _hit_rate(cache: Dict) -> float:
+    lookups = cache['hits'] + cache['misses']
+    return cache['hits'] / lookups * 100 if lookups else 0.0
+
+
+def _json_safe(value):
+    """
+    Plain JSON values: tuples become lists and NaN/inf become null.
+    """
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
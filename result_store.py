@@ -0,0 +1,202 @@
+"""
+Compact Result Store
+====================
+
+Column store for the per-response scores of one category. Instead of a
+list of dicts per model (several hundred bytes per response), a ScoreTable
+keeps typed NumPy columns: model and prompt IDs dictionary-encoded to
+int32 codes, the response length, one float64 column per metric and the
+weighted score, about 60 bytes per response with four metrics.
+
+Summary statistics and metric averages are computed from the columns
+directly. DetailedScores is a read-only Mapping over a table in the old
+results[category]['detailed_scores'] shape, built per model on access.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+
+class ScoreTable:
+    """
+    Per-response scores of one category in typed columns.
+    """
+
+    def __init__(self, metrics: List[str]):
+        """
+        Args:
+            metrics (List[str]): Metric names, in column order
+        """
+        self.metrics = list(metrics)
+        self.models: List = []   # Model label of each model code
+        self.prompts: List = []  # Prompt ID of each prompt code
+        self._model_codes: Dict = {}
+        self._prompt_codes: Dict = {}
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._columns = None
+
+    @staticmethod
+    def _encode(values: pd.Series, labels: List, codes: Dict) -> np.ndarray:
+        """
+        Dictionary-encode values, extending labels/codes with new ones.
+
+        Missing values are all stored under the label None, in the order
+        of their first occurrence like every other label.
+        """
+        inverse, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        found = [None if pd.isna(label) else label for label in uniques.tolist()]
+        mapping = np.zeros(len(found) or 1, dtype=np.int32)
+        for position, label in enumerate(found):
+            if label not in codes:
+                codes[label] = len(labels)
+                labels.append(label)
+            mapping[position] = codes[label]
+        return mapping[inverse]
+
+    def append(self, models: pd.Series, prompt_ids: pd.Series, lengths: np.ndarray,
+               metric_values: np.ndarray, weighted: np.ndarray) -> None:
+        """
+        Add scored rows.
+
+        Args:
+            models (pd.Series): LLM of each row
+            prompt_ids (pd.Series): Prompt ID of each row
+            lengths (np.ndarray): Response length of each row
+            metric_values (np.ndarray): Metric scores, rows x metrics in self.metrics order
+            weighted (np.ndarray): Weighted score of each row
+        """
+        self._chunks.append({
+            'model': self._encode(models, self.models, self._model_codes),
+            'prompt': self._encode(prompt_ids, self.prompts, self._prompt_codes),
+            'length': np.asarray(lengths, dtype=np.int64),
+            'metrics': np.asarray(metric_values, dtype=np.float64).reshape(-1, len(self.metrics)),
+            'weighted': np.asarray(weighted, dtype=np.float64)
+        })
+        self._columns = None
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        All rows as one array per column (chunks are joined on first access).
+        """
+        if self._columns is None:
+            if self._chunks:
+                self._columns = {name: np.concatenate([chunk[name] for chunk in self._chunks])
+                                 for name in self._chunks[0]}
+            else:
+                self._columns = {'model': np.empty(0, np.int32), 'prompt': np.empty(0, np.int32),
+                                 'length': np.empty(0, np.int64),
+                                 'metrics': np.empty((0, len(self.metrics))),
+                                 'weighted': np.empty(0)}
+            self._chunks = [self._columns] if self._chunks else []
+        return self._columns
+
+    def __len__(self) -> int:
+        return len(self.columns['weighted'])
+
+    def __contains__(self, model) -> bool:
+        return model in self._model_codes
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the columns.
+        """
+        return sum(column.nbytes for column in self.columns.values())
+
+    def rows(self, model) -> np.ndarray:
+        """
+        Row positions of a model, in insertion order.
+        """
+        return np.flatnonzero(self.columns['model'] == self._model_codes[model])
+
+    def scores(self, model) -> np.ndarray:
+        """
+        Weighted scores of a model.
+        """
+        return self.columns['weighted'][self.rows(model)]
+
+    def metric_scores(self, model, metric: str) -> np.ndarray:
+        """
+        Scores of a model on one metric.
+        """
+        return self.columns['metrics'][self.rows(model), self.metrics.index(metric)]
+
+    def summary(self, model) -> Dict:
+        """
+        Summary statistics of a model in the shape of results[category]['summary'][model].
+        """
+        scores = self.scores(model)
+        return {
+            'average_score': np.mean(scores),
+            'median_score': np.median(scores),
+            'std_score': np.std(scores),
+            'min_score': np.min(scores),
+            'max_score': np.max(scores),
+            'total_responses': len(scores)
+        }
+
+    def metric_averages(self, model) -> Dict[str, float]:
+        """
+        Average score of a model on every metric.
+        """
+        values = self.columns['metrics'][self.rows(model)]
+        return {metric: np.mean(values[:, i]) for i, metric in enumerate(self.metrics)}
+
+    def records(self, model) -> List[Dict]:
+        """
+        Rows of a model as detailed score dicts (the pre-table format).
+        """
+        rows = self.rows(model)
+        columns = self.columns
+        prompts = [self.prompts[code] for code in columns['prompt'][rows].tolist()]
+        metric_rows = columns['metrics'][rows].tolist()
+        return [
+            {
+                'prompt_id': prompt_id,
+                'response_length': length,
+                'metric_scores': dict(zip(self.metrics, metric_scores)),
+                'weighted_score': weighted_score
+            }
+            for prompt_id, length, metric_scores, weighted_score in zip(
+                prompts, columns['length'][rows].tolist(), metric_rows,
+                columns['weighted'][rows].tolist())
+        ]
+
+    def detailed_view(self) -> 'DetailedScores':
+        return DetailedScores(self)
+
+
+class DetailedScores(Mapping):
+    """
+    Read-only {model: [detailed score dict, ...]} view of a ScoreTable.
+
+    Models appear in the order their first row was added; each model's
+    list is built when it is looked up.
+    """
+
+    def __init__(self, table: ScoreTable):
+        self.table = table
+
+    def __getitem__(self, model) -> List[Dict]:
+        if model not in self.table:
+            raise KeyError(model)
+        return self.table.records(model)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.table.models)
+
+    def __len__(self) -> int:
+        return len(self.table.models)
+
+    def __contains__(self, model) -> bool:
+        return model in self.table
+
+    def __repr__(self) -> str:
+        return f"DetailedScores({len(self.table)} rows, models={self.table.models!r})"
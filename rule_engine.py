@@ -0,0 +1,481 @@
+"""
+Declarative Scoring Rules
+=========================
+
+The scoring heuristics as data, compiled into fast evaluators. A rule set
+(one per category, see scoring_rules.json) holds:
+
+    - weights       metric -> weight of the metric in the weighted score
+    - terms         named groups of indicator terms, looked up in the
+                    lowercased response by one KeywordMatcher scan
+    - metrics       metric -> base score and an ordered list of rules
+    - clamp         [low, high] bounds of every metric score
+    - prompt_prefix Prompt ID prefix of the category (e.g. 'C')
+    - sheets        workbook sheets holding responses of the category
+    - labels        Category column prefixes of the category (default:
+                    the category name), matched case-insensitively
+    - sources       Markdown prompt list (relative to this file) holding
+                    the source text of each prompt, for the source
+                    features of lexical_similarity; rules testing those
+                    features are opt-in (see without_source_rules)
+
+Adding a rule set adds a category: the analyzer routes rows to it by sheet,
+Category label or Prompt ID prefix and scores and reports it like the rest.
+
+A rule adds a bonus (or, if negative, a penalty) when its condition holds,
+e.g. {"when": "docstring", "add": 2.0}. {"first": [rule, ...]} applies only
+the first rule whose condition holds, like an if/elif chain. A condition is
+a term group name or an object whose parts must all hold:
+
+    "all": [groups]      every group has a term in the response
+    "any": [groups]      at least one group has a term in the response
+    "none": [groups]     no group has a term in the response
+    "feature": name      with "min"/"max" (inclusive) and "above"/"below"
+                         (exclusive) bounds on a text feature
+                         (text_features.FEATURES) or, with "sources", a
+                         similarity to the prompt's source text
+                         (lexical_similarity.SOURCE_FEATURES)
+    "prompts": [n, ...]  the number of the Prompt ID is one of these
+
+Bonuses are added in rule order, so the scores reproduce the hand-written
+if-chains exactly. "note" keys are free-form comments.
+
+RuleSet compiles a rule set twice at load time. The row-wise evaluator is
+one generated Python function per rule set, a flat if-chain with the group
+bitmasks inlined, reading the text features of each response from one
+shared (and memoized) text_features.TextFeatures. The column-wise evaluator runs each rule as one NumPy
+operation over a batch of responses and compares the whole batch with the
+source texts in one sparse pass. This module only imports pandas and
+NumPy when the column-wise evaluator runs.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lexical_similarity import SOURCE_FEATURES, load_source_index
+from text_features import FEATURES, ColumnFeatures, feature_cache
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_rules.json')
+
+
+def is_missing(value) -> bool:
+    """
+    pd.isna for a single value (None, NaN, NaT or pd.NA) without pandas.
+    """
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:  # pd.NA refuses to be truth-tested
+        return True
+
+
+def prompt_number(prompt_id: str) -> int:
+    """
+    Extract the numeric part of a prompt ID (e.g. 'P08' -> 8, 0 if malformed).
+    """
+    return int(prompt_id[1:]) if prompt_id[1:].isdigit() else 0
+
+
+def load_rules(path: str = RULES_PATH) -> Dict[str, Dict]:
+    """
+    Read the rule sets of every category from a JSON file.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _tests_source(rule: Dict) -> bool:
+    when = rule['when']
+    return isinstance(when, dict) and when.get('feature') in SOURCE_FEATURES
+
+
+def without_source_rules(spec: Dict) -> Dict:
+    """
+    A rule set without its source similarity: the 'sources' key and every
+    rule (or "first" alternative) testing a source feature are dropped.
+
+    Source similarity rules only apply when asked for (--source-similarity),
+    so default scores do not depend on thresholds tuned on one workbook.
+    """
+    if 'sources' not in spec:
+        return spec
+    metrics = {}
+    for metric, metric_spec in spec['metrics'].items():
+        rules = []
+        for rule in metric_spec['rules']:
+            if 'first' in rule:
+                alternatives = [alternative for alternative in rule['first'] if not _tests_source(alternative)]
+                if alternatives:
+                    rules.append({**rule, 'first': alternatives})
+            elif not _tests_source(rule):
+                rules.append(rule)
+        metrics[metric] = {**metric_spec, 'rules': rules}
+    return {**{key: value for key, value in spec.items() if key != 'sources'}, 'metrics': metrics}
+
+
+class KeywordMatcher:
+    """
+    Precompiled matcher for named groups of indicator terms.
+
+    The term lists are compiled once into a table of terms and group masks,
+    and every scan returns a hit bitmap with one bit per group which the
+    scorers test with the masks in ``bits``. Each term is looked up with
+    CPython's substring search, skipping terms whose groups are already
+    hit; term sets of ``REGEX_MIN_TERMS`` or more are matched in a single
+    pass with one trie-shaped regular expression instead.
+    """
+
+    # Where the regex overtook the substring search in
+    # `python benchmark.py --matcher --stages ''` (around 200-240 terms);
+    # the shipped rules have 42-46 terms and are 5-10x faster without it
+    REGEX_MIN_TERMS = 200
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        """
+        Compile the matcher.
+
+        Args:
+            groups (Dict): Group name -> list of terms that set the group's bit
+        """
+        if len(groups) > 63:
+            raise ValueError("KeywordMatcher supports at most 63 groups")
+
+        self.bits = {name: 1 << position for position, name in enumerate(groups)}
+
+        term_bits = {}
+        for name, terms in groups.items():
+            for term in terms:
+                term_bits[term] = term_bits.get(term, 0) | self.bits[name]
+
+        # Only the longest term starting at a position is reported, and every
+        # other term found there is a prefix of it, so fold their bits in.
+        self._term_masks = {}
+        for term in term_bits:
+            mask = 0
+            for other, bits in term_bits.items():
+                if term.startswith(other):
+                    mask |= bits
+            self._term_masks[term] = mask
+
+        # Longest terms first, so a hit also covers the prefixes tested later
+        self._terms = sorted(self._term_masks.items(), key=lambda item: -len(item[0]))
+
+        self.pattern = None
+        if len(term_bits) >= self.REGEX_MIN_TERMS:
+            trie = {}
+            for term in term_bits:
+                node = trie
+                for char in term:
+                    node = node.setdefault(char, {})
+                node[''] = {}
+            self.pattern = re.compile('(?=(%s))' % self._trie_to_regex(trie))
+
+    @classmethod
+    def _trie_to_regex(cls, node: Dict) -> str:
+        """
+        Render a trie node as a regex matching the longest term below it.
+        """
+        alternatives = [re.escape(char) + cls._trie_to_regex(child)
+                        for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:%s)' % '|'.join(alternatives)
+        if '' in node:
+            # A term ends here: longer terms are optional and tried first
+            body = '(?:%s)?' % body
+        return body
+
+    def scan(self, text: str) -> int:
+        """
+        Find every indicator term in a text.
+
+        Args:
+            text (str): Text to scan (already lowercased by the caller if needed)
+
+        Returns:
+            int: Bitmap with the bit of every group that has a term in the text
+        """
+        hits = 0
+        if self.pattern is not None:
+            for term in set(self.pattern.findall(text)):
+                hits |= self._term_masks[term]
+            return hits
+
+        for term, mask in self._terms:
+            if mask & ~hits and term in text:
+                hits |= mask
+        return hits
+
+
+# Comparison of each feature bound
+BOUNDS = {'min': '>=', 'max': '<=', 'above': '>', 'below': '<'}
+
+
+class Condition:
+    """
+    A compiled rule condition.
+    """
+
+    def __init__(self, spec, bits: Dict[str, int]):
+        """
+        Args:
+            spec: Group name or condition object (see the module docstring)
+            bits (Dict): Group name -> bit of the rule set's KeywordMatcher
+        """
+        if isinstance(spec, str):
+            spec = {'any': [spec]}
+        unknown = set(spec) - {'all', 'any', 'none', 'feature', 'prompts'} - set(BOUNDS)
+        if unknown:
+            raise ValueError(f"Unknown condition keys: {sorted(unknown)}")
+
+        def mask(key: str) -> int:
+            value = 0
+            for group in spec.get(key, []):
+                if group not in bits:
+                    raise ValueError(f"Unknown term group in condition: {group!r}")
+                value |= bits[group]
+            return value
+
+        self.all_mask, self.any_mask, self.none_mask = mask('all'), mask('any'), mask('none')
+        self.feature = spec.get('feature')
+        if self.feature is not None and self.feature not in FEATURES and self.feature not in SOURCE_FEATURES:
+            raise ValueError(f"Unknown feature in condition: {self.feature!r}")
+        self.bounds = [(BOUNDS[key], spec[key]) for key in BOUNDS if key in spec]
+        if self.bounds and self.feature is None:
+            raise ValueError("Condition bounds need a 'feature'")
+        self.prompts = tuple(spec['prompts']) if 'prompts' in spec else None
+        # Bounds and prompt numbers are inlined into generated code
+        numbers = [value for _, value in self.bounds] + list(self.prompts or ())
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in numbers):
+            raise ValueError(f"Condition bounds and prompts must be numbers: {spec!r}")
+
+    def source(self) -> str:
+        """
+        Python expression for the row-wise evaluator.
+        """
+        tests = []
+        if self.all_mask:
+            single = self.all_mask & (self.all_mask - 1) == 0
+            tests.append(f"hits & {self.all_mask}" if single
+                         else f"hits & {self.all_mask} == {self.all_mask}")
+        if self.any_mask:
+            tests.append(f"hits & {self.any_mask}")
+        if self.none_mask:
+            tests.append(f"not hits & {self.none_mask}")
+        for operator, value in self.bounds:
+            tests.append(f"f_{self.feature} {operator} {value!r}")
+        if self.prompts is not None:
+            tests.append(f"prompt in {self.prompts!r}")
+        return ' and '.join(f"({test})" for test in tests) or 'True'
+
+    def mask(self, hits, features: Callable, prompts):
+        """
+        Rows of a batch where the condition holds.
+
+        Args:
+            hits (np.ndarray): Hit bitmap per row
+            features (Callable): Feature name -> np.ndarray of values per row
+            prompts (np.ndarray): Prompt number per row
+
+        Returns:
+            np.ndarray: Boolean mask
+        """
+        import numpy as np
+
+        holds = np.ones(len(hits), dtype=bool)
+        if self.all_mask:
+            holds &= (hits & self.all_mask) == self.all_mask
+        if self.any_mask:
+            holds &= (hits & self.any_mask) != 0
+        if self.none_mask:
+            holds &= (hits & self.none_mask) == 0
+        if self.bounds:
+            values = features(self.feature)
+            for operator, value in self.bounds:
+                holds &= {'>=': np.greater_equal, '<=': np.less_equal,
+                          '>': np.greater, '<': np.less}[operator](values, value)
+        if self.prompts is not None:
+            holds &= np.isin(prompts, self.prompts)
+        return holds
+
+
+class RuleSet:
+    """
+    The compiled scoring rules of one category.
+    """
+
+    def __init__(self, name: str, spec: Dict):
+        """
+        Compile a rule set.
+
+        Args:
+            name (str): Category name, e.g. 'coding'
+            spec (Dict): Rule set in the format of scoring_rules.json
+        """
+        self.name = name
+        self.spec = spec
+        self.weights: Dict[str, float] = dict(spec['weights'])
+        self.terms: Dict[str, List[str]] = spec['terms']
+        self.prompt_prefix: Optional[str] = spec.get('prompt_prefix')
+        self.sheets: List[str] = list(spec.get('sheets', []))
+        self.labels: Tuple[str, ...] = tuple(label.lower() for label in spec.get('labels', [name]))
+        self.clamp: Tuple[float, float] = tuple(spec.get('clamp', (0.0, 10.0)))
+        self.metrics: List[str] = list(spec['metrics'])
+        self.matcher = KeywordMatcher(self.terms)
+        self.sources = None
+        if 'sources' in spec:
+            self.sources = load_source_index(os.path.join(os.path.dirname(RULES_PATH), spec['sources']),
+                                             self.prompt_prefix)
+
+        # Per metric: base score and steps, each a list of (condition, bonus)
+        # alternatives of which the first that holds applies
+        self.plan: Dict[str, Tuple[float, List[List[Tuple[Condition, float]]]]] = {}
+        if set(self.weights) != set(self.metrics):
+            raise ValueError(f"Rule set {name!r} needs a weight for each metric")
+        for metric, metric_spec in spec['metrics'].items():
+            steps = []
+            for rule in metric_spec['rules']:
+                alternatives = rule['first'] if 'first' in rule else [rule]
+                steps.append([(Condition(alternative['when'], self.matcher.bits),
+                               float(alternative['add'])) for alternative in alternatives])
+            self.plan[metric] = (float(metric_spec['base']), steps)
+
+        conditions = [condition for _, steps in self.plan.values()
+                      for step in steps for condition, _ in step]
+        features = {condition.feature for condition in conditions if condition.feature}
+        self.features = sorted(features - set(SOURCE_FEATURES))
+        self.source_features = sorted(features & set(SOURCE_FEATURES))
+        if self.source_features and self.sources is None:
+            raise ValueError(f"Rule set {name!r} tests {self.source_features} without 'sources'")
+        self.uses_prompts = any(condition.prompts is not None for condition in conditions)
+
+        self.source = self._generate_source()
+        self.feature_cache = feature_cache
+        namespace = {'is_missing': is_missing, 'prompt_number': prompt_number,
+                     'scan': self.matcher.scan, 'features': self.feature_cache.features,
+                     'similarity': self.sources.features if self.sources else None}
+        exec(compile(self.source, f"<rules:{name}>", 'exec'), namespace)
+        self.evaluate: Callable[[str, str], Dict[str, float]] = namespace['evaluate']
+
+    def __getstate__(self) -> Dict:
+        # The generated evaluator is rebuilt from the spec
+        return {'name': self.name, 'spec': self.spec}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(state['name'], state['spec'])
+
+    def _generate_source(self) -> str:
+        """
+        Source of the row-wise evaluator: evaluate(response, prompt_id) -> scores.
+        """
+        low, high = self.clamp
+        zeros = ', '.join(f"{metric!r}: 0.0" for metric in self.metrics)
+        lines = [
+            "def evaluate(response, prompt_id):",
+            "    if is_missing(response) or response == '':",
+            f"        return {{{zeros}}}",
+            "    text = str(response)",
+            "    lowered = text.lower()",
+            "    hits = scan(lowered)"
+        ]
+        if self.features:
+            lines.append("    features_ = features(text, lowered)")
+        for feature in self.features:
+            lines.append(f"    f_{feature} = features_[{feature!r}]")
+        if self.source_features:
+            lines.append("    similarity_ = similarity(lowered, prompt_id)")
+        for feature in self.source_features:
+            lines.append(f"    f_{feature} = similarity_[{feature!r}]")
+        if self.uses_prompts:
+            lines.append("    prompt = prompt_number(prompt_id)")
+        for position, (metric, (base, steps)) in enumerate(self.plan.items()):
+            lines.append(f"    # {metric!r}")
+            lines.append(f"    m{position} = {base!r}")
+            for step in steps:
+                for index, (condition, bonus) in enumerate(step):
+                    keyword = 'if' if index == 0 else 'elif'
+                    lines.append(f"    {keyword} {condition.source()}:")
+                    lines.append(f"        m{position} += {bonus!r}")
+        scores = ', '.join(f"{metric!r}: min({high!r}, max({low!r}, m{position}))"
+                           for position, metric in enumerate(self.metrics))
+        lines.append(f"    return {{{scores}}}")
+        return '\n'.join(lines) + '\n'
+
+    def evaluate_columns(self, responses, prompt_ids, lap: Optional[Callable[[str], None]] = None):
+        """
+        Column-wise evaluator: the scores of a batch of responses.
+
+        Every rule is one whole-column operation, so the result matches
+        calling evaluate on each row.
+
+        Args:
+            responses (pd.Series): Response column
+            prompt_ids (pd.Series): Prompt_ID column
+            lap (Callable): Called with 'keyword scan', 'source similarity'
+                (if the rules test it), each metric name and 'assemble' as
+                they finish (see PipelineTrace.laps)
+
+        Returns:
+            pd.DataFrame with one column per metric, indexed like responses
+        """
+        import numpy as np
+        import pandas as pd
+
+        lap = lap or (lambda name: None)
+        values = pd.Series(responses.to_numpy(dtype=object), index=range(len(responses)))
+        valid = (values.notna() & (values != '')).to_numpy(dtype=bool)
+        text = values[valid].map(str).astype(object)
+        # Repeated responses are scanned and measured once
+        codes, distinct = pd.factorize(text.to_numpy())
+        distinct = pd.Series(distinct, dtype=object)
+        distinct_lowered = distinct.str.lower()
+        scan = self.matcher.scan
+        hits = np.fromiter((scan(value) for value in distinct_lowered), dtype=np.int64,
+                           count=len(distinct))[codes]
+        prompts = None
+        if self.uses_prompts:
+            prompts = pd.Series(prompt_ids.to_numpy(dtype=object)[valid], index=text.index)
+            prompts = prompts.map(prompt_number).to_numpy()
+        lap('keyword scan')
+
+        distinct_features = ColumnFeatures(distinct, distinct_lowered)
+
+        def features(name: str) -> np.ndarray:
+            if name not in row_values:
+                row_values[name] = distinct_features(name)[codes]
+            return row_values[name]
+
+        row_values = {}
+        if self.source_features:
+            batch_ids = prompt_ids.to_numpy(dtype=object)[valid]
+            lowered = pd.Series(distinct_lowered.to_numpy()[codes], index=text.index)
+            row_values.update(self.sources.column_features(lowered, batch_ids))
+            lap('source similarity')
+        low, high = self.clamp
+        frame = pd.DataFrame(0.0, index=responses.index, columns=self.metrics)
+        columns = {}
+        for metric, (base, steps) in self.plan.items():
+            score = np.full(len(text), base)
+            for step in steps:
+                if len(step) == 1:
+                    condition, bonus = step[0]
+                    score += bonus * condition.mask(hits, features, prompts)
+                else:
+                    score += np.select([condition.mask(hits, features, prompts) for condition, _ in step],
+                                       [bonus for _, bonus in step], default=0.0)
+            columns[metric] = score
+            lap(metric)
+
+        # Empty or missing responses score 0.0 on every metric
+        for metric, score in columns.items():
+            scores = np.zeros(len(responses))
+            scores[valid] = np.minimum(high, np.maximum(low, score))
+            frame[metric] = scores
+        lap('assemble')
+        return frame
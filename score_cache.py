@@ -0,0 +1,183 @@
+"""
+Persistent Score Cache
+======================
+
+SQLite-backed cache of metric scores, keyed by a hash of the response
+text, prompt ID, category and scoring-rules fingerprint. Re-running the
+analysis only scores responses that were not seen before under the same
+rules; everything else is read back from the cache.
+
+The cache is bounded: once it holds more than max_entries scores, the least
+recently used ones are evicted. When the analyzer's rules fingerprint
+changes (metric weights, indicator terms or HEURISTIC_VERSION), every
+stored score is dropped. The number of stored scores is counted once when
+the cache is opened and then kept up to date by every write, so writes
+never scan the table to check the bound.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, List
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+def response_key(fingerprint: str, category: str, prompt_id, text: str) -> str:
+    """
+    Content address of one response's scores.
+
+    Args:
+        fingerprint (str): Scoring-rules fingerprint
+        category (str): Scoring category
+        prompt_id: Prompt ID of the response
+        text (str): Response text, '' for missing responses (they score the same)
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = '\x1f'.join((fingerprint, category, str(prompt_id), text))
+    return hashlib.sha256(payload.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class ScoreCache:
+    """
+    Size-bounded LRU store of metric scores in an SQLite database.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1_000_000):
+        """
+        Open (or create) a cache database.
+
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Scores kept before least recently used ones are evicted
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS scores (
+                key TEXT PRIMARY KEY,
+                metrics TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used);
+        """)
+        self.connection.commit()
+        self._entries = self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def validate(self, fingerprint: str) -> None:
+        """
+        Drop every stored score if the scoring rules changed since they were written.
+
+        Args:
+            fingerprint (str): Current scoring-rules fingerprint
+        """
+        row = self.connection.execute("SELECT value FROM meta WHERE name = 'fingerprint'").fetchone()
+        if row is not None and row[0] == fingerprint:
+            return
+        with self.connection:
+            self.connection.execute("DELETE FROM scores")
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        self._entries = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up scores and mark the hits as recently used.
+
+        Args:
+            keys (List[str]): Keys from response_key()
+
+        Returns:
+            Dict mapping every key found to its metric scores
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for batch in _batches(unique_keys):
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f"SELECT key, metrics FROM scores WHERE key IN ({placeholders})", batch)
+            found.update((key, json.loads(metrics)) for key, metrics in rows)
+
+        now = time.time()
+        with self.connection:
+            for batch in _batches(list(found)):
+                placeholders = ','.join('?' * len(batch))
+                self.connection.execute(
+                    f"UPDATE scores SET last_used = ? WHERE key IN ({placeholders})", [now] + batch)
+
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: Iterable) -> None:
+        """
+        Store scores, then evict least recently used entries over the size bound.
+
+        Args:
+            items: (key, metric score list) pairs
+        """
+        now = time.time()
+        rows = [(key, json.dumps(metrics), now) for key, metrics in dict(items).items()]
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany("INSERT OR IGNORE INTO scores VALUES (?, ?, ?)", rows)
+            added = self.connection.total_changes - before
+            if added < len(rows):
+                # Some keys were stored already: give them the new scores
+                self.connection.executemany(
+                    "UPDATE scores SET metrics = ?, last_used = ? WHERE key = ?",
+                    ((metrics, used, key) for key, metrics, used in rows))
+            self._entries += added
+            excess = self._entries - self.max_entries
+            if excess > 0:
+                self.connection.execute(
+                    "DELETE FROM scores WHERE key IN "
+                    "(SELECT key FROM scores ORDER BY last_used LIMIT ?)", (excess,))
+                self.evictions += excess
+                self._entries -= excess
+
+    def __len__(self) -> int:
+        return self._entries
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for the report.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self)
+        }
+
+    @property
+    def closed(self) -> bool:
+        return self.connection is None
+
+    def close(self) -> None:
+        """
+        Close the database; the counters stay readable through stats().
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def _batches(items: List, size: int = _SQL_BATCH) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,241 @@
+"""
+Response Scoring Core
+=====================
+
+Scoring of single LLM responses with the heuristic rules of
+scoring_rules.json, compiled by rule_engine. This module imports neither
+pandas, numpy nor openpyxl, so scoring single responses starts fast, e.g.
+from shell pipelines or pre-commit hooks. UpdatedLLMAnalyzer in
+analysis_script.py builds the Excel, batch and report machinery on top of
+ResponseScorer.
+
+Usage:
+    python scoring_core.py < responses.jsonl
+    python scoring_core.py --prompt-id C05 solution.py
+
+JSON Lines input has one object per line with 'response', 'prompt_id' and
+optionally 'category' ('coding' or 'paraphrasing', otherwise taken from
+the prompt ID prefix); each output line adds the metric scores and the
+weighted 'score'.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Dict, List, Optional
+
+# KeywordMatcher and is_missing are re-exported for existing imports
+from rule_engine import (RULES_PATH, KeywordMatcher, RuleSet, is_missing, load_rules,  # noqa: F401
+                         without_source_rules)
+
+# Bump whenever the scoring heuristics change, so cached scores are discarded
+HEURISTIC_VERSION = 1
+
+# Rule set keys that only route rows to a category and do not affect scores
+ROUTING_KEYS = ('sheets', 'labels')
+
+
+class ResponseScorer:
+    """
+    Heuristic scorer for single coding and paraphrasing responses.
+    """
+    
+    def __init__(self, rules: Optional[Dict[str, Dict]] = None, source_similarity: bool = False):
+        """
+        Load the scoring rules and compile them.
+        
+        Args:
+            rules (Dict): Rule set per category in the format of
+                scoring_rules.json (default: read that file)
+            source_similarity (bool): Apply the rules comparing responses
+                with the source text of their prompt (default: drop them)
+        """
+        self.source_similarity = source_similarity
+        self.rules = {}
+        self.rule_sets = {}
+        for category, spec in (rules if rules is not None else load_rules()).items():
+            self.register_category(category, spec)
+        
+        # Metric weights, indicator terms and matchers of the built-in categories
+        coding, paraphrasing = self.rule_sets.get('coding'), self.rule_sets.get('paraphrasing')
+        self.coding_metrics = coding.weights if coding else {}
+        self.paraphrasing_metrics = paraphrasing.weights if paraphrasing else {}
+        self.coding_indicators = coding.terms if coding else {}
+        self.paraphrasing_indicators = paraphrasing.terms if paraphrasing else {}
+        self.coding_matcher = coding.matcher if coding else None
+        self.paraphrasing_matcher = paraphrasing.matcher if paraphrasing else None
+    
+    def register_category(self, category: str, spec: Dict) -> RuleSet:
+        """
+        Add (or replace) the rule set of a scoring category.
+        
+        Args:
+            category (str): Category name, e.g. 'summarization'
+            spec (Dict): Rule set in the format of scoring_rules.json
+            
+        Returns:
+            RuleSet: The compiled rule set
+        """
+        if not self.source_similarity:
+            spec = without_source_rules(spec)
+        rule_set = RuleSet(category, spec)
+        self.rules[category] = spec
+        self.rule_sets[category] = rule_set
+        return rule_set
+    
+    @property
+    def categories(self) -> List[str]:
+        """
+        Names of the registered scoring categories, in registration order.
+        """
+        return list(self.rule_sets)
+    
+    def evaluate_coding_response(self, response: str, prompt_id: str) -> Dict[str, float]:
+        """
+        Evaluate a coding response based on the defined metrics.
+        
+        Args:
+            response (str): The LLM's response to evaluate
+            prompt_id (str): The prompt ID (C01-C30)
+            
+        Returns:
+            Dict with scores for each metric (0-10 scale)
+        """
+        return self.rule_sets['coding'].evaluate(response, prompt_id)
+    
+    def evaluate_paraphrasing_response(self, response: str, prompt_id: str) -> Dict[str, float]:
+        """
+        Evaluate a paraphrasing response based on the defined metrics.
+        
+        Args:
+            response (str): The LLM's response to evaluate
+            prompt_id (str): The prompt ID (P01-P30)
+            
+        Returns:
+            Dict with scores for each metric (0-10 scale)
+        """
+        return self.rule_sets['paraphrasing'].evaluate(response, prompt_id)
+    
+    def calculate_weighted_scores(self, metric_scores: Dict[str, float], 
+                                 weights: Dict[str, float]) -> float:
+        """
+        Calculate weighted total score from individual metric scores.
+        
+        Args:
+            metric_scores (Dict): Individual metric scores
+            weights (Dict): Weights for each metric
+            
+        Returns:
+            float: Weighted total score
+        """
+        total_score = 0.0
+        for metric, score in metric_scores.items():
+            if metric in weights:
+                total_score += score * weights[metric]
+        return total_score
+    
+    def scoring_fingerprint(self) -> str:
+        """
+        Hash of everything that determines a response's scores.
+        
+        Covers HEURISTIC_VERSION, the rule sets (weights, term lists and
+        rules) and the source texts they compare responses with, so
+        changing any of them invalidates cached scores. The
+        ROUTING_KEYS of a rule set are left out, as they do not change scores.
+        
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        rules = {
+            'heuristic_version': HEURISTIC_VERSION,
+            'rules': {category: {key: value for key, value in spec.items() if key not in ROUTING_KEYS}
+                      for category, spec in self.rules.items()},
+            'sources': {category: rule_set.sources.digest()
+                        for category, rule_set in self.rule_sets.items() if rule_set.sources}
+        }
+        return hashlib.sha256(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def category_of(self, prompt_id: str, label: Optional[str] = None) -> Optional[str]:
+        """
+        Scoring category of a response: by its Category label if that
+        starts with one of a rule set's labels, else by the prompt ID prefix
+        (C = coding, P = paraphrasing).
+        """
+        if label:
+            label = str(label).lower()
+            for category, rule_set in self.rule_sets.items():
+                if label.startswith(rule_set.labels):
+                    return category
+        prefix = str(prompt_id)[:1].upper()
+        for category, rule_set in self.rule_sets.items():
+            if rule_set.prompt_prefix == prefix:
+                return category
+        return None
+    
+    def score_response(self, response: str, prompt_id: str,
+                       category: Optional[str] = None) -> Dict[str, float]:
+        """
+        Score one response on every metric of its category.
+        
+        Args:
+            response (str): The LLM's response
+            prompt_id (str): The prompt ID (C01-C30 or P01-P30)
+            category (str): Rule set to score with, e.g. 'coding' (default: from
+                the prompt ID)
+            
+        Returns:
+            Dict with the metric scores and the weighted total under 'score'
+        """
+        category = category or self.category_of(prompt_id)
+        if category not in self.rule_sets:
+            raise ValueError(f"Unknown category for prompt {prompt_id!r}: {category!r}")
+        rule_set = self.rule_sets[category]
+        scores = rule_set.evaluate(response, prompt_id)
+        scores['score'] = self.calculate_weighted_scores(scores, rule_set.weights)
+        return scores
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Score responses given as files or as JSON Lines on stdin.
+    """
+    parser = argparse.ArgumentParser(description="Score LLM responses without loading pandas")
+    parser.add_argument('files', nargs='*',
+                        help="response files to score with --prompt-id (default: JSON Lines on stdin)")
+    parser.add_argument('--prompt-id', help="prompt ID of the response files, e.g. C05")
+    parser.add_argument('--category',
+                        help="scoring category, e.g. coding or paraphrasing "
+                             "(default: from the prompt ID prefix)")
+    parser.add_argument('--rules', default=RULES_PATH,
+                        help="JSON file with the scoring rules (default: scoring_rules.json)")
+    parser.add_argument('--source-similarity', action='store_true',
+                        help="apply the rules comparing responses with their prompt's source text")
+    args = parser.parse_args(argv)
+    
+    scorer = ResponseScorer(load_rules(args.rules), source_similarity=args.source_similarity)
+    if args.files:
+        if not args.prompt_id:
+            parser.error("--prompt-id is required when scoring files")
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                scores = scorer.score_response(f.read(), args.prompt_id, args.category)
+            print(json.dumps({'file': path, 'prompt_id': args.prompt_id, **scores}))
+        return 0
+    
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        prompt_id = record.get('prompt_id', args.prompt_id)
+        category = record.get('category', args.category)
+        record.update(scorer.score_response(record.get('response'), prompt_id, category))
+        print(json.dumps(record))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Online Scoring Service
+======================
+
+Long-running asyncio service that scores LLM responses as they arrive,
+over HTTP on a TCP port or a Unix socket (standard library only).
+
+Concurrent requests are micro-batched: whatever has queued up while the
+previous batch was being scored is scored together in one call per
+category, and the per-model running aggregates (streaming.ModelAggregate)
+are updated once per batch. Batches are scored on a worker thread so
+the event loop keeps reading and answering requests meanwhile, one batch
+at a time. They are scored with the per-response
+evaluators by default, which are faster than the column scorers at
+micro-batch sizes; --vectorized switches to the batch scorers (and the
+score cache, if configured).
+
+Endpoints:
+    POST /score     one record or a list of records with Category (optional,
+                    otherwise taken from the prompt ID), Prompt_ID, LLM and
+                    Response; returns the metric scores and weighted Score
+    GET  /rankings  live equivalent of results['overall_summary']
+    GET  /summary   per-category model summaries plus the rankings
+    GET  /health    liveness and the number of responses scored
+
+Usage:
+    python scoring_service.py --port 8765
+    python scoring_service.py --unix /tmp/scoring.sock
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import argparse
+import asyncio
+import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analysis_script import UpdatedLLMAnalyzer
+from streaming import ModelAggregate
+
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024 * 1024
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """
+    Invalid request, reported to the client with an HTTP status.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ScoringService:
+    """
+    Micro-batching scorer with running per-model aggregates.
+    """
+
+    def __init__(self, analyzer: Optional[UpdatedLLMAnalyzer] = None,
+                 max_batch: int = 1024, max_delay: float = 0.0):
+        """
+        Args:
+            analyzer (UpdatedLLMAnalyzer): Scorer to use (default: per-response evaluators)
+            max_batch (int): Most records scored in one batch
+            max_delay (float): Seconds to keep a batch open for more records
+                (0 = score whatever is queued right away)
+        """
+        self.analyzer = analyzer or UpdatedLLMAnalyzer(vectorized=False)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.aggregates: Dict[str, Dict[str, ModelAggregate]] = {
+            category: {} for category in self.analyzer.rule_sets}
+        self.scored = 0
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        # Scores batches off the event loop; one thread keeps the analyzer
+        # (and its SQLite cache) on a single thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+
+    def _metrics(self, category: str) -> Dict[str, float]:
+        return self.analyzer.rule_sets[category].weights
+
+    def _record_category(self, record: Dict) -> str:
+        """
+        Scoring category of a record: its Category label, else its prompt ID.
+        """
+        category = self.analyzer.category_of(record.get('Prompt_ID', ''),
+                                             record.get('Category') or record.get('category'))
+        if category is None:
+            raise RequestError(400, f"Cannot tell the category of record {record!r}")
+        return category
+
+    def _normalize(self, record) -> Dict:
+        if not isinstance(record, dict):
+            raise RequestError(400, "Records must be JSON objects")
+        lowered = {key.lower(): value for key, value in record.items()}
+        normalized = {
+            'Prompt_ID': str(lowered.get('prompt_id', '')),
+            'LLM': lowered.get('llm'),
+            'Response': lowered.get('response'),
+            'Category': lowered.get('category')
+        }
+        normalized['category'] = self._record_category(normalized)
+        return normalized
+
+    def score_batch(self, records: List[Dict]) -> List[Dict]:
+        """
+        Score normalized records and fold them into the running aggregates.
+
+        Returns:
+            One result per record, in order
+        """
+        results, scores = self._score_records(records)
+        self._record_scores(len(records), scores)
+        return results
+
+    def _score_records(self, records: List[Dict]) -> Tuple[List[Dict], List[Tuple]]:
+        """
+        Score normalized records without touching the aggregates.
+
+        Returns:
+            Tuple of (one result per record, in order; the per-category
+            arguments of _update_aggregates)
+        """
+        results: List[Optional[Dict]] = [None] * len(records)
+        scores = []
+        for category in self.analyzer.rule_sets:
+            positions = [i for i, record in enumerate(records) if record['category'] == category]
+            if not positions:
+                continue
+            weights = self._metrics(category)
+            metrics = list(weights)
+            part = [records[i] for i in positions]
+
+            if self.analyzer.vectorized:
+                frame = pd.DataFrame({'LLM': [record['LLM'] for record in part],
+                                      'Response': [record['Response'] for record in part],
+                                      'Prompt_ID': [record['Prompt_ID'] for record in part]},
+                                     dtype=object)
+                metric_frame, weighted = self.analyzer.score_responses(frame, category)
+                columns = {metric: metric_frame[metric].to_numpy(dtype=float) for metric in metrics}
+                weighted = weighted.to_numpy(dtype=float)
+            else:
+                evaluate = self.analyzer.rule_sets[category].evaluate
+                rows = [evaluate(record['Response'], record['Prompt_ID']) for record in part]
+                columns = {metric: np.array([row[metric] for row in rows]) for metric in metrics}
+                weighted = np.array([self.analyzer.calculate_weighted_scores(row, weights)
+                                     for row in rows])
+
+            scores.append((category, [record['LLM'] for record in part],
+                           weighted, columns, metrics))
+            for j, i in enumerate(positions):
+                record = part[j]
+                result = {'Category': category, 'Prompt_ID': record['Prompt_ID'], 'LLM': record['LLM']}
+                for metric in metrics:
+                    result[metric] = float(columns[metric][j])
+                result['Score'] = float(weighted[j])
+                results[i] = result
+        return results, scores
+
+    def _record_scores(self, count: int, scores: List[Tuple]) -> None:
+        for category_scores in scores:
+            self._update_aggregates(*category_scores)
+        self.scored += count
+        self.batches += 1
+
+    async def _score_off_loop(self, records: List[Dict]) -> List[Dict]:
+        """
+        score_batch on the worker thread; the aggregates are updated back
+        on the event loop, so the read-only endpoints never see half a batch.
+        """
+        loop = asyncio.get_running_loop()
+        results, scores = await loop.run_in_executor(self._executor, self._score_records, records)
+        self._record_scores(len(records), scores)
+        return results
+
+    def _update_aggregates(self, category: str, models: List, weighted: np.ndarray,
+                           columns: Dict[str, np.ndarray], metrics: List[str]) -> None:
+        groups: Dict[str, List[int]] = {}
+        for position, model in enumerate(models):
+            if model is not None:
+                groups.setdefault(str(model), []).append(position)
+        aggregates = self.aggregates[category]
+        for model, positions in groups.items():
+            if model not in aggregates:
+                aggregates[model] = ModelAggregate(metrics)
+            aggregates[model].add(weighted[positions],
+                                  {metric: columns[metric][positions] for metric in metrics})
+
+    def results(self) -> Dict:
+        """
+        Live results in the shape returned by process_stream().
+        """
+        results = self.analyzer._new_results()
+        self.analyzer.models = self.analyzer._resolve_models(
+            model for aggregates in self.aggregates.values() for model in aggregates)
+        for category, aggregates in self.aggregates.items():
+            for model in self.analyzer.models:
+                if model in aggregates:
+                    results[category]['summary'][model] = aggregates[model].summary()
+        results['overall_summary'] = self.analyzer._build_overall_summary(results)
+        return results
+
+    async def score(self, records: List) -> List[Dict]:
+        """
+        Queue records for the next batch and wait for their scores.
+        """
+        normalized = [self._normalize(record) for record in records]
+        if self._queue is None:
+            return await self._score_off_loop(normalized)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((normalized, future))
+        return await future
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_delay
+            while size < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                items.append(item)
+                size += len(item[0])
+
+            records = [record for item_records, _ in items for record in item_records]
+            try:
+                scored = await self._score_off_loop(records)
+            except Exception as error:  # Fail the waiting requests, keep serving
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            start = 0
+            for item_records, future in items:
+                if not future.done():
+                    future.set_result(scored[start:start + len(item_records)])
+                start += len(item_records)
+
+    def start(self) -> None:
+        """
+        Start the batching task on the running event loop.
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def stop(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.analyzer.close)
+        self._executor.shutdown()
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        """
+        Answer one request.
+
+        Returns:
+            Tuple of (HTTP status, JSON-serializable payload)
+        """
+        path = path.split('?', 1)[0].rstrip('/') or '/'
+        if path == '/score':
+            if method != 'POST':
+                raise RequestError(405, "Use POST /score")
+            try:
+                payload = json.loads(body or b'null')
+            except ValueError as error:
+                raise RequestError(400, f"Invalid JSON: {error}")
+            if isinstance(payload, list):
+                return 200, await self.score(payload)
+            return 200, (await self.score([payload]))[0]
+        if method != 'GET':
+            raise RequestError(405, f"Use GET {path}")
+        if path == '/rankings':
+            return 200, self.results()['overall_summary']
+        if path == '/summary':
+            results = self.results()
+            summary = {category: results[category]['summary'] for category in self.aggregates}
+            summary['overall_summary'] = results['overall_summary']
+            return 200, summary
+        if path == '/health':
+            return 200, {'status': 'ok', 'scored': self.scored, 'batches': self.batches}
+        raise RequestError(404, f"No such endpoint: {path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """
+        Serve HTTP/1.1 requests on one connection (kept alive unless closed).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = None
+                try:
+                    try:
+                        length = int(headers.get('content-length', 0) or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        raise RequestError(400, "Invalid Content-Length header")
+                    if length > MAX_BODY:
+                        raise RequestError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.route(method, path, body)
+                except RequestError as error:
+                    status, payload = error.status, {'error': str(error)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as error:  # Answer the request, keep serving
+                    traceback.print_exc()
+                    status, payload = 500, {'error': f"{type(error).__name__}: {error}"}
+
+                # The unread body of a rejected request would be parsed as the next request
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close'
+                              and body is not None)
+                data = json.dumps(payload).encode('utf-8')
+                head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                        f"Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service: ScoringService, host: str = '127.0.0.1', port: int = 8765,
+                unix_path: Optional[str] = None) -> None:
+    """
+    Run the service until cancelled.
+    """
+    service.start()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle_connection, path=unix_path)
+        print(f"Scoring service listening on {unix_path}")
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(f"Scoring service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    """
+    Start the scoring service from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Serve LLM response scoring over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--max-batch', type=int, default=1024,
+                        help="most records scored in one batch (default: 1024)")
+    parser.add_argument('--max-delay-ms', type=float, default=0.0,
+                        help="how long a batch waits for more records (default: 0)")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="score batches with the column scorers instead of per response")
+    parser.add_argument('--cache', metavar='PATH',
+                        help="score cache used with --vectorized")
+    args = parser.parse_args()
+
+    analyzer = UpdatedLLMAnalyzer(vectorized=args.vectorized, cache_path=args.cache)
+    service = ScoringService(analyzer, args.max_batch, args.max_delay_ms / 1000)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Sharded Evaluation Runs
+=======================
+
+Partial results of one input shard (a records-style workbook, CSV, JSON
+Lines file or corpus holding some of the prompts or models), which can be
+merged with the partials of the other shards into the results of the
+whole evaluation without re-scoring anything.
+
+A ShardPartial keeps, per category and model, a streaming.ModelAggregate
+(count, mean, M2, min, max, metric totals and a quantile sketch) plus the
+count of every distinct weighted score. Scores are sums of a few weighted
+rule bonuses, so there are few distinct values and the median of the
+merged counts is exact. If a model has more than MAX_EXACT_VALUES distinct
+scores the counts are dropped and the median comes from the sketch.
+The mean and std are then computed from the counts in exact rational
+arithmetic (otherwise merged with Chan et al.'s update), so they do not
+depend on how the rows were split into shards; min and max merge exactly.
+
+Partials are saved as JSON next to their shard (records.xlsx ->
+records.xlsx.partial.json) and carry the scoring fingerprint, so partials
+scored with different rules are never merged.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import glob
+import json
+import math
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import atomic_path
+from streaming import ModelAggregate
+
+PARTIAL_VERSION = 1
+
+# Distinct weighted scores kept per model for an exact median
+MAX_EXACT_VALUES = 100_000
+
+
+def default_partial_path(shard: str) -> str:
+    """
+    Partial file kept next to the shard.
+    """
+    return f"{shard}.partial.json"
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    Expand glob patterns into input files, in sorted order without duplicates.
+
+    Args:
+        patterns (Iterable[str]): File names or glob patterns
+
+    Returns:
+        List[str]: Matching files; a pattern without matches is kept as given,
+        so opening it reports the missing file
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches or [pattern]:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def _moments_of_counts(counts: Dict[float, int]):
+    """
+    Correctly rounded mean and population std of a multiset given as
+    value -> count.
+    """
+    total = sum(counts.values())
+    mean = sum(Fraction(value) * count for value, count in counts.items()) / total
+    variance = sum((Fraction(value) - mean) ** 2 * count for value, count in counts.items()) / total
+    return float(mean), math.sqrt(variance)
+
+
+def _median_of_counts(counts: Dict[float, int]) -> float:
+    """
+    Median of a multiset given as value -> count, computed like np.median.
+    """
+    values = sorted(counts)
+    cumulative = np.cumsum([counts[value] for value in values])
+    total = int(cumulative[-1])
+    low = values[int(np.searchsorted(cumulative, (total - 1) // 2, side='right'))]
+    high = values[int(np.searchsorted(cumulative, total // 2, side='right'))]
+    return (low + high) / 2
+
+
+class ShardPartial:
+    """
+    Mergeable per-model statistics of one or more scored shards.
+    """
+
+    def __init__(self, fingerprint: str, metrics: Dict[str, List[str]]):
+        """
+        Args:
+            fingerprint (str): ResponseScorer.scoring_fingerprint() of the scorer
+            metrics (Dict): Category -> metric names
+        """
+        self.fingerprint = fingerprint
+        self.metrics = {category: list(names) for category, names in metrics.items()}
+        self.sources: List[str] = []
+        self.rows = 0
+        self.aggregates: Dict[str, Dict[str, ModelAggregate]] = {category: {} for category in metrics}
+        # Category -> model -> {weighted score: count}, or None once too many
+        self.score_counts: Dict[str, Dict[str, Optional[Dict[float, int]]]] = {
+            category: {} for category in metrics}
+
+    def add(self, category: str, scored: pd.DataFrame) -> None:
+        """
+        Add a scored batch (LLM, the metric columns and Score), as yielded by
+        UpdatedLLMAnalyzer.stream_scored_batches.
+        """
+        metrics = self.metrics[category]
+        self.rows += len(scored)
+        for llm, group in scored.groupby('LLM', sort=False):
+            aggregates = self.aggregates[category]
+            if llm not in aggregates:
+                aggregates[llm] = ModelAggregate(metrics)
+                self.score_counts[category][llm] = {}
+            weighted = group['Score'].to_numpy(dtype=float)
+            aggregates[llm].add(weighted, group[metrics])
+            values, counts = np.unique(weighted, return_counts=True)
+            self._count(category, llm, dict(zip(values.tolist(), counts.tolist())))
+
+    def _count(self, category: str, model: str, counts: Dict[float, int]) -> None:
+        current = self.score_counts[category].get(model, {})
+        if current is None:
+            return
+        for value, count in counts.items():
+            current[value] = current.get(value, 0) + count
+        self.score_counts[category][model] = current if len(current) <= MAX_EXACT_VALUES else None
+
+    def merge(self, other: 'ShardPartial') -> None:
+        """
+        Fold the partial of another shard into this one.
+        """
+        if other.fingerprint != self.fingerprint:
+            raise ValueError("Cannot merge partials scored with different scoring rules: "
+                             f"{', '.join(other.sources) or 'unnamed shard'}")
+        self.sources.extend(other.sources)
+        self.rows += other.rows
+        for category, models in other.aggregates.items():
+            self.aggregates.setdefault(category, {})
+            self.score_counts.setdefault(category, {})
+            for model, aggregate in models.items():
+                if model not in self.aggregates[category]:
+                    self.aggregates[category][model] = ModelAggregate(list(aggregate.metric_totals))
+                    self.score_counts[category][model] = {}
+                self.aggregates[category][model].merge(aggregate)
+                counts = other.score_counts[category].get(model)
+                if counts is None:
+                    self.score_counts[category][model] = None
+                else:
+                    self._count(category, model, counts)
+
+    def summary(self, category: str, model: str) -> Dict:
+        """
+        Summary of a model in the shape of results[category]['summary'][model],
+        with 'metric_averages' and an exact mean, std and median when the
+        counts were kept.
+        """
+        summary = self.aggregates[category][model].summary()
+        counts = self.score_counts[category].get(model)
+        if counts:
+            summary['average_score'], summary['std_score'] = _moments_of_counts(counts)
+            summary['median_score'] = _median_of_counts(counts)
+        return summary
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': PARTIAL_VERSION,
+            'fingerprint': self.fingerprint,
+            'metrics': self.metrics,
+            'sources': self.sources,
+            'rows': self.rows,
+            'aggregates': {
+                category: {model: aggregate.to_dict() for model, aggregate in models.items()}
+                for category, models in self.aggregates.items()
+            },
+            'score_counts': {
+                category: {model: None if counts is None else [[value, count] for value, count
+                                                                in sorted(counts.items())]
+                           for model, counts in models.items()}
+                for category, models in self.score_counts.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'ShardPartial':
+        if state.get('version') != PARTIAL_VERSION:
+            raise ValueError(f"Unsupported partial result version: {state.get('version')}")
+        partial = cls(state['fingerprint'], state['metrics'])
+        partial.sources = list(state['sources'])
+        partial.rows = state['rows']
+        for category, models in state['aggregates'].items():
+            partial.aggregates[category] = {model: ModelAggregate.from_dict(aggregate)
+                                            for model, aggregate in models.items()}
+        for category, models in state['score_counts'].items():
+            partial.score_counts[category] = {
+                model: None if counts is None else {float(value): int(count) for value, count in counts}
+                for model, counts in models.items()}
+        return partial
+
+    def save(self, path: str) -> None:
+        """
+        Write the partial atomically (temporary file, then rename).
+        """
+        with atomic_path(path) as temp_path, open(temp_path, 'w', encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> 'ShardPartial':
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,197 @@
+"""
+Bootstrap Intervals and Permutation Tests
+=========================================
+
+Uncertainty of the model rankings. Each model's category averages get a
+percentile bootstrap confidence interval. The overall score gets one too,
+taken from the same resamples as the mean of the category averages, as in
+the rankings. Each pair of models gets a paired sign-flip permutation test on
+the Prompt_IDs both have answered, per category and overall.
+
+Resampling is vectorized in NumPy: one (resamples x n) sign matrix for a
+test, drawn in row blocks of at most MAX_BLOCK_ELEMENTS entries to bound
+memory. The bootstrap draws a (resamples x distinct values) matrix of
+multinomial counts instead of drawing indices, which has the same
+distribution, so its cost grows with the number of distinct scores, not
+of responses. Weighted scores from the keyword rules are multiples of
+0.05 and have few distinct values, but the execution (--execute) and
+source similarity rules make them continuous. Sets with more distinct
+values than EXACT_MAX_VALUES are therefore binned to multiples of
+BIN_WIDTH first, which moves every resample mean by at most BIN_WIDTH / 2,
+below the two decimals reported; smaller sets are resampled exactly. Either
+way 10k resamples of a million scores take about a second.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from aggregation import ScoreAggregator
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 5541
+
+# Largest count / index / sign matrix drawn at once (8 bytes per entry)
+MAX_BLOCK_ELEMENTS = 1 << 24
+
+# Most distinct scores bootstrapped exactly; above it scores are binned
+EXACT_MAX_VALUES = 2_000
+
+# Bin width of the scores of larger sets (scores are on a 0-10 scale)
+BIN_WIDTH = 0.01
+
+
+def _block_rows(n_rows: int, n: int) -> List[Tuple[int, int]]:
+    step = max(1, MAX_BLOCK_ELEMENTS // max(n, 1))
+    return [(start, min(start + step, n_rows)) for start in range(0, n_rows, step)]
+
+
+def bootstrap_means(values: np.ndarray, resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Means of bootstrap resamples of values.
+
+    With more than EXACT_MAX_VALUES distinct values, the values are binned
+    to multiples of BIN_WIDTH before resampling.
+
+    Args:
+        values (np.ndarray): Observed scores (n,)
+        resamples (int): Number of resamples
+        rng (np.random.Generator): Random source
+
+    Returns:
+        np.ndarray: (resamples,) resample means; all zeros if values is empty
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    means = np.zeros(resamples)
+    if n == 0:
+        return means
+    distinct, counts = np.unique(values, return_counts=True)
+    if len(distinct) > EXACT_MAX_VALUES:
+        distinct, counts = np.unique(np.round(values / BIN_WIDTH) * BIN_WIDTH, return_counts=True)
+    if len(distinct) * 2 > n:
+        # Mostly unique values: drawing indices is cheaper than counts
+        for start, stop in _block_rows(resamples, n):
+            index = rng.integers(0, n, size=(stop - start, n))
+            means[start:stop] = values[index].mean(axis=1)
+        return means
+    # How often each distinct value is drawn in each resample
+    for start, stop in _block_rows(resamples, len(distinct)):
+        drawn = rng.multinomial(n, counts / n, size=stop - start)
+        means[start:stop] = drawn @ distinct / n
+    return means
+
+
+def percentile_interval(samples: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """
+    Percentile interval covering the central confidence share of samples.
+    """
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def paired_permutation_test(differences: np.ndarray, permutations: int,
+                            rng: np.random.Generator) -> Dict:
+    """
+    Two-sided paired sign-flip permutation test of a zero mean difference.
+
+    Under the null hypothesis either model is as likely to score higher on
+    a prompt, so each paired difference keeps its size but gets a random
+    sign. The p-value counts permuted means at least as far from zero as
+    the observed one, with the observed arrangement included.
+
+    Args:
+        differences (np.ndarray): Per-prompt score differences (n,)
+        permutations (int): Number of random sign assignments
+        rng (np.random.Generator): Random source
+
+    Returns:
+        Dict with mean_difference, p_value (None without pairs) and n_pairs
+    """
+    differences = np.asarray(differences, dtype=np.float64)
+    n = len(differences)
+    if n == 0:
+        return {'mean_difference': 0.0, 'p_value': None, 'n_pairs': 0}
+    observed = differences.mean()
+    # Compare with a little slack so permutations that only reorder the
+    # float summation still count as ties
+    threshold = abs(observed) - 1e-12 * max(1.0, abs(observed))
+    extreme = 0
+    for start, stop in _block_rows(permutations, n):
+        signs = rng.integers(0, 2, size=(stop - start, n), dtype=np.int8) * 2 - 1
+        permuted = signs @ differences / n
+        extreme += int(np.count_nonzero(np.abs(permuted) >= threshold))
+    return {'mean_difference': float(observed),
+            'p_value': (extreme + 1) / (permutations + 1),
+            'n_pairs': n}
+
+
+def model_significance(aggregator: ScoreAggregator, models: Sequence[str],
+                       resamples: int = DEFAULT_RESAMPLES,
+                       confidence: float = DEFAULT_CONFIDENCE,
+                       seed: Optional[int] = DEFAULT_SEED) -> Dict:
+    """
+    Confidence intervals of every model's scores and paired tests between models.
+
+    Args:
+        aggregator (ScoreAggregator): Aggregation over the run's ScoreTables
+        models (Sequence[str]): Models to compare
+        resamples (int): Bootstrap resamples, also used as the number of permutations
+        confidence (float): Interval coverage, e.g. 0.95
+        seed (int): Random seed, so reports are reproducible
+
+    Returns:
+        Dict with the settings, 'intervals' {model: {category or 'overall':
+        {'mean', 'low', 'high'}}} and 'paired_tests' [{'models', 'category',
+        'mean_difference', 'p_value', 'n_pairs'}]
+    """
+    rng = np.random.default_rng(seed)
+    categories = list(aggregator.tables)
+    means = aggregator.category_means(models)
+
+    intervals = {}
+    for model in models:
+        # Like the rankings, averaged over the categories the model has scores in
+        overall = np.zeros(resamples)
+        covered = 0
+        intervals[model] = {}
+        for category in categories:
+            table = aggregator.tables[category]
+            scores = table.scores(model) if model in table else np.empty(0)
+            if len(scores):
+                samples = bootstrap_means(scores, resamples, rng)
+                overall += samples
+                covered += 1
+                low, high = percentile_interval(samples, confidence)
+                intervals[model][category] = {'mean': float(means.loc[model, category]),
+                                              'low': low, 'high': high}
+        if covered:
+            low, high = percentile_interval(overall / covered, confidence)
+            intervals[model]['overall'] = {'mean': float(means.loc[model].mean()),
+                                           'low': low, 'high': high}
+
+    # Paired tests on per-prompt average scores, so several responses of a
+    # model to one prompt count as one observation
+    matrices = {category: aggregator.model_prompt_matrix(category).reindex(columns=list(models))
+                for category in categories if len(aggregator.tables[category])}
+    paired_tests = []
+    for first, second in combinations(models, 2):
+        pooled = []
+        for category in categories:
+            if category in matrices:
+                difference = (matrices[category][first] - matrices[category][second]).dropna()
+                pooled.append(difference.to_numpy())
+                paired_tests.append({'models': (first, second), 'category': category,
+                                     **paired_permutation_test(pooled[-1], resamples, rng)})
+        pooled = np.concatenate(pooled) if pooled else np.empty(0)
+        paired_tests.append({'models': (first, second), 'category': 'overall',
+                             **paired_permutation_test(pooled, resamples, rng)})
+
+    return {'resamples': resamples, 'confidence': confidence, 'seed': seed,
+            'intervals': intervals, 'paired_tests': paired_tests}
@@ -0,0 +1,430 @@
+"""
+Streaming Ingestion for LLM Evaluation Records
+==============================================
+
+Readers that yield evaluation records in fixed-size batches instead of
+loading a whole file, plus running accumulators for per-model summary
+statistics. Together they let UpdatedLLMAnalyzer.process_stream score
+inputs of any size with flat peak memory.
+
+Supported inputs:
+    - .xlsx  read with openpyxl in read-only mode, sheet by sheet
+    - .csv   read with pandas in chunks
+    - .jsonl one JSON record per line
+    - .corpus memory-mapped response corpus (see corpus.py)
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+import math
+import os
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+# Columns every record needs for scoring
+RECORD_COLUMNS = ['Category', 'LLM', 'Prompt_ID', 'Response']
+
+
+def iter_record_batches(path: str, batch_size: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Read evaluation records incrementally.
+
+    Args:
+        path (str): Path to an .xlsx, .csv, .jsonl or .corpus file
+        batch_size (int): Maximum number of records per batch
+
+    Yields:
+        pd.DataFrame: Batches with at least LLM, Prompt_ID and Response
+        columns, plus Category and a Sheet column naming the source sheet
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        batches = _iter_xlsx_batches(path, batch_size)
+    elif extension == '.csv':
+        batches = _iter_csv_batches(path, batch_size)
+    elif extension in ('.jsonl', '.ndjson'):
+        batches = _iter_jsonl_batches(path, batch_size)
+    elif extension == '.corpus':
+        batches = _iter_corpus_batches(path, batch_size)
+    else:
+        raise ValueError(f"Unsupported input format for streaming: {path}")
+
+    for batch in batches:
+        for column in RECORD_COLUMNS + ['Sheet']:
+            if column not in batch.columns:
+                batch[column] = None
+        yield batch
+
+
+def _iter_xlsx_batches(path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream the rows of every sheet of a workbook in openpyxl read-only mode.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            columns = [str(name) if name is not None else f"column_{i}" for i, name in enumerate(header)]
+            if 'Response' not in columns:
+                continue  # Not a response sheet (e.g. Metrics)
+
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= batch_size:
+                    yield _rows_to_frame(buffer, columns, worksheet.title)
+                    buffer = []
+            if buffer:
+                yield _rows_to_frame(buffer, columns, worksheet.title)
+    finally:
+        workbook.close()
+
+
+def _rows_to_frame(rows: List[tuple], columns: List[str], sheet: str) -> pd.DataFrame:
+    """
+    Build a batch frame from raw worksheet rows (which may be ragged).
+    """
+    width = len(columns)
+    rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    frame['Sheet'] = sheet
+    return frame
+
+
+def _iter_csv_batches(path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file in chunks of batch_size rows.
+    """
+    for chunk in pd.read_csv(path, chunksize=batch_size):
+        yield chunk
+
+
+def _iter_jsonl_batches(path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a JSON Lines file, one record per non-blank line.
+    """
+    buffer = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            buffer.append(json.loads(line))
+            if len(buffer) >= batch_size:
+                yield pd.DataFrame.from_records(buffer)
+                buffer = []
+    if buffer:
+        yield pd.DataFrame.from_records(buffer)
+
+
+def _iter_corpus_batches(path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Slice record batches out of a memory-mapped corpus.
+    """
+    from corpus import Corpus
+
+    with Corpus(path) as corpus:
+        yield from corpus.iter_batches(batch_size)
+
+
+class QuantileSketch:
+    """
+    Mergeable sketch of a score distribution for medians and quantiles.
+
+    Values are counted exactly while there are at most max_bins distinct
+    values, which always holds for the weighted scores since they lie on a
+    small lattice in 0-10. Beyond that, values are rounded onto bins that
+    double in width until they fit, bounding the quantile error by the
+    bin width.
+    """
+
+    def __init__(self, max_bins: int = 4096, base_width: float = 1e-6):
+        """
+        Args:
+            max_bins (int): Maximum number of distinct bins kept
+            base_width (float): Bin width used once values need rounding
+        """
+        self.max_bins = max_bins
+        self.base_width = base_width
+        self.level = 0  # 0 = exact values, otherwise bins of base_width * 2**(level-1)
+        self.counts: Dict[float, int] = {}
+
+    @property
+    def bin_width(self) -> float:
+        return 0.0 if self.level == 0 else self.base_width * 2 ** (self.level - 1)
+
+    def _bin(self, value: float) -> float:
+        if self.level == 0:
+            return value
+        width = self.bin_width
+        return round(value / width) * width
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of values to the sketch.
+        """
+        values = np.asarray(values, dtype=float)
+        if self.level > 0:
+            width = self.bin_width
+            values = np.round(values / width) * width
+        uniques, counts = np.unique(values, return_counts=True)
+        for value, count in zip(uniques.tolist(), counts.tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._compress()
+
+    def remove(self, values: np.ndarray) -> None:
+        """
+        Take a batch of previously added values back out of the sketch.
+        """
+        values = np.asarray(values, dtype=float)
+        if self.level > 0:
+            width = self.bin_width
+            values = np.round(values / width) * width
+        uniques, counts = np.unique(values, return_counts=True)
+        for value, count in zip(uniques.tolist(), counts.tolist()):
+            remaining = self.counts.get(value, 0) - count
+            if remaining > 0:
+                self.counts[value] = remaining
+            else:
+                self.counts.pop(value, None)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        Fold another sketch into this one.
+        """
+        while self.level < other.level:
+            self._coarsen()
+        for value, count in other.counts.items():
+            value = self._bin(value)
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._compress()
+
+    def _coarsen(self) -> None:
+        self.level += 1
+        counts = {}
+        for value, count in self.counts.items():
+            value = self._bin(value)
+            counts[value] = counts.get(value, 0) + count
+        self.counts = counts
+
+    def _compress(self) -> None:
+        while len(self.counts) > self.max_bins:
+            self._coarsen()
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile with numpy's default linear interpolation.
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            float: The quantile, or nan for an empty sketch
+        """
+        n = self.count
+        if n == 0:
+            return math.nan
+
+        position = (n - 1) * q
+        lower_rank, upper_rank = math.floor(position), math.ceil(position)
+        lower = upper = None
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if lower is None and seen > lower_rank:
+                lower = value
+            if seen > upper_rank:
+                upper = value
+                break
+        return lower + (upper - lower) * (position - lower_rank)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def to_dict(self) -> Dict:
+        return {'level': self.level, 'max_bins': self.max_bins, 'base_width': self.base_width,
+                'counts': [[value, count] for value, count in sorted(self.counts.items())]}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'QuantileSketch':
+        sketch = cls(state['max_bins'], state['base_width'])
+        sketch.level = state['level']
+        sketch.counts = {float(value): int(count) for value, count in state['counts']}
+        return sketch
+
+
+class RunningStats:
+    """
+    Running count, mean, variance, min and max of a score stream.
+
+    Batches are folded in with Chan et al.'s pairwise update, so two
+    accumulators can also be merged exactly. The median comes from a
+    QuantileSketch kept alongside.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of values.
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        batch_mean = float(np.mean(values))
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        self._combine(len(values), batch_mean, batch_m2, float(np.min(values)), float(np.max(values)))
+        self.sketch.update(values)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """
+        Fold another accumulator into this one.
+        """
+        if other.count == 0:
+            return
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+
+    def remove(self, values: np.ndarray) -> None:
+        """
+        Take a batch of previously added values back out.
+
+        Inverts the pairwise update; min and max are re-read from the sketch.
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        remaining = self.count - len(values)
+        if remaining <= 0:
+            self.__init__()
+            return
+        batch_mean = float(np.mean(values))
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        mean = (self.count * self.mean - len(values) * batch_mean) / remaining
+        delta = batch_mean - mean
+        self.m2 = max(0.0, self.m2 - batch_m2 - delta * delta * remaining * len(values) / self.count)
+        self.mean = mean
+        self.count = remaining
+        self.sketch.remove(values)
+        self.min = min(self.sketch.counts)
+        self.max = max(self.sketch.counts)
+
+    def _combine(self, count: int, mean: float, m2: float, minimum: float, maximum: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    @property
+    def std(self) -> float:
+        """
+        Population standard deviation, as np.std computes it.
+        """
+        return math.sqrt(self.m2 / self.count) if self.count else math.nan
+
+    def summary(self) -> Dict:
+        """
+        Summary in the shape of results[category]['summary'][model].
+        """
+        return {
+            'average_score': self.mean,
+            'median_score': self.sketch.median(),
+            'std_score': self.std,
+            'min_score': self.min,
+            'max_score': self.max,
+            'total_responses': self.count
+        }
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max, 'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'RunningStats':
+        stats = cls()
+        stats.count = state['count']
+        stats.mean = state['mean']
+        stats.m2 = state['m2']
+        stats.min = state['min']
+        stats.max = state['max']
+        stats.sketch = QuantileSketch.from_dict(state['sketch'])
+        return stats
+
+
+class ModelAggregate:
+    """
+    Partial statistics of one model in one category.
+
+    Tracks the weighted scores in a RunningStats and a running total per
+    metric, so summaries and the per-metric breakdown can be updated as rows
+    are added or removed without revisiting the other rows.
+    """
+
+    def __init__(self, metrics: List[str]):
+        self.scores = RunningStats()
+        self.metric_totals = {metric: 0.0 for metric in metrics}
+
+    def add(self, weighted: np.ndarray, metric_frame: pd.DataFrame) -> None:
+        """
+        Add scored rows (weighted scores and their metric scores, as a
+        DataFrame or a dict of arrays keyed by metric).
+        """
+        self.scores.update(weighted)
+        for metric in self.metric_totals:
+            self.metric_totals[metric] += float(np.sum(np.asarray(metric_frame[metric], dtype=float)))
+
+    def remove(self, weighted: np.ndarray, metric_frame: pd.DataFrame) -> None:
+        """
+        Remove rows that were added before.
+        """
+        self.scores.remove(weighted)
+        for metric in self.metric_totals:
+            self.metric_totals[metric] -= float(np.sum(np.asarray(metric_frame[metric], dtype=float)))
+        if self.scores.count == 0:
+            self.metric_totals = {metric: 0.0 for metric in self.metric_totals}
+
+    def merge(self, other: 'ModelAggregate') -> None:
+        self.scores.merge(other.scores)
+        for metric, total in other.metric_totals.items():
+            self.metric_totals[metric] = self.metric_totals.get(metric, 0.0) + total
+
+    def summary(self) -> Dict:
+        """
+        Summary in the shape of results[category]['summary'][model], plus the
+        average of every metric under 'metric_averages'.
+        """
+        summary = self.scores.summary()
+        summary['metric_averages'] = {metric: total / self.scores.count
+                                      for metric, total in self.metric_totals.items()}
+        return summary
+
+    def to_dict(self) -> Dict:
+        return {'scores': self.scores.to_dict(), 'metric_totals': self.metric_totals}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'ModelAggregate':
+        aggregate = cls(list(state['metric_totals']))
+        aggregate.scores = RunningStats.from_dict(state['scores'])
+        aggregate.metric_totals = dict(state['metric_totals'])
+        return aggregate
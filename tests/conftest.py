@@ -0,0 +1,15 @@
+"""
+Test Configuration
+==================
+
+Makes the analysis modules in the repository root importable from the
+tests.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,202 @@
+"""
+Aggregation Tests
+=================
+
+ScoreAggregator.aggregate must give the same statistics as a pandas
+group-by over the unpivoted scores, for any combination of group keys.
+The overall rankings, the category means behind them and the overall
+confidence intervals average a model over the categories it has scores
+in, so a model missing from a category is not ranked as if it scored 0
+there.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregation import SCORE, STATISTICS, ScoreAggregator
+from analysis_script import UpdatedLLMAnalyzer
+from result_store import ScoreTable
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+PARAPHRASING_SHEET = 'Paraphrasing_Gen_Creation'
+
+PANDAS_STATISTICS = {'mean': 'mean', 'median': 'median', 'std': lambda values: values.std(ddof=0),
+                     'min': 'min', 'max': 'max', 'count': 'count'}
+
+
+@pytest.fixture(scope='module')
+def aggregator():
+    """
+    Aggregator over two random score tables, with missing models and prompts.
+    """
+    rng = np.random.default_rng(0)
+    tables = {}
+    for category, metrics, prefix in (('coding', ['A', 'B', 'C'], 'C'), ('paraphrasing', ['A', 'D'], 'P')):
+        table = ScoreTable(metrics)
+        for rows in (40, 25):
+            models = pd.Series(rng.choice(['M1', 'M2', 'M3', None], rows), dtype=object)
+            prompts = pd.Series(rng.choice([f'{prefix}01', f'{prefix}02', f'{prefix}03', None], rows),
+                                dtype=object)
+            values = rng.integers(0, 21, (rows, len(metrics))) / 2
+            table.append(models, prompts, rng.integers(0, 500, rows), values, values.mean(axis=1))
+        tables[category] = table
+    return ScoreAggregator(tables)
+
+
+def long_frame(aggregator) -> pd.DataFrame:
+    """
+    The unpivoted scores built row by row, as plain object columns.
+    """
+    rows = []
+    for category, table in aggregator.tables.items():
+        columns = table.columns
+        for position in range(len(table)):
+            model = table.models[columns['model'][position]]
+            prompt = table.prompts[columns['prompt'][position]]
+            values = list(columns['metrics'][position]) + [columns['weighted'][position]]
+            for metric, value in zip(table.metrics + [SCORE], values):
+                rows.append({'category': category, 'llm': model, 'prompt_id': prompt,
+                             'metric': metric, 'value': value})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope='module')
+def partial_results():
+    """
+    Analysis of records.xlsx without Mistral's paraphrasing responses.
+    """
+    data = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    sheet = data[PARAPHRASING_SHEET]
+    data[PARAPHRASING_SHEET] = sheet[sheet['LLM'] != 'Mistral'].reset_index(drop=True)
+    analyzer = UpdatedLLMAnalyzer(resamples=200)
+    analyzer.data = data
+    results = analyzer.process_and_update_excel()
+    analyzer.close()
+    return analyzer, results
+
+
+@pytest.mark.parametrize('by', [['category'], ['llm'], ['category', 'llm'], ['metric', 'llm'],
+                                ['category', 'prompt_id', 'llm', 'metric']])
+def test_aggregate_matches_pandas_groupby(aggregator, by):
+    frame = long_frame(aggregator).dropna(subset=by)
+    expected = frame.groupby(by, sort=False)['value'].agg(
+        [(name, PANDAS_STATISTICS[name]) for name in STATISTICS])
+    result = aggregator.aggregate(by)
+    # Groups come in first-seen order, like groupby(sort=False)
+    assert result.index.tolist() == expected.index.tolist()
+    assert result.index.names == by
+    for name in STATISTICS:
+        np.testing.assert_allclose(result[name].to_numpy(dtype=float),
+                                   expected[name].to_numpy(dtype=float), err_msg=name)
+
+
+def test_aggregate_options(aggregator):
+    frame = long_frame(aggregator)
+    scores = frame[frame['metric'] == SCORE].dropna(subset=['llm'])
+    result = aggregator.aggregate(['llm'], metrics=[SCORE], statistics=['mean', 'count'])
+    assert list(result.columns) == ['mean', 'count']
+    expected = scores.groupby('llm', sort=False)['value'].mean()
+    np.testing.assert_allclose(result['mean'].to_numpy(), expected.to_numpy())
+    assert aggregator.aggregate(['llm'], metrics=[SCORE], statistics=['mean', 'count']) is result
+
+    everything = aggregator.aggregate([], statistics=['count', 'max'])
+    assert everything['count'].tolist() == [len(frame)] and everything['max'].iloc[0] == 10.0
+    with pytest.raises(ValueError):
+        aggregator.aggregate(['model'])
+    with pytest.raises(ValueError):
+        aggregator.aggregate(['llm'], statistics=['variance'])
+
+
+def test_slices_match_the_tables(aggregator):
+    table = aggregator.tables['coding']
+    summaries = aggregator.summaries('coding', ['M1', 'M2', 'M3', 'M4'])
+    assert list(summaries) == ['M1', 'M2', 'M3']
+    for model, summary in summaries.items():
+        expected = table.summary(model)
+        assert summary == pytest.approx(expected)
+        assert summary['total_responses'] == expected['total_responses']
+    averages = aggregator.metric_averages('paraphrasing', ['M2', 'M4'])
+    assert list(averages) == ['M2']
+    assert averages['M2'] == pytest.approx(aggregator.tables['paraphrasing'].metric_averages('M2'))
+
+    difficulty = aggregator.prompt_difficulty('coding')
+    assert difficulty['mean'].is_monotonic_increasing and set(difficulty.index) == {'C01', 'C02', 'C03'}
+    matrix = aggregator.model_prompt_matrix('coding')
+    assert set(matrix.columns) == {'M1', 'M2', 'M3'}
+    frame = long_frame(aggregator)
+    cell = frame[(frame['category'] == 'coding') & (frame['llm'] == 'M1')
+                 & (frame['prompt_id'] == 'C02') & (frame['metric'] == SCORE)]['value']
+    assert matrix.loc['C02', 'M1'] == pytest.approx(cell.mean())
+    variance = aggregator.metric_variance()['variance']
+    assert variance[('coding', 'M1', 'B')] == pytest.approx(np.var(table.metric_scores('M1', 'B')))
+
+
+def test_partial_model_is_averaged_over_its_categories(partial_results):
+    _, results = partial_results
+    overall = results['overall_summary']
+    scores = dict(overall['model_rankings'])
+    assert overall['categories_covered'] == {'GPT-4.1-mini': 2, 'Llama': 2, 'Mistral': 1}
+    assert scores['Mistral'] == pytest.approx(results['coding']['summary']['Mistral']['average_score'])
+    for model in ('GPT-4.1-mini', 'Llama'):
+        both = [results[category]['summary'][model]['average_score']
+                for category in ('coding', 'paraphrasing')]
+        assert scores[model] == pytest.approx(sum(both) / 2)
+    assert overall['best_model'] == overall['model_rankings'][0][0]
+
+
+def test_category_means_leave_missing_categories_empty(partial_results):
+    _, results = partial_results
+    means = results['aggregates'].category_means(['GPT-4.1-mini', 'Llama', 'Mistral', 'Unknown'])
+    assert math.isnan(means.loc['Mistral', 'paraphrasing'])
+    assert means.loc['Unknown'].isna().all()
+    assert not means.loc[['GPT-4.1-mini', 'Llama']].isna().any().any()
+
+
+def test_summary_path_matches_aggregates(partial_results):
+    analyzer, results = partial_results
+    summaries = {category: {'summary': results[category]['summary']}
+                 for category in analyzer.rule_sets}
+    overall = analyzer._build_overall_summary(summaries)
+    assert overall['categories_covered'] == results['overall_summary']['categories_covered']
+    expected = dict(results['overall_summary']['model_rankings'])
+    for model, score in overall['model_rankings']:
+        assert score == pytest.approx(expected[model])
+
+
+def test_models_without_scores_are_not_ranked(partial_results):
+    analyzer, results = partial_results
+    analyzer.models = ['Llama', 'Unknown']
+    try:
+        overall = analyzer._build_overall_summary(results)
+    finally:
+        analyzer.models = ['GPT-4.1-mini', 'Llama', 'Mistral']
+    assert [model for model, _ in overall['model_rankings']] == ['Llama']
+    assert overall['categories_covered'] == {'Llama': 2, 'Unknown': 0}
+
+
+def test_overall_interval_uses_covered_categories(partial_results):
+    _, results = partial_results
+    intervals = results['significance']['intervals']
+    mistral = intervals['Mistral']
+    assert 'paraphrasing' not in mistral
+    assert mistral['overall']['mean'] == pytest.approx(mistral['coding']['mean'])
+    assert mistral['overall']['low'] == pytest.approx(mistral['coding']['low'])
+    assert mistral['overall']['high'] == pytest.approx(mistral['coding']['high'])
+    assert intervals['Llama']['overall']['low'] < intervals['Llama']['overall']['mean']
+
+
+def test_report_flags_partial_coverage(partial_results):
+    analyzer, results = partial_results
+    text = analyzer.generate_report(results, 'txt')
+    assert "Mistral: " in text and "(averaged over 1 of 2 categories)" in text
+    assert text.count("averaged over") == 1
+    markdown = analyzer.generate_report(results, 'md')
+    assert "| Mistral |" in markdown and "| 1 of 2 |" in markdown
@@ -0,0 +1,127 @@
+"""
+Batch Scoring Equivalence Tests
+===============================
+
+The column-wise evaluator of every rule set (RuleSet.evaluate_columns,
+behind score_coding_batch and score_paraphrasing_batch) must give the
+same scores as calling the row-wise RuleSet.evaluate on each response,
+and both must reproduce the scores of the original hand-written
+evaluate_coding_response and evaluate_paraphrasing_response on
+records.xlsx (kept in data/original_scores.json).
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring_core import ResponseScorer
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+ORIGINAL_SCORES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data',
+                                    'original_scores.json')
+
+SCORER = ResponseScorer()
+
+# Responses the batch path handles differently from plain text
+EDGE_CASES = [
+    None,
+    float('nan'),
+    pd.NA,
+    '',
+    42,
+    3.5,
+    'DEF SOLVE(X):\n    RETURN X  # UPPERCASE',
+    'Try: Handle the ERROR with a ValueError',
+    'Ünïcödé résumé — naïve café ☕ def naïve():\n    return "日本語"',
+    'Straße ΣΊΣΥΦΟΣ İstanbul',
+    # Keywords found only across word boundaries
+    'subclass definitions notify important information',
+    'undefined fortress, rehandled retry',
+    'a nested loopback, terror and dictate',
+    'the binary searching sorter imports',
+]
+
+
+def assert_equivalent(rule_set, responses: pd.Series, prompt_ids: pd.Series) -> None:
+    """
+    Compare the column-wise scores with row-by-row evaluation.
+    """
+    frame = rule_set.evaluate_columns(responses, prompt_ids)
+    assert list(frame.columns) == rule_set.metrics
+    assert frame.index.equals(responses.index)
+    for (index, response), prompt_id in zip(responses.items(), prompt_ids):
+        expected = rule_set.evaluate(response, prompt_id)
+        for metric, score in expected.items():
+            assert math.isclose(frame.at[index, metric], score, abs_tol=1e-9), (
+                f"{rule_set.name} {metric} of {response!r} ({prompt_id}): "
+                f"{frame.at[index, metric]} != {score}")
+
+
+def records() -> list:
+    """
+    (category, sheet) of every sheet in records.xlsx a rule set scores.
+    """
+    return [(category, sheet) for category, rule_set in SCORER.rule_sets.items()
+            for sheet in rule_set.sheets]
+
+
+@pytest.mark.parametrize('category, sheet', records())
+def test_records_match_row_evaluation(category, sheet):
+    df = pd.read_excel(RECORDS_PATH, sheet_name=sheet)
+    assert_equivalent(SCORER.rule_sets[category], df['Response'], df['Prompt_ID'])
+
+
+@pytest.mark.parametrize('category, sheet', records())
+def test_records_match_original_evaluators(category, sheet):
+    with open(ORIGINAL_SCORES_PATH, 'r', encoding='utf-8') as f:
+        original = json.load(f)[sheet]
+    rule_set = SCORER.rule_sets[category]
+    df = pd.read_excel(RECORDS_PATH, sheet_name=sheet)
+    assert len(df) == len(original)
+    frame = rule_set.evaluate_columns(df['Response'], df['Prompt_ID'])
+    for index, (response, prompt_id) in enumerate(zip(df['Response'], df['Prompt_ID'])):
+        assert rule_set.evaluate(response, prompt_id) == original[index]
+        assert frame.iloc[index].to_dict() == original[index]
+
+
+@pytest.mark.parametrize('category', list(SCORER.rule_sets))
+def test_repeated_responses_match_row_evaluation(category):
+    rule_set = SCORER.rule_sets[category]
+    prefix = rule_set.prompt_prefix or ''
+    texts = [text for text in EDGE_CASES if isinstance(text, str)]
+    responses = pd.Series([texts[number % 3] for number in range(12)], dtype=object)
+    prompt_ids = pd.Series([f"{prefix}{number % 5 + 1:02d}" for number in range(12)])
+    assert_equivalent(rule_set, responses, prompt_ids)
+
+
+@pytest.mark.parametrize('category', list(SCORER.rule_sets))
+def test_edge_cases_match_row_evaluation(category):
+    rule_set = SCORER.rule_sets[category]
+    prefix = rule_set.prompt_prefix or ''
+    responses = pd.Series(EDGE_CASES, dtype=object, index=range(100, 100 + len(EDGE_CASES)))
+    prompt_ids = pd.Series([f"{prefix}{number % 30 + 1:02d}" for number in range(len(EDGE_CASES))],
+                           index=responses.index)
+    assert_equivalent(rule_set, responses, prompt_ids)
+
+
+@pytest.mark.parametrize('category', list(SCORER.rule_sets))
+def test_missing_and_empty_responses_score_zero(category):
+    rule_set = SCORER.rule_sets[category]
+    responses = pd.Series([None, np.nan, ''], dtype=object)
+    frame = rule_set.evaluate_columns(responses, pd.Series(['X01'] * 3))
+    assert (frame.to_numpy() == 0.0).all()
+
+
+@pytest.mark.parametrize('category', list(SCORER.rule_sets))
+def test_numeric_column_matches_row_evaluation(category):
+    rule_set = SCORER.rule_sets[category]
+    prefix = rule_set.prompt_prefix or ''
+    responses = pd.Series([0, 7, 2.25, np.nan])
+    assert_equivalent(rule_set, responses, pd.Series([f"{prefix}01"] * len(responses)))
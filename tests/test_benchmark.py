@@ -0,0 +1,102 @@
+"""
+Benchmark Suite Tests
+=====================
+
+The synthetic workload must be reproducible from its seed and follow
+the records.xlsx schema, every benchmark stage must report its
+throughput and latencies, and a baseline comparison must flag stages
+whose throughput dropped (or whose startup time rose) past the
+threshold, and nothing else.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from benchmark import (MATCHER_EXTRA_TERMS, STAGES, compare_to_baseline, generate_records,
+                       measure_matcher, run_benchmark)
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+def test_generate_records_is_seeded():
+    data = generate_records(60, seed=3)
+    same = generate_records(60, seed=3)
+    for sheet in data:
+        pd.testing.assert_frame_equal(data[sheet], same[sheet])
+    other = generate_records(60, seed=4)
+    assert data['Coding']['Response'].tolist() != other['Coding']['Response'].tolist()
+
+
+def test_generate_records_schema():
+    data = generate_records(60, seed=0, code_length=500, length_sigma=0, missing_rate=0.1,
+                            models=['A', 'B'])
+    assert list(data) == ['Metrics'] + list(SHEETS)
+    for sheet in SHEETS:
+        frame = data[sheet]
+        assert len(frame) == 60
+        assert frame['LLM'].tolist() == ['A', 'B'] * 30
+        assert {'Prompt_ID', 'Response', 'Metric_A', 'Score', 'Mean_Score'} <= set(frame.columns)
+        assert frame['Response'].isna().any() and frame['Response'].notna().any()
+    assert data['Coding']['Prompt_ID'].str.startswith('C').all()
+    # The generated workbook can be scored like the real one
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.data = data
+    results = analyzer.process_and_update_excel()
+    assert [model for model, _ in results['overall_summary']['model_rankings']] != []
+    coding = data['Coding']
+    assert coding['Score'].notna().all()
+    assert (coding.loc[coding['Response'].isna(), 'Score'] == 0).all()
+
+
+def test_run_benchmark_reports_every_stage():
+    result = run_benchmark(rows=30, repeat=2, code_length=300, prose_length=100)
+    assert result['config']['rows'] == 30
+    assert list(result['stages']) == STAGES
+    for stage, stats in result['stages'].items():
+        assert stats['throughput_rows_per_s'] > 0
+        latency = stats['latency_ms']
+        assert 0 <= latency['p50'] <= latency['p90'] <= latency['p99'] <= latency['max'], stage
+    assert result['stages']['process_and_update_excel']['runs'] == 2
+    assert result['stages']['evaluate_coding_response']['runs'] == 30
+
+
+def test_run_benchmark_without_stages():
+    result = run_benchmark(rows=30, stages=[])
+    assert result['stages'] == {}
+
+
+def test_measure_matcher_pads_the_term_sets():
+    matcher = measure_matcher(rows=10, code_length=300, prose_length=100)
+    for category in ('coding', 'paraphrasing'):
+        terms = [timing['terms'] for timing in matcher[category]]
+        assert len(terms) == len(MATCHER_EXTRA_TERMS)
+        assert np.diff(terms).tolist() == np.diff(MATCHER_EXTRA_TERMS).tolist()
+        assert all(timing['substring_s'] >= 0 and timing['regex_s'] >= 0
+                   for timing in matcher[category])
+
+
+def stage(throughput):
+    return {'throughput_rows_per_s': throughput}
+
+
+def test_compare_to_baseline():
+    baseline = {'stages': {'load_data': stage(1000), 'generate_report': stage(500)},
+                'startup': {'scoring_core': {'median_ms': 100.0}}}
+    result = {'stages': {'load_data': stage(850), 'generate_report': stage(390),
+                         'save_updated_excel': stage(1)},
+              'startup': {'scoring_core': {'median_ms': 119.0}}}
+    # Stages missing from the baseline are not compared
+    regressions = compare_to_baseline(result, baseline, 0.2)
+    assert len(regressions) == 1 and regressions[0].startswith('generate_report:')
+
+    result['startup']['scoring_core']['median_ms'] = 125.0
+    regressions = compare_to_baseline(result, baseline, 0.2)
+    assert [message.split(':')[0] for message in regressions] == \
+        ['generate_report', 'startup scoring_core']
+    assert compare_to_baseline(result, baseline, 0.5) == []
+    assert compare_to_baseline(baseline, baseline, 0.0) == []
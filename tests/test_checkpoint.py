@@ -0,0 +1,156 @@
+"""
+Crash-Safe Run Tests
+====================
+
+An interrupted run must resume from its CheckpointStore and give the
+same scores as an uninterrupted one, and atomic_path must leave either
+the old or the complete new file behind, never a partial one.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from checkpoint import CheckpointStore, atomic_path, chunk_key
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+# 90 rows per sheet in chunks of 20: 5 chunks each
+CHUNK_ROWS = 20
+CHUNKS = 10
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def analyzer_for(data, checkpoint_path=None) -> UpdatedLLMAnalyzer:
+    analyzer = UpdatedLLMAnalyzer(resamples=0, checkpoint_path=checkpoint_path)
+    analyzer.CHECKPOINT_ROWS = CHUNK_ROWS
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    return analyzer
+
+
+def test_chunk_key_is_content_addressed():
+    key = chunk_key('rules', 'coding', ['C01', 'C02'], ['a', 'b'])
+    assert key == chunk_key('rules', 'coding', ['C01', 'C02'], ['a', 'b'])
+    assert len({key,
+                chunk_key('other', 'coding', ['C01', 'C02'], ['a', 'b']),
+                chunk_key('rules', 'paraphrasing', ['C01', 'C02'], ['a', 'b']),
+                chunk_key('rules', 'coding', ['C01', 'C03'], ['a', 'b']),
+                chunk_key('rules', 'coding', ['C01', 'C02'], ['a', 'c']),
+                chunk_key('rules', 'coding', ['C02', 'C01'], ['b', 'a'])}) == 6
+
+
+def test_store_round_trip_and_discard(tmp_path):
+    path = str(tmp_path / 'run.checkpoint.sqlite')
+    store = CheckpointStore(path)
+    assert store.get('a') is None
+    store.put('a', [[1.0, 2.0], [3.0, 4.0]])
+    store.close()
+
+    store = CheckpointStore(path)
+    assert store.get('a') == [[1.0, 2.0], [3.0, 4.0]]
+    assert len(store) == 1 and store.stats() == {'resumed': 1, 'saved': 0}
+    store.discard()
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('run.checkpoint')]
+
+
+def test_interrupted_run_resumes(tmp_path, records, monkeypatch):
+    expected = analyzer_for(records)
+    expected.process_and_update_excel()
+
+    path = str(tmp_path / 'records.xlsx.checkpoint.sqlite')
+    crashing = analyzer_for(records, path)
+    score = crashing._score_with_cache
+    calls = []
+
+    def score_then_crash(df, category):
+        if len(calls) == 7:
+            raise Interrupted()
+        calls.append(len(df))
+        return score(df, category)
+
+    monkeypatch.setattr(crashing, '_score_with_cache', score_then_crash)
+    with pytest.raises(Interrupted):
+        crashing.process_and_update_excel()
+    assert crashing.checkpoint_stats() == {'resumed': 0, 'saved': 7}
+    crashing._checkpoint.close()
+
+    resumed = analyzer_for(records, path)
+    scored = []
+    score = resumed._score_with_cache
+    monkeypatch.setattr(resumed, '_score_with_cache',
+                        lambda df, category: scored.append(len(df)) or score(df, category))
+    resumed.process_and_update_excel()
+    assert resumed.checkpoint_stats() == {'resumed': 7, 'saved': CHUNKS - 7}
+    assert len(scored) == CHUNKS - 7
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(resumed.data[sheet], expected.data[sheet])
+
+    resumed.discard_checkpoint()
+    assert not os.path.exists(path)
+
+
+def test_changed_rows_are_scored_again(tmp_path, records):
+    path = str(tmp_path / 'records.xlsx.checkpoint.sqlite')
+    first = analyzer_for(records, path)
+    first.process_and_update_excel()
+    first._checkpoint.close()
+
+    changed = {sheet: frame.copy() for sheet, frame in records.items()}
+    changed['Coding'].loc[0, 'Response'] = "def changed():\n    return 1\n"
+    second = analyzer_for(changed, path)
+    second.process_and_update_excel()
+    # Only the chunk holding the changed row is scored again
+    assert second.checkpoint_stats() == {'resumed': CHUNKS - 1, 'saved': 1}
+    second.discard_checkpoint()
+
+
+def test_atomic_path_replaces_on_success(tmp_path):
+    target = tmp_path / 'report.txt'
+    target.write_text('old')
+    os.chmod(target, 0o640)
+    with atomic_path(str(target)) as temp_path:
+        assert os.path.dirname(temp_path) == str(tmp_path)
+        assert temp_path.endswith('.txt') and temp_path != str(target)
+        with open(temp_path, 'w') as f:
+            f.write('new')
+        assert target.read_text() == 'old'
+    assert target.read_text() == 'new'
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ['report.txt']
+
+
+def test_atomic_path_keeps_the_old_file_on_failure(tmp_path):
+    target = tmp_path / 'report.txt'
+    target.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_path(str(target)) as temp_path:
+            with open(temp_path, 'w') as f:
+                f.write('partial')
+            raise RuntimeError("writer failed")
+    assert target.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['report.txt']
+
+
+def test_atomic_path_creates_new_files(tmp_path):
+    target = tmp_path / 'new.json'
+    with atomic_path(str(target)) as temp_path:
+        with open(temp_path, 'w') as f:
+            f.write('{}')
+    assert target.read_text() == '{}'
+    assert stat.S_IMODE(os.stat(target).st_mode) & 0o600 == 0o600
@@ -0,0 +1,146 @@
+"""
+Code Execution Tests
+====================
+
+The execution engine (code_execution.py) must find the code of a
+response, run it in the sandbox against its prompt's test cases, score
+it by the share it passes, and leave the heuristic score alone where
+running says nothing about the code: no code, a module missing from the
+sandbox, no test cases or a snippet skipped by the time budget.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from code_execution import STATUSES, ExecutionEngine, extract_code, run_job
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="the sandbox needs fork")
+
+TESTS = {'coding': {'metric': 'Correctness', 'prompts': {
+    'C01': {'tests': ['area(10, 5) == 25', 'area(3, 4) == 6', 'area(0, 7) == 0',
+                      'bool(area.__doc__)']},
+    'C02': {'setup': ['LIMIT = 3'],
+            'tests': [['assert below(2)', 'assert not below(LIMIT)'], 'raises(ValueError, below, -1)']},
+}}}
+
+CORRECT = '''Here you go:
+
+```python
+def area(base, height):
+    """Area of a triangle."""
+    return 0.5 * base * height
+```
+
+Example output:
+
+```
+>>> area(10, 5)
+25.0
+```
+'''
+
+# Passes the three value tests but has no docstring
+UNDOCUMENTED = "def area(base, height):\n    return base * height / 2\n"
+
+BELOW = '''```python
+def below(value):
+    if value < 0:
+        raise ValueError("negative")
+    return value < LIMIT
+```'''
+
+PROSE = "The area of a triangle is half its base times its height."
+MISSING_MODULE = "import not_a_real_module\n\ndef area(base, height):\n    return 0\n"
+HANGS = "def area(base, height):\n    while True:\n        pass\n"
+
+
+@pytest.fixture
+def engine():
+    engine = ExecutionEngine(TESTS, workers=2, timeout=2)
+    yield engine
+    engine.close()
+
+
+def test_extract_code():
+    code = extract_code(CORRECT)
+    assert code.startswith('def area') and '>>>' not in code
+    assert extract_code(UNDOCUMENTED) == UNDOCUMENTED
+    assert extract_code(PROSE) is None
+    assert extract_code("```python\nnot valid python(\n```") == "not valid python(\n"
+
+
+def test_run_job_statuses():
+    job = {'setup': '', 'tests': TESTS['coding']['prompts']['C01']['tests'], 'timeout': 2,
+           'memory_mb': 512}
+    assert run_job({**job, 'code': extract_code(CORRECT)})['status'] == 'passed'
+    result = run_job({**job, 'code': UNDOCUMENTED})
+    assert (result['status'], result['passed'], result['total']) == ('failed', 3, 4)
+    assert run_job({**job, 'code': MISSING_MODULE})['status'] == 'unsupported'
+    assert run_job({**job, 'code': HANGS})['status'] == 'timeout'
+    result = run_job({**job, 'code': "raise SystemExit(3)\n"})
+    assert result['status'] in ('failed', 'crashed') and result['passed'] == 0
+
+
+def test_pass_rates(engine):
+    responses = [CORRECT, UNDOCUMENTED, BELOW, PROSE, MISSING_MODULE, None, CORRECT]
+    prompt_ids = ['C01', 'C01', 'C02', 'C01', 'C01', 'C01', 'C09']
+    rates, final = engine.pass_rates('coding', responses, prompt_ids)
+    # No code, a missing module, a missing response or no test cases keep the heuristic score
+    assert rates == [1.0, 0.75, 1.0, None, None, None, None]
+    assert all(final)
+
+
+def test_each_response_is_counted_once(engine):
+    responses = [CORRECT, CORRECT, UNDOCUMENTED, PROSE, MISSING_MODULE, None]
+    prompt_ids = ['C01'] * len(responses)
+    engine.pass_rates('coding', responses, prompt_ids)
+    stats = engine.stats()
+    assert stats['responses'] == 5
+    assert sum(stats[status] for status in STATUSES) == stats['responses']
+    assert (stats['passed'], stats['failed'], stats['no_code'], stats['unsupported']) == (2, 1, 1, 1)
+    assert stats['executed'] == 3 and stats['cache_hits'] == 1
+
+    # Scoring the same responses again reuses every executed result
+    engine.pass_rates('coding', responses, prompt_ids)
+    stats = engine.stats()
+    assert stats['responses'] == 10 and stats['executed'] == 3 and stats['cache_hits'] == 5
+    assert sum(stats[status] for status in STATUSES) == stats['responses']
+
+
+def test_time_budget_skips_snippets():
+    engine = ExecutionEngine(TESTS, workers=1, timeout=2, time_budget=0)
+    try:
+        rates, final = engine.pass_rates('coding', [CORRECT, UNDOCUMENTED, PROSE], ['C01'] * 3)
+    finally:
+        engine.close()
+    # Skipped snippets are not final, so they are scored again on the next run
+    assert rates == [None, None, None] and final == [False, False, True]
+    assert engine.stats()['skipped'] == 2 and engine.stats()['executed'] == 0
+
+
+def test_fingerprint_follows_tests_and_limits():
+    fingerprint = ExecutionEngine(TESTS, timeout=2).fingerprint()
+    assert fingerprint == ExecutionEngine(TESTS, timeout=2).fingerprint()
+    assert fingerprint != ExecutionEngine(TESTS, timeout=3).fingerprint()
+    assert fingerprint != ExecutionEngine({'coding': {'metric': 'Correctness', 'prompts': {}}},
+                                          timeout=2).fingerprint()
+
+
+def test_analyzer_scores_correctness_by_pass_rate(engine):
+    frame = pd.DataFrame({'LLM': ['A', 'B', 'C'], 'Prompt_ID': ['C01', 'C01', 'C01'],
+                          'Response': [CORRECT, UNDOCUMENTED, PROSE]})
+    heuristic, _ = UpdatedLLMAnalyzer().score_responses(frame, 'coding')
+    analyzer = UpdatedLLMAnalyzer(executor=engine)
+    executed, _ = analyzer.score_responses(frame, 'coding')
+    low, high = analyzer.rule_sets['coding'].clamp
+    assert executed['Correctness'].tolist()[:2] == [high, low + (high - low) * 0.75]
+    # A response without code keeps its heuristic Correctness
+    assert executed['Correctness'].iloc[2] == heuristic['Correctness'].iloc[2]
+    others = [metric for metric in executed.columns if metric != 'Correctness']
+    pd.testing.assert_frame_equal(executed[others], heuristic[others])
@@ -0,0 +1,131 @@
+"""
+Response Corpus Tests
+=====================
+
+A corpus must give back every response and label of the sheets it was
+written from (empty cells, non-ASCII text and numeric labels included),
+be rebuilt only when its workbook changes, reject files that are not a
+corpus, survive pickling into worker processes, and stream the same
+scores as the workbook itself.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import corpus as corpus_module
+from analysis_script import UpdatedLLMAnalyzer
+from corpus import Corpus, default_corpus_path, import_corpus, write_corpus
+from streaming import iter_record_batches
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def test_round_trip(tmp_path):
+    sheet = pd.DataFrame({
+        'Category': ['Coding', 'Coding', None, 'Coding'],
+        'LLM': ['GPT', None, 'Llama', 'GPT'],
+        'Prompt_ID': [101, 102, 101, 103],
+        'Response': ['def f():\n    return "é ✓"', None, '', 'x' * 10000]
+    })
+    path = str(tmp_path / 'sheet.corpus')
+    write_corpus(path, {'Metrics': pd.DataFrame({'Metric': ['A']}), 'Sheet': sheet})
+
+    with Corpus(path) as corpus:
+        # Sheets without responses are not stored
+        assert list(corpus.sheets) == ['Sheet'] and len(corpus) == 4
+        stored = corpus.sheets['Sheet']
+        assert stored.response(0) == sheet['Response'][0]
+        assert stored.response(1) is None and stored.response(2) == ''
+        assert stored.responses(1, 3).tolist() == [None, '']
+        assert stored.labels('llm').tolist() == ['GPT', None, 'Llama', 'GPT']
+        assert stored.labels('prompt_id').tolist() == [101, 102, 101, 103]
+        assert stored.codes['llm'].dtype == np.int16
+        assert stored.offsets.ctypes.data % 8 == 0
+
+        frame = stored.frame(1, 10)
+        assert list(frame.columns) == ['Category', 'LLM', 'Prompt_ID', 'Response', 'Sheet']
+        assert frame['Response'].tolist() == [None, '', 'x' * 10000]
+        assert frame['Sheet'].unique().tolist() == ['Sheet']
+
+
+def test_records_round_trip(tmp_path, records):
+    path = import_corpus(RECORDS_PATH, str(tmp_path / 'records.corpus'))
+    with Corpus(path) as corpus:
+        assert list(corpus.sheets) == list(SHEETS)
+        for name in SHEETS:
+            stored, expected = corpus.sheets[name], records[name]
+            assert stored.responses().tolist() == expected['Response'].tolist()
+            assert stored.labels('llm').tolist() == expected['LLM'].tolist()
+            assert stored.labels('category').tolist() == expected['Category'].tolist()
+        assert corpus.is_current(RECORDS_PATH)
+    assert default_corpus_path('data/records.xlsx') == os.path.join('data', 'records.corpus')
+
+
+def test_import_rebuilds_only_stale_corpora(tmp_path, monkeypatch):
+    source = str(tmp_path / 'records.xlsx')
+    shutil.copy(RECORDS_PATH, source)
+    path = import_corpus(source)
+    assert path == str(tmp_path / 'records.corpus')
+
+    writes = []
+    write = corpus_module.write_corpus
+    monkeypatch.setattr(corpus_module, 'write_corpus',
+                        lambda *args: writes.append(args[0]) or write(*args))
+    import_corpus(source)
+    assert writes == []
+    import_corpus(source, force=True)
+    assert writes == [path]
+
+    later = time.time() + 10
+    os.utime(source, (later, later))
+    with Corpus(path) as corpus:
+        assert not corpus.is_current(source)
+    import_corpus(source)
+    assert writes == [path, path]
+
+
+def test_invalid_files(tmp_path):
+    path = tmp_path / 'records.corpus'
+    path.write_bytes(b'not a corpus at all')
+    with pytest.raises(ValueError):
+        Corpus(str(path))
+
+
+def test_pickles_as_its_path(tmp_path):
+    path = import_corpus(RECORDS_PATH, str(tmp_path / 'records.corpus'))
+    with Corpus(path) as corpus:
+        state = pickle.dumps(corpus)
+        assert len(state) < 500
+        with pickle.loads(state) as copy:
+            assert copy.sheets['Coding'].responses().tolist() == \
+                corpus.sheets['Coding'].responses().tolist()
+
+
+def test_streams_like_the_workbook(tmp_path, records):
+    path = import_corpus(RECORDS_PATH, str(tmp_path / 'records.corpus'))
+    batches = list(iter_record_batches(path, batch_size=40))
+    assert max(len(batch) for batch in batches) == 40
+    streamed = pd.concat(batches, ignore_index=True)
+    expected = pd.concat(list(iter_record_batches(RECORDS_PATH)), ignore_index=True)
+    for column in ('LLM', 'Prompt_ID', 'Response', 'Sheet'):
+        assert streamed[column].tolist() == expected[column].tolist()
+
+    from_corpus = UpdatedLLMAnalyzer(resamples=0).process_stream(path, batch_size=40)
+    from_workbook = UpdatedLLMAnalyzer(resamples=0).process_stream(RECORDS_PATH, batch_size=40)
+    assert from_corpus['overall_summary'] == from_workbook['overall_summary']
@@ -0,0 +1,123 @@
+"""
+Incremental Re-scoring Tests
+============================
+
+process_incremental must score only the rows that are new or changed
+since the manifest was written, match rows by content rather than
+position, and end up with the same scores and summaries as scoring the
+whole workbook from scratch.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from incremental import RowManifest, match_rows, row_fingerprints
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+ROWS = 180
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def incremental_run(data, manifest_path):
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    return analyzer, analyzer.process_incremental(manifest_path)
+
+
+def assert_matches_full_run(analyzer, results, data):
+    full = UpdatedLLMAnalyzer(resamples=0)
+    full.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    expected = full.process_and_update_excel()
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(analyzer.data[sheet], full.data[sheet])
+    for category in ('coding', 'paraphrasing'):
+        assert list(results[category]['summary']) == list(expected[category]['summary'])
+        for model, summary in expected[category]['summary'].items():
+            for key, value in summary.items():
+                assert results[category]['summary'][model][key] == pytest.approx(value), (model, key)
+    rankings = results['overall_summary']['model_rankings']
+    expected_rankings = expected['overall_summary']['model_rankings']
+    assert [model for model, _ in rankings] == [model for model, _ in expected_rankings]
+    assert [score for _, score in rankings] == pytest.approx([score for _, score in expected_rankings])
+
+
+def test_fingerprints_follow_the_scoring_inputs():
+    frame = pd.DataFrame({'LLM': ['A', 'A', 'B', None], 'Prompt_ID': ['C01', 'C01', 'C01', 'C01'],
+                          'Response': ['x', 'x', 'x', 'x'], 'Notes': ['one', 'two', 'three', 'four']})
+    hashes = row_fingerprints(frame)
+    assert hashes.dtype == np.uint64
+    # Notes do not count; the model does, and a missing model is not the text 'None'
+    assert hashes[0] == hashes[1] and len(set(hashes[1:].tolist())) == 3
+    assert hashes[3] != row_fingerprints(frame.fillna({'LLM': 'None'}))[3]
+
+
+def test_match_rows_pairs_duplicates_once():
+    old = np.array([5, 7, 7, 9], dtype=np.uint64)
+    new = np.array([7, 3, 5, 7, 7], dtype=np.uint64)
+    source, stale = match_rows(old, new)
+    assert source.tolist() == [1, -1, 0, 2, -1]
+    assert stale.tolist() == [False, False, False, True]
+
+
+def test_manifest_round_trip(tmp_path):
+    path = str(tmp_path / 'records.xlsx.manifest.json')
+    manifest = RowManifest('rules')
+    manifest.set_sheet_rows('Coding', np.array([1, 2 ** 64 - 1], dtype=np.uint64),
+                            np.array(['A', None], dtype=object),
+                            np.array([[7.0, 8.0], [6.5, np.nan]]), np.array([7.5, 6.5]), 'coding')
+    manifest.save(path)
+
+    loaded = RowManifest.load(path, 'rules')
+    rows = loaded.sheet_rows('Coding', ['A', 'B'])
+    assert rows['hashes'].tolist() == [1, 2 ** 64 - 1]
+    assert rows['models'].tolist() == ['A', None]
+    np.testing.assert_array_equal(rows['metrics'], [[7.0, 8.0], [6.5, np.nan]])
+    assert loaded.sheet_categories == {'Coding': 'coding'}
+    assert loaded.sheet_rows('Other', ['A', 'B'])['metrics'].shape == (0, 2)
+
+    # Other scoring rules or an unreadable file mean scoring everything again
+    assert RowManifest.load(path, 'new rules') is None
+    assert RowManifest.load(str(tmp_path / 'missing.json'), 'rules') is None
+
+
+def test_unchanged_rows_are_not_scored_again(tmp_path, records):
+    path = str(tmp_path / 'records.xlsx.manifest.json')
+    analyzer, results = incremental_run(records, path)
+    assert results['incremental'] == {'scored_rows': ROWS, 'reused_rows': 0, 'removed_rows': 0}
+    assert_matches_full_run(analyzer, results, records)
+
+    analyzer, results = incremental_run(records, path)
+    assert results['incremental'] == {'scored_rows': 0, 'reused_rows': ROWS, 'removed_rows': 0}
+    assert not results['coding']['scores']
+    assert_matches_full_run(analyzer, results, records)
+
+
+def test_changed_added_and_removed_rows(tmp_path, records):
+    path = str(tmp_path / 'records.xlsx.manifest.json')
+    incremental_run(records, path)
+
+    changed = {sheet: frame.copy() for sheet, frame in records.items()}
+    coding = changed['Coding']
+    coding.loc[0, 'Response'] = "def changed():\n    return 1\n"
+    # Re-ordered rows are still matched by content
+    coding = coding.iloc[::-1].reset_index(drop=True)
+    added = coding.iloc[[5]].assign(Response="print('added')")
+    changed['Coding'] = pd.concat([coding, added], ignore_index=True)
+    changed[SHEETS[1]] = changed[SHEETS[1]].drop(index=[0, 1]).reset_index(drop=True)
+
+    analyzer, results = incremental_run(changed, path)
+    assert results['incremental'] == {'scored_rows': 2, 'reused_rows': ROWS - 3, 'removed_rows': 3}
+    assert_matches_full_run(analyzer, results, changed)
@@ -0,0 +1,120 @@
+"""
+Instrumentation Tests
+=====================
+
+PipelineTrace must count the calls, time, rows and bytes of every stage
+(nested stages inclusively), charge lap times to metric families, and
+write a JSON trace, plus the cProfile stats when profiling. An
+instrumented analyzer must trace its pipeline stages without changing a
+single score.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+import os
+import pstats
+import time
+
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from instrumentation import PipelineTrace, no_laps
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def test_stages_are_counted_inclusively():
+    trace = PipelineTrace()
+    for _ in range(2):
+        with trace.stage('score', rows=10, nbytes=100):
+            with trace.stage('score:lookup', rows=10) as record:
+                time.sleep(0.01)
+                record['bytes'] += 5
+    trace.count('load', rows=3, nbytes=7)
+
+    stages = trace.to_dict()['stages']
+    assert {name: (stage['calls'], stage['rows'], stage['bytes']) for name, stage in stages.items()} == \
+        {'score': (2, 20, 200), 'score:lookup': (2, 20, 10), 'load': (0, 3, 7)}
+    assert stages['score']['seconds'] >= stages['score:lookup']['seconds'] >= 0.02
+
+
+def test_stage_is_recorded_when_the_block_fails():
+    trace = PipelineTrace()
+    with pytest.raises(KeyError):
+        with trace.stage('load', rows=4):
+            raise KeyError('sheet')
+    assert trace.stages['load']['calls'] == 1 and trace.stages['load']['rows'] == 4
+
+
+def test_laps_charge_metric_families():
+    trace = PipelineTrace()
+    for _ in range(3):
+        lap = trace.laps('coding', rows=5)
+        time.sleep(0.005)
+        lap('keyword scan')
+        lap('Correctness')
+    families = trace.to_dict()['metric_families']['coding']
+    assert list(families) == ['keyword scan', 'Correctness']
+    assert families['keyword scan']['calls'] == 3 and families['keyword scan']['rows'] == 15
+    assert families['keyword scan']['seconds'] > families['Correctness']['seconds']
+    assert no_laps('coding', 5)('anything') is None
+
+
+def test_write_with_profile_and_memory(tmp_path):
+    path = str(tmp_path / 'analysis_trace.json')
+    trace = PipelineTrace(profile=True, trace_memory=True)
+    with trace.stage('build'):
+        blocks = [bytearray(1000) for _ in range(100)]
+    trace.write(path)
+    del blocks
+
+    with open(path, encoding='utf-8') as f:
+        written = json.load(f)
+    assert written['total_seconds'] >= written['stages']['build']['seconds']
+    assert 0 < len(written['profile']) <= 25
+    assert written['memory']['peak_bytes'] >= 100 * 1000
+    assert pstats.Stats(str(tmp_path / 'analysis_trace.prof')).total_calls > 0
+    # Stopping again keeps the first stop time
+    stopped = trace.stopped
+    trace.stop()
+    assert trace.stopped == stopped
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_instrumented_run_gives_the_same_scores(records, vectorized):
+    plain = UpdatedLLMAnalyzer(resamples=0, vectorized=vectorized)
+    plain.data = {sheet: frame.copy() for sheet, frame in records.items()}
+    expected = plain.process_and_update_excel()
+    assert plain.trace is None
+
+    analyzer = UpdatedLLMAnalyzer(resamples=0, vectorized=vectorized)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in records.items()}
+    trace = analyzer.instrument()
+    results = analyzer.process_and_update_excel()
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(analyzer.data[sheet], plain.data[sheet])
+    assert results['overall_summary'] == expected['overall_summary']
+
+    stages = trace.to_dict()['stages']
+    for stage in ('process_and_update_excel', 'score:coding', 'score:paraphrasing',
+                  'update_sheet:Coding', 'summary_stats'):
+        assert stages[stage]['calls'] == 1, stage
+    assert stages['score:coding']['rows'] == len(records['Coding'])
+    assert stages['score:coding']['bytes'] >= \
+        records['Coding']['Response'].dropna().map(len).sum()
+    assert stages['process_and_update_excel']['seconds'] >= stages['score:coding']['seconds']
+    if vectorized:
+        # The column scorers time each metric family
+        families = trace.metric_families['coding']
+        assert {'keyword scan', 'assemble'} <= set(families)
+        assert set(analyzer.coding_metrics) <= set(families)
@@ -0,0 +1,105 @@
+"""
+Keyword Matcher Tests
+=====================
+
+Both scan modes of KeywordMatcher (per-term substring search and the
+single-pass trie regex) must set exactly the bits of the groups that have
+a term in the text, as testing every term with ``in`` would.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from rule_engine import KeywordMatcher, load_rules
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+
+class SubstringMatcher(KeywordMatcher):
+    REGEX_MIN_TERMS = 1 << 30
+
+
+class RegexMatcher(KeywordMatcher):
+    REGEX_MIN_TERMS = 0
+
+
+MODES = [SubstringMatcher, RegexMatcher]
+
+# Terms that are prefixes of, overlap with or contain each other
+OVERLAPPING = {
+    'short': ['def', 'de'],
+    'long': ['define', 'undefined'],
+    'inner': ['fin', 'ne'],
+    'spaced': ['for each', 'each'],
+    'symbol': ['o(n)', 'o(n^2)', '->'],
+}
+
+TEXTS = [
+    '',
+    'def',
+    'de',
+    'undefined behaviour',
+    'we define a function',
+    'for each item in a list',
+    'runs in o(n^2) time -> too slow',
+    'o(n)',
+    'definefinene',
+    'nothing here',
+]
+
+
+def expected_hits(groups: dict, text: str) -> int:
+    """
+    Bitmap from testing every term of every group with ``in``.
+    """
+    return sum(1 << position for position, terms in enumerate(groups.values())
+               if any(term in text for term in terms))
+
+
+def response_texts() -> list:
+    texts = list(TEXTS)
+    for sheet in ('Coding', 'Paraphrasing_Gen_Creation'):
+        responses = pd.read_excel(RECORDS_PATH, sheet_name=sheet)['Response'].dropna()
+        texts.extend(str(response).lower() for response in responses)
+    return texts
+
+
+@pytest.mark.parametrize('matcher_class', MODES)
+@pytest.mark.parametrize('category', list(load_rules()))
+def test_shipped_terms_match_per_term_search(matcher_class, category):
+    groups = load_rules()[category]['terms']
+    matcher = matcher_class(groups)
+    for text in response_texts():
+        assert matcher.scan(text) == expected_hits(groups, text), text
+
+
+@pytest.mark.parametrize('matcher_class', MODES)
+def test_overlapping_terms_match_per_term_search(matcher_class):
+    matcher = matcher_class(OVERLAPPING)
+    for text in TEXTS:
+        assert matcher.scan(text) == expected_hits(OVERLAPPING, text), text
+
+
+def test_mode_follows_the_number_of_terms():
+    groups = load_rules()['coding']['terms']
+    assert KeywordMatcher(groups).pattern is None
+    many = {f'group_{number}': [f'term{number}_{index}' for index in range(10)]
+            for number in range(KeywordMatcher.REGEX_MIN_TERMS // 10)}
+    assert KeywordMatcher(many).pattern is not None
+
+
+def test_group_bits():
+    matcher = KeywordMatcher(OVERLAPPING)
+    assert matcher.bits == {name: 1 << position for position, name in enumerate(OVERLAPPING)}
+    assert matcher.scan('each') & matcher.bits['spaced']
+    assert not matcher.scan('each') & matcher.bits['long']
+
+
+def test_too_many_groups():
+    with pytest.raises(ValueError):
+        KeywordMatcher({f'group_{number}': ['term'] for number in range(64)})
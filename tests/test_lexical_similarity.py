@@ -0,0 +1,93 @@
+"""
+Source Similarity Tests
+=======================
+
+The row-wise (SourceIndex.features) and column-wise
+(SourceIndex.column_features) source features must agree, and the rules
+testing them must only apply with source_similarity=True.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lexical_similarity import SOURCE_FEATURES, SourceIndex, load_source_index
+from rule_engine import RULES_PATH, load_rules, without_source_rules
+from scoring_core import ResponseScorer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INDEX = load_source_index(os.path.join(ROOT, 'paraphrasing_prompts.md'), 'P')
+
+
+def paraphrases() -> pd.DataFrame:
+    df = pd.read_excel(os.path.join(ROOT, 'records.xlsx'), sheet_name='Paraphrasing_Gen_Creation')
+    extra = pd.DataFrame({
+        'Response': ['', 'word', 'The The the', 'Ünïcödé — naïve café', '1 2 3 4 5 6',
+                     INDEX.sources['P01'], INDEX.sources['P01'].upper(), 'x ' * 500],
+        'Prompt_ID': ['P01', 'P02', 'P03', 'P04', 'P05', 'P01', 'P01', 'P99']
+    })
+    return pd.concat([df[['Response', 'Prompt_ID']], extra], ignore_index=True)
+
+
+def test_sources_are_loaded():
+    assert len(INDEX.sources) == 30
+    assert all(text.strip() for text in INDEX.sources.values())
+
+
+def test_row_and_column_features_are_identical():
+    df = paraphrases()
+    lowered = df['Response'].fillna('').map(str).str.lower()
+    columns = INDEX.column_features(lowered, df['Prompt_ID'])
+    for position, (text, prompt_id) in enumerate(zip(lowered, df['Prompt_ID'])):
+        row = INDEX.features(text, prompt_id)
+        for feature in SOURCE_FEATURES:
+            expected, got = row[feature], columns[feature][position]
+            if math.isnan(expected):
+                assert math.isnan(got), (feature, prompt_id)
+            else:
+                assert got == expected, (feature, prompt_id, got, expected)
+
+
+def test_source_text_is_similar_to_itself():
+    lowered = INDEX.sources['P01'].lower()
+    features = INDEX.features(lowered, 'P01')
+    assert features['source_similarity'] == pytest.approx(1.0)
+    assert features['source_overlap'] == pytest.approx(1.0)
+    assert features['copy_ratio'] == pytest.approx(1.0)
+
+
+def test_unknown_prompt_has_no_features():
+    assert all(math.isnan(value) for value in INDEX.features('some text', 'P99').values())
+    columns = INDEX.column_features(pd.Series(['some text']), ['P99'])
+    assert all(np.isnan(values[0]) for values in columns.values())
+
+
+def test_digest_depends_on_sources():
+    other = SourceIndex({**INDEX.sources, 'P01': 'changed'})
+    assert other.digest() != INDEX.digest()
+
+
+def test_source_rules_are_opt_in():
+    spec = load_rules(RULES_PATH)['paraphrasing']
+    stripped = without_source_rules(spec)
+    assert 'sources' in spec and 'sources' not in stripped
+    assert ResponseScorer().rule_sets['paraphrasing'].source_features == []
+    enabled = ResponseScorer(source_similarity=True)
+    assert enabled.rule_sets['paraphrasing'].source_features
+    assert enabled.scoring_fingerprint() != ResponseScorer().scoring_fingerprint()
+
+
+def test_opt_in_batch_scores_match_row_scores():
+    rule_set = ResponseScorer(source_similarity=True).rule_sets['paraphrasing']
+    df = paraphrases()
+    frame = rule_set.evaluate_columns(df['Response'], df['Prompt_ID'])
+    for position, (response, prompt_id) in enumerate(zip(df['Response'], df['Prompt_ID'])):
+        for metric, score in rule_set.evaluate(response, prompt_id).items():
+            assert frame[metric].iloc[position] == pytest.approx(score, abs=1e-9)
@@ -0,0 +1,171 @@
+"""
+Model and Category Discovery Tests
+==================================
+
+The models must come from the data rather than a fixed list, and every
+category registered at runtime must be scored through the same path as
+the built-in ones: rows are routed by sheet, Category label or Prompt_ID
+prefix, a sheet may mix categories, and the full and stream runs must
+agree on a workbook with a fourth model and a third category.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer, metric_columns
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+MODELS = ['GPT-4.1-mini', 'Llama', 'Mistral']
+
+SUMMARY_SPEC = {
+    'sheets': ['Summaries'],
+    'prompt_prefix': 'S',
+    'clamp': [0.0, 10.0],
+    'weights': {'Brevity': 0.3, 'Coverage': 0.2, 'Structure': 0.2, 'Clarity': 0.2, 'Tone': 0.1},
+    'terms': {'summary': ['in short', 'overall', 'summary'], 'hedge': ['maybe', 'perhaps']},
+    'metrics': {
+        'Brevity': {'base': 6.0, 'rules': [
+            {'when': {'feature': 'words', 'max': 40}, 'add': 3.0},
+            {'when': {'feature': 'words', 'min': 200}, 'add': -3.0}
+        ]},
+        'Coverage': {'base': 5.0, 'rules': [{'when': 'summary', 'add': 2.0}]},
+        'Structure': {'base': 5.0, 'rules': [{'when': {'feature': 'lines', 'min': 2}, 'add': 2.5}]},
+        'Clarity': {'base': 7.0, 'rules': [{'when': {'any': ['hedge']}, 'add': -2.0}]},
+        'Tone': {'base': 8.0, 'rules': []}
+    }
+}
+
+SUMMARIES = [
+    "In short, the method works.",
+    "Overall the results improve.\nMaybe the baseline was weak.",
+    "A long answer " + "with many words " * 80,
+    "",
+]
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def analyze(data, models=None, summaries=False):
+    analyzer = UpdatedLLMAnalyzer(resamples=0, models=models)
+    if summaries:
+        analyzer.register_category('summarization', SUMMARY_SPEC)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    return analyzer, analyzer.process_and_update_excel()
+
+
+@pytest.fixture(scope='module')
+def baseline(records):
+    return analyze(records)
+
+
+def extended(records):
+    """
+    records.xlsx with a fourth model answering like Llama and a
+    summarization sheet.
+    """
+    data = {sheet: frame.copy() for sheet, frame in records.items()}
+    for sheet in SHEETS:
+        frame = data[sheet]
+        data[sheet] = pd.concat([frame, frame[frame['LLM'] == 'Llama'].assign(LLM='Zephyr')],
+                                ignore_index=True)
+    data['Summaries'] = pd.DataFrame({
+        'Category': 'Summarization',
+        'LLM': ['Zephyr', 'Llama', 'Mistral', 'Llama'],
+        'Prompt': 'Summarize the text',
+        'Response': SUMMARIES,
+        'Prompt_ID': ['S01', 'S01', 'S02', 'S02'],
+    })
+    return data
+
+
+def test_models_come_from_the_data(baseline):
+    analyzer, results = baseline
+    assert analyzer.models == MODELS and analyzer.categories == ['coding', 'paraphrasing']
+    assert sorted(model for model, _ in results['overall_summary']['model_rankings']) == MODELS
+
+
+def test_selected_models(records, baseline):
+    _, expected = baseline
+    analyzer, results = analyze(records, models=['Mistral', 'Llama'])
+    assert analyzer.models == ['Mistral', 'Llama']
+    assert list(results['coding']['summary']) == ['Mistral', 'Llama']
+    for category in ('coding', 'paraphrasing'):
+        for model in ('Mistral', 'Llama'):
+            assert results[category]['summary'][model] == expected[category]['summary'][model]
+
+
+def test_new_model_and_category(records, baseline):
+    _, expected = baseline
+    analyzer, results = analyze(extended(records), summaries=True)
+    assert analyzer.models == MODELS + ['Zephyr']
+    assert analyzer.categories == ['coding', 'paraphrasing', 'summarization']
+
+    # The other models are scored as before; the new one like the model it copies
+    for category in ('coding', 'paraphrasing'):
+        summaries = results[category]['summary']
+        for model in MODELS:
+            assert summaries[model]['average_score'] == pytest.approx(
+                expected[category]['summary'][model]['average_score'])
+        assert summaries['Zephyr']['average_score'] == pytest.approx(summaries['Llama']['average_score'])
+
+    # Five metrics, written to five columns
+    sheet = analyzer.data['Summaries']
+    rule_set = analyzer.rule_sets['summarization']
+    for position, response in enumerate(SUMMARIES):
+        scores = rule_set.evaluate(response, sheet['Prompt_ID'][position])
+        assert sheet.loc[position, metric_columns(5)].tolist() == list(scores.values())
+        assert sheet.loc[position, 'Score'] == pytest.approx(
+            sum(scores[metric] * weight for metric, weight in SUMMARY_SPEC['weights'].items()))
+    assert 'Metric_E' not in analyzer.data['Coding'].columns
+    assert results['summarization']['summary']['Llama']['total_responses'] == 2
+    # GPT-4.1-mini has no summaries: it is averaged over the two categories it covers
+    covered = results['overall_summary']['categories_covered']
+    assert covered == {'GPT-4.1-mini': 2, 'Llama': 3, 'Mistral': 3, 'Zephyr': 3}
+
+    report = analyzer.generate_report(results)
+    assert "SUMMARIZATION" in report.upper() and "/30" not in report
+
+
+def test_mixed_sheet_scores_like_the_home_sheets(records, baseline):
+    expected, _ = baseline
+    data = {sheet: frame.copy() for sheet, frame in records.items()}
+    # Rows of both categories in one sheet, routed by their Prompt_ID
+    mixed = pd.concat([data['Coding'].iloc[::7], data['Paraphrasing_Gen_Creation'].iloc[::5]])
+    data['Mixed'] = mixed.assign(Category='Mixed').reset_index(drop=True)
+    analyzer, results = analyze(data)
+    columns = metric_columns(4) + ['Score']
+    home = pd.concat([expected.data['Coding'].iloc[::7], expected.data['Paraphrasing_Gen_Creation'].iloc[::5]])
+    np.testing.assert_array_equal(analyzer.data['Mixed'][columns].to_numpy(dtype=float),
+                                  home[columns].to_numpy(dtype=float))
+    mixed_coding = ((mixed['LLM'] == 'Llama') & mixed['Prompt_ID'].str.startswith('C')).sum()
+    assert results['coding']['summary']['Llama']['total_responses'] == 30 + mixed_coding
+
+
+def test_stream_agrees_with_the_full_run(tmp_path, records):
+    data = extended(records)
+    path = str(tmp_path / 'extended.xlsx')
+    with pd.ExcelWriter(path) as writer:
+        for sheet, frame in data.items():
+            frame.to_excel(writer, sheet_name=sheet, index=False)
+    _, full = analyze(data, summaries=True)
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.register_category('summarization', SUMMARY_SPEC)
+    streamed = analyzer.process_stream(path, batch_size=50)
+    for category in ('coding', 'paraphrasing', 'summarization'):
+        assert list(streamed[category]['summary']) == list(full[category]['summary'])
+        for model, summary in full[category]['summary'].items():
+            assert streamed[category]['summary'][model]['average_score'] == \
+                pytest.approx(summary['average_score']), (category, model)
+    assert [model for model, _ in streamed['overall_summary']['model_rankings']] == \
+        [model for model, _ in full['overall_summary']['model_rankings']]
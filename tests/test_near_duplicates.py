@@ -0,0 +1,128 @@
+"""
+Near-Duplicate Tests
+====================
+
+The MinHash index must cluster identical and nearly identical responses
+to one prompt, and only those: never responses to different prompts,
+missing responses, or pairs below the threshold. An analyzer run with
+near_duplicates set must score each cluster once, share its scores with
+the other members, leave every other score as it was, and report the
+clusters per model and per Prompt_ID.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from lexical_similarity import shingle_hashes, token_hashes
+from near_duplicates import (PERMUTATIONS, SHINGLE_SIZE, THRESHOLD, DuplicateReport, NearDuplicateIndex,
+                             minhash_signatures)
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+METRICS = ['Metric_A', 'Metric_B', 'Metric_C', 'Metric_D', 'Score']
+
+WORDS = [f"word{index}" for index in range(100)]
+TEXT = " ".join(WORDS)
+# One word in a hundred changed: 95 of 101 shingles shared
+NEAR = " ".join(WORDS[:50] + ['changed'] + WORDS[51:])
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def test_signatures_estimate_jaccard_similarity():
+    # 38 of 78 distinct shingles shared
+    responses = pd.Series([" ".join(WORDS[:60]), " ".join(WORDS[20:80]), ""])
+    rows, hashes, _ = token_hashes(responses)
+    rows, shingles = shingle_hashes(rows, hashes, SHINGLE_SIZE)
+    signatures = minhash_signatures(rows, shingles, len(responses))
+    assert signatures.shape == (3, PERMUTATIONS)
+    assert (signatures[0] == signatures[1]).mean() == pytest.approx(38 / 78, abs=0.1)
+    # Rows without shingles have no hashes at all
+    assert (signatures[2] == 1 << 32).all() and (signatures[:2] < 1 << 32).all()
+    assert np.array_equal(minhash_signatures(rows, shingles, len(responses)), signatures)
+
+
+def test_index_clusters_near_duplicates():
+    responses = pd.Series([TEXT, "something else entirely", NEAR, TEXT.upper(), None, None, 'ok', 'OK'])
+    index = NearDuplicateIndex(responses)
+    assert index.representatives.tolist() == [0, 1, 0, 0, 4, 5, 6, 6]
+    clusters = index.clusters()
+    assert [members.tolist() for members in clusters] == [[0, 2, 3], [6, 7]]
+
+
+def test_index_respects_groups_and_threshold():
+    responses = pd.Series([TEXT, TEXT, NEAR, TEXT], index=[10, 20, 30, 40])
+    index = NearDuplicateIndex(responses, ['C01', 'C02', 'C01', 'C02'])
+    assert index.representatives.tolist() == [0, 1, 0, 1]
+    # The pair with a changed word is below a stricter threshold
+    strict = NearDuplicateIndex(responses, ['C01', 'C02', 'C01', 'C02'], threshold=0.99)
+    assert strict.representatives.tolist() == [0, 1, 2, 1]
+    assert NearDuplicateIndex(pd.Series([TEXT])).clusters() == []
+    assert NearDuplicateIndex(pd.Series([], dtype=object)).representatives.tolist() == []
+
+
+def test_duplicate_report():
+    report = DuplicateReport()
+    responses = pd.Series([TEXT, TEXT, NEAR, 'other', 'ok', 'ok'])
+    index = NearDuplicateIndex(responses, ['C01', 'C01', 'C01', 'C01', 'C02', 'C02'])
+    report.add(index, ['A', 'B', 'A', 'B', 'A', 'A'], ['C01', 'C01', 'C01', 'C01', 'C02', 'C02'])
+    assert report.summary() == {
+        'threshold': THRESHOLD, 'responses': 6, 'clusters': 2, 'duplicates': 3, 'cross_model': 1,
+        'models': {'A': {'responses': 4, 'cross_model': 2}, 'B': {'responses': 1, 'cross_model': 1}},
+        'prompts': {'C01': {'clusters': 1, 'responses': 3, 'models': ['A', 'B']},
+                    'C02': {'clusters': 1, 'responses': 2, 'models': ['A']}}
+    }
+
+
+def analyze(data, **kwargs):
+    analyzer = UpdatedLLMAnalyzer(resamples=0, **kwargs)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    return analyzer, analyzer.process_and_update_excel()
+
+
+def test_records_have_no_near_duplicates(records):
+    _, plain = analyze(records)
+    analyzer, results = analyze(records, near_duplicates=THRESHOLD)
+    assert results['duplicates']['responses'] == 180 and results['duplicates']['clusters'] == 0
+    assert results['overall_summary'] == plain['overall_summary']
+    assert analyzer.scoring_fingerprint() != UpdatedLLMAnalyzer().scoring_fingerprint()
+
+
+def test_clusters_share_their_scores(records):
+    data = {sheet: frame.copy() for sheet, frame in records.items()}
+    coding = data['Coding']
+    first = coding.index[(coding['LLM'] == 'Llama') & (coding['Prompt_ID'] == 'C01')][0]
+    copy = coding.index[(coding['LLM'] == 'Mistral') & (coding['Prompt_ID'] == 'C01')][0]
+    other = coding.index[(coding['LLM'] == 'Mistral') & (coding['Prompt_ID'] == 'C02')][0]
+    # A re-run with trailing whitespace, and the same text answering another prompt
+    coding.loc[copy, 'Response'] = coding.loc[first, 'Response'] + "\n\n"
+    coding.loc[other, 'Response'] = coding.loc[first, 'Response']
+
+    plain, plain_results = analyze(data)
+    analyzer, results = analyze(data, near_duplicates=THRESHOLD)
+    scored = analyzer.data['Coding']
+    assert scored.loc[copy, METRICS].tolist() == scored.loc[first, METRICS].tolist()
+    rest = scored.index != copy
+    for sheet in ('Coding', 'Paraphrasing_Gen_Creation'):
+        expected = plain.data[sheet][METRICS]
+        kept = rest if sheet == 'Coding' else slice(None)
+        pd.testing.assert_frame_equal(analyzer.data[sheet][METRICS][kept], expected[kept])
+
+    assert results['duplicates'] == {
+        'threshold': THRESHOLD, 'responses': 180, 'clusters': 1, 'duplicates': 1, 'cross_model': 1,
+        'models': {'Llama': {'responses': 1, 'cross_model': 1}, 'Mistral': {'responses': 1, 'cross_model': 1}},
+        'prompts': {'C01': {'clusters': 1, 'responses': 2, 'models': ['Llama', 'Mistral']}}
+    }
+    report = analyzer.generate_report(results)
+    assert "NEAR-DUPLICATE RESPONSES" in report and "Duplicates: 1" in report
+    assert "NEAR-DUPLICATE RESPONSES" not in plain.generate_report(plain_results)
@@ -0,0 +1,129 @@
+"""
+Output Writer Tests
+===================
+
+Every output format must read back to the scored sheets: the full and
+streamed workbooks, the Parquet and Arrow sidecar files, and the
+incremental writer, which must patch only the score columns of the
+scored sheets and copy every other part of the workbook unchanged.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+import shutil
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from output_writers import (SCORE_COLUMNS, WRITERS, IncrementalXlsxWriter, OutputWriter,
+                            get_writer, register_writer)
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+@pytest.fixture(scope='module')
+def scored():
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.data = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    analyzer.process_and_update_excel()
+    # Shift the scores so a writer that skips them cannot pass by reading back the input
+    for sheet in SHEETS:
+        frame = analyzer.data[sheet]
+        for column in frame.columns:
+            if SCORE_COLUMNS.fullmatch(str(column)):
+                frame[column] = (frame[column] + 0.25).round(2)
+        frame.loc[3, 'Score'] = np.nan
+    return analyzer
+
+
+def assert_scores_equal(written: pd.DataFrame, expected: pd.DataFrame):
+    assert list(written.columns) == list(expected.columns)
+    for column in expected.columns:
+        if SCORE_COLUMNS.fullmatch(str(column)):
+            np.testing.assert_allclose(written[column].to_numpy(dtype=float),
+                                       expected[column].to_numpy(dtype=float), err_msg=column)
+    assert written['Response'].tolist() == expected['Response'].tolist()
+
+
+@pytest.mark.parametrize('output_format', ['xlsx', 'xlsx-stream', 'xlsx-incremental'])
+def test_workbooks_read_back(scored, tmp_path, output_format):
+    path = str(tmp_path / 'records.xlsx')
+    shutil.copy(RECORDS_PATH, path)
+    assert get_writer(output_format).write(scored.data, path, set(SHEETS)) == [path]
+    written = pd.read_excel(path, sheet_name=None)
+    assert list(written) == list(scored.data)
+    for sheet in SHEETS:
+        assert_scores_equal(written[sheet], scored.data[sheet])
+    pd.testing.assert_frame_equal(written['Metrics'], scored.data['Metrics'])
+    assert os.listdir(tmp_path) == ['records.xlsx']
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'arrow'])
+def test_sidecar_files_read_back(scored, tmp_path, output_format):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'records.xlsx')
+    paths = get_writer(output_format).write(scored.data, path)
+    assert [os.path.basename(name) for name in paths] == \
+        [f"records.{sheet}.{output_format}" for sheet in scored.data]
+    for sheet, name in zip(scored.data, paths):
+        written = pd.read_parquet(name) if output_format == 'parquet' else pd.read_feather(name)
+        if sheet in SHEETS:
+            assert_scores_equal(written, scored.data[sheet])
+        else:
+            assert written['Metric'].tolist() == scored.data[sheet]['Metric'].tolist()
+
+
+def test_incremental_writer_copies_the_other_parts(scored, tmp_path):
+    path = str(tmp_path / 'records.xlsx')
+    shutil.copy(RECORDS_PATH, path)
+    # Only the coding sheet was scored
+    IncrementalXlsxWriter().write(scored.data, path, {'Coding'})
+
+    with zipfile.ZipFile(RECORDS_PATH) as before, zipfile.ZipFile(path) as after:
+        parts = IncrementalXlsxWriter._sheet_parts(before)
+        assert before.namelist() == after.namelist()
+        for name in before.namelist():
+            if name != parts['Coding']:
+                assert before.read(name) == after.read(name), name
+
+    written = pd.read_excel(path, sheet_name=None)
+    assert_scores_equal(written['Coding'], scored.data['Coding'])
+    original = pd.read_excel(RECORDS_PATH, sheet_name=SHEETS[1])
+    pd.testing.assert_frame_equal(written[SHEETS[1]], original)
+
+
+def test_incremental_writer_falls_back_to_a_full_rewrite(scored, tmp_path):
+    path = str(tmp_path / 'records.xlsx')
+    # No workbook yet, then one whose sheets no longer match the data
+    IncrementalXlsxWriter().write(scored.data, path)
+    assert_scores_equal(pd.read_excel(path, sheet_name='Coding'), scored.data['Coding'])
+
+    fewer_rows = dict(scored.data)
+    fewer_rows['Coding'] = scored.data['Coding'].iloc[:40]
+    IncrementalXlsxWriter().write(fewer_rows, path, {'Coding'})
+    assert len(pd.read_excel(path, sheet_name='Coding')) == 40
+
+
+def test_writer_registry(scored, tmp_path):
+    with pytest.raises(ValueError):
+        get_writer('xls')
+
+    class CsvWriter(OutputWriter):
+        def write(self, data, filename, updated_sheets=None):
+            data['Coding'].to_csv(filename, index=False)
+            return [filename]
+
+    register_writer('csv', CsvWriter)
+    try:
+        path = str(tmp_path / 'records.csv')
+        scored.save_updated_excel(path, 'csv')
+        assert_scores_equal(pd.read_csv(path), scored.data['Coding'])
+    finally:
+        del WRITERS['csv']
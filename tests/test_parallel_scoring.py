@@ -0,0 +1,80 @@
+"""
+Parallel Scoring Tests
+======================
+
+Scoring across a process pool (--workers) must split sheets into
+contiguous chunks and merge them back in row order, so the scores are
+identical to scoring in one process.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def parallel(workers: int, **kwargs) -> UpdatedLLMAnalyzer:
+    analyzer = UpdatedLLMAnalyzer(workers=workers, **kwargs)
+    # Small enough for records.xlsx to be split across the workers
+    analyzer.MIN_ROWS_PER_WORKER = 10
+    return analyzer
+
+
+@pytest.mark.parametrize('workers, n_rows', [(1, 1000), (2, 15), (2, 90), (3, 91), (4, 7)])
+def test_chunks_cover_the_rows_in_order(workers, n_rows):
+    chunks = parallel(workers).plan_chunks(n_rows)
+    assert chunks[0][0] == 0 and chunks[-1][1] == n_rows
+    assert all(stop == start for (_, stop), (start, _) in zip(chunks, chunks[1:]))
+    assert all(start < stop for start, stop in chunks)
+    expected_workers = min(workers, n_rows // 10)
+    if expected_workers <= 1:
+        assert chunks == [(0, n_rows)]
+    else:
+        assert len(chunks) <= expected_workers * UpdatedLLMAnalyzer.CHUNKS_PER_WORKER
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_workers_give_the_same_scores(records, vectorized):
+    serial = UpdatedLLMAnalyzer(vectorized=vectorized)
+    pooled = parallel(2, vectorized=vectorized)
+    try:
+        for category, sheet in (('coding', 'Coding'), ('paraphrasing', SHEETS[1])):
+            frame = records[sheet]
+            # A shuffled, non-default index must come back unchanged
+            order = np.random.default_rng(0).permutation(len(frame))
+            shuffled = frame.iloc[order].set_index(pd.Index(order * 10 + 7))
+            expected = serial._score_in_chunks(category, shuffled['Response'], shuffled['Prompt_ID'])
+            result = pooled._score_in_chunks(category, shuffled['Response'], shuffled['Prompt_ID'])
+            assert pooled._pool is not None
+            pd.testing.assert_frame_equal(result, expected)
+    finally:
+        pooled.close()
+    assert pooled._pool is None
+
+
+def test_full_run_with_workers(records):
+    serial = UpdatedLLMAnalyzer(resamples=0)
+    serial.data = {sheet: frame.copy() for sheet, frame in records.items()}
+    expected = serial.process_and_update_excel()
+
+    pooled = parallel(3, resamples=0)
+    pooled.data = {sheet: frame.copy() for sheet, frame in records.items()}
+    results = pooled.process_and_update_excel()
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(pooled.data[sheet], serial.data[sheet])
+    assert results['overall_summary'] == expected['overall_summary']
@@ -0,0 +1,142 @@
+"""
+Report Writer Tests
+===================
+
+The text report of records.xlsx must stay the committed
+comprehensive_analysis_report.txt, the JSON report must be the report
+document itself, and the Markdown and HTML reports must hold the same
+tables with their cells escaped. The document must only grow with the
+number of models, metrics and prompts, paging through the per-prompt
+tables, never with the number of responses.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import json
+import os
+import re
+
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from report_writers import (REPORT_WRITERS, ReportWriter, get_report_writer, register_report_writer,
+                            render_report)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDS_PATH = os.path.join(ROOT, 'records.xlsx')
+REPORT_PATH = os.path.join(ROOT, 'comprehensive_analysis_report.txt')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+def analyze(data, **kwargs):
+    analyzer = UpdatedLLMAnalyzer(**kwargs)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    return analyzer, analyzer.process_and_update_excel()
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+@pytest.fixture(scope='module')
+def analysis(records):
+    return analyze(records)
+
+
+def test_text_report_is_unchanged(analysis):
+    analyzer, results = analysis
+    with open(REPORT_PATH, encoding='utf-8') as f:
+        assert analyzer.generate_report(results) == f.read()
+
+
+def test_json_report_is_the_document(analysis):
+    analyzer, results = analysis
+    document = analyzer.build_report(results)
+    written = json.loads(analyzer.generate_report(results, 'json'))
+    assert written['title'] == document['title']
+    assert [section['kind'] for section in written['sections']] == \
+        [section['kind'] for section in document['sections']]
+    rankings = written['sections'][0]
+    assert rankings['rankings'] == [list(pair) for pair in document['sections'][0]['rankings']]
+
+
+def test_markdown_and_html_hold_the_same_tables(analysis):
+    analyzer, results = analysis
+    markdown = analyzer.generate_report(results, 'md')
+    page = analyzer.generate_report(results, 'html')
+    tables = len(re.findall(r'^\|( --- \|)+$', markdown, re.MULTILINE))
+    assert tables > 0 and page.count('<table>') == tables
+    for model, score in results['overall_summary']['model_rankings']:
+        assert f"| {model} | {score:.2f} |" in markdown
+        assert f"<td>{model}</td><td>{score:.2f}</td>" in page
+    assert page.startswith('<!DOCTYPE html>') and page.rstrip().endswith('</html>')
+    # Self-contained: no scripts, stylesheets or images to fetch
+    assert not re.search(r'<(script|link|img)\b', page)
+
+
+def test_cells_are_escaped(records):
+    data = {sheet: frame.copy() for sheet, frame in records.items()}
+    for sheet in SHEETS:
+        data[sheet]['LLM'] = data[sheet]['LLM'].replace('Llama', 'Llama <3|b>')
+    analyzer, results = analyze(data, resamples=0)
+    markdown = analyzer.generate_report(results, 'md')
+    assert "| Llama <3\\|b> |" in markdown
+    page = analyzer.generate_report(results, 'html')
+    assert "Llama &lt;3|b&gt;" in page and "<3|b>" not in page
+
+
+def test_prompt_tables_are_paged(analysis):
+    analyzer, results = analysis
+    document = analyzer.build_report(results, max_rows=7, page=2)
+    tables = [section for section in document['sections'] if section['kind'] == 'prompt_table']
+    assert [table['category'] for table in tables] == ['coding', 'paraphrasing']
+    for table in tables:
+        assert (table['first_row'], table['page'], table['pages'], table['total_rows']) == (8, 2, 5, 30)
+        assert len(table['rows']) == 7 and table['columns'][0] == 'Prompt'
+    assert "8-14 of 30, page 2 of 5" in render_report(document, 'txt')
+
+    # Pages past the end show the last one
+    last = analyzer.build_report(results, max_rows=7, page=99)
+    for table in [section for section in last['sections'] if section['kind'] == 'prompt_table']:
+        assert (table['page'], table['first_row'], len(table['rows'])) == (5, 29, 2)
+    none = analyzer.build_report(results, max_rows=0)
+    assert not [section for section in none['sections'] if section['kind'] == 'prompt_table']
+
+
+def test_document_does_not_grow_with_responses(records, analysis):
+    analyzer, results = analysis
+    # Every response three times over
+    tripled = {sheet: pd.concat([frame] * 3, ignore_index=True) if sheet in SHEETS else frame
+               for sheet, frame in records.items()}
+    bigger, bigger_results = analyze(tripled, resamples=200)
+    small = analyzer.generate_report(results, 'json')
+    large = bigger.generate_report(bigger_results, 'json')
+    assert abs(len(large) - len(small)) < 0.05 * len(small)
+
+
+def test_report_formats(tmp_path, analysis):
+    analyzer, results = analysis
+    with pytest.raises(ValueError):
+        get_report_writer('pdf')
+
+    class CsvReportWriter(ReportWriter):
+        extension = 'csv'
+
+        def write(self, document, stream):
+            for model, score in document['sections'][0]['rankings']:
+                stream.write(f"{model},{score:.2f}\n")
+
+    register_report_writer('csv', CsvReportWriter)
+    try:
+        basename = str(tmp_path / 'report')
+        paths = analyzer.write_reports(results, basename, ('txt', 'md', 'json', 'html', 'csv'))
+    finally:
+        del REPORT_WRITERS['csv']
+    assert [os.path.basename(path) for path in paths] == \
+        ['report.txt', 'report.md', 'report.json', 'report.html', 'report.csv']
+    with open(paths[-1], encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == len(results['overall_summary']['model_rankings'])
@@ -0,0 +1,102 @@
+"""
+Result Store Tests
+==================
+
+ScoreTable must keep every scored row across appended chunks, with the
+model and prompt labels dictionary-encoded (missing labels under None),
+give the same summaries and metric averages as NumPy over the rows, and
+its DetailedScores view must hold the detailed score dicts of the
+per-model lists it replaced.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from result_store import ScoreTable
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+METRICS = ['Correctness', 'Efficiency']
+
+
+def filled_table() -> ScoreTable:
+    table = ScoreTable(METRICS)
+    table.append(pd.Series(['A', 'B', 'A']), pd.Series(['C01', 'C01', 'C02']),
+                 np.array([10, 20, 30]), np.array([[8.0, 6.0], [5.0, 5.0], [9.0, 7.0]]),
+                 np.array([7.0, 5.0, 8.0]))
+    table.append(pd.Series(['B', None, 'C']), pd.Series(['C02', 'C03', np.nan]),
+                 np.array([40, 0, 50]), np.array([[6.0, 4.0], [0.0, 0.0], [10.0, 10.0]]),
+                 np.array([5.0, 0.0, 10.0]))
+    return table
+
+
+def test_rows_are_encoded_across_chunks():
+    table = filled_table()
+    assert len(table) == 6
+    assert table.models == ['A', 'B', None, 'C']
+    assert table.prompts == ['C01', 'C02', 'C03', None]
+    assert table.columns['model'].dtype == np.int32
+    assert table.rows('B').tolist() == [1, 3]
+    assert None in table and 'D' not in table
+    assert table.metric_scores('A', 'Efficiency').tolist() == [6.0, 7.0]
+
+    # Appending after the columns were joined keeps every row
+    table.append(pd.Series(['A']), pd.Series(['C01']), np.array([5]), np.array([[1.0, 1.0]]),
+                 np.array([1.0]))
+    assert table.scores('A').tolist() == [7.0, 8.0, 1.0]
+
+
+def test_summary_and_metric_averages():
+    table = filled_table()
+    assert table.summary('B') == {'average_score': 5.0, 'median_score': 5.0, 'std_score': 0.0,
+                                  'min_score': 5.0, 'max_score': 5.0, 'total_responses': 2}
+    summary = table.summary('A')
+    scores = np.array([7.0, 8.0])
+    assert summary['average_score'] == scores.mean() and summary['std_score'] == scores.std()
+    assert table.metric_averages('A') == {'Correctness': 8.5, 'Efficiency': 6.5}
+
+
+def test_detailed_view():
+    view = filled_table().detailed_view()
+    assert list(view) == ['A', 'B', None, 'C'] and len(view) == 4
+    assert view['A'] == [
+        {'prompt_id': 'C01', 'response_length': 10,
+         'metric_scores': {'Correctness': 8.0, 'Efficiency': 6.0}, 'weighted_score': 7.0},
+        {'prompt_id': 'C02', 'response_length': 30,
+         'metric_scores': {'Correctness': 9.0, 'Efficiency': 7.0}, 'weighted_score': 8.0}]
+    assert view['C'][0]['prompt_id'] is None
+    with pytest.raises(KeyError):
+        view['D']
+
+
+def test_empty_table():
+    table = ScoreTable(METRICS)
+    assert len(table) == 0 and table.nbytes == 0
+    assert table.columns['metrics'].shape == (0, 2)
+    assert dict(table.detailed_view()) == {}
+
+
+def test_analyzer_results_use_the_table():
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.data = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    results = analyzer.process_and_update_excel()
+    sheet = analyzer.data['Coding']
+    table = results['coding']['scores']
+    assert len(table) == len(sheet)
+    # Well under the several hundred bytes per row of the per-model lists
+    assert table.nbytes / len(table) < 100
+
+    detailed = results['coding']['detailed_scores']
+    for model in detailed:
+        rows = sheet[sheet['LLM'] == model]
+        assert [record['prompt_id'] for record in detailed[model]] == rows['Prompt_ID'].tolist()
+        np.testing.assert_allclose([record['weighted_score'] for record in detailed[model]],
+                                   rows['Score'])
+        assert results['coding']['summary'][model]['total_responses'] == len(rows)
@@ -0,0 +1,131 @@
+"""
+Rule Engine Tests
+=================
+
+A rule set must compile every kind of condition into a row-wise and a
+column-wise evaluator that give the scores the rules describe, apply
+only the first holding alternative of a "first" rule, clamp the scores,
+and refuse specs that name unknown groups, features or keys instead of
+scoring with them silently.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import copy
+import pickle
+
+import pandas as pd
+import pytest
+
+from rule_engine import RuleSet, is_missing, load_rules, prompt_number, without_source_rules
+
+SPEC = {
+    'prompt_prefix': 'T',
+    'clamp': [0.0, 10.0],
+    'weights': {'Style': 0.5, 'Size': 0.5},
+    'terms': {'greeting': ['hello', 'hi there'], 'farewell': ['goodbye'], 'rude': ['shut up']},
+    'metrics': {
+        'Style': {'base': 5.0, 'rules': [
+            {'when': 'greeting', 'add': 1.0, 'note': "a group name"},
+            {'when': {'all': ['greeting', 'farewell']}, 'add': 2.0},
+            {'when': {'none': ['rude']}, 'add': 0.5},
+            {'when': {'any': ['rude']}, 'add': -9.0},
+            {'when': {'prompts': [2, 3]}, 'add': 1.5}
+        ]},
+        'Size': {'base': 8.0, 'rules': [
+            {'first': [
+                {'when': {'feature': 'words', 'min': 6}, 'add': 3.0},
+                {'when': {'feature': 'words', 'above': 2, 'below': 6}, 'add': 1.0},
+                {'when': {'feature': 'length', 'max': 5}, 'add': -1.0}
+            ]},
+            {'when': {'feature': 'commas', 'min': 1, 'any': ['farewell']}, 'add': -2.5}
+        ]}
+    }
+}
+
+# (response, prompt ID, expected Style, expected Size)
+CASES = [
+    ("hello and goodbye, friend", 'T01', 8.5, 6.5),             # 4 words; comma and farewell
+    ("Hi there, I say hi there again now", 'T02', 8.0, 10.0),   # 8 words: clamped at 10
+    ("shut up", 'T03', 0.0, 8.0),          # 5 - 9 + 1.5 clamps at 0; no alternative holds
+    ("ok", 'T01', 5.5, 7.0),               # Short: the last alternative
+    ("", 'T01', 0.0, 0.0),
+    (None, 'T02', 0.0, 0.0),
+]
+
+
+@pytest.fixture(scope='module')
+def rule_set():
+    return RuleSet('test', SPEC)
+
+
+def test_row_evaluator(rule_set):
+    for response, prompt_id, style, size in CASES:
+        assert rule_set.evaluate(response, prompt_id) == {'Style': style, 'Size': size}, response
+
+
+def test_column_evaluator_matches_rows(rule_set):
+    responses = pd.Series([case[0] for case in CASES] * 2, index=range(100, 100 + 2 * len(CASES)))
+    prompt_ids = pd.Series([case[1] for case in CASES] * 2, index=responses.index)
+    laps = []
+    frame = rule_set.evaluate_columns(responses, prompt_ids, laps.append)
+    assert list(frame.columns) == ['Style', 'Size'] and frame.index.equals(responses.index)
+    expected = [rule_set.evaluate(response, prompt_id) for response, prompt_id in zip(responses, prompt_ids)]
+    assert frame.to_dict('records') == expected
+    assert laps == ['keyword scan', 'Style', 'Size', 'assemble']
+
+
+def test_compiled_rule_set(rule_set):
+    assert rule_set.features == ['commas', 'length', 'words']
+    assert rule_set.uses_prompts and rule_set.source_features == []
+    assert rule_set.metrics == ['Style', 'Size']
+    assert "def evaluate(response, prompt_id):" in rule_set.source
+    # Rebuilt from its spec after pickling
+    copied = pickle.loads(pickle.dumps(rule_set))
+    for response, prompt_id, _, _ in CASES:
+        assert copied.evaluate(response, prompt_id) == rule_set.evaluate(response, prompt_id)
+
+
+def broken(path, value):
+    spec = copy.deepcopy(SPEC)
+    target = spec
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    return spec
+
+
+@pytest.mark.parametrize('spec', [
+    broken(('metrics', 'Style', 'rules', 0, 'when'), 'unknown group'),
+    broken(('metrics', 'Style', 'rules', 0, 'when'), {'any': ['greeting'], 'unless': ['rude']}),
+    broken(('metrics', 'Style', 'rules', 0, 'when'), {'feature': 'sparkle', 'min': 1}),
+    broken(('metrics', 'Style', 'rules', 0, 'when'), {'min': 1}),
+    broken(('metrics', 'Style', 'rules', 0, 'when'), {'feature': 'words', 'min': '3'}),
+    broken(('metrics', 'Style', 'rules', 0, 'when'), {'prompts': [True]}),
+    broken(('metrics', 'Style', 'rules', 0, 'when'), {'feature': 'copy_ratio', 'max': 0.5}),
+    broken(('weights',), {'Style': 1.0}),
+    broken(('terms',), {f'group_{index}': [f'term{index}'] for index in range(64)}),
+], ids=['group', 'key', 'feature', 'bounds without feature', 'string bound', 'bool prompt',
+        'source feature without sources', 'weights', 'too many groups'])
+def test_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        RuleSet('test', spec)
+
+
+def test_without_source_rules():
+    spec = load_rules()['paraphrasing']
+    assert 'sources' in spec
+    stripped = without_source_rules(spec)
+    assert 'sources' not in stripped and spec['sources']
+    rule_set = RuleSet('paraphrasing', stripped)
+    assert rule_set.source_features == [] and rule_set.sources is None
+    assert RuleSet('paraphrasing', spec).source_features
+    # Rule sets without sources come back unchanged
+    assert without_source_rules(SPEC) is SPEC
+
+
+def test_helpers():
+    assert [prompt_number(prompt_id) for prompt_id in ('P08', 'C30', 'X', 'Cab')] == [8, 30, 0, 0]
+    assert is_missing(None) and is_missing(float('nan')) and is_missing(pd.NA)
+    assert not is_missing('') and not is_missing(0)
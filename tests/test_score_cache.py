@@ -0,0 +1,140 @@
+"""
+Score Cache Tests
+=================
+
+ScoreCache must give back what was stored, count its entries exactly
+without scanning the table, evict the least recently used scores over
+its bound, and drop everything when the scoring rules change. The
+analyzer must read repeated runs back from it and close it when done.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+import sqlite3
+import types
+
+import pandas as pd
+import pytest
+
+import score_cache
+from analysis_script import UpdatedLLMAnalyzer
+from score_cache import ScoreCache, response_key
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Deterministic time.time() for score_cache, one second per call.
+    """
+    ticks = iter(range(1, 1_000_000))
+    monkeypatch.setattr(score_cache, 'time', types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+def stored_rows(path: str) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_response_key_depends_on_every_part():
+    key = response_key('rules', 'coding', 'C01', 'text')
+    assert len(key) == 64
+    assert len({key,
+                response_key('other', 'coding', 'C01', 'text'),
+                response_key('rules', 'paraphrasing', 'C01', 'text'),
+                response_key('rules', 'coding', 'C02', 'text'),
+                response_key('rules', 'coding', 'C01', 'other')}) == 5
+
+
+def test_round_trip_and_counters(tmp_path):
+    cache = ScoreCache(str(tmp_path / 'cache.sqlite'))
+    cache.validate('rules')
+    cache.put_many([('a', [1.0, 2.0]), ('b', [3.0, 4.5])])
+    found = cache.get_many(['a', 'b', 'c', 'a'])
+    assert found == {'a': [1.0, 2.0], 'b': [3.0, 4.5]}
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'evictions': 0, 'entries': 2}
+    cache.close()
+
+
+def test_entry_count_is_exact(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ScoreCache(path, max_entries=100)
+    cache.validate('rules')
+    cache.put_many([('a', [1.0]), ('b', [2.0])])
+    # Replaced keys and keys repeated in one write are counted once
+    cache.put_many([('b', [5.0]), ('c', [3.0]), ('c', [4.0])])
+    assert len(cache) == stored_rows(path) == 3
+    assert cache.get_many(['b', 'c']) == {'b': [5.0], 'c': [4.0]}
+    cache.close()
+
+    reopened = ScoreCache(path, max_entries=100)
+    assert len(reopened) == 3
+    reopened.validate('other rules')
+    assert len(reopened) == stored_rows(path) == 0
+    reopened.close()
+
+
+def test_least_recently_used_scores_are_evicted(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ScoreCache(path, max_entries=3)
+    cache.validate('rules')
+    cache.put_many([('a', [1.0]), ('b', [2.0]), ('c', [3.0])])
+    cache.get_many(['a'])
+    cache.put_many([('d', [4.0]), ('e', [5.0])])
+    assert set(cache.get_many(['a', 'b', 'c', 'd', 'e'])) == {'a', 'd', 'e'}
+    assert cache.evictions == 2
+    assert len(cache) == stored_rows(path) == 3
+    cache.close()
+
+
+def test_rules_change_drops_scores(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ScoreCache(path)
+    cache.validate('rules')
+    cache.put_many([('a', [1.0])])
+    cache.validate('rules')
+    assert cache.get_many(['a']) == {'a': [1.0]}
+    cache.validate('new rules')
+    assert cache.get_many(['a']) == {}
+    cache.close()
+
+
+def test_close_keeps_the_counters(tmp_path):
+    cache = ScoreCache(str(tmp_path / 'cache.sqlite'))
+    cache.validate('rules')
+    cache.put_many([('a', [1.0])])
+    cache.get_many(['a', 'b'])
+    cache.close()
+    cache.close()
+    assert cache.closed
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1}
+
+
+def test_repeated_runs_are_read_from_the_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    data = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    rows = sum(len(data[sheet]) for sheet in SHEETS)
+
+    analyzer = UpdatedLLMAnalyzer(cache_path=path, resamples=0)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    first = analyzer.process_and_update_excel()
+    first_scores = {sheet: analyzer.data[sheet]['Score'].copy() for sheet in SHEETS}
+    assert analyzer._cache.closed
+    assert first['cache']['misses'] == rows and first['cache']['hits'] == 0
+
+    # The next run reopens the closed cache and scores nothing again
+    analyzer.data = {sheet: frame.copy() for sheet, frame in data.items()}
+    second = analyzer.process_and_update_excel()
+    assert analyzer._cache.closed
+    assert second['cache']['hits'] == rows and second['cache']['misses'] == 0
+    for sheet in SHEETS:
+        pd.testing.assert_series_equal(analyzer.data[sheet]['Score'], first_scores[sheet])
+    assert first['overall_summary'] == second['overall_summary']
@@ -0,0 +1,118 @@
+"""
+Scoring Core Tests
+==================
+
+scoring_core must import without pandas, numpy or openpyxl, and
+ResponseScorer must give the same scores as the analyzer built on top
+of it, route responses to their category, and change its fingerprint
+only when something that decides a score changes.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import copy
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import scoring_core
+from analysis_script import UpdatedLLMAnalyzer
+from rule_engine import load_rules
+from scoring_core import ResponseScorer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDS_PATH = os.path.join(ROOT, 'records.xlsx')
+
+SCORER = ResponseScorer()
+
+CODE = "def add(a, b):\n    \"\"\"Add two numbers.\"\"\"\n    return a + b\n"
+PROSE = "The quick brown fox jumps over the lazy dog, as the original sentence says."
+
+
+def test_import_does_not_load_pandas():
+    check = ("import sys, scoring_core; "
+             "print(','.join(m for m in ('pandas', 'numpy', 'openpyxl') if m in sys.modules))")
+    completed = subprocess.run([sys.executable, '-c', check], cwd=ROOT, capture_output=True,
+                               text=True, check=True)
+    assert completed.stdout.strip() == ''
+
+
+def test_scores_match_the_analyzer():
+    analyzer = UpdatedLLMAnalyzer()
+    records = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    for sheet, category in (('Coding', 'coding'), ('Paraphrasing_Gen_Creation', 'paraphrasing')):
+        frame = records[sheet]
+        metric_frame, weighted = analyzer.score_responses(frame, category)
+        for position, (response, prompt_id) in enumerate(zip(frame['Response'], frame['Prompt_ID'])):
+            scores = SCORER.score_response(response, prompt_id)
+            assert scores.pop('score') == pytest.approx(weighted.iloc[position])
+            assert scores == pytest.approx(metric_frame.iloc[position].to_dict())
+
+
+def test_category_routing():
+    assert SCORER.categories == ['coding', 'paraphrasing']
+    assert SCORER.category_of('C05') == 'coding'
+    assert SCORER.category_of('p12') == 'paraphrasing'
+    assert SCORER.category_of('X01') is None
+    # A Category label wins over the prompt ID
+    assert SCORER.category_of('C05', 'Paraphrasing, Generation, and Creation') == 'paraphrasing'
+    assert set(SCORER.score_response(CODE, 'C01')) == set(SCORER.coding_metrics) | {'score'}
+    assert set(SCORER.score_response(PROSE, 'X01', 'paraphrasing')) == \
+        set(SCORER.paraphrasing_metrics) | {'score'}
+    with pytest.raises(ValueError):
+        SCORER.score_response(CODE, 'X01')
+
+
+def test_weighted_score():
+    assert SCORER.calculate_weighted_scores({'A': 8.0, 'B': 6.0, 'Other': 10.0},
+                                            {'A': 0.5, 'B': 0.5}) == 7.0
+
+
+def test_register_category():
+    scorer = ResponseScorer()
+    spec = copy.deepcopy(load_rules()['paraphrasing'])
+    spec.update(prompt_prefix='S', labels=['summar'], sheets=['Summaries'])
+    scorer.register_category('summarization', spec)
+    assert scorer.categories[-1] == 'summarization'
+    assert scorer.category_of('S01') == 'summarization'
+    scores = scorer.score_response(PROSE, 'S01')
+    assert scores['score'] == pytest.approx(SCORER.score_response(PROSE, 'P01')['score'])
+
+
+def test_fingerprint_follows_the_scoring_rules():
+    fingerprint = SCORER.scoring_fingerprint()
+    assert fingerprint == ResponseScorer().scoring_fingerprint()
+    assert fingerprint != ResponseScorer(source_similarity=True).scoring_fingerprint()
+
+    rules = load_rules()
+    rules['coding']['sheets'] = ['Coding', 'More_Coding']
+    assert ResponseScorer(rules).scoring_fingerprint() == fingerprint
+    rules['coding']['weights']['Correctness'] = 0.5
+    assert ResponseScorer(rules).scoring_fingerprint() != fingerprint
+
+
+def test_command_line(tmp_path, monkeypatch, capsys):
+    path = tmp_path / 'solution.py'
+    path.write_text(CODE, encoding='utf-8')
+    assert scoring_core.main([str(path), '--prompt-id', 'C05']) == 0
+    output = json.loads(capsys.readouterr().out)
+    assert output['file'] == str(path)
+    assert output['score'] == pytest.approx(SCORER.score_response(CODE, 'C05')['score'])
+
+    lines = [json.dumps({'response': CODE, 'prompt_id': 'C01', 'id': 1}), '',
+             json.dumps({'response': PROSE, 'prompt_id': 'X01', 'category': 'paraphrasing'})]
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('\n'.join(lines) + '\n'))
+    assert scoring_core.main([]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record.get('id') for record in records] == [1, None]
+    assert records[1]['score'] == pytest.approx(
+        SCORER.score_response(PROSE, 'X01', 'paraphrasing')['score'])
+
+    with pytest.raises(SystemExit):
+        scoring_core.main([str(path)])
@@ -0,0 +1,185 @@
+"""
+Scoring Service Tests
+=====================
+
+The online scoring service (scoring_service.py) must give the scores of
+the batch pipeline, keep its running aggregates in step with them, and
+answer every request, including malformed ones and ones that fail while
+being scored, without dropping the connection or the service.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from scoring_service import ScoringService
+
+CODE = "def add(a, b):\n    # Add two numbers\n    return a + b\n"
+PROSE = "The quick brown fox jumps over the lazy dog, which sleeps in the sun."
+
+RECORDS = [
+    {'Prompt_ID': 'C01', 'LLM': 'Llama', 'Response': CODE},
+    {'Prompt_ID': 'P01', 'LLM': 'Llama', 'Response': PROSE},
+    {'Prompt_ID': 'C02', 'LLM': 'Mistral', 'Response': CODE + "print(add(1, 2))\n"},
+    {'prompt_id': 'P02', 'llm': 'Mistral', 'response': PROSE.upper()},
+]
+
+
+async def request(port: int, method: str, path: str, body: bytes = b'',
+                  headers: str = None) -> tuple:
+    """
+    Send one HTTP request on a new connection.
+
+    Returns:
+        Tuple of (status, JSON payload, Connection header)
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    if headers is None:
+        headers = f"Content-Length: {len(body)}\r\n"
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\n{headers}\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    payload = json.loads(await reader.readexactly(int(response_headers['content-length'])))
+    writer.close()
+    return status, payload, response_headers['connection']
+
+
+def serve(service: ScoringService, client) -> None:
+    """
+    Run client(port) against the service on a free local port.
+    """
+    async def run():
+        service.start()
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        try:
+            await client(server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+
+    asyncio.run(run())
+
+
+def expected_scores(analyzer: UpdatedLLMAnalyzer, record: dict) -> dict:
+    lowered = {key.lower(): value for key, value in record.items()}
+    category = analyzer.category_of(lowered['prompt_id'])
+    rule_set = analyzer.rule_sets[category]
+    scores = rule_set.evaluate(lowered['response'], lowered['prompt_id'])
+    scores['Score'] = analyzer.calculate_weighted_scores(scores, rule_set.weights)
+    return scores
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_scores_match_the_evaluators(vectorized):
+    service = ScoringService(UpdatedLLMAnalyzer(vectorized=vectorized))
+    results = asyncio.run(service.score(RECORDS))
+    for record, result in zip(RECORDS, results):
+        for metric, score in expected_scores(service.analyzer, record).items():
+            assert result[metric] == pytest.approx(score)
+    assert service.scored == len(RECORDS)
+    rankings = service.results()['overall_summary']['model_rankings']
+    assert sorted(model for model, _ in rankings) == ['Llama', 'Mistral']
+
+
+def test_vectorized_batches_with_near_duplicates():
+    analyzer = UpdatedLLMAnalyzer(vectorized=True, near_duplicates=0.8)
+    service = ScoringService(analyzer)
+    records = [{'Prompt_ID': 'P01', 'LLM': model, 'Response': PROSE}
+               for model in ('Llama', 'Mistral', 'GPT-4.1-mini')]
+    results = asyncio.run(service.score(records))
+    assert len({result['Score'] for result in results}) == 1
+    assert len(service.results()['overall_summary']['model_rankings']) == 3
+
+
+def test_aggregates_follow_the_scores():
+    service = ScoringService()
+    results = asyncio.run(service.score(RECORDS * 3))
+    summary = service.results()['coding']['summary']['Llama']
+    llama = [result['Score'] for result in results
+             if result['LLM'] == 'Llama' and result['Category'] == 'coding']
+    assert summary['total_responses'] == len(llama)
+    assert summary['average_score'] == pytest.approx(sum(llama) / len(llama))
+
+
+def test_http_endpoints():
+    service = ScoringService()
+
+    async def client(port):
+        status, payload, _ = await request(port, 'POST', '/score', json.dumps(RECORDS[0]).encode())
+        assert status == 200 and payload['Category'] == 'coding'
+        status, payload, _ = await request(port, 'POST', '/score', json.dumps(RECORDS).encode())
+        assert status == 200 and len(payload) == len(RECORDS)
+        status, payload, _ = await request(port, 'GET', '/health')
+        assert status == 200 and payload['scored'] == 1 + len(RECORDS)
+        status, payload, _ = await request(port, 'GET', '/rankings')
+        assert status == 200 and [model for model, _ in payload['model_rankings']] == ['Llama', 'Mistral']
+        status, payload, _ = await request(port, 'GET', '/summary')
+        assert status == 200 and 'overall_summary' in payload
+
+    serve(service, client)
+
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('POST', '/score', b'{not json', 400),
+    ('POST', '/score', b'{"Prompt_ID": "X01", "Response": "text"}', 400),
+    ('POST', '/score', b'[1, 2]', 400),
+    ('GET', '/score', b'', 405),
+    ('POST', '/health', b'', 405),
+    ('GET', '/nowhere', b'', 404),
+])
+def test_invalid_requests_are_answered(method, path, body, status):
+    service = ScoringService()
+
+    async def client(port):
+        answer = await request(port, method, path, body)
+        assert answer[0] == status and 'error' in answer[1]
+        assert answer[2] == 'keep-alive'
+
+    serve(service, client)
+
+
+@pytest.mark.parametrize('length', ['abc', '-5'])
+def test_malformed_content_length_is_rejected(length):
+    service = ScoringService()
+
+    async def client(port):
+        status, payload, connection = await request(port, 'POST', '/score', b'{}',
+                                                    f"Content-Length: {length}\r\n")
+        assert status == 400 and 'Content-Length' in payload['error']
+        # The body was not read, so the connection cannot be reused
+        assert connection == 'close'
+        status, _, _ = await request(port, 'GET', '/health')
+        assert status == 200
+
+    serve(service, client)
+
+
+def test_scoring_errors_are_answered_and_the_service_keeps_serving(monkeypatch, capsys):
+    service = ScoringService()
+
+    def fail(records):
+        raise RuntimeError("scorer failed")
+
+    async def client(port):
+        with monkeypatch.context() as patch:
+            patch.setattr(service, '_score_records', fail)
+            status, payload, _ = await request(port, 'POST', '/score', json.dumps(RECORDS).encode())
+        assert status == 500 and payload['error'] == 'RuntimeError: scorer failed'
+        status, payload, _ = await request(port, 'POST', '/score', json.dumps(RECORDS[0]).encode())
+        assert status == 200 and 'Score' in payload
+
+    serve(service, client)
+    assert 'scorer failed' in capsys.readouterr().err
@@ -0,0 +1,151 @@
+"""
+Sharded Run Tests
+=================
+
+Scoring the records in shards and merging the partials must give the
+summaries of scoring them in one run, with the same mean, std and
+median however the rows were split or the partials ordered, and
+partials scored under different rules must never be merged.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import shards
+from analysis_script import UpdatedLLMAnalyzer
+from shards import ShardPartial, default_partial_path, expand_inputs
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+CATEGORIES = ('coding', 'paraphrasing')
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+@pytest.fixture(scope='module')
+def expected(records):
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.data = {sheet: frame.copy() for sheet, frame in records.items()}
+    return analyzer.process_and_update_excel()
+
+
+def write_shards(records, directory, count: int):
+    """
+    Split the response rows into shards of interleaved prompts, as CSV and JSON Lines files.
+    """
+    rows = pd.concat([records[sheet] for sheet in SHEETS], ignore_index=True)
+    rows = rows[['Category', 'LLM', 'Prompt_ID', 'Response']]
+    number = rows['Prompt_ID'].str[1:].astype(int)
+    paths = []
+    for shard in range(count):
+        part = rows[number % count == shard]
+        if shard % 2:
+            path = os.path.join(str(directory), f"shard_{shard}.jsonl")
+            part.to_json(path, orient='records', lines=True)
+        else:
+            path = os.path.join(str(directory), f"shard_{shard}.csv")
+            part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def assert_summaries_match(results, expected):
+    for category in CATEGORIES:
+        assert list(results[category]['summary']) == list(expected[category]['summary'])
+        for model, summary in expected[category]['summary'].items():
+            merged = results[category]['summary'][model]
+            for key, value in summary.items():
+                assert merged[key] == pytest.approx(value, rel=1e-12), (category, model, key)
+    rankings = results['overall_summary']['model_rankings']
+    assert [model for model, _ in rankings] == \
+        [model for model, _ in expected['overall_summary']['model_rankings']]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_shards_merge_to_the_full_run(tmp_path, records, expected, workers):
+    paths = write_shards(records, tmp_path, 3)
+    analyzer = UpdatedLLMAnalyzer(resamples=0, workers=workers)
+    results = analyzer.process_shards([str(tmp_path / 'shard_*')])
+    assert results['shards'] == {'sources': paths, 'rows': 180}
+    assert all(os.path.exists(default_partial_path(path)) for path in paths)
+    assert_summaries_match(results, expected)
+
+
+def test_merge_does_not_depend_on_the_split(tmp_path, records, expected):
+    summaries = []
+    for count in (2, 5):
+        directory = tmp_path / str(count)
+        directory.mkdir()
+        analyzer = UpdatedLLMAnalyzer(resamples=0)
+        paths = write_shards(records, directory, count)
+        for path in paths:
+            analyzer.score_shard(path)
+        partials = [default_partial_path(path) for path in paths]
+        for order in (partials, partials[::-1]):
+            summaries.append(UpdatedLLMAnalyzer(resamples=0).merge_partials(order))
+    # Mean, std and median come from exact score counts: identical, not just close
+    for results in summaries[1:]:
+        for category in CATEGORIES:
+            for model, summary in summaries[0][category]['summary'].items():
+                other = results[category]['summary'][model]
+                for key in ('average_score', 'std_score', 'median_score', 'min_score', 'max_score',
+                            'total_responses'):
+                    assert other[key] == summary[key], (category, model, key)
+    assert_summaries_match(summaries[0], expected)
+
+
+def test_partial_round_trip(tmp_path, records):
+    path = write_shards(records, tmp_path, 1)[0]
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    partial = analyzer.score_shard(path, str(tmp_path / 'one.partial.json'))
+    loaded = ShardPartial.load(str(tmp_path / 'one.partial.json'))
+    assert loaded.to_dict() == partial.to_dict()
+    assert loaded.rows == 180 and loaded.sources == [path]
+    for category in CATEGORIES:
+        for model in partial.aggregates[category]:
+            assert loaded.summary(category, model) == partial.summary(category, model)
+
+
+def test_partials_of_other_rules_are_not_merged(tmp_path):
+    first = ShardPartial('rules', {'coding': ['A']})
+    second = ShardPartial('other rules', {'coding': ['A']})
+    with pytest.raises(ValueError):
+        first.merge(second)
+    with pytest.raises(ValueError):
+        UpdatedLLMAnalyzer().merge_partials([])
+    # A pattern without matches is reported as a missing file
+    with pytest.raises(FileNotFoundError):
+        UpdatedLLMAnalyzer().merge_partials([str(tmp_path / 'none_*.partial.json')])
+
+
+def test_median_falls_back_to_the_sketch(monkeypatch):
+    monkeypatch.setattr(shards, 'MAX_EXACT_VALUES', 50)
+    values = np.random.default_rng(0).uniform(0, 10, 400).round(3)
+    partial = ShardPartial('rules', {'coding': ['A']})
+    for batch in np.array_split(values, 4):
+        partial.add('coding', pd.DataFrame({'LLM': 'M', 'A': batch, 'Score': batch}))
+    assert partial.score_counts['coding']['M'] is None
+    summary = partial.summary('coding', 'M')
+    assert summary['total_responses'] == 400
+    assert summary['average_score'] == pytest.approx(values.mean())
+    assert summary['std_score'] == pytest.approx(values.std())
+    assert abs(summary['median_score'] - np.median(values)) <= 0.2
+
+
+def test_expand_inputs(tmp_path):
+    for name in ('b.csv', 'a.csv', 'c.jsonl'):
+        (tmp_path / name).write_text('')
+    pattern = str(tmp_path / '*.csv')
+    missing = str(tmp_path / 'missing_*.csv')
+    assert expand_inputs([pattern, str(tmp_path / 'a.csv'), missing]) == \
+        [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv'), missing]
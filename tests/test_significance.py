@@ -0,0 +1,124 @@
+"""
+Significance Tests
+==================
+
+The vectorized bootstrap must have the sampling distribution of drawing
+indices (mean and standard error of the resample means), whether it
+draws counts of few distinct scores, indices of mostly unique ones or
+binned scores of large sets. The sign-flip permutation test must give
+the exact p-values of small samples, and model_significance must be
+reproducible from its seed.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import significance
+from analysis_script import UpdatedLLMAnalyzer
+from significance import (BIN_WIDTH, EXACT_MAX_VALUES, bootstrap_means, model_significance,
+                          paired_permutation_test, percentile_interval)
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+RESAMPLES = 20_000
+
+
+@pytest.fixture(scope='module')
+def aggregates():
+    analyzer = UpdatedLLMAnalyzer(resamples=0)
+    analyzer.data = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    results = analyzer.process_and_update_excel()
+    return analyzer, results['aggregates']
+
+
+@pytest.mark.parametrize('values', [
+    np.round(np.random.default_rng(1).normal(7, 1.5, 400) * 20) / 20,  # Few distinct: counts
+    np.random.default_rng(2).normal(7, 1.5, 300),                      # Unique: indices
+    np.random.default_rng(3).uniform(0, 10, 3 * EXACT_MAX_VALUES)      # Many distinct: binned
+], ids=['counts', 'indices', 'binned'])
+def test_bootstrap_distribution(values):
+    means = bootstrap_means(values, RESAMPLES, np.random.default_rng(0))
+    assert means.shape == (RESAMPLES,)
+    standard_error = values.std() / np.sqrt(len(values))
+    assert abs(means.mean() - values.mean()) < 4 * standard_error / np.sqrt(RESAMPLES) + BIN_WIDTH / 2
+    assert means.std() == pytest.approx(standard_error, rel=0.03)
+
+
+def test_bootstrap_edge_cases(monkeypatch):
+    assert bootstrap_means(np.empty(0), 5, np.random.default_rng(0)).tolist() == [0.0] * 5
+    assert set(bootstrap_means(np.full(50, 6.5), 100, np.random.default_rng(0)).tolist()) == {6.5}
+
+    values = np.random.default_rng(4).normal(5, 2, 200)
+    first = bootstrap_means(values, 1000, np.random.default_rng(9))
+    assert np.array_equal(first, bootstrap_means(values, 1000, np.random.default_rng(9)))
+    # Drawn in many small blocks, the distribution stays the same
+    monkeypatch.setattr(significance, 'MAX_BLOCK_ELEMENTS', 1000)
+    blocked = bootstrap_means(values, RESAMPLES, np.random.default_rng(9))
+    assert blocked.std() == pytest.approx(values.std() / np.sqrt(len(values)), rel=0.03)
+
+
+def test_percentile_interval():
+    samples = np.arange(1001, dtype=float)
+    assert percentile_interval(samples, 0.95) == pytest.approx((25.0, 975.0))
+    assert percentile_interval(samples, 0.5) == pytest.approx((250.0, 750.0))
+
+
+def exact_p_value(differences) -> float:
+    """
+    Share of all 2^n sign assignments with a mean as far from zero as observed.
+    """
+    observed = abs(np.mean(differences))
+    means = [abs(np.dot(signs, differences)) / len(differences)
+             for signs in itertools.product((-1, 1), repeat=len(differences))]
+    return np.mean(np.array(means) >= observed - 1e-12)
+
+
+@pytest.mark.parametrize('differences', [[1.0, 1.0, 1.0], [2.0, 1.0, -1.0, 0.5],
+                                         [0.5, -0.25, 1.5, 0.0, 2.0, -1.0], [0.0, 0.0]])
+def test_permutation_p_values_are_exact(differences):
+    p_value = exact_p_value(differences)
+    result = paired_permutation_test(np.array(differences), 200_000, np.random.default_rng(0))
+    assert result['n_pairs'] == len(differences)
+    assert result['mean_difference'] == pytest.approx(np.mean(differences))
+    assert result['p_value'] == pytest.approx(p_value, abs=0.005)
+
+
+def test_permutation_test_edge_cases():
+    result = paired_permutation_test(np.empty(0), 100, np.random.default_rng(0))
+    assert result == {'mean_difference': 0.0, 'p_value': None, 'n_pairs': 0}
+    # A clear difference is as extreme as only the observed arrangement
+    result = paired_permutation_test(np.full(60, 1.5), 999, np.random.default_rng(0))
+    assert result['p_value'] == pytest.approx(1 / 1000)
+
+
+def test_model_significance(aggregates):
+    analyzer, aggregator = aggregates
+    models = analyzer.models
+    result = model_significance(aggregator, models, resamples=2000, seed=7)
+    assert result == model_significance(aggregator, models, resamples=2000, seed=7)
+    assert (result['resamples'], result['confidence'], result['seed']) == (2000, 0.95, 7)
+
+    means = aggregator.category_means(models)
+    for model in models:
+        for category in ('coding', 'paraphrasing'):
+            interval = result['intervals'][model][category]
+            assert interval['mean'] == pytest.approx(means.loc[model, category])
+            assert interval['low'] <= interval['mean'] <= interval['high']
+        assert result['intervals'][model]['overall']['mean'] == pytest.approx(means.loc[model].mean())
+
+    # Every pair of models, per category and overall
+    pairs = len(models) * (len(models) - 1) // 2
+    assert len(result['paired_tests']) == pairs * 3
+    for test in result['paired_tests']:
+        assert 0 < test['p_value'] <= 1
+        if test['category'] == 'coding':
+            assert test['n_pairs'] == 30
+        elif test['category'] == 'overall':
+            assert test['n_pairs'] == 60
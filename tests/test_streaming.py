@@ -0,0 +1,138 @@
+"""
+Streaming Tests
+===============
+
+The batch readers must yield every record of an .xlsx, .csv or .jsonl
+file in order and in bounded batches, the running accumulators must
+match statistics computed over all values at once (also when batches
+are merged or removed again), and process_stream must report the same
+summaries as scoring the whole workbook in memory.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_script import UpdatedLLMAnalyzer
+from streaming import ModelAggregate, QuantileSketch, RunningStats, iter_record_batches
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+COLUMNS = ['LLM', 'Prompt_ID', 'Response']
+
+
+@pytest.fixture(scope='module')
+def records():
+    return pd.read_excel(RECORDS_PATH, sheet_name=None)
+
+
+def response_rows(records) -> pd.DataFrame:
+    return pd.concat([records[sheet] for sheet in SHEETS], ignore_index=True)
+
+
+def write_input(records, directory, extension: str) -> str:
+    rows = response_rows(records)
+    path = os.path.join(str(directory), f"records{extension}")
+    if extension == '.csv':
+        rows.to_csv(path, index=False)
+    else:
+        rows.to_json(path, orient='records', lines=True)
+    return path
+
+
+@pytest.mark.parametrize('extension', ['.xlsx', '.csv', '.jsonl'])
+def test_batches_hold_every_record_in_order(records, tmp_path, extension):
+    path = RECORDS_PATH if extension == '.xlsx' else write_input(records, tmp_path, extension)
+    batches = list(iter_record_batches(path, batch_size=25))
+    assert all(len(batch) <= 25 for batch in batches)
+    streamed = pd.concat(batches, ignore_index=True)
+    for column in ['Category', 'Sheet'] + COLUMNS:
+        assert column in streamed.columns
+    expected = response_rows(records)
+    assert streamed['Prompt_ID'].tolist() == expected['Prompt_ID'].tolist()
+    assert streamed['Response'].tolist() == expected['Response'].tolist()
+    if extension == '.xlsx':
+        assert streamed['Sheet'].tolist() == [sheet for sheet in SHEETS for _ in records[sheet].index]
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        next(iter_record_batches(str(tmp_path / 'records.parquet')))
+
+
+def test_running_stats_match_numpy():
+    values = np.random.default_rng(1).normal(7, 1.5, 1000).round(2)
+    stats = RunningStats()
+    for batch in np.array_split(values, 7):
+        stats.update(batch)
+    summary = stats.summary()
+    assert summary['total_responses'] == len(values)
+    assert summary['average_score'] == pytest.approx(values.mean())
+    assert summary['std_score'] == pytest.approx(values.std())
+    assert summary['median_score'] == pytest.approx(np.median(values))
+    assert (summary['min_score'], summary['max_score']) == (values.min(), values.max())
+
+
+def test_running_stats_merge_and_remove():
+    values = np.random.default_rng(2).uniform(0, 10, 600).round(1)
+    first, second = RunningStats(), RunningStats()
+    first.update(values[:250])
+    second.update(values[250:])
+    first.merge(second)
+    assert first.mean == pytest.approx(values.mean())
+    assert first.std == pytest.approx(values.std())
+    assert first.sketch.median() == pytest.approx(np.median(values))
+
+    first.remove(values[250:])
+    kept = values[:250]
+    assert first.count == 250
+    assert first.mean == pytest.approx(kept.mean())
+    assert first.std == pytest.approx(kept.std())
+    assert (first.min, first.max) == (kept.min(), kept.max())
+
+    restored = RunningStats.from_dict(first.to_dict())
+    assert restored.summary() == first.summary()
+    assert math.isnan(RunningStats().std)
+
+
+def test_quantile_sketch_error_is_bounded_by_the_bin_width():
+    values = np.random.default_rng(3).uniform(0, 10, 5000)
+    sketch = QuantileSketch(max_bins=64)
+    sketch.update(values)
+    assert len(sketch.counts) <= 64 and sketch.count == len(values)
+    for q in (0.1, 0.5, 0.9):
+        assert abs(sketch.quantile(q) - np.quantile(values, q)) <= sketch.bin_width
+    assert math.isnan(QuantileSketch().median())
+
+
+def test_model_aggregate_metric_averages():
+    frame = pd.DataFrame({'A': [1.0, 2.0, 3.0], 'B': [4.0, 6.0, 8.0]})
+    aggregate = ModelAggregate(['A', 'B'])
+    aggregate.add(np.array([5.0, 6.0, 7.0]), frame)
+    aggregate.remove(np.array([7.0]), frame.iloc[2:])
+    summary = aggregate.summary()
+    assert summary['metric_averages'] == {'A': 1.5, 'B': 5.0}
+    assert ModelAggregate.from_dict(aggregate.to_dict()).summary() == summary
+
+
+@pytest.mark.parametrize('batch_size', [7, 5000])
+def test_process_stream_matches_in_memory_run(records, batch_size):
+    in_memory = UpdatedLLMAnalyzer(resamples=0)
+    in_memory.data = {sheet: frame.copy() for sheet, frame in records.items()}
+    expected = in_memory.process_and_update_excel()
+
+    streamed = UpdatedLLMAnalyzer(resamples=0).process_stream(RECORDS_PATH, batch_size=batch_size)
+    for category in ('coding', 'paraphrasing'):
+        assert list(streamed[category]['summary']) == list(expected[category]['summary'])
+        for model, summary in expected[category]['summary'].items():
+            for key, value in summary.items():
+                assert streamed[category]['summary'][model][key] == pytest.approx(value), (model, key)
+    assert [model for model, _ in streamed['overall_summary']['model_rankings']] == \
+        [model for model, _ in expected['overall_summary']['model_rankings']]
@@ -0,0 +1,108 @@
+"""
+Text Feature Tests
+==================
+
+Every text feature must have its documented value, the column-wise
+features must equal the row-wise ones on the responses of records.xlsx
+and on awkward text, and the feature cache must hand back the values of
+a response it has seen, evicting the least recently used ones over its
+bound.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from text_features import COLUMN_FEATURES, FEATURES, ColumnFeatures, FeatureCache, TextFeatures
+
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'records.xlsx')
+
+SHEETS = ('Coding', 'Paraphrasing_Gen_Creation')
+
+AWKWARD = [
+    "",
+    "   \n\t ",
+    "One. Two.  . Three",
+    "ÀÉÎ straße ΣΙΣΥΦΟΣ don't \"quote\"",
+    "line one\n\n  \nline two\r\nline 3, 4, 5",
+    "x" * 5000,
+]
+
+
+def test_feature_values():
+    features = TextFeatures("Hello world. Hello AGAIN, 'friend' 42\n\nBye.")
+    assert features['length'] == 43
+    assert features['words'] == 7
+    assert features['unique_words'] == 6
+    # Only 'hello' twice: 'world.' and 'again,' carry punctuation
+    assert features['descriptive_words'] == 2
+    assert features['vocab_diversity'] == pytest.approx(6 / 7)
+    assert features['sentences'] == 2
+    assert features['lines'] == 2
+    assert features['quotes'] == 2
+    assert features['commas'] == 1
+    assert features['digits'] == 2
+    assert features['uppercase'] == 8
+    assert set(features.values) == set(FEATURES)
+
+
+def test_empty_text():
+    features = TextFeatures("")
+    assert [features[name] for name in FEATURES] == [0] * len(FEATURES)
+
+
+@pytest.fixture(scope='module')
+def responses():
+    records = pd.read_excel(RECORDS_PATH, sheet_name=None)
+    texts = pd.concat([records[sheet]['Response'] for sheet in SHEETS]).dropna().map(str)
+    return pd.Series(texts.tolist() + AWKWARD, dtype=object)
+
+
+@pytest.mark.parametrize('name', list(FEATURES))
+def test_column_features_match_rows(responses, name):
+    columns = ColumnFeatures(responses)
+    expected = [FEATURES[name](TextFeatures(text)) for text in responses]
+    np.testing.assert_allclose(columns(name).astype(float), expected, err_msg=name)
+    assert columns(name) is columns(name)
+
+
+def test_column_features_share_one_tokenization(responses):
+    columns = ColumnFeatures(responses, responses.str.lower())
+    columns('words')
+    rows = columns.rows
+    columns('unique_words')
+    assert columns.rows is rows
+    assert all(row._tokens is not None for row in rows)
+    assert set(COLUMN_FEATURES) < set(FEATURES)
+
+
+def test_cache_returns_known_values():
+    cache = FeatureCache(max_entries=10)
+    first = cache.features("Some response, with words")
+    assert first['words'] == 4
+    second = cache.features("Some response, with words")
+    assert second.values is first.values and second.values == {'words': 4}
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'entries': 0}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FeatureCache(max_entries=2)
+    for text in ('a', 'b', 'a', 'c'):
+        cache.features(text)['length']
+    assert len(cache) == 2
+    cache.features('a')
+    assert cache.hits == 2
+    cache.features('b')
+    assert cache.misses == 4
+
+    uncached = FeatureCache(max_entries=0)
+    assert uncached.features('a')['length'] == 1 and len(uncached) == 0
+    # Lone surrogates from odd cell contents still hash
+    assert FeatureCache.key('\ud800') != FeatureCache.key('\ud801')
@@ -0,0 +1,233 @@
+"""
+Shared Text Features
+====================
+
+Text features of a response that the scoring rules test, computed from one
+tokenization per response and shared by every metric. TextFeatures
+lowercases a response and splits it into tokens and sentences once. Each
+feature is computed on first use from those pieces and then kept, so a
+metric that uses a feature another metric already needed costs a dict
+lookup.
+
+Computed feature values are memoized in a bounded LRU FeatureCache keyed by
+a hash of the response, so repeated responses (resubmissions, duplicates
+across sheets, service traffic) skip extraction. Only the numbers are
+cached, not the text or its tokens, so the cache stays small.
+
+ColumnFeatures is the counterpart for a batch of responses: every response
+is lowercased and tokenized once for all features, and the features with
+a faster whole-column form (COLUMN_FEATURES) use pandas string operations.
+
+Adding a feature is one entry in FEATURES (and optionally COLUMN_FEATURES);
+rule conditions can use it right away, with the column-wise evaluator
+falling back to the row-wise function.
+
+Author: COMP 5541 Project
+Date: 2025
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+# Responses whose feature values are kept by the default cache
+DEFAULT_CACHE_SIZE = 4096
+
+_ASCII_UPPER = re.compile(r'[A-Z]')
+
+
+class TextFeatures:
+    """
+    The pieces and feature values of one response, each computed at most once.
+    """
+
+    __slots__ = ('text', '_lowered', '_tokens', '_sentences', 'values')
+
+    def __init__(self, text: str, lowered: Optional[str] = None,
+                 values: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            text (str): The response
+            lowered (str): text.lower(), if the caller already has it
+            values (Dict): Feature values known so far (e.g. from a FeatureCache);
+                new values are added to this dict
+        """
+        self.text = text
+        self._lowered = lowered
+        self._tokens = None
+        self._sentences = None
+        self.values = values if values is not None else {}
+
+    @property
+    def lowered(self) -> str:
+        if self._lowered is None:
+            self._lowered = self.text.lower()
+        return self._lowered
+
+    @property
+    def tokens(self) -> List[str]:
+        """
+        Whitespace-separated tokens of the lowercased response.
+        """
+        if self._tokens is None:
+            self._tokens = self.lowered.split()
+        return self._tokens
+
+    @property
+    def sentences(self) -> List[str]:
+        """
+        Non-blank pieces between full stops.
+        """
+        if self._sentences is None:
+            self._sentences = [piece for piece in self.text.split('.') if piece.strip()]
+        return self._sentences
+
+    def __getitem__(self, name: str) -> float:
+        value = self.values.get(name)
+        if value is None:
+            value = self.values[name] = FEATURES[name](self)
+        return value
+
+
+def _vocab_diversity(features: TextFeatures) -> float:
+    tokens = features.tokens
+    return features['unique_words'] / len(tokens) if tokens else 0.0
+
+
+# Text features usable in rule conditions, computed from a TextFeatures
+FEATURES: Dict[str, Callable[[TextFeatures], float]] = {
+    # Characters in the lowercased response
+    'length': lambda f: len(f.lowered),
+    # Whitespace-separated words
+    'words': lambda f: len(f.tokens),
+    # Distinct lowercased words
+    'unique_words': lambda f: len(set(f.tokens)),
+    # Lowercased words longer than three letters, a proxy for clear names
+    'descriptive_words': lambda f: sum(1 for word in f.tokens if len(word) > 3 and word.isalpha()),
+    # Unique / total lowercased words (0 without words)
+    'vocab_diversity': _vocab_diversity,
+    # Non-blank pieces between full stops
+    'sentences': lambda f: len(f.sentences),
+    # Non-blank lines
+    'lines': lambda f: sum(1 for line in f.text.splitlines() if line.strip()),
+    # Character classes
+    'quotes': lambda f: f.text.count('"') + f.text.count("'"),
+    'commas': lambda f: f.text.count(','),
+    'digits': lambda f: sum(f.text.count(digit) for digit in '0123456789'),
+    'uppercase': lambda f: len(_ASCII_UPPER.findall(f.text))
+}
+
+
+class FeatureCache:
+    """
+    Bounded LRU of feature values per response, keyed by a content hash.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            max_entries (int): Responses kept before least recently used
+                ones are evicted (0 = no caching)
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[bytes, Dict[str, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def features(self, text: str, lowered: Optional[str] = None) -> TextFeatures:
+        """
+        TextFeatures of a response, with the values cached for the same text.
+        """
+        if self.max_entries <= 0:
+            return TextFeatures(text, lowered)
+        key = self.key(text)
+        values = self._entries.get(key)
+        if values is None:
+            self.misses += 1
+            values = self._entries[key] = {}
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return TextFeatures(text, lowered, values)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Cache shared by the rule sets of this process
+feature_cache = FeatureCache()
+
+
+class ColumnFeatures:
+    """
+    Column-wise features of a batch of responses, sharing one TextFeatures
+    (one lowercasing and one tokenization) per response.
+    """
+
+    def __init__(self, text, lowered=None):
+        """
+        Args:
+            text (pd.Series): Responses as strings
+            lowered (pd.Series): The same responses lowercased, if known
+        """
+        self.text = text
+        self._lowered = lowered
+        self._rows = None
+        self.values = {}
+
+    @property
+    def lowered(self):
+        if self._lowered is None:
+            self._lowered = self.text.str.lower()
+        return self._lowered
+
+    @property
+    def rows(self) -> List[TextFeatures]:
+        """
+        TextFeatures per row, keeping tokens and sentences between features.
+        """
+        if self._rows is None:
+            self._rows = [TextFeatures(text, lowered) for text, lowered in zip(self.text, self.lowered)]
+        return self._rows
+
+    def __call__(self, name: str):
+        """
+        np.ndarray of the values of a feature per row.
+        """
+        if name not in self.values:
+            column = COLUMN_FEATURES.get(name)
+            if column is not None:
+                self.values[name] = column(self)
+            else:
+                import numpy as np
+
+                row = FEATURES[name]
+                self.values[name] = np.fromiter((row(features) for features in self.rows),
+                                                dtype=float, count=len(self.text))
+        return self.values[name]
+
+
+# Whole-column counterparts of FEATURES over a ColumnFeatures, for the
+# features where a pandas string operation beats the row-wise function;
+# the others (the token and sentence features) run row by row on the
+# shared TextFeatures
+COLUMN_FEATURES: Dict[str, Callable[[ColumnFeatures], object]] = {
+    'length': lambda f: f.lowered.str.len().to_numpy(),
+    'quotes': lambda f: (f.text.str.count('"') + f.text.str.count("'")).to_numpy(),
+    'commas': lambda f: f.text.str.count(',').to_numpy(),
+    'uppercase': lambda f: f.text.str.count('[A-Z]').to_numpy()
+}